@@ -0,0 +1,57 @@
+"""
+Benchmark: Average-Linkage-Clustering (bisheriges Verfahren vs. Nearest-Neighbour-Chain)
+
+Die Ähnlichkeitsmatrix wird aus synthetischen Einbettungen mit Gruppenstruktur
+erzeugt, damit der Benchmark ohne Modell läuft. Das bisherige Verfahren wird nur
+für kleine n gemessen und dabei auf identische Ausgabe geprüft.
+
+Aufruf: python benchmarks/bench_clustering.py [--n 2000 20000] [--baseline-n 50 100 150]
+"""
+
+import argparse
+
+import numpy as np
+
+from bench_utils import Timer
+from clustering import average_linkage_clusters, average_linkage_clusters_naive
+from vector_index import normalize_rows
+
+
+def make_similarity_matrix(n: int, dimension: int = 64, groups: int = 50, seed: int = 0) -> np.ndarray:
+    """Erzeugt eine Ähnlichkeitsmatrix (float32) für n synthetische Einbettungen."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(groups, dimension))
+    labels = rng.integers(0, groups, size=n)
+    embeddings = normalize_rows(centers[labels] + 0.4 * rng.normal(size=(n, dimension)))
+    similarity_matrix = embeddings @ embeddings.T
+    np.fill_diagonal(similarity_matrix, 1.0)
+    return similarity_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--baseline-n", type=int, nargs="+", default=[50, 100, 150])
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--min-cluster-size", type=int, default=2)
+    args = parser.parse_args()
+    
+    for n in args.baseline_n:
+        similarity_matrix = make_similarity_matrix(n)
+        with Timer() as baseline_timer:
+            expected = average_linkage_clusters_naive(similarity_matrix, args.threshold, args.min_cluster_size)
+        with Timer() as timer:
+            clusters = average_linkage_clusters(similarity_matrix, args.threshold, args.min_cluster_size)
+        print(f"n={n}: bisher {baseline_timer.elapsed:.2f}s, neu {timer.elapsed * 1000:.1f}ms, "
+              f"{len(clusters)} Cluster, identisch: {clusters == expected}")
+    
+    for n in args.n:
+        similarity_matrix = make_similarity_matrix(n)
+        with Timer() as timer:
+            clusters = average_linkage_clusters(similarity_matrix, args.threshold, args.min_cluster_size, copy=False)
+        print(f"n={n}: neu {timer.elapsed:.1f}s, {len(clusters)} Cluster "
+              f"(Matrix {similarity_matrix.nbytes / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: Epochenzeit der Trainingsdaten (Tokenisierung pro Epoche vs. vortokenisiert)
+
+Verglichen wird eine Epoche über den DataLoader ohne Modell:
+- "pro Epoche": Tokenisierung jedes Eintrags in __getitem__ (bisheriges Verhalten)
+- "vortokenisiert": ProposalDataset auf einem TokenizedCorpus, zufällige Batches
+- "nach Länge": zusätzlich LengthGroupedBatchSampler, mit 0 und mehr Workern
+
+Angegeben sind die Zeit pro Epoche, der Anteil der Padding-Tokens (er bestimmt
+den Mehraufwand im Forward-Pass) und die einmalige Vortokenisierung.
+
+Aufruf: python benchmarks/bench_dataloading.py [--texts datei.jsonl] [--n 20000] [--batch-size 16]
+        [--workers 0 2 4]
+"""
+
+import tempfile
+import argparse
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset, DataLoader
+
+from bench_utils import load_texts, Timer
+from proposal_processor import ProposalProcessor
+from proposal_models import ProposalDataset, DynamicPaddingCollator, LengthGroupedBatchSampler
+
+
+class OnTheFlyDataset(Dataset):
+    """Tokenisiert jeden Eintrag bei jedem Zugriff (wie vor der Vortokenisierung)."""
+    
+    def __init__(self, texts, labels, preprocessor):
+        self.texts = texts
+        self.labels = labels
+        self.preprocessor = preprocessor
+    
+    def __len__(self):
+        return len(self.texts)
+    
+    def __getitem__(self, idx):
+        tokenized = self.preprocessor.tokenize_for_bert(self.texts[idx])
+        return {
+            "input_ids": tokenized["input_ids"][0],
+            "labels": torch.tensor(self.labels[idx], dtype=torch.float)
+        }
+
+
+def run_epoch(dataloader) -> tuple:
+    """Liest eine Epoche und liefert (Sekunden, Padding-Anteil)."""
+    padded_tokens = real_tokens = 0
+    with Timer() as timer:
+        for batch in dataloader:
+            padded_tokens += batch["attention_mask"].numel()
+            real_tokens += int(batch["attention_mask"].sum())
+    return timer.elapsed, 1 - real_tokens / padded_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.n)
+    processor = ProposalProcessor(load_models=False)
+    preprocessor = processor.preprocessor
+    labels = np.random.default_rng(0).integers(0, 2, (len(texts), processor.num_categories))
+    collator = DynamicPaddingCollator(preprocessor.tokenizer.pad_token_id)
+    cache_dir = tempfile.mkdtemp()
+    
+    with Timer() as timer:
+        dataset = ProposalDataset(texts, labels, preprocessor, cache_dir=cache_dir)
+    print(f"{len(texts)} Texte, Batch-Größe {args.batch_size}")
+    print(f"Einmalige Vortokenisierung: {timer.elapsed:.2f} s "
+          f"(erneutes Öffnen: ", end="")
+    with Timer() as timer:
+        ProposalDataset(texts, labels, preprocessor, cache_dir=cache_dir)
+    print(f"{timer.elapsed:.2f} s)\n")
+    
+    variants = [
+        ("pro Epoche", DataLoader(
+            OnTheFlyDataset(texts, labels, preprocessor), batch_size=args.batch_size, shuffle=True, collate_fn=collator
+        )),
+        ("vortokenisiert", DataLoader(dataset, batch_size=args.batch_size, shuffle=True, collate_fn=collator))
+    ]
+    for num_workers in args.workers:
+        variants.append((f"nach Länge, {num_workers} W.", DataLoader(
+            dataset, batch_sampler=LengthGroupedBatchSampler(dataset.lengths, args.batch_size),
+            collate_fn=collator, num_workers=num_workers, persistent_workers=num_workers > 0
+        )))
+    
+    print(f"{'Variante':22s} {'Epoche (s)':>11s} {'Speedup':>8s} {'Padding':>8s}")
+    baseline = None
+    for name, dataloader in variants:
+        # Zweite Epoche messen (Worker und Dateicache sind dann aufgewärmt)
+        run_epoch(dataloader)
+        elapsed, padding = run_epoch(dataloader)
+        baseline = baseline or elapsed
+        print(f"{name:22s} {elapsed:11.2f} {baseline / elapsed:8.1f} {padding:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
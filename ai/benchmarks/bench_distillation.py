@@ -0,0 +1,74 @@
+"""
+Benchmark: Geschwindigkeit und Genauigkeit destillierter Schülermodelle
+
+Für jede Schülerkonfiguration (Schichten x Breite) wird das gemeinsame Modell
+mit ProposalProcessor.train_distilled destilliert und auf zurückgehaltenen
+Texten mit dem Lehrer verglichen. Die Tabelle zeigt Parameterzahl, Latenz pro
+Vorschlag, Durchsatz und die Übereinstimmung von Kategorien, Qualitätsscores
+und Einbettungen, um den Arbeitspunkt zu wählen.
+
+Konfigurationen werden als "Schichten" oder "SchichtenxBreite" angegeben,
+z.B. 6 4 4x512.
+
+Aufruf: python benchmarks/bench_distillation.py [--texts datei.jsonl] [--n 2000] [--configs 6 4 4x512]
+        [--epochs 3]
+"""
+
+import argparse
+
+import torch
+
+from bench_utils import load_texts
+from proposal_processor import ProposalProcessor
+
+
+def parse_config(value: str) -> tuple:
+    """Zerlegt "6" bzw. "4x512" in (Schichten, Breite oder None)."""
+    layers, _, width = value.partition("x")
+    return int(layers), int(width) if width else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--validation-fraction", type=float, default=0.2)
+    parser.add_argument("--configs", nargs="+", default=["6", "4", "4x512"])
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.n)
+    n_validation = max(1, int(len(texts) * args.validation_fraction))
+    train_texts, validation_texts = texts[n_validation:], texts[:n_validation]
+    print(f"{len(train_texts)} Trainingstexte, {len(validation_texts)} Vergleichstexte, "
+          f"{torch.get_num_threads()} Threads")
+    
+    torch.manual_seed(0)
+    processor = ProposalProcessor()
+    
+    rows = []
+    for config in args.configs:
+        num_layers, hidden_size = parse_config(config)
+        result = processor.train_distilled(
+            train_texts, num_layers=num_layers, hidden_size=hidden_size,
+            batch_size=args.batch_size, num_epochs=args.epochs,
+            validation_texts=validation_texts, model_file=f"student-{config}.pt"
+        )
+        teacher_row, student_row = result["report"]
+        if not rows:
+            rows.append(teacher_row)
+        rows.append(student_row)
+    
+    teacher = rows[0]
+    print(f"\n{'Modell':18s} {'Param. (M)':>10s} {'Latenz (ms)':>12s} {'Speedup':>8s} {'Texte/s':>9s} "
+          f"{'Top-1':>7s} {'Labels':>7s} {'P MAE':>7s} {'Q MAE':>7s} {'cos':>7s}")
+    for row in rows:
+        print(f"{row['model']:18s} {row['parameters_m']:10.1f} {row['latency_ms']:12.1f} "
+              f"{teacher['latency_ms'] / row['latency_ms']:8.2f} {row['throughput']:9.1f} "
+              f"{row['top1_agreement']:7.1%} {row['label_agreement']:7.1%} {row['probability_mae']:7.4f} "
+              f"{row['quality_mae']:7.4f} {row['embedding_cosine']:7.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: Kategorisierung mit vorzeitigem Abbruch (Early Exit)
+
+Das gemeinsame Modell erhält bei Bedarf Zwischenklassifikatoren
+(ProposalProcessor.train_exit_heads, ohne Labels als Nachbildung des
+vollständigen Modells). Für jede Konfidenzmarge zeigt die Tabelle die
+durchschnittlich ausgeführten Schichten, den Durchsatz und die Übereinstimmung
+der Kategorienmengen mit dem vollständigen Modell. Enthält die JSONL-Datei ein
+Feld "categories", werden zusätzlich Genauigkeit und Genauigkeitsverlust
+gegenüber den Labels ausgegeben.
+
+Aufruf: python benchmarks/bench_early_exit.py [--texts datei.jsonl] [--n 1000] [--margins 0.1 0.2 0.3 0.4]
+        [--exit-layers 3 6 9] [--train] [--epochs 10]
+"""
+
+import json
+import argparse
+
+import torch
+
+from bench_utils import load_texts
+from proposal_processor import ProposalProcessor
+
+
+def load_labels(path: str, n: int):
+    """Liest das Feld "categories" aus einer JSONL-Datei (None, wenn es fehlt)."""
+    if not path or not path.endswith(".jsonl"):
+        return None
+    
+    labels = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "categories" not in record:
+                return None
+            labels.append(record["categories"])
+            if len(labels) >= n:
+                break
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=1000)
+    parser.add_argument("--validation-fraction", type=float, default=0.3)
+    parser.add_argument("--margins", type=float, nargs="+", default=[0.1, 0.2, 0.3, 0.4])
+    parser.add_argument("--exit-layers", type=int, nargs="+", help="Standard: 1/4, 1/2 und 3/4 der Schichten")
+    parser.add_argument("--train", action="store_true",
+                        help="Zwischenklassifikatoren neu trainieren, auch wenn das Modell bereits welche hat")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.n)
+    labels = load_labels(args.texts, args.n)
+    n_validation = max(1, int(len(texts) * args.validation_fraction))
+    train_texts, validation_texts = texts[n_validation:], texts[:n_validation]
+    
+    torch.manual_seed(0)
+    processor = ProposalProcessor()
+    if args.train or not processor.model.exit_layers:
+        processor.train_exit_heads(
+            train_texts, labels[n_validation:] if labels else None, args.exit_layers,
+            batch_size=args.batch_size, num_epochs=args.epochs
+        )
+    
+    report = processor.early_exit_report(
+        validation_texts, args.margins, labels[:n_validation] if labels else None,
+        batch_size=args.batch_size
+    )
+    
+    print(f"\n{len(validation_texts)} Vergleichstexte, Zwischenklassifikatoren nach Schichten "
+          f"{processor.model.exit_layers}, {torch.get_num_threads()} Threads")
+    print(f"{'Marge':>7s} {'Schichten':>10s} {'Texte/s':>9s} {'Speedup':>8s} {'Labels':>7s} {'P MAE':>7s}"
+          + (f" {'Genau.':>7s} {'Verlust':>8s}" if labels else ""))
+    full = report[0]
+    for row in report:
+        margin = "voll" if row["margin"] is None else f"{row['margin']:.2f}"
+        line = (f"{margin:>7s} {row['avg_layers']:10.2f} {row['throughput']:9.1f} "
+                f"{row['throughput'] / full['throughput']:8.2f} {row['label_agreement']:7.1%} "
+                f"{row['probability_mae']:7.4f}")
+        if labels:
+            line += f" {row['accuracy']:7.1%} {row['accuracy_loss']:8.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
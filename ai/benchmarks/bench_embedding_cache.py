@@ -0,0 +1,69 @@
+"""
+Benchmark: wiederholte Duplikatprüfungen mit und ohne Embedding-Cache
+
+Prüft eine Reihe von Anfragetexten mehrfach gegen eine feste Referenzmenge
+(wie SimilarityAnalyzer.is_duplicate im Betrieb) und berichtet Trefferquote und
+Latenz pro Prüfung. Anschließend wird mit einem neuen Cache-Objekt auf derselben
+SQLite-Datei ein Neustart simuliert.
+
+Aufruf: python benchmarks/bench_embedding_cache.py [--references 200] [--queries 20] [--rounds 3]
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from bench_utils import load_texts, Timer
+from embedding_cache import EmbeddingCache
+from proposal_processor import SimilarityAnalyzer
+
+
+def run_duplicate_checks(analyzer: SimilarityAnalyzer, queries, references) -> float:
+    """Führt alle Duplikatprüfungen aus und gibt die mittlere Latenz in ms zurück."""
+    latencies = []
+    for query in queries:
+        with Timer() as timer:
+            analyzer.is_duplicate(query, references)
+        latencies.append(timer.elapsed)
+    return 1000 * float(np.mean(latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--references", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.references + args.queries)
+    references, queries = texts[:args.references], texts[args.references:]
+    cache_path = os.path.join(tempfile.mkdtemp(), "embeddings.sqlite")
+    
+    print(f"{len(references)} Referenztexte, {len(queries)} Anfragen, {args.rounds} Runden")
+    print(f"{'Variante':<22} {'Runde':>5} {'ms/Prüfung':>12} {'Trefferquote':>13}")
+    
+    # Ohne Cache: jede Prüfung kodiert alle Referenztexte neu
+    analyzer = SimilarityAnalyzer()
+    latency = run_duplicate_checks(analyzer, queries, references)
+    print(f"{'ohne Cache':<22} {1:>5} {latency:>12.1f} {'-':>13}")
+    
+    # Mit Cache (Speicher + SQLite)
+    analyzer.cache = EmbeddingCache(max_entries=10000, path=cache_path)
+    for round_number in range(1, args.rounds + 1):
+        latency = run_duplicate_checks(analyzer, queries, references)
+        print(f"{'mit Cache':<22} {round_number:>5} {latency:>12.1f} {analyzer.cache.stats()['hit_rate']:>13.1%}")
+    analyzer.cache.close()
+    
+    # Neustart: leere Speicherstufe, persistente Stufe bleibt erhalten
+    analyzer.cache = EmbeddingCache(max_entries=10000, path=cache_path)
+    latency = run_duplicate_checks(analyzer, queries, references)
+    stats = analyzer.cache.stats()
+    print(f"{'nach Neustart':<22} {1:>5} {latency:>12.1f} {stats['hit_rate']:>13.1%}")
+    print(f"Cache-Statistik nach Neustart: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: spaCy-Merkmalsextraktion einzeln (volle Pipeline) vs. gebündelt (reduzierte Pipeline)
+
+Das bisherige Verfahren ruft nlp(text) mit allen Komponenten für jeden Text
+einzeln auf. Das neue Verfahren nutzt nlp.pipe ohne Lemmatizer und Parser
+(Satzgrenzen über den Senter) und liefert eine Merkmalsmatrix.
+
+Aufruf: python benchmarks/bench_features.py [--texts datei.jsonl] [--n 1000] [--batch-size 64] [--n-process 1 2 4]
+"""
+
+import argparse
+
+import numpy as np
+
+from bench_utils import load_texts, Timer
+from proposal_processor import TextPreprocessor
+
+
+def extract_features_single(nlp, text: str) -> dict:
+    """Bisheriges Verfahren: volle Pipeline und ein Merkmals-Dictionary pro Text."""
+    doc = nlp(text)
+    features = {
+        "num_tokens": len(doc),
+        "num_sentences": len(list(doc.sents)),
+        "avg_token_length": np.mean([len(token.text) for token in doc]) if len(doc) > 0 else 0,
+        "avg_sentence_length": np.mean([len(sent) for sent in doc.sents]) if len(list(doc.sents)) > 0 else 0,
+    }
+    pos_counts = {}
+    for token in doc:
+        pos_counts[token.pos_] = pos_counts.get(token.pos_, 0) + 1
+    for pos, count in pos_counts.items():
+        features[f"pos_{pos}"] = count / len(doc) if len(doc) > 0 else 0
+    for ent in doc.ents:
+        features[f"ent_{ent.label_}"] = features.get(f"ent_{ent.label_}", 0) + 1
+    return features
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.n)
+    preprocessor = TextPreprocessor()
+    print(f"Pipeline: {preprocessor.nlp.pipe_names}, deaktiviert: {preprocessor._feature_disable}, "
+          f"zusätzlich: {preprocessor._feature_enable}")
+    
+    # Bisheriges Verfahren: volle Pipeline, ein Dokument pro Aufruf
+    with Timer() as baseline_timer:
+        baseline = [extract_features_single(preprocessor.nlp, text) for text in texts]
+    print(f"einzeln, volle Pipeline: {len(texts) / baseline_timer.elapsed:.0f} Texte/s")
+    
+    for n_process in args.n_process:
+        with Timer() as timer:
+            features = preprocessor.extract_features_batch(texts, args.batch_size, n_process)
+        print(f"gebündelt, n_process={n_process}: {len(texts) / timer.elapsed:.0f} Texte/s "
+              f"(x{baseline_timer.elapsed / timer.elapsed:.1f}), Matrix {features.shape}")
+    
+    # Vergleich der gemeinsamen Merkmale
+    names = preprocessor.feature_names
+    deviation = max(
+        abs(features[row, names.index(name)] - value)
+        for row, row_features in enumerate(baseline)
+        for name, value in row_features.items()
+        if name in names
+    )
+    print(f"max. Abweichung gegenüber dem bisherigen Verfahren: {deviation:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: Nachtraining der Köpfe auf zwischengespeicherten Merkmalen vs. Fine-Tuning
+
+Gemessen wird auf demselben gelabelten Korpus:
+- "Fine-Tuning": eine Epoche des vollständigen Kategorisierers (Encoder und Kopf)
+- "Köpfe, kalt": train_heads einschließlich einmaliger Berechnung der [CLS]-Merkmale
+- "Köpfe, Cache": train_heads mit den zwischengespeicherten Merkmalen
+
+Das Modellverzeichnis ist ein temporäres Verzeichnis; vorhandene Gewichte
+werden weder gelesen noch überschrieben.
+
+Aufruf: python benchmarks/bench_head_training.py [--texts datei.jsonl] [--n 2000] [--batch-size 16]
+        [--head-epochs 20]
+"""
+
+import tempfile
+import argparse
+
+import numpy as np
+
+import proposal_processor
+from bench_utils import load_texts, Timer
+from proposal_processor import ProposalProcessor
+from proposal_models import ProposalDataset, ProposalCategorizer, DEVICE
+from trainer import Trainer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--head-epochs", type=int, default=20)
+    args = parser.parse_args()
+
+    proposal_processor.MODEL_PATH = tempfile.mkdtemp()
+    texts = load_texts(args.texts, args.n)
+    processor = ProposalProcessor(load_models=False)
+    rng = np.random.default_rng(0)
+    labels = [[processor.categories[i]] for i in rng.integers(0, processor.num_categories, len(texts))]
+
+    print(f"{len(texts)} Texte, Gerät {DEVICE}")
+    print(f"{'Variante':14s} {'Zeit (s)':>10s}")
+
+    # Eine Epoche des vollständigen Fine-Tunings (ohne Speichern)
+    import torch
+
+    dataset = ProposalDataset(texts, processor.mlb.transform(labels), processor.preprocessor)
+    model = ProposalCategorizer(processor.num_categories).to(DEVICE)
+    criterion = torch.nn.BCEWithLogitsLoss()
+    trainer = Trainer(model, lambda m, batch: criterion(m(batch["input_ids"], batch["attention_mask"]), batch["labels"]))
+    with Timer() as timer:
+        trainer.train(processor._training_dataloader(dataset, args.batch_size), num_epochs=1)
+    print(f"{'Fine-Tuning':14s} {timer.elapsed:10.2f}  (pro Epoche)")
+    del model, trainer
+
+    for name in ("Köpfe, kalt", "Köpfe, Cache"):
+        with Timer() as timer:
+            result = processor.train_heads(texts, labels, num_epochs=args.head_epochs)
+        print(f"{name:14s} {timer.elapsed:10.2f}  ({args.head_epochs} Epochen, "
+              f"Verlust {result['training_stats'][-1]['avg_loss']:.4f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: Top-k-Abfragen mit PriorityLeaderboard vs. get_top_proposals bei laufenden Stimmen
+
+Gemessen wird für synthetische Vorschlagsdaten:
+- "aufbauen": PriorityLeaderboard.add_proposals (einmalig)
+- "Stimmen": add_votes für zufällige Vorschläge (je Aktualisierung)
+- "top-k": top(k) für beide Profile, abwechselnd mit Stimmen (je Abfrage)
+- "get_top_proposals": vollständige Neuberechnung auf der Liste (je Abfrage)
+
+Am Ende werden die Top-k beider Varianten auf Gleichheit geprüft.
+
+Aufruf: python benchmarks/bench_leaderboard.py [--n 100000] [--updates 100000] [--k 20]
+"""
+
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from bench_utils import Timer
+from bench_priority import make_proposals
+from leaderboard import PriorityLeaderboard
+from proposal_processor import ProposalProcessor
+from categorization_algorithms import ProposalSorter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--updates", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    sorter = ProposalSorter(ProposalProcessor(load_models=False))
+    proposals = make_proposals(args.n)
+    now = datetime.now()
+    rng = np.random.default_rng(1)
+    targets = rng.integers(0, args.n, args.updates).tolist()
+
+    print(f"{args.n} Vorschläge, {args.updates} Stimmen, k={args.k}")
+    print(f"{'Variante':18s} {'Zeit (µs)':>12s}")
+
+    leaderboard = PriorityLeaderboard(sorter)
+    with Timer() as timer:
+        leaderboard.add_proposals(proposals, now)
+    print(f"{'aufbauen':18s} {timer.elapsed * 1e6 / args.n:12.1f}  (je Vorschlag)")
+
+    with Timer() as timer:
+        for i in targets:
+            leaderboard.add_votes(proposals[i]["id"], 1, now)
+    print(f"{'Stimmen':18s} {timer.elapsed * 1e6 / args.updates:12.1f}")
+    for i in targets:
+        proposals[i]["votes"] = proposals[i].get("votes", 0) + 1
+
+    with Timer() as timer:
+        for i in targets[:10_000]:
+            leaderboard.add_votes(proposals[i]["id"], 0, now)
+            leaderboard.top(args.k, "default", now)
+            leaderboard.top(args.k, "trending", now)
+    print(f"{'top-k':18s} {timer.elapsed * 1e6 / 20_000:12.1f}  (inkl. Stimmen)")
+
+    with Timer() as timer:
+        for _ in range(3):
+            expected = sorter.get_top_proposals(proposals, args.k, "default", now)
+    print(f"{'get_top_proposals':18s} {timer.elapsed * 1e6 / 3:12.0f}")
+
+    identical = [p["id"] for p in expected] == [i for i, _ in leaderboard.top(args.k, "default", now)]
+    expected = sorter.get_trending_proposals(proposals, 7, args.k, "trending", now)
+    identical &= [p["id"] for p in expected] == [i for i, _ in leaderboard.top(args.k, "trending", now)]
+    print(f"identisch: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: Inferenz mit PyTorch vs. onnxruntime bei Batch-Größen 1, 8 und 32
+
+Das gemeinsame Modell wird einmal nach ONNX exportiert (in ein temporäres
+Verzeichnis, damit beide Backends dieselben Gewichte nutzen) und mit dem
+CPU-Provider von onnxruntime ausgeführt. Gemessen werden je Backend und
+Batch-Größe die Latenz pro Batch (Median) und der Durchsatz sowie die maximale
+Abweichung der Ausgaben gegenüber PyTorch.
+
+Aufruf: python benchmarks/bench_onnx.py [--texts datei.jsonl] [--n 256] [--batch-sizes 1 8 32]
+        [--threads 4] [--optimization all] [--int8]
+"""
+
+import tempfile
+import argparse
+
+import numpy as np
+import torch
+
+from bench_utils import load_texts, Timer
+from proposal_processor import ProposalProcessor, length_sorted_batches
+from onnx_backend import load_onnx_model
+
+
+def run_backend(processor: ProposalProcessor, input_ids, batch_size: int) -> dict:
+    """Misst Latenz und Durchsatz eines Processors bei fester Batch-Größe."""
+    # Aufwärmen (erste Ausführung enthält Initialisierung)
+    processor._predict_batch(input_ids[:batch_size], batch_size)
+    
+    latencies = []
+    with Timer() as total_timer:
+        for batch_indices in length_sorted_batches([len(ids) for ids in input_ids], batch_size):
+            with Timer() as timer:
+                processor._predict_batch([input_ids[i] for i in batch_indices], batch_size)
+            latencies.append(timer.elapsed)
+    
+    return {
+        "latency_ms": 1000 * float(np.median(latencies)),
+        "throughput": len(input_ids) / total_timer.elapsed,
+        "predictions": processor._predict_batch(input_ids, batch_size)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=256)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads(),
+                        help="Threads für PyTorch und intra_op_num_threads für onnxruntime")
+    parser.add_argument("--optimization", default="all", choices=["disable", "basic", "extended", "all"])
+    parser.add_argument("--int8", action="store_true", help="zusätzlich den quantisierten ONNX-Graphen messen")
+    args = parser.parse_args()
+    
+    torch.set_num_threads(args.threads)
+    texts = load_texts(args.texts, args.n)
+    
+    # PyTorch-Referenz
+    torch.manual_seed(0)
+    torch_processor = ProposalProcessor()
+    input_ids = torch_processor._tokenize_cleaned(texts)
+    
+    # ONNX-Backends mit denselben Gewichten
+    options = {"graph_optimization_level": args.optimization, "intra_op_num_threads": args.threads}
+    export_dir = tempfile.mkdtemp()
+    backends = [("torch", torch_processor)]
+    for precision in ["fp32"] + (["int8"] if args.int8 else []):
+        processor = ProposalProcessor(backend="onnx", precision=precision, onnx_options=options)
+        with Timer() as timer:
+            processor._onnx_model = load_onnx_model(
+                f"{export_dir}/multihead.onnx", lambda: torch_processor.model, precision, options
+            )
+        print(f"Export/Laden onnx ({precision}): {timer.elapsed:.1f} s")
+        backends.append((f"onnx ({precision})", processor))
+    
+    print(f"\n{len(texts)} Texte, {args.threads} Threads, Graph-Optimierung {args.optimization}")
+    print(f"{'Backend':14s} {'Batch':>6s} {'Latenz (ms)':>12s} {'Texte/s':>9s} {'max. Abw. P':>12s} {'max. Abw. E':>12s}")
+    for batch_size in args.batch_sizes:
+        reference = None
+        for name, processor in backends:
+            result = run_backend(processor, input_ids, batch_size)
+            if reference is None:
+                reference = result
+            deviation = {
+                key: np.abs(result["predictions"][key] - reference["predictions"][key]).max()
+                for key in ("category_probabilities", "embeddings")
+            }
+            print(f"{name:14s} {batch_size:6d} {result['latency_ms']:12.1f} {result['throughput']:9.1f} "
+                  f"{deviation['category_probabilities']:12.2e} {deviation['embeddings']:12.2e}")
+
+
+if __name__ == "__main__":
+    main()
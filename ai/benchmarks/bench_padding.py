@@ -0,0 +1,67 @@
+"""
+Benchmark: festes Padding auf MAX_LENGTH vs. dynamisches Padding vs. Längen-Buckets
+
+Misst den Durchsatz des Encoders in echten (nicht gepaddeten) Tokens pro Sekunde
+und die maximale Abweichung der [CLS]-Einbettungen gegenüber dem Padding auf 512.
+
+Aufruf: python benchmarks/bench_padding.py [--texts datei.jsonl] [--n 256] [--batch-size 16]
+"""
+
+import argparse
+
+import numpy as np
+import torch
+
+from bench_utils import load_texts, Timer
+from proposal_processor import SimilarityAnalyzer, MAX_LENGTH, LENGTH_BUCKETS, DEVICE
+
+
+def embed_fixed_padding(analyzer: SimilarityAnalyzer, texts, batch_size: int) -> np.ndarray:
+    """Bisheriges Verfahren: jeder Text wird auf MAX_LENGTH gepaddet."""
+    embeddings = []
+    for i in range(0, len(texts), batch_size):
+        inputs = analyzer.tokenizer(
+            texts[i:i + batch_size],
+            padding="max_length",
+            truncation=True,
+            max_length=MAX_LENGTH,
+            return_tensors="pt"
+        )
+        inputs = {k: v.to(DEVICE) for k, v in inputs.items()}
+        with torch.no_grad():
+            outputs = analyzer.model.encode(inputs["input_ids"], inputs["attention_mask"])
+        embeddings.append(outputs.cpu().numpy())
+    return np.concatenate(embeddings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.n)
+    analyzer = SimilarityAnalyzer()
+    
+    lengths = [len(ids) for ids in analyzer.tokenizer(texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]]
+    real_tokens = sum(lengths)
+    print(f"{len(texts)} Texte, Ø {np.mean(lengths):.1f} Tokens, max {max(lengths)} Tokens")
+    
+    with Timer() as fixed_timer:
+        reference = embed_fixed_padding(analyzer, texts, args.batch_size)
+    
+    runs = [("fest (512)", fixed_timer.elapsed, reference)]
+    for name, bucket_sizes in [("dynamisch", None), ("Buckets", LENGTH_BUCKETS)]:
+        with Timer() as timer:
+            embeddings = analyzer.get_embeddings(texts, args.batch_size, bucket_sizes)
+        runs.append((name, timer.elapsed, embeddings))
+    
+    print(f"{'Padding':<12} {'Zeit [s]':>10} {'Tokens/s':>12} {'max. Abw.':>12}")
+    for name, elapsed, embeddings in runs:
+        deviation = float(np.max(np.abs(embeddings - reference)))
+        print(f"{name:<12} {elapsed:>10.2f} {real_tokens / elapsed:>12.0f} {deviation:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: Genauigkeitsabweichung, Latenz und Speicher der Inferenz mit fp32, int8 und bf16
+
+Für jede Genauigkeit wird ein ProposalProcessor mit denselben Gewichten erzeugt
+und auf einem zurückgehaltenen Datensatz ausgeführt. Verglichen mit fp32 werden:
+
+- Kategoriewahrscheinlichkeiten: max./mittlere absolute Abweichung, Übereinstimmung
+  der wahrscheinlichsten Kategorie und der Kategorienmenge (Schwellenwert 0,5)
+- Qualitätsscores (Skala 1–5): max./mittlere absolute Abweichung
+- Einbettungen: mittlere und minimale Kosinus-Ähnlichkeit zu fp32
+
+Dazu kommen die Latenz je Einzelvorschlag (Median), der Durchsatz im Batch und
+die Größe der serialisierten Modellgewichte.
+
+Ohne trainierte Gewichte (models/multihead.pt) werden die Köpfe mit festem
+Startwert initialisiert, damit alle Genauigkeiten dieselben Gewichte nutzen.
+
+Aufruf: python benchmarks/bench_precision.py [--texts heldout.jsonl] [--n 256] [--precisions fp32 int8 bf16]
+"""
+
+import io
+import argparse
+
+import numpy as np
+import torch
+
+from bench_utils import load_texts, Timer
+from proposal_processor import ProposalProcessor, PRECISION_MODES
+
+
+def model_size_mb(model: torch.nn.Module) -> float:
+    """Größe des serialisierten State-Dicts in MB (enthält auch quantisierte Gewichte)."""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1e6
+
+
+def run_precision(precision: str, texts, batch_size: int, n_single: int) -> dict:
+    """Führt alle Texte mit einer Genauigkeit aus und misst Latenz und Durchsatz."""
+    torch.manual_seed(0)
+    processor = ProposalProcessor(precision=precision)
+    model = processor.model
+    input_ids = processor._tokenize_cleaned(texts)
+    
+    # Aufwärmen, damit die erste Messung keine Initialisierung enthält
+    processor._predict_batch(input_ids[:batch_size], batch_size)
+    
+    with Timer() as batch_timer:
+        predictions = processor._predict_batch(input_ids, batch_size)
+    
+    latencies = []
+    for ids in input_ids[:n_single]:
+        with Timer() as timer:
+            processor._predict_batch([ids], 1)
+        latencies.append(timer.elapsed)
+    
+    return {
+        "precision": processor.precision,
+        "predictions": predictions,
+        "latency_ms": 1000 * float(np.median(latencies)),
+        "throughput": len(texts) / batch_timer.elapsed,
+        "size_mb": model_size_mb(model)
+    }
+
+
+def drift(reference: dict, candidate: dict, threshold: float = 0.5) -> dict:
+    """Berechnet die Abweichungen einer Genauigkeit gegenüber fp32."""
+    ref, cand = reference["predictions"], candidate["predictions"]
+    
+    probability_diff = np.abs(cand["category_probabilities"] - ref["category_probabilities"])
+    quality_diff = 4 * np.abs(cand["quality_scores"] - ref["quality_scores"])
+    
+    ref_embeddings = ref["embeddings"] / np.linalg.norm(ref["embeddings"], axis=1, keepdims=True)
+    cand_embeddings = cand["embeddings"] / np.linalg.norm(cand["embeddings"], axis=1, keepdims=True)
+    cosine = np.sum(ref_embeddings * cand_embeddings, axis=1)
+    
+    return {
+        "prob_max": probability_diff.max(),
+        "prob_mean": probability_diff.mean(),
+        "top1": np.mean(
+            cand["category_probabilities"].argmax(axis=1) == ref["category_probabilities"].argmax(axis=1)
+        ),
+        "labels": np.mean(np.all(
+            (cand["category_probabilities"] >= threshold) == (ref["category_probabilities"] >= threshold), axis=1
+        )),
+        "quality_max": quality_diff.max(),
+        "quality_mean": quality_diff.mean(),
+        "cos_mean": cosine.mean(),
+        "cos_min": cosine.min()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit zurückgehaltenen Vorschlägen")
+    parser.add_argument("--n", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--n-single", type=int, default=32, help="Anzahl der Einzelmessungen für die Latenz")
+    parser.add_argument("--precisions", nargs="+", default=list(PRECISION_MODES), choices=PRECISION_MODES)
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.n)
+    print(f"{len(texts)} Texte, {torch.get_num_threads()} Threads")
+    
+    precisions = ["fp32"] + [p for p in args.precisions if p != "fp32"]
+    results = [run_precision(p, texts, args.batch_size, args.n_single) for p in precisions]
+    reference = results[0]
+    
+    print(f"\n{'Genauigkeit':12s} {'Latenz (ms)':>12s} {'Texte/s':>9s} {'Größe (MB)':>11s}")
+    for requested, result in zip(precisions, results):
+        name = requested if result["precision"] == requested else f"{requested}->{result['precision']}"
+        print(f"{name:12s} {result['latency_ms']:12.1f} {result['throughput']:9.1f} {result['size_mb']:11.1f} "
+              f"(x{reference['latency_ms'] / result['latency_ms']:.2f} Latenz, "
+              f"x{reference['size_mb'] / result['size_mb']:.2f} Größe)")
+    
+    print("\nAbweichung gegenüber fp32")
+    print(f"{'Genauigkeit':12s} {'P max':>8s} {'P mittel':>9s} {'Top-1':>7s} {'Labels':>7s} "
+          f"{'Q max':>7s} {'Q mittel':>9s} {'cos mittel':>11s} {'cos min':>8s}")
+    for requested, result in zip(precisions[1:], results[1:]):
+        d = drift(reference, result)
+        print(f"{requested:12s} {d['prob_max']:8.4f} {d['prob_mean']:9.5f} {d['top1']:7.1%} {d['labels']:7.1%} "
+              f"{d['quality_max']:7.4f} {d['quality_mean']:9.5f} {d['cos_mean']:11.5f} {d['cos_min']:8.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: Prioritätsscores pro Vorschlag vs. spaltenweise über eine ProposalTable
+
+Gemessen wird für synthetische Vorschlagsdaten:
+- "skalar": calculate_priority_score in einer Schleife (nur für --baseline-n Vorschläge,
+  hochgerechnet auf n)
+- "Tabelle anlegen": ProposalTable.from_dicts (einmalig, u.a. Parsen der Zeitstempel)
+- "vektorisiert": priority_scores auf der Tabelle
+- "sortieren": sort_proposals(..., "priority") auf der Tabelle bzw. auf der Liste
+
+Die vektorisierten Scores werden auf den ersten --baseline-n Vorschlägen auf
+Gleichheit mit den skalaren Scores geprüft.
+
+Aufruf: python benchmarks/bench_priority.py [--n 1000000] [--baseline-n 100000]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from bench_utils import Timer
+from proposal_table import ProposalTable
+from proposal_processor import ProposalProcessor
+from categorization_algorithms import ProposalSorter
+
+
+def make_proposals(n: int, seed: int = 0):
+    """Erzeugt n synthetische Vorschlagsdaten (teils ohne Datum, Qualität oder Stimmen)."""
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    ages = rng.integers(0, 60 * 24 * 3600, n).tolist()
+    qualities = rng.uniform(1, 5, (n, 3)).tolist()
+    votes = rng.integers(0, 5000, n).tolist()
+    
+    proposals = []
+    for i in range(n):
+        proposal = {"id": str(i), "primary_category": "Verkehr"}
+        if i % 10:
+            proposal["created_at"] = (now - timedelta(seconds=ages[i])).isoformat()
+        if i % 7:
+            proposal["quality"] = {
+                "overall_quality": qualities[i][0], "relevance": qualities[i][1], "feasibility": qualities[i][2]
+            }
+        if i % 3:
+            proposal["votes"] = votes[i]
+        proposals.append(proposal)
+    return proposals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--baseline-n", type=int, default=100_000)
+    args = parser.parse_args()
+    
+    sorter = ProposalSorter(ProposalProcessor(load_models=False))
+    proposals = make_proposals(args.n)
+    now = datetime.now()
+    baseline_n = min(args.baseline_n, args.n)
+    
+    print(f"{args.n} Vorschläge")
+    print(f"{'Variante':18s} {'Zeit (s)':>10s}")
+    
+    with Timer() as timer:
+        expected = np.array([sorter.calculate_priority_score(p, now) for p in proposals[:baseline_n]])
+    print(f"{'skalar':18s} {timer.elapsed * args.n / baseline_n:10.2f}  (hochgerechnet aus {baseline_n})")
+    
+    with Timer() as timer:
+        table = ProposalTable.from_dicts(proposals)
+    print(f"{'Tabelle anlegen':18s} {timer.elapsed:10.2f}")
+    
+    with Timer() as timer:
+        scores = sorter.priority_scores(table, now)
+    print(f"{'vektorisiert':18s} {timer.elapsed:10.3f}")
+    
+    with Timer() as timer:
+        sorter.sort_proposals(table, "priority")
+    print(f"{'sortieren':18s} {timer.elapsed:10.3f}")
+    
+    with Timer() as timer:
+        sorter.sort_proposals(proposals, "priority")
+    print(f"{'sortieren (Liste)':18s} {timer.elapsed:10.2f}  (inkl. Anlegen der Tabelle)")
+    
+    print(f"identisch: {np.array_equal(scores[:baseline_n], expected)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Lastgenerator: Latenz und Durchsatz des Inferenzservers unter Nebenläufigkeit
+
+Für jede Nebenläufigkeitsstufe schicken entsprechend viele Clients über je
+eine Keep-Alive-Verbindung Anfragen an den Server, bis --n Anfragen
+beantwortet sind. Ausgegeben werden p50/p95/p99 der Latenz, der Durchsatz,
+die Anzahl abgewiesener Anfragen (503) und die mittlere Batch-Größe.
+
+Ohne --port bzw. --unix-socket wird der Server im selben Prozess gestartet,
+einmal je --max-batch-sizes (1 entspricht der Verarbeitung einzeln).
+
+Aufruf: python benchmarks/bench_server.py [--texts datei.jsonl] [--n 512] [--concurrency 1 8 32]
+        [--operation categorize] [--max-batch-sizes 1 32] [--max-wait-ms 5]
+        [--port 8765 | --unix-socket /tmp/proposals.sock]
+"""
+
+import json
+import asyncio
+import argparse
+from typing import List, Optional
+
+import numpy as np
+
+from bench_utils import load_texts, Timer
+from proposal_processor import ProposalProcessor
+from inference_server import InferenceServer
+
+
+async def send_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                       method: str, path: str, body: Optional[dict] = None) -> tuple:
+    """Sendet eine HTTP-Anfrage über eine bestehende Verbindung und liefert (Status, Antwort)."""
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+    )
+    await writer.drain()
+    
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    
+    response = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, json.loads(response)
+
+
+async def open_connection(args: argparse.Namespace, address):
+    """Öffnet eine Verbindung zum Server (TCP oder Unix-Socket)."""
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(address[0], address[1])
+
+
+async def run_load(args: argparse.Namespace, address, texts: List[str], concurrency: int) -> dict:
+    """Führt eine Laststufe aus und liefert Latenzen, Durchsatz und Fehlerzahlen."""
+    latencies = []
+    statuses = []
+    pending = iter(range(args.n))
+    
+    async def client():
+        reader, writer = await open_connection(args, address)
+        try:
+            for i in pending:
+                loop = asyncio.get_running_loop()
+                start = loop.time()
+                status, _ = await send_request(reader, writer, "POST", f"/{args.operation}", {
+                    "text": texts[i % len(texts)],
+                    "reference_texts": texts[:8]
+                })
+                latencies.append(loop.time() - start)
+                statuses.append(status)
+        finally:
+            writer.close()
+    
+    with Timer() as timer:
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    
+    ok = [latency for latency, status in zip(latencies, statuses) if status == 200]
+    p50, p95, p99 = np.percentile(ok, [50, 95, 99]) * 1000 if ok else (float("nan"),) * 3
+    return {
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        "throughput": len(ok) / timer.elapsed,
+        "rejected": statuses.count(503),
+        "errors": len(statuses) - len(ok) - statuses.count(503)
+    }
+
+
+async def batch_stats(args: argparse.Namespace, address) -> dict:
+    """Liest die Batch-Statistik der gemessenen Operation über /health."""
+    reader, writer = await open_connection(args, address)
+    try:
+        _, health = await send_request(reader, writer, "GET", "/health")
+    finally:
+        writer.close()
+    return health["batchers"][args.operation]
+
+
+async def run_levels(args: argparse.Namespace, address, texts: List[str], label: str) -> None:
+    """Misst alle Nebenläufigkeitsstufen gegen einen Server."""
+    # Aufwärmen (erste Anfragen enthalten Initialisierung)
+    await run_load(argparse.Namespace(**dict(vars(args), n=8)), address, texts, 1)
+    
+    for concurrency in args.concurrency:
+        before = await batch_stats(args, address)
+        result = await run_load(args, address, texts, concurrency)
+        after = await batch_stats(args, address)
+        
+        batches = after["batches"] - before["batches"]
+        avg_batch_size = (after["items"] - before["items"]) / batches if batches else 0.0
+        print(f"{label:>10s} {concurrency:8d} {result['p50']:9.1f} {result['p95']:9.1f} {result['p99']:9.1f} "
+              f"{result['throughput']:9.1f} {avg_batch_size:8.1f} {result['rejected']:6d} {result['errors']:6d}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=512, help="Anfragen pro Nebenläufigkeitsstufe")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--operation", default="categorize", choices=["process", "categorize", "quality", "similarity"])
+    parser.add_argument("--max-batch-sizes", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-queue-size", type=int, default=256)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Laufenden Server auf diesem Port messen")
+    parser.add_argument("--unix-socket", help="Laufenden Server auf diesem Unix-Socket messen")
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, max(args.n, 64))
+    
+    print(f"{len(texts)} Texte, Operation {args.operation}, {args.n} Anfragen pro Stufe")
+    print(f"{'Batch':>10s} {'Clients':>8s} {'p50 (ms)':>9s} {'p95 (ms)':>9s} {'p99 (ms)':>9s} "
+          f"{'Anfr./s':>9s} {'Ø Batch':>8s} {'503':>6s} {'Fehler':>6s}")
+    
+    if args.port or args.unix_socket:
+        address = args.unix_socket or (args.host, args.port)
+        await run_levels(args, address, texts, "extern")
+        return
+    
+    processor = ProposalProcessor()
+    processor.warmup()
+    for max_batch_size in args.max_batch_sizes:
+        server = InferenceServer(processor, max_batch_size, args.max_wait_ms, args.max_queue_size)
+        await server.start(args.host, 0)
+        try:
+            await run_levels(args, server.address, texts, str(max_batch_size))
+        finally:
+            await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
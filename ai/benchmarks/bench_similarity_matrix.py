@@ -0,0 +1,94 @@
+"""
+Benchmark: paarweise Ähnlichkeitsmatrix vs. einmalige Einbettung mit Matrixprodukt
+
+Das bisherige Verfahren ruft compute_similarity für jedes Paar auf und benötigt
+damit n·(n−1) Forward-Passes. Das neue Verfahren bettet jeden Text einmal ein.
+Das alte Verfahren wird nur für kleine n gemessen und für großes n hochgerechnet.
+
+Aufruf: python benchmarks/bench_similarity_matrix.py [--n 2000] [--baseline-n 30] [--block-size 512]
+"""
+
+import argparse
+
+import numpy as np
+
+from bench_utils import load_texts, Timer
+from proposal_processor import ProposalProcessor
+from categorization_algorithms import ProposalClusterer
+
+
+class ForwardCounter:
+    """Zählt die Texte, die den Encoder durchlaufen."""
+    
+    def __init__(self, analyzer):
+        self.count = 0
+        self._encode = analyzer._encode
+        analyzer._encode = self
+    
+    def __call__(self, texts, *args, **kwargs):
+        self.count += len(texts)
+        return self._encode(texts, *args, **kwargs)
+
+
+def pairwise_matrix(analyzer, texts) -> np.ndarray:
+    """Bisheriges Verfahren: compute_similarity für jedes Paar."""
+    n = len(texts)
+    similarity_matrix = np.zeros((n, n))
+    for i in range(n):
+        for j in range(i, n):
+            if i == j:
+                similarity_matrix[i, j] = 1.0
+            else:
+                similarity = analyzer.compute_similarity(texts[i], texts[j])
+                similarity_matrix[i, j] = similarity
+                similarity_matrix[j, i] = similarity
+    return similarity_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--baseline-n", type=int, default=30)
+    parser.add_argument("--block-size", type=int, default=512)
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.n)
+    processor = ProposalProcessor(load_models=False)
+    clusterer = ProposalClusterer(processor)
+    analyzer = clusterer.similarity_analyzer
+    counter = ForwardCounter(analyzer)
+    
+    # Bisheriges Verfahren (ohne Cache, sonst würde der Cache die Paare abfangen)
+    cache, analyzer.cache = analyzer.cache, None
+    baseline_texts = texts[:args.baseline_n]
+    with Timer() as baseline_timer:
+        baseline = pairwise_matrix(analyzer, baseline_texts)
+    baseline_passes = counter.count
+    time_per_pass = baseline_timer.elapsed / baseline_passes
+    
+    # Neues Verfahren auf denselben Texten zum Vergleich der Werte
+    counter.count = 0
+    matrix = clusterer.compute_similarity_matrix(baseline_texts)
+    deviation = float(np.max(np.abs(matrix - baseline)))
+    analyzer.cache = cache
+    
+    print(f"n={len(baseline_texts)}: paarweise {baseline_passes} Forward-Passes in {baseline_timer.elapsed:.1f}s, "
+          f"neu {counter.count} Forward-Passes, max. Abweichung {deviation:.2e}")
+    
+    # Großes n: nur das neue Verfahren wird gemessen
+    analyzer.cache.clear()
+    counter.count = 0
+    with Timer() as timer:
+        matrix = clusterer.compute_similarity_matrix(texts, block_size=args.block_size)
+    
+    n = len(texts)
+    estimated_passes = n * (n - 1)
+    print(f"n={n}: neu {counter.count} Forward-Passes in {timer.elapsed:.1f}s "
+          f"(Matrix {matrix.nbytes / 1e6:.0f} MB, {matrix.dtype})")
+    print(f"n={n}: paarweise geschätzt {estimated_passes} Forward-Passes, "
+          f"ca. {estimated_passes * time_per_pass / 3600:.1f}h")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: Kaltstart von ProposalProcessor (Zeit bis zum ersten Ergebnis und Speicherbedarf)
+
+Jedes Szenario läuft in einem frischen Python-Prozess. Gemessen werden für jeden
+Schritt die Dauer und der residente Speicher (RSS) danach:
+
+- categorize: Import, Konstruktor, erstes categorize() (ohne spaCy)
+- process: Import, Konstruktor, erstes process_proposal() (mit spaCy)
+- warmup: Import, Konstruktor, Tokenizer, Modell und spaCy einzeln, warmup(), danach process_proposal()
+
+Aufruf: python benchmarks/bench_startup.py [--scenarios categorize process warmup]
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from bench_utils import Timer
+
+EXAMPLE_TEXT = "Ich schlage vor, mehr Fahrradwege in der Innenstadt zu bauen, um den Verkehr zu entlasten."
+
+
+def rss_mb() -> float:
+    """Aktueller residenter Speicher des Prozesses in MB (Linux)."""
+    with open("/proc/self/statm", "r") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def run_scenario(scenario: str) -> None:
+    """Führt ein Szenario im aktuellen Prozess aus und gibt die Schritte als JSON-Zeilen aus."""
+    def report(step: str, seconds: float) -> None:
+        print(json.dumps({"step": step, "seconds": seconds, "rss_mb": rss_mb()}), flush=True)
+    
+    report("start", 0.0)
+    
+    with Timer() as timer:
+        from proposal_processor import ProposalProcessor
+    report("import", timer.elapsed)
+    
+    with Timer() as timer:
+        processor = ProposalProcessor()
+    report("konstruktor", timer.elapsed)
+    
+    if scenario == "categorize":
+        with Timer() as timer:
+            processor.categorize(EXAMPLE_TEXT)
+        report("erstes categorize", timer.elapsed)
+    elif scenario == "process":
+        with Timer() as timer:
+            processor.process_proposal(EXAMPLE_TEXT)
+        report("erstes process_proposal", timer.elapsed)
+    else:
+        # Komponenten einzeln laden, um Dauer und Speicher je Komponente zu erfassen
+        components = [
+            ("tokenizer", lambda: processor.preprocessor.tokenizer),
+            ("modell", lambda: processor.model),
+            ("spaCy", lambda: processor.preprocessor.nlp)
+        ]
+        for step, load in components:
+            with Timer() as timer:
+                load()
+            report(step, timer.elapsed)
+        
+        with Timer() as timer:
+            processor.warmup()
+        report("warmup (Dummy-Batch)", timer.elapsed)
+        
+        with Timer() as timer:
+            processor.process_proposal(EXAMPLE_TEXT)
+        report("process_proposal nach warmup", timer.elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=["categorize", "process", "warmup"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_scenario(args.child)
+        return
+    
+    for scenario in args.scenarios:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", scenario],
+            capture_output=True, text=True, check=True
+        ).stdout
+        
+        print(f"\n{scenario}")
+        print(f"{'Schritt':32s} {'Dauer (s)':>10s} {'RSS (MB)':>10s}")
+        total = 0.0
+        for line in output.splitlines():
+            if not line.startswith("{"):
+                continue
+            step = json.loads(line)
+            total += step["seconds"]
+            print(f"{step['step']:32s} {step['seconds']:10.2f} {step['rss_mb']:10.0f}")
+        print(f"{'Zeit bis zum letzten Ergebnis':32s} {total:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
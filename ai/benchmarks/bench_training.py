@@ -0,0 +1,83 @@
+"""
+Benchmark: Trainingsdurchsatz und Spitzenspeicher der Trainer-Optionen
+
+Trainiert den Kategorisierer je Variante für eine Epoche auf denselben
+Daten und gibt Beispiele/s sowie den Spitzenspeicher aus:
+- fp32 (bisherige Trainingsschleife)
+- bf16-Autocast
+- Gradient Checkpointing (weniger Speicher, mehr Rechenzeit)
+- Gradientenakkumulation (kleine Batches, gleiche effektive Batch-Größe)
+- torch.compile
+
+Der Spitzenspeicher auf der CPU ist der maximale RSS des Prozesses und steigt
+daher über die Varianten nur an; aussagekräftig ist er auf der GPU.
+
+Aufruf: python benchmarks/bench_training.py [--texts datei.jsonl] [--n 512] [--batch-size 16]
+        [--accumulation-steps 4] [--variants fp32 bf16 checkpointing accumulation compile]
+"""
+
+import tempfile
+import argparse
+
+import numpy as np
+import torch
+
+from bench_utils import load_texts
+from proposal_processor import ProposalProcessor
+from proposal_models import ProposalDataset, ProposalCategorizer, DEVICE
+from trainer import Trainer
+
+
+VARIANTS = {
+    "fp32": {},
+    "bf16": {"bf16": True},
+    "checkpointing": {"gradient_checkpointing": True},
+    "accumulation": {},
+    "compile": {"compile_model": True}
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--accumulation-steps", type=int, default=4)
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS))
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.n)
+    processor = ProposalProcessor(load_models=False)
+    labels = np.random.default_rng(0).integers(0, 2, (len(texts), processor.num_categories))
+    dataset = ProposalDataset(texts, labels, processor.preprocessor, cache_dir=tempfile.mkdtemp())
+    criterion = torch.nn.BCEWithLogitsLoss()
+    
+    def loss_fn(model, batch):
+        return criterion(model(batch["input_ids"], batch["attention_mask"]).float(), batch["labels"])
+    
+    print(f"{len(texts)} Texte, Batch-Größe {args.batch_size}, Gerät {DEVICE}")
+    print(f"{'Variante':15s} {'Beispiele/s':>12s} {'Speedup':>8s} {'Speicher (MB)':>14s} {'Loss':>8s}")
+    
+    baseline = None
+    for name in args.variants:
+        options = dict(VARIANTS[name])
+        batch_size = args.batch_size
+        if name == "accumulation":
+            options["gradient_accumulation_steps"] = args.accumulation_steps
+            batch_size = max(1, args.batch_size // args.accumulation_steps)
+        
+        # Gleiche Startgewichte und Batch-Reihenfolge für alle Varianten
+        torch.manual_seed(0)
+        model = ProposalCategorizer(processor.num_categories).to(DEVICE)
+        dataloader = processor._training_dataloader(dataset, batch_size)
+        trainer = Trainer(model, loss_fn, **options)
+        
+        # Erste Epoche wärmt auf (bei torch.compile inklusive Übersetzung), die zweite wird gemessen
+        stats = trainer.train(dataloader, num_epochs=2)[-1]
+        baseline = baseline or stats["samples_per_sec"]
+        print(f"{name:15s} {stats['samples_per_sec']:12.1f} {stats['samples_per_sec'] / baseline:8.2f} "
+              f"{stats['peak_memory_mb']:14.1f} {stats['avg_loss']:8.4f}")
+
+
+if __name__ == "__main__":
+    main()
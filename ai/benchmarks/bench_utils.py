@@ -0,0 +1,79 @@
+"""
+Hilfsfunktionen für die Benchmarks der KI-Komponenten
+
+Stellt Beispieltexte und einfache Zeitmessung für die Benchmark-Skripte bereit.
+Die Skripte werden aus dem Verzeichnis ai/ heraus gestartet, z.B.
+``python benchmarks/bench_padding.py``.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+from typing import List, Optional
+
+# Pfad zum KI-Verzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Satzbausteine für synthetische Vorschläge (typisch 40–150 Tokens pro Vorschlag)
+SAMPLE_SENTENCES = [
+    "Ich schlage vor, das Fahrradwegenetz in der Innenstadt auszubauen.",
+    "Auf allen Hauptstraßen sollten separate Fahrradspuren eingerichtet werden.",
+    "Die Schulen sollten besser mit digitalen Geräten ausgestattet werden.",
+    "Lehrer sollten regelmäßige Fortbildungen zu digitalen Medien erhalten.",
+    "Es sollten mehr Grünflächen in der Stadt angelegt werden.",
+    "Dies würde die Luftqualität verbessern und Erholungsmöglichkeiten bieten.",
+    "Der öffentliche Nahverkehr sollte durch häufigere Verbindungen verbessert werden.",
+    "Die Installation von Solaranlagen in Privathaushalten sollte gefördert werden.",
+    "Ein Beratungsprogramm könnte Hausbesitzer über erneuerbare Energien informieren.",
+    "Die Genehmigungsverfahren für kleine Betriebe sollten vereinfacht werden.",
+    "Pflegekräfte sollten besser bezahlt und von Bürokratie entlastet werden.",
+    "Behördengänge sollten vollständig online erledigt werden können.",
+]
+
+
+def load_texts(path: Optional[str] = None, n: int = 256, seed: int = 0) -> List[str]:
+    """
+    Lädt Vorschlagstexte oder erzeugt synthetische Beispieltexte.
+    
+    Args:
+        path: Optional JSONL-Datei (Felder "text" oder "content") oder Textdatei (ein Text pro Zeile)
+        n: Anzahl der Texte
+        seed: Startwert für die synthetischen Texte
+        
+    Returns:
+        Liste von Texten
+    """
+    if path:
+        texts = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if path.endswith(".jsonl"):
+                    record = json.loads(line)
+                    line = record.get("text", record.get("content", ""))
+                texts.append(line)
+                if len(texts) >= n:
+                    break
+        return texts
+    
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(3, 12)))
+        for _ in range(n)
+    ]
+
+
+class Timer:
+    """Kontextmanager für die Messung der Laufzeit eines Blocks."""
+    
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,98 @@
+"""
+Benchmark: Durchsatz des Worker-Pools in Abhängigkeit von der Anzahl der Worker
+
+Gemessen wird der Durchsatz von ProposalProcessor._predict_batch in einem
+Prozess (alle Kerne als Intra-Op-Threads) und mit dem Worker-Pool bei
+steigender Anzahl von Workern mit je --threads-per-worker Threads. Die Tabelle
+zeigt Speedup und Effizienz gegenüber einem Worker sowie den gesamten
+proportionalen Speicherbedarf (PSS) aller Prozesse; da die Gewichte geteilt
+werden, wächst er nur um den Laufzeitbedarf pro Worker.
+
+Aufruf: python benchmarks/bench_worker_pool.py [--texts datei.jsonl] [--n 512] [--workers 1 2 4 8]
+        [--threads-per-worker 1] [--batch-size 8]
+"""
+
+import os
+import argparse
+
+import numpy as np
+import torch
+
+from bench_utils import load_texts, Timer
+from proposal_processor import ProposalProcessor
+from worker_pool import available_cores
+
+
+def pss_mb(pids) -> float:
+    """Summe des proportionalen Speicherbedarfs (PSS) der Prozesse in MB (Linux)."""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+                        break
+        except OSError:
+            return float("nan")
+    return total / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", help="JSONL- oder Textdatei mit Vorschlägen")
+    parser.add_argument("--n", type=int, default=512)
+    cores = available_cores()
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, 16, 32, cores} & set(range(1, cores + 1))))
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    
+    texts = load_texts(args.texts, args.n)
+    processor = ProposalProcessor()
+    input_ids = processor._tokenize_cleaned(texts)
+    
+    def measure() -> float:
+        """Bester Durchsatz (Texte/s) aus mehreren Durchläufen."""
+        processor._predict_batch(input_ids[:args.batch_size], args.batch_size)
+        best = 0.0
+        for _ in range(args.repeats):
+            with Timer() as timer:
+                processor._predict_batch(input_ids, args.batch_size)
+            best = max(best, len(input_ids) / timer.elapsed)
+        return best
+    
+    # Referenz: ein Prozess mit allen Kernen
+    torch.set_num_threads(cores)
+    reference = processor._predict_batch(input_ids, args.batch_size)
+    single_process = measure()
+    
+    print(f"{len(texts)} Texte, {cores} Kerne, Batch-Größe {args.batch_size}")
+    print(f"Ein Prozess mit {cores} Threads: {single_process:.1f} Texte/s, "
+          f"PSS {pss_mb([os.getpid()]):.0f} MB\n")
+    print(f"{'Worker':>7s} {'Threads':>8s} {'Texte/s':>9s} {'Speedup':>8s} {'Effizienz':>10s} "
+          f"{'PSS (MB)':>9s} {'max. Abw.':>10s}")
+    
+    base = None
+    for num_workers in args.workers:
+        pool = processor.start_worker_pool(num_workers, args.threads_per_worker)
+        try:
+            throughput = measure()
+            deviation = np.abs(
+                processor._predict_batch(input_ids, args.batch_size)["category_probabilities"]
+                - reference["category_probabilities"]
+            ).max()
+            memory = pss_mb([os.getpid()] + [worker.pid for worker in pool.workers])
+        finally:
+            processor.stop_worker_pool()
+        
+        base = base or throughput
+        speedup = throughput / base
+        print(f"{num_workers:7d} {args.threads_per_worker:8d} {throughput:9.1f} {speedup:8.2f} "
+              f"{speedup / num_workers:10.1%} {memory:9.0f} {deviation:10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""
+Massenanalyse von Vorschlagsdateien mit Checkpoints
+
+Liest Vorschläge zeilenweise aus JSONL-, CSV- oder Parquet-Dateien, verarbeitet
+sie in Batches mit ProposalProcessor.process_batch und schreibt die Ergebnisse
+fortlaufend als JSONL-Datei oder als Parquet-Datensatz (ein Verzeichnis mit
+Teildateien). Im Speicher liegen dabei nur der aktuelle Batch und die noch nicht
+gesicherten Ergebnisse.
+
+Alle checkpoint_every Vorschläge wird der Stand in <Ausgabe>.checkpoint.json
+gesichert (Position in der Eingabe und gesicherter Umfang der Ausgabe). Ein
+abgebrochener Lauf setzt beim letzten Checkpoint fort; danach bereits
+geschriebene Ergebnisse werden verworfen, sodass jeder Vorschlag genau einmal
+in der Ausgabe steht.
+
+Parquet wird über pyarrow gelesen und geschrieben (optionale Abhängigkeit).
+
+Aufruf: python bulk_analysis.py eingabe.jsonl ausgabe.jsonl [--text-field text] [--id-field id]
+        [--batch-size 32] [--chunk-size 256] [--checkpoint-every 1000] [--no-resume]
+        [--precision fp32] [--backend torch] [--workers 0] [--result-store ergebnisse.sqlite]
+
+Mit --result-store werden Ergebnisse unveränderter Vorschläge aus einem
+früheren Lauf übernommen, solange Gewichte und Konfiguration gleich sind.
+"""
+
+import os
+import csv
+import json
+import time
+import argparse
+import itertools
+from typing import List, Dict, Optional, Any, Iterable, Iterator
+
+from proposal_processor import ProposalProcessor, PRECISION_MODES, BACKENDS
+from result_store import ResultStore, json_default
+
+# Unterstützte Dateiformate (nach Dateiendung)
+INPUT_FORMATS = (".jsonl", ".csv", ".parquet")
+OUTPUT_FORMATS = (".jsonl", ".parquet")
+
+# Felder mit Bezeichner-Wert-Paaren in den Analyseergebnissen
+MAPPING_FIELDS = ("categories", "ministries", "quality", "features")
+
+
+def file_format(path: str, formats: Iterable[str]) -> str:
+    """Bestimmt das Dateiformat anhand der Endung und prüft, ob es unterstützt wird."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in formats:
+        raise ValueError(f"Nicht unterstütztes Dateiformat '{extension}' (erlaubt: {', '.join(formats)})")
+    return extension
+
+
+def _import_pyarrow():
+    """Importiert pyarrow für Parquet-Dateien."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Für Parquet-Dateien wird pyarrow benötigt (pip install pyarrow)")
+    return pyarrow
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Liest die Datensätze einer Eingabedatei nacheinander.
+    
+    Args:
+        path: JSONL-, CSV- oder Parquet-Datei
+        
+    Returns:
+        Generator über die Datensätze (Dictionaries)
+    """
+    extension = file_format(path, INPUT_FORMATS)
+    
+    if extension == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif extension == ".csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+    else:
+        pyarrow = _import_pyarrow()
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=1024):
+            yield from batch.to_pylist()
+
+
+def read_proposals(path: str, text_field: str = "text", id_field: str = "id",
+                   start: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Liest Vorschläge (Bezeichner und Text) aus einer Eingabedatei.
+    
+    Args:
+        path: JSONL-, CSV- oder Parquet-Datei
+        text_field: Feld mit dem Vorschlagstext
+        id_field: Feld mit dem Bezeichner (fehlt es, wird die Zeilennummer verwendet)
+        start: Anzahl der zu überspringenden Datensätze (beim Fortsetzen)
+        
+    Returns:
+        Generator über Dictionaries mit "id" und "text" (leerer Text, falls das Feld fehlt)
+    """
+    records = itertools.islice(read_records(path), start, None)
+    for position, record in enumerate(records, start=start):
+        proposal_id = record.get(id_field)
+        yield {
+            "id": str(proposal_id) if proposal_id is not None else str(position),
+            "text": record.get(text_field) or ""
+        }
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Fasst die Elemente eines Iterators zu Listen der angegebenen Größe zusammen."""
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class JsonlResultWriter:
+    """Schreibt Ergebnisse fortlaufend in eine JSONL-Datei."""
+    
+    def __init__(self, path: str, state: Optional[Dict[str, Any]] = None):
+        """
+        Öffnet die Ausgabedatei.
+        
+        Args:
+            path: Pfad der JSONL-Datei
+            state: Stand eines Checkpoints (siehe commit); Zeilen nach diesem Stand
+                   werden verworfen. Ohne Stand wird die Datei neu angelegt.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        if state is None:
+            self._file = open(path, "wb")
+        else:
+            if not os.path.exists(path) or os.path.getsize(path) < state["bytes"]:
+                raise ValueError(f"Die Ausgabedatei {path} ist kürzer als im Checkpoint angegeben")
+            
+            # Nach dem Checkpoint geschriebene Zeilen werden erneut erzeugt
+            with open(path, "ab") as f:
+                f.truncate(state["bytes"])
+            self._file = open(path, "ab")
+    
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Hängt Ergebnisse an die Datei an."""
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False, default=json_default).encode("utf-8") + b"\n")
+    
+    def commit(self) -> Dict[str, Any]:
+        """Schreibt alle Ergebnisse auf die Festplatte und liefert den Stand für den Checkpoint."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {"bytes": self._file.tell()}
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetResultWriter:
+    """Schreibt Ergebnisse als Parquet-Datensatz (eine Teildatei pro Checkpoint)."""
+    
+    def __init__(self, path: str, state: Optional[Dict[str, Any]] = None):
+        """
+        Öffnet das Ausgabeverzeichnis.
+        
+        Args:
+            path: Verzeichnis des Parquet-Datensatzes
+            state: Stand eines Checkpoints (siehe commit); spätere Teildateien werden
+                   entfernt. Ohne Stand werden alle Teildateien entfernt.
+        """
+        self.pyarrow = _import_pyarrow()
+        self.path = path
+        self.parts = state["parts"] if state is not None else 0
+        self._records = []
+        
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.startswith("part-") and int(name[5:10]) >= self.parts:
+                os.remove(os.path.join(path, name))
+    
+    @staticmethod
+    def _row(record: Dict[str, Any]) -> Dict[str, Any]:
+        # Bezeichner-Wert-Paare als Map-Spalten, damit alle Teildateien dasselbe Schema haben
+        return {
+            name: [(key, float(score)) for key, score in value.items()] if name in MAPPING_FIELDS else value
+            for name, value in record.items()
+        }
+    
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Puffert Ergebnisse bis zum nächsten Checkpoint."""
+        self._records.extend(self._row(record) for record in records)
+    
+    def commit(self) -> Dict[str, Any]:
+        """Schreibt die gepufferten Ergebnisse als neue Teildatei und liefert den Stand für den Checkpoint."""
+        if self._records:
+            pa = self.pyarrow
+            mapping = pa.map_(pa.string(), pa.float64())
+            schema = pa.schema([
+                ("id", pa.string()), ("categories", mapping), ("ministries", mapping), ("quality", mapping),
+                ("priority", pa.int64()), ("features", mapping), ("processed_text", pa.string())
+            ])
+            table = pa.Table.from_pylist(self._records, schema=schema)
+            part_path = os.path.join(self.path, f"part-{self.parts:05d}.parquet")
+            pa.parquet.write_table(table, part_path + ".tmp")
+            os.replace(part_path + ".tmp", part_path)
+            
+            self.parts += 1
+            self._records = []
+        return {"parts": self.parts}
+    
+    def close(self) -> None:
+        self._records = []
+
+
+def checkpoint_path(output_path: str) -> str:
+    """Pfad der Checkpoint-Datei zu einer Ausgabe."""
+    return f"{output_path.rstrip(os.sep)}.checkpoint.json"
+
+
+def _input_identity(input_path: str) -> Dict[str, Any]:
+    """Identität der Eingabedatei (Pfad und Größe), um Checkpoints fremder Eingaben zu erkennen."""
+    return {"path": os.path.abspath(input_path), "size": os.path.getsize(input_path)}
+
+
+def _save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    """Schreibt den Checkpoint atomar."""
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(path + ".tmp", path)
+
+
+def run_bulk_analysis(processor: ProposalProcessor, input_path: str, output_path: str,
+                      text_field: str = "text", id_field: str = "id", batch_size: int = 32,
+                      chunk_size: int = 256, checkpoint_every: int = 1000, resume: bool = True,
+                      progress_interval: float = 10.0) -> Dict[str, Any]:
+    """
+    Analysiert alle Vorschläge einer Eingabedatei und schreibt die Ergebnisse fortlaufend.
+    
+    Args:
+        processor: ProposalProcessor mit geladenen Modellen
+        input_path: JSONL-, CSV- oder Parquet-Datei mit Vorschlägen
+        output_path: JSONL-Datei oder Parquet-Verzeichnis (Endung .parquet) für die Ergebnisse
+        text_field: Feld mit dem Vorschlagstext
+        id_field: Feld mit dem Bezeichner
+        batch_size: Anzahl der Texte pro Forward-Pass
+        chunk_size: Anzahl der Vorschläge pro process_batch-Aufruf
+        checkpoint_every: Anzahl der Vorschläge zwischen zwei Checkpoints
+        resume: Ob ein vorhandener Checkpoint fortgesetzt wird
+        progress_interval: Sekunden zwischen zwei Fortschrittsmeldungen
+        
+    Returns:
+        Statistik des Laufs ("processed", "skipped", "resumed_from", "elapsed", "throughput")
+    """
+    output_format = file_format(output_path, OUTPUT_FORMATS)
+    file_format(input_path, INPUT_FORMATS)
+    if chunk_size < 1 or checkpoint_every < 1:
+        raise ValueError("chunk_size und checkpoint_every müssen mindestens 1 sein")
+    
+    # Fortsetzen eines abgebrochenen Laufs
+    checkpoint_file = checkpoint_path(output_path)
+    input_identity = _input_identity(input_path)
+    checkpoint = None
+    if resume and os.path.exists(checkpoint_file):
+        with open(checkpoint_file, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint["input"] != input_identity:
+            raise ValueError(
+                f"Der Checkpoint {checkpoint_file} gehört zu einer anderen Eingabedatei; "
+                "ohne Fortsetzen (resume=False) neu starten"
+            )
+    
+    position = checkpoint["position"] if checkpoint is not None else 0
+    skipped = checkpoint["skipped"] if checkpoint is not None else 0
+    writer_class = JsonlResultWriter if output_format == ".jsonl" else ParquetResultWriter
+    writer = writer_class(output_path, checkpoint["output"] if checkpoint is not None else None)
+    
+    start_position = position
+    start = last_report = time.perf_counter()
+    since_checkpoint = 0
+    
+    def save_checkpoint(complete: bool = False) -> None:
+        _save_checkpoint(checkpoint_file, {
+            "input": input_identity,
+            "position": position,
+            "skipped": skipped,
+            "output": writer.commit(),
+            "complete": complete
+        })
+    
+    try:
+        for chunk in batched(read_proposals(input_path, text_field, id_field, position), chunk_size):
+            # Leere Texte werden übersprungen (und in der Statistik gezählt)
+            proposals = [proposal for proposal in chunk if proposal["text"].strip()]
+            skipped += len(chunk) - len(proposals)
+            
+            if proposals:
+                results = processor.process_batch([proposal["text"] for proposal in proposals], batch_size)
+                writer.write([{"id": proposal["id"], **result} for proposal, result in zip(proposals, results)])
+            
+            position += len(chunk)
+            since_checkpoint += len(chunk)
+            if since_checkpoint >= checkpoint_every:
+                save_checkpoint()
+                since_checkpoint = 0
+            
+            # Fortschritt und Durchsatz
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                print(f"{position} Vorschläge verarbeitet, "
+                      f"{(position - start_position) / (now - start):.1f} Vorschläge/s", flush=True)
+                last_report = now
+        
+        save_checkpoint(complete=True)
+    finally:
+        writer.close()
+    
+    elapsed = time.perf_counter() - start
+    stats = {
+        "processed": position - start_position,
+        "skipped": skipped,
+        "resumed_from": start_position,
+        "elapsed": elapsed,
+        "throughput": (position - start_position) / elapsed if elapsed > 0 else 0.0
+    }
+    print(f"Fertig: {position} Vorschläge ({stats['processed']} in diesem Lauf, {skipped} leer), "
+          f"{stats['throughput']:.1f} Vorschläge/s")
+    return stats
+
+
+def main(args: argparse.Namespace) -> None:
+    """Startet die Massenanalyse mit den Kommandozeilenparametern."""
+    result_store = ResultStore(args.result_store) if args.result_store else None
+    processor = ProposalProcessor(precision=args.precision, backend=args.backend, result_store=result_store)
+    if args.workers > 0:
+        processor.start_worker_pool(args.workers)
+    
+    try:
+        run_bulk_analysis(
+            processor, args.input, args.output, args.text_field, args.id_field, args.batch_size,
+            args.chunk_size, args.checkpoint_every, not args.no_resume, args.progress_interval
+        )
+    finally:
+        processor.stop_worker_pool()
+    
+    if result_store is not None:
+        stats = result_store.stats()
+        print(f"Ergebnisspeicher: {stats['hits']} Treffer, {stats['misses']} neu analysiert")
+        result_store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Massenanalyse von Vorschlagsdateien mit Checkpoints")
+    parser.add_argument("input", help="JSONL-, CSV- oder Parquet-Datei mit Vorschlägen")
+    parser.add_argument("output", help="JSONL-Datei oder Parquet-Verzeichnis (.parquet) für die Ergebnisse")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texte pro Forward-Pass")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Vorschläge pro process_batch-Aufruf")
+    parser.add_argument("--checkpoint-every", type=int, default=1000)
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="Sekunden zwischen Fortschrittsmeldungen")
+    parser.add_argument("--no-resume", action="store_true", help="Vorhandenen Checkpoint ignorieren")
+    parser.add_argument("--precision", default="fp32", choices=PRECISION_MODES)
+    parser.add_argument("--backend", default="torch", choices=BACKENDS)
+    parser.add_argument("--workers", type=int, default=0, help="Anzahl der Inferenz-Worker (0: im eigenen Prozess)")
+    parser.add_argument("--result-store", help="SQLite-Datei mit gespeicherten Analyseergebnissen")
+    
+    main(parser.parse_args())
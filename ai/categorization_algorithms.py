@@ -9,7 +9,6 @@ KI-Modell zur Vorschlagsverarbeitung.
 import os
 import json
 import numpy as np
-import pandas as pd
 from typing import List, Dict, Tuple, Optional, Union, Any
 from collections import defaultdict, Counter
 import heapq
@@ -17,11 +16,52 @@ from datetime import datetime
 
 # Import des KI-Modells
 from proposal_processor import ProposalProcessor, TextPreprocessor, SimilarityAnalyzer
+from vector_index import VectorIndex, normalize_rows
+from clustering import average_linkage_clusters, StreamingClusterState
+from proposal_table import ProposalTable
 
 # Konstanten
 DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config")
 
+# Gewichtungsprofile für den Prioritätsscore (pro Abfrage wählbar, siehe ProposalSorter)
+WEIGHT_PROFILES = {
+    "default": {
+        "quality": 0.4,
+        "relevance": 0.3,
+        "feasibility": 0.2,
+        "recency": 0.1
+    },
+    "trending": {
+        "quality": 0.2,
+        "relevance": 0.2,
+        "feasibility": 0.1,
+        "recency": 0.5  # Höhere Gewichtung für Aktualität
+    }
+}
+
+
+def _descending_order(keys: np.ndarray) -> np.ndarray:
+    """
+    Absteigende Reihenfolge, bei gleichen Werten in ursprünglicher Reihenfolge
+    (wie sorted(..., reverse=True)).
+    """
+    n = len(keys)
+    return n - 1 - np.argsort(keys[::-1], kind="stable")[::-1]
+
+
+def _top_order(keys: np.ndarray, n: int) -> np.ndarray:
+    """Die ersten n Positionen von _descending_order(keys), ohne alle Werte zu sortieren."""
+    if n >= len(keys):
+        return _descending_order(keys)
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    # Alle Werte ab dem n-größten; deren stabile Sortierung liefert dieselben ersten n Positionen
+    threshold = np.partition(keys, len(keys) - n)[len(keys) - n]
+    candidates = np.flatnonzero(keys >= threshold)
+    return candidates[_descending_order(keys[candidates])][:n]
+
 
 class ProposalCategorizer:
     """Klasse für die erweiterte Kategorisierung von Bürgervorschlägen."""
@@ -83,6 +123,18 @@ class ProposalCategorizer:
         # Grundlegende Kategorisierung durch das KI-Modell
         category_scores = self.processor.categorize(text)
         
+        return self._build_categorization(category_scores)
+    
+    def _build_categorization(self, category_scores: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Erstellt das erweiterte Kategorisierungsergebnis aus den Modell-Konfidenzwerten.
+        
+        Args:
+            category_scores: Dictionary mit Kategorien und Konfidenzwerten
+            
+        Returns:
+            Dictionary mit Kategorisierungsergebnissen
+        """
         # Sortierung der Kategorien nach Konfidenz
         sorted_categories = sorted(
             category_scores.items(), 
@@ -135,17 +187,19 @@ class ProposalCategorizer:
         
         return results
     
-    def batch_categorize(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def batch_categorize(self, texts: List[str], batch_size: int = 32) -> List[Dict[str, Any]]:
         """
         Kategorisiert mehrere Vorschläge in einem Batch.
         
         Args:
             texts: Liste von Vorschlagstexten
+            batch_size: Anzahl der Texte pro Forward-Pass des Modells
             
         Returns:
             Liste von Kategorisierungsergebnissen
         """
-        return [self.categorize_proposal(text) for text in texts]
+        batch_scores = self.processor.categorize_batch(texts, batch_size=batch_size)
+        return [self._build_categorization(category_scores) for category_scores in batch_scores]
     
     def get_related_categories(self, category: str) -> List[str]:
         """
@@ -188,36 +242,51 @@ class ProposalSorter:
         """
         self.processor = processor or ProposalProcessor()
         
-        # Gewichtungen für verschiedene Sortierkriterien
-        self.weights = {
-            "quality": 0.4,
-            "relevance": 0.3,
-            "feasibility": 0.2,
-            "recency": 0.1
-        }
+        # Gewichtungen für verschiedene Sortierkriterien (Standard, falls eine Abfrage
+        # kein Profil angibt)
+        self.weights = dict(WEIGHT_PROFILES["default"])
+    
+    def _resolve_weights(self, weights: Optional[Union[str, Dict[str, float]]]) -> Dict[str, float]:
+        """Gewichtungen einer Abfrage: self.weights, ein Profil aus WEIGHT_PROFILES oder ein Dictionary."""
+        if weights is None:
+            return self.weights
+        if isinstance(weights, str):
+            if weights not in WEIGHT_PROFILES:
+                raise ValueError(f"Unbekanntes Gewichtungsprofil: {weights}")
+            return WEIGHT_PROFILES[weights]
+        return weights
     
-    def calculate_priority_score(self, proposal_data: Dict[str, Any]) -> float:
+    def calculate_priority_score(self, proposal_data: Dict[str, Any],
+                                 now: Optional[datetime] = None,
+                                 weights: Optional[Union[str, Dict[str, float]]] = None) -> float:
         """
         Berechnet einen Prioritätsscore für einen Vorschlag.
         
+        Für viele Vorschläge ist priority_scores deutlich schneller und liefert dieselben Werte.
+        
         Args:
             proposal_data: Dictionary mit Vorschlagsdaten
                 (muss 'quality', 'created_at' und optional 'votes' enthalten)
+            now: Bezugszeitpunkt für das Alter (Standard: datetime.now())
+            weights: Name eines Profils aus WEIGHT_PROFILES oder Gewichtungen
+                     (Standard: self.weights)
             
         Returns:
             Prioritätsscore zwischen 0 und 1
         """
+        now = now or datetime.now()
+        weights = self._resolve_weights(weights)
+        
         quality_score = proposal_data.get("quality", {}).get("overall_quality", 3.0) / 5.0
         relevance_score = proposal_data.get("quality", {}).get("relevance", 3.0) / 5.0
         feasibility_score = proposal_data.get("quality", {}).get("feasibility", 3.0) / 5.0
         
         # Zeitfaktor: Neuere Vorschläge erhalten einen höheren Score
-        created_at = proposal_data.get("created_at", datetime.now().isoformat())
+        created_at = proposal_data.get("created_at", now)
         if isinstance(created_at, str):
             created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
         
         # Berechnung des Zeitfaktors (1.0 für aktuelle Vorschläge, abnehmend mit dem Alter)
-        now = datetime.now()
         days_old = (now - created_at).days
         recency_score = max(0, 1.0 - (days_old / 30))  # Linear abnehmend über 30 Tage
         
@@ -230,34 +299,141 @@ class ProposalSorter:
         
         # Gewichtete Summe der Faktoren
         priority_score = (
-            self.weights["quality"] * quality_score +
-            self.weights["relevance"] * relevance_score +
-            self.weights["feasibility"] * feasibility_score +
-            self.weights["recency"] * recency_score
+            weights["quality"] * quality_score +
+            weights["relevance"] * relevance_score +
+            weights["feasibility"] * feasibility_score +
+            weights["recency"] * recency_score
         ) * vote_factor
         
         return min(1.0, priority_score)  # Begrenzung auf maximal 1.0
     
-    def sort_proposals(self, proposals: List[Dict[str, Any]], 
-                      criteria: str = "priority") -> List[Dict[str, Any]]:
+    def priority_scores(self, proposals: ProposalTable, now: Optional[datetime] = None,
+                        weights: Optional[Union[str, Dict[str, float]]] = None) -> np.ndarray:
+        """
+        Berechnet die Prioritätsscores aller Vorschläge einer ProposalTable mit NumPy.
+        
+        Die Werte stimmen mit calculate_priority_score für denselben Bezugszeitpunkt
+        überein; alle Vorschläge werden zu einem gemeinsamen Zeitpunkt bewertet.
+        
+        Args:
+            proposals: Vorschlagsdaten als ProposalTable
+            now: Bezugszeitpunkt für das Alter (Standard: datetime.now())
+            weights: Name eines Profils aus WEIGHT_PROFILES oder Gewichtungen
+                     (Standard: self.weights)
+            
+        Returns:
+            Prioritätsscores (float64, eine Zeile pro Vorschlag)
+        """
+        now = now or datetime.now()
+        weights = self._resolve_weights(weights)
+        n = len(proposals)
+        
+        quality_score = proposals.quality_column("overall_quality", 3.0) / 5.0
+        relevance_score = proposals.quality_column("relevance", 3.0) / 5.0
+        feasibility_score = proposals.quality_column("feasibility", 3.0) / 5.0
+        
+        # Alter in ganzen Tagen wie timedelta.days; Vorschläge ohne Datum gelten als aktuell
+        days_old = np.zeros(n, dtype=np.int64)
+        dated = ~np.isnat(proposals.created_at)
+        days_old[dated] = (np.datetime64(now, "us") - proposals.created_at[dated]) // np.timedelta64(1, "D")
+        recency_score = np.maximum(0.0, 1.0 - (days_old / 30))
+        
+        # Stimmen nur für Vorschläge mit Angabe (sonst Faktor 1.0)
+        vote_factor = np.ones(n)
+        voted = ~np.isnan(proposals.votes)
+        vote_factor[voted] = np.minimum(2.0, 1.0 + 0.2 * np.log1p(proposals.votes[voted]))
+        
+        # Gewichtete Summe in derselben Reihenfolge wie calculate_priority_score
+        priority_score = (
+            weights["quality"] * quality_score +
+            weights["relevance"] * relevance_score +
+            weights["feasibility"] * feasibility_score +
+            weights["recency"] * recency_score
+        ) * vote_factor
+        
+        return np.minimum(1.0, priority_score)
+    
+    def _priority_keys(self, proposals: Union[List[Dict[str, Any]], ProposalTable],
+                       weights: Optional[Union[str, Dict[str, float]]] = None,
+                       now: Optional[datetime] = None) -> np.ndarray:
+        """
+        Prioritätsscores zum Sortieren.
+        
+        Vorhandene 'priority_score'-Werte in Listen haben nur ohne explizite Gewichtungen
+        Vorrang; sie wurden mit self.weights berechnet und passen nicht zu einem anderen Profil.
+        """
+        if isinstance(proposals, ProposalTable):
+            return self.priority_scores(proposals, now, weights)
+        
+        scores = self.priority_scores(ProposalTable.from_dicts(proposals), now, weights)
+        if weights is not None:
+            return scores
+        for i, proposal in enumerate(proposals):
+            if "priority_score" in proposal:
+                scores[i] = proposal["priority_score"]
+        return scores
+    
+    def _table_order(self, proposals: ProposalTable, criteria: str,
+                     weights: Optional[Union[str, Dict[str, float]]] = None,
+                     now: Optional[datetime] = None) -> np.ndarray:
+        """Reihenfolge der Zeilen einer ProposalTable für ein Sortierkriterium (siehe sort_proposals)."""
+        if criteria == "priority":
+            keys = self.priority_scores(proposals, now, weights)
+        elif criteria == "quality":
+            keys = proposals.quality_column("overall_quality", 0.0)
+        elif criteria == "relevance":
+            keys = proposals.quality_column("relevance", 0.0)
+        elif criteria == "recency":
+            # NaT entspricht dem kleinsten int64-Wert; Vorschläge ohne Datum stehen damit am Ende
+            keys = proposals.created_at.astype(np.int64)
+        elif criteria == "votes":
+            keys = np.where(np.isnan(proposals.votes), 0.0, proposals.votes)
+        else:
+            raise ValueError(f"Unbekanntes Sortierkriterium: {criteria}")
+        
+        return _descending_order(keys)
+    
+    def _group_table(self, proposals: ProposalTable, codes: np.ndarray, names: List[str],
+                     default: str) -> Dict[str, ProposalTable]:
+        """Gruppiert eine ProposalTable nach kategorialen Codes; jede Gruppe ist nach Priorität sortiert."""
+        labels = np.array(list(names) + [default], dtype=object)[codes]
+        order = self._table_order(proposals, "priority")
+        sorted_labels = labels[order]
+        
+        # Gruppen in der Reihenfolge ihres ersten Auftretens
+        return {
+            label: proposals.take(order[sorted_labels == label])
+            for label in dict.fromkeys(labels.tolist())
+        }
+    
+    def sort_proposals(self, proposals: Union[List[Dict[str, Any]], ProposalTable], 
+                      criteria: str = "priority",
+                      weights: Optional[Union[str, Dict[str, float]]] = None,
+                      now: Optional[datetime] = None) -> Union[List[Dict[str, Any]], ProposalTable]:
         """
         Sortiert eine Liste von Vorschlägen nach verschiedenen Kriterien.
         
+        Die Eingabe wird nicht verändert; für 'priority' werden die Scores mit
+        priority_scores berechnet (vorhandene 'priority_score'-Werte haben Vorrang).
+        
         Args:
-            proposals: Liste von Vorschlagsdaten
+            proposals: Liste von Vorschlagsdaten oder ProposalTable
             criteria: Sortierkriterium ('priority', 'quality', 'relevance', 'recency', 'votes')
+            weights: Gewichtungsprofil für 'priority' (siehe calculate_priority_score)
+            now: Bezugszeitpunkt für 'priority' (Standard: datetime.now())
             
         Returns:
-            Sortierte Liste von Vorschlägen
+            Sortierte Liste von Vorschlägen (bzw. sortierte ProposalTable)
         """
+        if isinstance(proposals, ProposalTable):
+            return proposals.take(self._table_order(proposals, criteria, weights, now))
+        
         if criteria == "priority":
-            # Berechnung des Prioritätsscores für jeden Vorschlag
-            for proposal in proposals:
-                if "priority_score" not in proposal:
-                    proposal["priority_score"] = self.calculate_priority_score(proposal)
+            # Berechnung aller Prioritätsscores auf einmal; die Vorschläge bleiben unverändert
+            scores = self._priority_keys(proposals, weights, now)
             
             # Sortierung nach Prioritätsscore
-            return sorted(proposals, key=lambda p: p.get("priority_score", 0), reverse=True)
+            return [proposals[i] for i in _descending_order(scores)]
         
         elif criteria == "quality":
             return sorted(
@@ -290,16 +466,23 @@ class ProposalSorter:
         else:
             raise ValueError(f"Unbekanntes Sortierkriterium: {criteria}")
     
-    def group_by_category(self, proposals: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    def group_by_category(self, proposals: Union[List[Dict[str, Any]], ProposalTable]
+                          ) -> Dict[str, Union[List[Dict[str, Any]], ProposalTable]]:
         """
         Gruppiert Vorschläge nach ihrer primären Kategorie.
         
         Args:
-            proposals: Liste von Vorschlagsdaten
+            proposals: Liste von Vorschlagsdaten oder ProposalTable
             
         Returns:
-            Dictionary mit Kategorien als Schlüssel und Listen von Vorschlägen als Werte
+            Dictionary mit Kategorien als Schlüssel und Listen von Vorschlägen (bzw.
+            ProposalTables) als Werte
         """
+        if isinstance(proposals, ProposalTable):
+            return self._group_table(
+                proposals, proposals.primary_categories, proposals.category_names, "Unkategorisiert"
+            )
+        
         grouped = defaultdict(list)
         
         for proposal in proposals:
@@ -312,16 +495,23 @@ class ProposalSorter:
         
         return dict(grouped)
     
-    def group_by_ministry(self, proposals: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    def group_by_ministry(self, proposals: Union[List[Dict[str, Any]], ProposalTable]
+                          ) -> Dict[str, Union[List[Dict[str, Any]], ProposalTable]]:
         """
         Gruppiert Vorschläge nach ihrem primären Ministerium.
         
         Args:
-            proposals: Liste von Vorschlagsdaten
+            proposals: Liste von Vorschlagsdaten oder ProposalTable
             
         Returns:
-            Dictionary mit Ministerien als Schlüssel und Listen von Vorschlägen als Werte
+            Dictionary mit Ministerien als Schlüssel und Listen von Vorschlägen (bzw.
+            ProposalTables) als Werte
         """
+        if isinstance(proposals, ProposalTable):
+            return self._group_table(
+                proposals, proposals.primary_ministries, proposals.ministry_names, "Nicht zugeordnet"
+            )
+        
         grouped = defaultdict(list)
         
         for proposal in proposals:
@@ -334,75 +524,84 @@ class ProposalSorter:
         
         return dict(grouped)
     
-    def get_top_proposals(self, proposals: List[Dict[str, Any]], n: int = 10) -> List[Dict[str, Any]]:
+    def get_top_proposals(self, proposals: Union[List[Dict[str, Any]], ProposalTable],
+                          n: int = 10, weights: Optional[Union[str, Dict[str, float]]] = None,
+                          now: Optional[datetime] = None) -> Union[List[Dict[str, Any]], ProposalTable]:
         """
         Gibt die Top-N-Vorschläge nach Priorität zurück.
         
+        Es werden nur die besten n Vorschläge sortiert. Für häufige Abfragen bei laufend
+        eingehenden Stimmen siehe PriorityLeaderboard.
+        
         Args:
-            proposals: Liste von Vorschlagsdaten
+            proposals: Liste von Vorschlagsdaten oder ProposalTable
             n: Anzahl der zurückzugebenden Vorschläge
+            weights: Gewichtungsprofil (siehe calculate_priority_score)
+            now: Bezugszeitpunkt für das Alter (Standard: datetime.now())
             
         Returns:
-            Liste der Top-N-Vorschläge
+            Liste der Top-N-Vorschläge (bzw. ProposalTable)
         """
-        sorted_proposals = self.sort_proposals(proposals, "priority")
-        return sorted_proposals[:n]
+        order = _top_order(self._priority_keys(proposals, weights, now), n)
+        if isinstance(proposals, ProposalTable):
+            return proposals.take(order)
+        return [proposals[i] for i in order]
     
-    def get_trending_proposals(self, proposals: List[Dict[str, Any]], 
-                              days: int = 7, n: int = 10) -> List[Dict[str, Any]]:
+    def get_trending_proposals(self, proposals: Union[List[Dict[str, Any]], ProposalTable], 
+                              days: int = 7, n: int = 10,
+                              weights: Optional[Union[str, Dict[str, float]]] = "trending",
+                              now: Optional[datetime] = None) -> Union[List[Dict[str, Any]], ProposalTable]:
         """
         Gibt die trendenden Vorschläge der letzten Tage zurück.
         
         Args:
-            proposals: Liste von Vorschlagsdaten
+            proposals: Liste von Vorschlagsdaten oder ProposalTable
             days: Anzahl der zu berücksichtigenden Tage
             n: Anzahl der zurückzugebenden Vorschläge
+            weights: Gewichtungsprofil (Standard: 'trending' mit höherer Gewichtung der Aktualität)
+            now: Bezugszeitpunkt (Standard: datetime.now())
             
         Returns:
-            Liste der trendenden Vorschläge
+            Liste der trendenden Vorschläge (bzw. ProposalTable)
         """
-        now = datetime.now()
+        now = now or datetime.now()
         
         # Filterung nach Datum
-        recent_proposals = []
-        for proposal in proposals:
-            created_at = proposal.get("created_at", "")
-            if isinstance(created_at, str):
-                try:
-                    created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-                except ValueError:
-                    continue
-            
-            if (now - created_at).days <= days:
-                recent_proposals.append(proposal)
-        
-        # Anpassung der Gewichtungen für Trends
-        original_weights = self.weights.copy()
-        self.weights = {
-            "quality": 0.2,
-            "relevance": 0.2,
-            "feasibility": 0.1,
-            "recency": 0.5  # Höhere Gewichtung für Aktualität
-        }
-        
-        # Sortierung nach angepasster Priorität
-        trending = self.sort_proposals(recent_proposals, "priority")
-        
-        # Wiederherstellung der ursprünglichen Gewichtungen
-        self.weights = original_weights
+        if isinstance(proposals, ProposalTable):
+            recent = ~np.isnat(proposals.created_at)
+            age = np.datetime64(now, "us") - proposals.created_at[recent]
+            recent[recent] = age // np.timedelta64(1, "D") <= days
+            recent_proposals = proposals.take(np.flatnonzero(recent))
+        else:
+            recent_proposals = []
+            for proposal in proposals:
+                created_at = proposal.get("created_at", "")
+                if isinstance(created_at, str):
+                    try:
+                        created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+                    except ValueError:
+                        continue
+                
+                if (now - created_at).days <= days:
+                    recent_proposals.append(proposal)
         
-        return trending[:n]
+        # Auswahl nach Priorität mit dem Trend-Profil; self.weights bleibt unverändert,
+        # sodass gleichzeitige Abfragen mit anderen Profilen möglich sind
+        return self.get_top_proposals(recent_proposals, n, weights, now)
 
 
 class ProposalClusterer:
     """Klasse für das Clustering ähnlicher Vorschläge und die Erkennung von Trends."""
     
-    def __init__(self, processor: Optional[ProposalProcessor] = None):
+    def __init__(self, processor: Optional[ProposalProcessor] = None,
+                 cluster_state: Optional[StreamingClusterState] = None):
         """
         Initialisiert den ProposalClusterer.
         
         Args:
             processor: Optional vorhandene ProposalProcessor-Instanz
+            cluster_state: Optional vorhandener (z.B. mit StreamingClusterState.load
+                           geladener) Zustand für das inkrementelle Clustering
         """
         self.processor = processor or ProposalProcessor()
         self.similarity_analyzer = self.processor.similarity_analyzer
@@ -410,42 +609,60 @@ class ProposalClusterer:
         # Schwellenwerte für das Clustering
         self.similarity_threshold = 0.75  # Schwellenwert für Ähnlichkeit
         self.min_cluster_size = 2  # Minimale Größe eines Clusters
+        
+        # Zustand für das inkrementelle Clustering (wird beim ersten add_proposals angelegt)
+        self.cluster_state = cluster_state
     
-    def compute_similarity_matrix(self, texts: List[str]) -> np.ndarray:
+    def compute_similarity_matrix(self, texts: List[str], batch_size: int = 32,
+                                  block_size: Optional[int] = None,
+                                  out: Optional[np.ndarray] = None,
+                                  embeddings: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Berechnet eine Ähnlichkeitsmatrix für eine Liste von Texten.
         
+        Jeder Text wird genau einmal (gebündelt) eingebettet; die Matrix ergibt sich
+        als Produkt der normalisierten Einbettungen in float32.
+        
         Args:
             texts: Liste von Texten
+            batch_size: Anzahl der Texte pro Forward-Pass
+            block_size: Optional Anzahl der Zeilen pro Block; begrenzt den zusätzlichen
+                        Speicherbedarf beim Füllen großer Matrizen
+            out: Optional vorab angelegte (n x n)-Matrix, z.B. ein np.memmap
+            embeddings: Optional vorberechnete Einbettungen der Texte (z.B. aus einer
+                        ProposalTable); die Texte werden dann nicht eingebettet
             
         Returns:
             Ähnlichkeitsmatrix als NumPy-Array
         """
         n = len(texts)
-        similarity_matrix = np.zeros((n, n))
+        similarity_matrix = out if out is not None else np.empty((n, n), dtype=np.float32)
+        if n == 0:
+            return similarity_matrix
+        
+        # Einmalige Einbettung aller Texte
+        if embeddings is None:
+            embeddings = self.similarity_analyzer.get_embeddings(texts, batch_size)
+        embeddings = normalize_rows(embeddings)
         
-        for i in range(n):
-            for j in range(i, n):
-                if i == j:
-                    similarity_matrix[i, j] = 1.0
-                else:
-                    similarity = self.similarity_analyzer.compute_similarity(texts[i], texts[j])
-                    similarity_matrix[i, j] = similarity
-                    similarity_matrix[j, i] = similarity
+        if block_size is None:
+            np.matmul(embeddings, embeddings.T, out=similarity_matrix)
+        else:
+            # Blockweise Berechnung (Zeilenblöcke)
+            for start in range(0, n, block_size):
+                end = min(start + block_size, n)
+                similarity_matrix[start:end] = embeddings[start:end] @ embeddings.T
+        
+        np.fill_diagonal(similarity_matrix, 1.0)
         
         return similarity_matrix
     
-    def cluster_proposals(self, proposals: List[Dict[str, Any]]) -> List[List[int]]:
-        """
-        Clustert ähnliche Vorschläge.
+    @staticmethod
+    def _proposal_texts(proposals: Union[List[Dict[str, Any]], ProposalTable]) -> List[str]:
+        """Extrahiert die Texte der Vorschläge ('text', sonst 'content')."""
+        if isinstance(proposals, ProposalTable):
+            return proposals.texts.tolist()
         
-        Args:
-            proposals: Liste von Vorschlagsdaten (muss 'text' oder 'content' enthalten)
-            
-        Returns:
-            Liste von Clustern, wobei jeder Cluster eine Liste von Indizes in der ursprünglichen Liste ist
-        """
-        # Extraktion der Texte
         texts = []
         for proposal in proposals:
             if "text" in proposal:
@@ -454,69 +671,91 @@ class ProposalClusterer:
                 texts.append(proposal["content"])
             else:
                 texts.append("")
+        return texts
+    
+    def cluster_proposals(self, proposals: Union[List[Dict[str, Any]], ProposalTable]) -> List[List[int]]:
+        """
+        Clustert ähnliche Vorschläge.
         
+        Args:
+            proposals: Liste von Vorschlagsdaten (muss 'text' oder 'content' enthalten) oder
+                       ProposalTable (deren Einbettungen werden verwendet, falls vorhanden)
+            
+        Returns:
+            Liste von Clustern, wobei jeder Cluster eine aufsteigend sortierte Liste von Indizes
+            in der ursprünglichen Liste ist
+        """
         # Berechnung der Ähnlichkeitsmatrix
-        similarity_matrix = self.compute_similarity_matrix(texts)
+        embeddings = proposals.embeddings if isinstance(proposals, ProposalTable) else None
+        similarity_matrix = self.compute_similarity_matrix(self._proposal_texts(proposals), embeddings=embeddings)
         
-        # Hierarchisches Clustering (einfache Implementierung)
-        n = len(texts)
-        clusters = [{i} for i in range(n)]  # Jeder Vorschlag beginnt in seinem eigenen Cluster
-        
-        # Zusammenführen von Clustern basierend auf Ähnlichkeit
-        while len(clusters) > 1:
-            max_similarity = 0
-            merge_i, merge_j = 0, 0
-            
-            # Finden der ähnlichsten Cluster
-            for i in range(len(clusters)):
-                for j in range(i + 1, len(clusters)):
-                    # Berechnung der durchschnittlichen Ähnlichkeit zwischen Clustern
-                    cluster_similarity = 0
-                    count = 0
-                    
-                    for idx1 in clusters[i]:
-                        for idx2 in clusters[j]:
-                            cluster_similarity += similarity_matrix[idx1, idx2]
-                            count += 1
-                    
-                    if count > 0:
-                        avg_similarity = cluster_similarity / count
-                        
-                        if avg_similarity > max_similarity:
-                            max_similarity = avg_similarity
-                            merge_i, merge_j = i, j
-            
-            # Wenn keine Cluster mehr über dem Schwellenwert liegen, beenden
-            if max_similarity < self.similarity_threshold:
-                break
+        # Hierarchisches Clustering (Average-Linkage); die Matrix wird direkt als Arbeitsspeicher verwendet
+        return average_linkage_clusters(
+            similarity_matrix, self.similarity_threshold, self.min_cluster_size, copy=False
+        )
+    
+    def add_proposals(self, proposals: Union[List[Dict[str, Any]], ProposalTable],
+                      batch_size: int = 32) -> List[int]:
+        """
+        Nimmt neue Vorschläge in den inkrementellen Clusterzustand auf.
+        
+        Jeder Vorschlag wird dem Cluster mit der höchsten durchschnittlichen Ähnlichkeit
+        zugeordnet, sofern diese den Schwellenwert erreicht; sonst wird ein neuer Cluster eröffnet.
+        
+        Args:
+            proposals: Neue Vorschlagsdaten (muss 'text' oder 'content' enthalten) oder
+                       ProposalTable (deren Einbettungen werden verwendet, falls vorhanden)
+            batch_size: Anzahl der Texte pro Forward-Pass
             
-            # Zusammenführen der ähnlichsten Cluster
-            clusters[merge_i].update(clusters[merge_j])
-            clusters.pop(merge_j)
+        Returns:
+            Positionen der Vorschläge im Clusterzustand
+        """
+        if len(proposals) == 0:
+            return []
+        
+        if isinstance(proposals, ProposalTable) and proposals.embeddings is not None:
+            embeddings = proposals.embeddings
+        else:
+            embeddings = self.similarity_analyzer.get_embeddings(self._proposal_texts(proposals), batch_size)
         
-        # Konvertierung der Sets zu Listen und Filterung nach Mindestgröße
-        result_clusters = [list(cluster) for cluster in clusters if len(cluster) >= self.min_cluster_size]
+        if self.cluster_state is None:
+            self.cluster_state = StreamingClusterState(embeddings.shape[1], self.similarity_threshold)
         
-        return result_clusters
+        if isinstance(proposals, ProposalTable):
+            proposals = [proposals[i] for i in range(len(proposals))]
+        return self.cluster_state.add(embeddings, proposals)
     
-    def identify_trends(self, proposals: List[Dict[str, Any]], 
+    def identify_trends(self, proposals: Optional[Union[List[Dict[str, Any]], ProposalTable]] = None,
                        min_trend_size: int = 3) -> List[Dict[str, Any]]:
         """
         Identifiziert Trends in den Vorschlägen.
         
         Args:
-            proposals: Liste von Vorschlagsdaten
+            proposals: Liste von Vorschlagsdaten oder ProposalTable; ohne Vorschläge werden
+                       die Trends aus dem inkrementellen Clusterzustand (siehe add_proposals)
+                       abgeleitet ('created_at' ist bei einer ProposalTable eine ISO-Zeichenkette
+                       in Ortszeit)
             min_trend_size: Minimale Anzahl von Vorschlägen für einen Trend
             
         Returns:
             Liste von Trend-Informationen
         """
+        if proposals is None:
+            if self.cluster_state is None:
+                return []
+            return self.cluster_state.trends(min_trend_size)
+        
         # Clustering der Vorschläge
         clusters = self.cluster_proposals(proposals)
         
         # Filterung nach Mindestgröße für Trends
         trend_clusters = [cluster for cluster in clusters if len(cluster) >= min_trend_size]
         
+        if isinstance(proposals, ProposalTable):
+            quality = proposals.quality_column("overall_quality", 3.0)
+            trends = [self._table_trend_info(proposals, cluster_indices, quality) for cluster_indices in trend_clusters]
+            return sorted(trends, key=lambda t: (t["size"], t["avg_quality"]), reverse=True)
+        
         # Extraktion von Trendinformationen
         trends = []
         
@@ -568,6 +807,26 @@ class ProposalClusterer:
         )
         
         return sorted_trends
+    
+    @staticmethod
+    def _table_trend_info(proposals: ProposalTable, cluster_indices: List[int],
+                          quality: np.ndarray) -> Dict[str, Any]:
+        """Trendinformationen eines Clusters aus einer ProposalTable (wie in identify_trends)."""
+        categories = proposals.trend_categories(cluster_indices)
+        title = proposals.titles[cluster_indices[0]]
+        
+        # Vorschläge ohne Datum zählen wie in identify_trends als aktuell
+        created_at = proposals.created_at[cluster_indices]
+        created_at = np.where(np.isnat(created_at), np.datetime64(datetime.now(), "us"), created_at)
+        
+        return {
+            "category": Counter(categories).most_common(1)[0][0] if categories else "Unkategorisiert",
+            "size": len(cluster_indices),
+            "avg_quality": float(np.mean(quality[cluster_indices])),
+            "representative_title": title if title is not None else "Unbenannter Trend",
+            "proposal_indices": cluster_indices,
+            "created_at": created_at.min().astype(datetime).isoformat()
+        }
 
 
 class ProposalRecommender:
@@ -583,63 +842,116 @@ class ProposalRecommender:
         self.processor = processor or ProposalProcessor()
         self.similarity_analyzer = self.processor.similarity_analyzer
     
-    def find_similar_proposals(self, text: str, proposals: List[Dict[str, Any]], 
-                              n: int = 5, threshold: float = 0.6) -> List[Dict[str, Any]]:
+    def find_similar_proposals(self, text: str,
+                              proposals: Optional[Union[List[Dict[str, Any]], ProposalTable]] = None,
+                              n: int = 5, threshold: float = 0.6,
+                              index: Optional[VectorIndex] = None) -> List[Dict[str, Any]]:
         """
         Findet ähnliche Vorschläge zu einem gegebenen Text.
         
         Args:
             text: Referenztext
-            proposals: Liste von Vorschlagsdaten
+            proposals: Liste von Vorschlagsdaten oder ProposalTable (deren Einbettungen
+                       werden verwendet, falls vorhanden; Treffer als Zeilen-Dictionaries)
             n: Anzahl der zurückzugebenden ähnlichen Vorschläge
             threshold: Minimaler Ähnlichkeitsschwellenwert
+            index: Optionaler VectorIndex über die Vorschlags-IDs; dann wird statt
+                   der Textliste der Index abgefragt und die Treffer über 'id' den
+                   Vorschlägen zugeordnet (ohne Vorschläge nur 'id' und 'similarity')
             
         Returns:
             Liste ähnlicher Vorschläge mit Ähnlichkeitswerten
         """
-        similarities = []
+        if index is not None:
+            return self._find_similar_in_index(text, proposals, n, threshold, index)
         
-        for i, proposal in enumerate(proposals):
-            proposal_text = proposal.get("text", proposal.get("content", ""))
-            similarity = self.similarity_analyzer.compute_similarity(text, proposal_text)
-            
-            if similarity >= threshold:
-                similarities.append((i, similarity))
+        if proposals is None or len(proposals) == 0:
+            return []
         
-        # Sortierung nach Ähnlichkeit
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        if isinstance(proposals, ProposalTable) and proposals.embeddings is not None:
+            query = normalize_rows(self.similarity_analyzer.get_embeddings([text]))[0]
+            proposal_similarities = normalize_rows(proposals.embeddings) @ query
+        else:
+            # Einbettung aller Texte in einem Aufruf (bereits bekannte Texte kommen aus dem Cache)
+            if isinstance(proposals, ProposalTable):
+                proposal_texts = proposals.texts.tolist()
+            else:
+                proposal_texts = [proposal.get("text", proposal.get("content", "")) for proposal in proposals]
+            embeddings = self.similarity_analyzer.get_embeddings([text] + proposal_texts)
+            embeddings = normalize_rows(embeddings)
+            proposal_similarities = embeddings[1:] @ embeddings[0]
+        
+        # Sortierung der Vorschläge über dem Schwellenwert nach Ähnlichkeit
+        candidates = np.flatnonzero(proposal_similarities >= threshold)
+        candidates = candidates[_descending_order(proposal_similarities[candidates])]
         
         # Rückgabe der Top-N ähnlichen Vorschläge
         similar_proposals = []
-        for i, similarity in similarities[:n]:
-            proposal_copy = proposals[i].copy()
+        for i in candidates[:n]:
+            proposal_copy = proposals[int(i)].copy()
+            proposal_copy["similarity"] = float(proposal_similarities[i])
+            similar_proposals.append(proposal_copy)
+        
+        return similar_proposals
+    
+    def _find_similar_in_index(self, text: str, proposals: Optional[Union[List[Dict[str, Any]], ProposalTable]],
+                               n: int, threshold: float, index: VectorIndex) -> List[Dict[str, Any]]:
+        """Sucht ähnliche Vorschläge über einen VectorIndex."""
+        matches = index.query(self.similarity_analyzer.get_embedding(text), k=n, threshold=threshold)
+        if isinstance(proposals, ProposalTable):
+            positions = proposals.positions(proposal_id for proposal_id, _ in matches)
+            proposals_by_id = {
+                proposal_id: proposals[position]
+                for (proposal_id, _), position in zip(matches, positions) if position is not None
+            }
+        else:
+            proposals_by_id = {str(p.get("id", "")): p for p in proposals or []}
+        
+        similar_proposals = []
+        for proposal_id, similarity in matches:
+            proposal_copy = proposals_by_id.get(proposal_id, {"id": proposal_id}).copy()
             proposal_copy["similarity"] = similarity
             similar_proposals.append(proposal_copy)
         
         return similar_proposals
     
     def recommend_for_user(self, user_interests: List[str], user_history: List[Dict[str, Any]],
-                          all_proposals: List[Dict[str, Any]], n: int = 10) -> List[Dict[str, Any]]:
+                          all_proposals: Union[List[Dict[str, Any]], ProposalTable],
+                          n: int = 10) -> List[Dict[str, Any]]:
         """
         Empfiehlt Vorschläge für einen Benutzer basierend auf Interessen und Verlauf.
         
         Args:
             user_interests: Liste von Interessenskategorien des Benutzers
             user_history: Liste von Vorschlägen, mit denen der Benutzer interagiert hat
-            all_proposals: Liste aller verfügbaren Vorschläge
+            all_proposals: Liste aller verfügbaren Vorschläge oder ProposalTable (deren
+                           Einbettungen werden verwendet, falls vorhanden)
             n: Anzahl der zu empfehlenden Vorschläge
             
         Returns:
             Liste empfohlener Vorschläge mit Relevanzwerten
         """
+        if isinstance(all_proposals, ProposalTable):
+            return self._recommend_from_table(user_interests, user_history, all_proposals, n)
+        
+        # Vorschläge, die bereits im Verlauf des Benutzers sind, werden übersprungen
+        candidates = [
+            proposal for proposal in all_proposals
+            if not any(h.get("id", "") == proposal.get("id", "") for h in user_history)
+        ]
+        
+        # Ähnlichkeiten zwischen Kandidaten und Verlauf; jeder Text wird nur einmal eingebettet
+        history_similarity_matrix = None
+        if user_history and candidates:
+            candidate_texts = [p.get("text", p.get("content", "")) for p in candidates]
+            history_texts = [h.get("text", h.get("content", "")) for h in user_history]
+            embeddings = normalize_rows(self.similarity_analyzer.get_embeddings(candidate_texts + history_texts))
+            history_similarity_matrix = embeddings[:len(candidates)] @ embeddings[len(candidates):].T
+        
         # Berechnung von Relevanzscores für jeden Vorschlag
         proposal_scores = []
         
-        for proposal in all_proposals:
-            # Prüfung, ob der Vorschlag bereits im Verlauf des Benutzers ist
-            if any(h.get("id", "") == proposal.get("id", "") for h in user_history):
-                continue
-            
+        for candidate_index, proposal in enumerate(candidates):
             score = 0.0
             
             # Faktor 1: Übereinstimmung mit Interessen
@@ -658,14 +970,8 @@ class ProposalRecommender:
             score += 0.5 * (interest_match / max(1, len(user_interests)))
             
             # Faktor 2: Ähnlichkeit zu früheren Interaktionen
-            if user_history:
-                history_similarities = []
-                proposal_text = proposal.get("text", proposal.get("content", ""))
-                
-                for history_item in user_history:
-                    history_text = history_item.get("text", history_item.get("content", ""))
-                    similarity = self.similarity_analyzer.compute_similarity(proposal_text, history_text)
-                    history_similarities.append(similarity)
+            if history_similarity_matrix is not None:
+                history_similarities = history_similarity_matrix[candidate_index].tolist()
                 
                 # Verwendung des Durchschnitts der Top-3-Ähnlichkeiten
                 top_similarities = sorted(history_similarities, reverse=True)[:3]
@@ -690,6 +996,45 @@ class ProposalRecommender:
         
         return recommendations
     
+    def _recommend_from_table(self, user_interests: List[str], user_history: List[Dict[str, Any]],
+                              proposals: ProposalTable, n: int) -> List[Dict[str, Any]]:
+        """Berechnet die Empfehlungen aus recommend_for_user spaltenweise für eine ProposalTable."""
+        history_ids = {h.get("id", "") for h in user_history}
+        candidates = np.flatnonzero([proposal_id not in history_ids for proposal_id in proposals.ids])
+        
+        # Faktor 1: Übereinstimmung mit Interessen
+        interest_match = proposals.count_categories_in(user_interests)[candidates]
+        scores = 0.5 * (interest_match / max(1, len(user_interests)))
+        
+        # Faktor 2: Durchschnitt der Top-3-Ähnlichkeiten zu früheren Interaktionen
+        if user_history and len(candidates):
+            history_texts = [h.get("text", h.get("content", "")) for h in user_history]
+            if proposals.embeddings is not None:
+                candidate_embeddings = normalize_rows(proposals.embeddings[candidates])
+                history_embeddings = normalize_rows(self.similarity_analyzer.get_embeddings(history_texts))
+            else:
+                embeddings = normalize_rows(self.similarity_analyzer.get_embeddings(
+                    proposals.texts[candidates].tolist() + history_texts
+                ))
+                candidate_embeddings = embeddings[:len(candidates)]
+                history_embeddings = embeddings[len(candidates):]
+            
+            history_similarity_matrix = candidate_embeddings @ history_embeddings.T
+            top_similarities = -np.sort(-history_similarity_matrix, axis=1)[:, :3]
+            scores += 0.3 * top_similarities.astype(np.float64).mean(axis=1)
+        
+        # Faktor 3: Qualität
+        scores += 0.2 * (proposals.quality_column("overall_quality", 3.0)[candidates] / 5.0)
+        
+        # Rückgabe der Top-N Empfehlungen
+        recommendations = []
+        for i in _descending_order(scores)[:n]:
+            proposal = proposals[int(candidates[i])]
+            proposal["relevance_score"] = float(scores[i])
+            recommendations.append(proposal)
+        
+        return recommendations
+    
     def diversify_recommendations(self, recommendations: List[Dict[str, Any]], 
                                  diversity_factor: float = 0.3) -> List[Dict[str, Any]]:
         """
@@ -708,19 +1053,11 @@ class ProposalRecommender:
         n = len(recommendations)
         diversified = [recommendations[0]]  # Start mit dem relevantesten Vorschlag
         
-        # Berechnung der Ähnlichkeitsmatrix zwischen allen Vorschlägen
-        similarity_matrix = np.zeros((n, n))
-        
-        for i in range(n):
-            for j in range(i, n):
-                if i == j:
-                    similarity_matrix[i, j] = 1.0
-                else:
-                    text_i = recommendations[i].get("text", recommendations[i].get("content", ""))
-                    text_j = recommendations[j].get("text", recommendations[j].get("content", ""))
-                    similarity = self.similarity_analyzer.compute_similarity(text_i, text_j)
-                    similarity_matrix[i, j] = similarity
-                    similarity_matrix[j, i] = similarity
+        # Berechnung der Ähnlichkeitsmatrix zwischen allen Vorschlägen (jeder Text wird einmal eingebettet)
+        texts = [rec.get("text", rec.get("content", "")) for rec in recommendations]
+        embeddings = normalize_rows(self.similarity_analyzer.get_embeddings(texts))
+        similarity_matrix = embeddings @ embeddings.T
+        np.fill_diagonal(similarity_matrix, 1.0)
         
         # Auswahl der verbleibenden Vorschläge unter Berücksichtigung der Diversität
         remaining_indices = list(range(1, n))
@@ -0,0 +1,504 @@
+"""
+Agglomeratives Clustering für Bürgervorschläge
+
+Dieses Modul implementiert Average-Linkage-Clustering auf einer vorberechneten
+Ähnlichkeitsmatrix. Die Ähnlichkeiten zwischen Clustern werden mit der
+Lance-Williams-Formel inkrementell aktualisiert; die Reihenfolge der
+Zusammenführungen bestimmt ein Nearest-Neighbour-Chain-Verfahren. Damit sinkt
+der Aufwand von O(n³) (bzw. mehr in reinem Python) auf O(n²) NumPy-Operationen.
+
+Für laufend eingehende Vorschläge hält StreamingClusterState die Cluster
+inkrementell vor, sodass Trends ohne erneutes Clustering abgeleitet werden können.
+"""
+
+import os
+import json
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Optional, Any
+
+import numpy as np
+
+from vector_index import normalize_rows
+
+
+def average_linkage_clusters(similarity_matrix: np.ndarray, threshold: float,
+                             min_cluster_size: int = 1, copy: bool = True,
+                             sizes: Optional[np.ndarray] = None) -> List[List[int]]:
+    """
+    Clustert Elemente per Average-Linkage, bis keine zwei Cluster mehr eine
+    durchschnittliche Ähnlichkeit von mindestens threshold haben.
+    
+    Average-Linkage ist reduzierbar: Zwei gegenseitig nächste Nachbarn können sofort
+    zusammengeführt werden, ohne das Ergebnis der global gierigen Zusammenführung zu
+    ändern. Liegt ein solches Paar unter dem Schwellenwert, kann keiner der beiden
+    Cluster später noch über den Schwellenwert kommen; beide werden abgeschlossen.
+    
+    Args:
+        similarity_matrix: Symmetrische (n x n)-Ähnlichkeitsmatrix
+        threshold: Minimale durchschnittliche Ähnlichkeit für eine Zusammenführung
+        min_cluster_size: Minimale Größe der zurückgegebenen Cluster
+        copy: Bei False wird similarity_matrix als Arbeitsspeicher verwendet und überschrieben
+        sizes: Optionale Ausgangsgrößen der Elemente, wenn diese bereits Cluster sind
+               (similarity_matrix enthält dann deren durchschnittliche Ähnlichkeiten)
+               
+    Returns:
+        Liste von Clustern (aufsteigend sortierte Indizes), geordnet nach ihrem kleinsten Index
+    """
+    n = len(similarity_matrix)
+    if n == 0:
+        return []
+    
+    if copy:
+        similarities = np.array(similarity_matrix, dtype=np.float32)
+    else:
+        similarities = np.asarray(similarity_matrix, dtype=np.float32)
+    np.fill_diagonal(similarities, -np.inf)
+    
+    if sizes is None:
+        sizes = np.ones(n, dtype=np.float32)
+    else:
+        sizes = np.array(sizes, dtype=np.float32)
+    members = {i: [i] for i in range(n)}
+    open_clusters = np.ones(n, dtype=bool)
+    finished = []
+    chain = []
+    
+    def close(cluster: int) -> None:
+        # Abgeschlossene Cluster nehmen an keiner Zusammenführung mehr teil
+        similarities[cluster, :] = -np.inf
+        similarities[:, cluster] = -np.inf
+        open_clusters[cluster] = False
+        finished.append(members.pop(cluster))
+    
+    while True:
+        if not chain:
+            remaining = np.flatnonzero(open_clusters)
+            if len(remaining) == 0:
+                break
+            chain.append(int(remaining[0]))
+        
+        a = chain[-1]
+        b = int(np.argmax(similarities[a]))
+        
+        # Bei Gleichstand wird der Vorgänger in der Kette bevorzugt (garantiert Terminierung)
+        if len(chain) > 1 and similarities[a, chain[-2]] >= similarities[a, b]:
+            b = chain[-2]
+        
+        if similarities[a, b] == -np.inf:
+            # Kein offener Nachbar mehr
+            chain.pop()
+            close(a)
+            continue
+        
+        if len(chain) < 2 or b != chain[-2]:
+            chain.append(b)
+            continue
+        
+        # Gegenseitig nächste Nachbarn
+        chain.pop()
+        chain.pop()
+        
+        if similarities[a, b] < threshold:
+            close(a)
+            close(b)
+            continue
+        
+        keep, drop = min(a, b), max(a, b)
+        
+        # Lance-Williams-Aktualisierung für Average-Linkage
+        merged = (sizes[keep] * similarities[keep] + sizes[drop] * similarities[drop]) / (sizes[keep] + sizes[drop])
+        similarities[keep, :] = merged
+        similarities[:, keep] = merged
+        similarities[keep, keep] = -np.inf
+        similarities[drop, :] = -np.inf
+        similarities[:, drop] = -np.inf
+        
+        sizes[keep] += sizes[drop]
+        open_clusters[drop] = False
+        members[keep].extend(members.pop(drop))
+    
+    clusters = [sorted(cluster) for cluster in finished if len(cluster) >= min_cluster_size]
+    clusters.sort(key=lambda cluster: cluster[0])
+    
+    return clusters
+
+
+def average_linkage_clusters_naive(similarity_matrix: np.ndarray, threshold: float,
+                                   min_cluster_size: int = 1) -> List[List[int]]:
+    """
+    Referenzimplementierung: gierige Zusammenführung mit vollständiger Neuberechnung
+    der Clusterähnlichkeiten in jedem Schritt (bisheriges Verfahren von
+    ProposalClusterer.cluster_proposals). Nur für Tests und Benchmarks auf kleinen n.
+    
+    Args:
+        similarity_matrix: Symmetrische (n x n)-Ähnlichkeitsmatrix
+        threshold: Minimale durchschnittliche Ähnlichkeit für eine Zusammenführung
+        min_cluster_size: Minimale Größe der zurückgegebenen Cluster
+        
+    Returns:
+        Liste von Clustern (aufsteigend sortierte Indizes), geordnet nach ihrem kleinsten Index
+    """
+    n = len(similarity_matrix)
+    clusters = [{i} for i in range(n)]  # Jeder Vorschlag beginnt in seinem eigenen Cluster
+    
+    # Zusammenführen von Clustern basierend auf Ähnlichkeit
+    while len(clusters) > 1:
+        max_similarity = 0
+        merge_i, merge_j = 0, 0
+        
+        # Finden der ähnlichsten Cluster
+        for i in range(len(clusters)):
+            for j in range(i + 1, len(clusters)):
+                # Berechnung der durchschnittlichen Ähnlichkeit zwischen Clustern
+                cluster_similarity = 0
+                count = 0
+                
+                for idx1 in clusters[i]:
+                    for idx2 in clusters[j]:
+                        cluster_similarity += similarity_matrix[idx1, idx2]
+                        count += 1
+                
+                if count > 0:
+                    avg_similarity = cluster_similarity / count
+                    
+                    if avg_similarity > max_similarity:
+                        max_similarity = avg_similarity
+                        merge_i, merge_j = i, j
+        
+        # Wenn keine Cluster mehr über dem Schwellenwert liegen, beenden
+        if max_similarity < threshold:
+            break
+        
+        # Zusammenführen der ähnlichsten Cluster
+        clusters[merge_i].update(clusters[merge_j])
+        clusters.pop(merge_j)
+    
+    return [sorted(cluster) for cluster in clusters if len(cluster) >= min_cluster_size]
+
+
+class StreamingClusterState:
+    """
+    Inkrementeller Clusterzustand für neu eingehende Vorschläge.
+    
+    Pro Cluster werden die Summe der normalisierten Einbettungen, die Größe, die
+    Qualitätssumme, die Kategorienhäufigkeiten und der früheste Vorschlag gehalten.
+    Die durchschnittliche Ähnlichkeit eines Vorschlags zu allen Mitgliedern eines
+    Clusters ergibt sich damit als Skalarprodukt mit der Summe geteilt durch die Größe.
+    """
+    
+    def __init__(self, dimension: int, similarity_threshold: float = 0.75,
+                 maintenance_interval: int = 1000):
+        """
+        Initialisiert den StreamingClusterState.
+        
+        Args:
+            dimension: Dimension der Einbettungen
+            similarity_threshold: Minimale durchschnittliche Ähnlichkeit zu einem Cluster
+            maintenance_interval: Anzahl neuer Vorschläge zwischen zwei automatischen
+                                  Wartungsläufen (0 deaktiviert die automatische Wartung)
+        """
+        self.dimension = dimension
+        self.similarity_threshold = similarity_threshold
+        self.maintenance_interval = maintenance_interval
+        
+        # Daten pro Vorschlag (Position = Reihenfolge des Hinzufügens)
+        self._embeddings = np.zeros((0, dimension), dtype=np.float32)
+        self._assignments = np.zeros(0, dtype=np.int64)
+        self._records = []
+        
+        # Daten pro Cluster
+        self._sums = np.zeros((0, dimension), dtype=np.float32)
+        self._sizes = np.zeros(0, dtype=np.int64)
+        self._quality_sums = np.zeros(0, dtype=np.float64)
+        self._categories = []
+        self._members = []
+        self._earliest = []
+        
+        self._n_clusters = 0
+        self._added_since_maintenance = 0
+    
+    @property
+    def n_proposals(self) -> int:
+        """Anzahl der aufgenommenen Vorschläge."""
+        return len(self._records)
+    
+    @property
+    def n_clusters(self) -> int:
+        """Anzahl der nicht leeren Cluster."""
+        return int(np.count_nonzero(self._sizes[:self._n_clusters]))
+    
+    def add(self, embeddings: np.ndarray, proposals: List[Dict[str, Any]]) -> List[int]:
+        """
+        Ordnet neue Vorschläge dem ähnlichsten Cluster zu oder eröffnet neue Cluster.
+        
+        Args:
+            embeddings: Einbettungsmatrix der Vorschläge (eine Zeile pro Vorschlag)
+            proposals: Vorschlagsdaten (für Qualität, Kategorien, Titel und Erstellungsdatum)
+            
+        Returns:
+            Positionen der Vorschläge im Zustand (entsprechen 'proposal_indices' der Trends)
+        """
+        embeddings = normalize_rows(embeddings)
+        positions = []
+        
+        for embedding, proposal in zip(embeddings, proposals):
+            position = len(self._records)
+            self._embeddings = _ensure_rows(self._embeddings, position + 1)
+            self._assignments = _ensure_rows(self._assignments, position + 1)
+            self._embeddings[position] = embedding
+            self._records.append(self._make_record(proposal))
+            
+            cluster = self._nearest_cluster(embedding)
+            if cluster is None:
+                cluster = self._open_cluster()
+            self._add_member(cluster, position)
+            positions.append(position)
+            
+            self._added_since_maintenance += 1
+            if self.maintenance_interval and self._added_since_maintenance >= self.maintenance_interval:
+                self.maintain()
+        
+        return positions
+    
+    def maintain(self) -> None:
+        """
+        Wartung der Cluster: Teilt Cluster, deren durchschnittliche innere Ähnlichkeit
+        unter den Schwellenwert gefallen ist, und führt Cluster zusammen, deren
+        durchschnittliche Ähnlichkeit (Average-Linkage) den Schwellenwert erreicht.
+        """
+        self._compact()
+        
+        # Aufteilen auseinandergelaufener Cluster
+        for cluster in range(self._n_clusters):
+            size = int(self._sizes[cluster])
+            if size < 2:
+                continue
+            
+            cluster_sum = self._sums[cluster]
+            inner_similarity = (float(cluster_sum @ cluster_sum) - size) / (size * (size - 1))
+            if inner_similarity >= self.similarity_threshold:
+                continue
+            
+            members = self._members[cluster]
+            member_embeddings = self._embeddings[members]
+            parts = average_linkage_clusters(
+                member_embeddings @ member_embeddings.T, self.similarity_threshold, copy=False
+            )
+            self._set_members(cluster, [members[i] for i in parts[0]])
+            for part in parts[1:]:
+                self._set_members(self._open_cluster(), [members[i] for i in part])
+        
+        # Zusammenführen ähnlicher Cluster
+        if self._n_clusters > 1:
+            sums = self._sums[:self._n_clusters]
+            sizes = self._sizes[:self._n_clusters].astype(np.float32)
+            similarity_matrix = (sums @ sums.T) / np.outer(sizes, sizes)
+            groups = average_linkage_clusters(
+                similarity_matrix, self.similarity_threshold, copy=False, sizes=sizes
+            )
+            for group in groups:
+                if len(group) > 1:
+                    members = sorted(member for cluster in group for member in self._members[cluster])
+                    self._set_members(group[0], members)
+                    for cluster in group[1:]:
+                        self._set_members(cluster, [])
+        
+        self._compact()
+        self._added_since_maintenance = 0
+    
+    def trends(self, min_trend_size: int = 3) -> List[Dict[str, Any]]:
+        """
+        Leitet Trends aus dem Clusterzustand ab (wie ProposalClusterer.identify_trends).
+        
+        Args:
+            min_trend_size: Minimale Anzahl von Vorschlägen für einen Trend
+            
+        Returns:
+            Liste von Trend-Informationen, sortiert nach Größe und Qualität
+        """
+        trends = []
+        
+        for cluster in np.flatnonzero(self._sizes[:self._n_clusters] >= min_trend_size):
+            size = int(self._sizes[cluster])
+            categories = self._categories[cluster]
+            members = self._members[cluster]
+            
+            trends.append({
+                "category": categories.most_common(1)[0][0] if categories else "Unkategorisiert",
+                "size": size,
+                "avg_quality": float(self._quality_sums[cluster] / size),
+                "representative_title": self._records[members[0]]["title"],
+                "proposal_indices": list(members),
+                "proposal_ids": [self._records[i]["id"] for i in members],
+                "created_at": self._records[self._earliest[cluster]]["created_at"]
+            })
+        
+        # Sortierung der Trends nach Größe und Qualität
+        return sorted(trends, key=lambda t: (t["size"], t["avg_quality"]), reverse=True)
+    
+    def save(self, path: str) -> None:
+        """
+        Speichert den Zustand in einem Verzeichnis.
+        
+        Args:
+            path: Zielverzeichnis (wird bei Bedarf angelegt)
+        """
+        os.makedirs(path, exist_ok=True)
+        n = len(self._records)
+        
+        np.savez(
+            os.path.join(path, "cluster_state.npz"),
+            embeddings=self._embeddings[:n],
+            assignments=self._assignments[:n]
+        )
+        
+        with open(os.path.join(path, "cluster_state.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "dimension": self.dimension,
+                "similarity_threshold": self.similarity_threshold,
+                "maintenance_interval": self.maintenance_interval,
+                "added_since_maintenance": self._added_since_maintenance,
+                "records": self._records
+            }, f, ensure_ascii=False)
+    
+    @classmethod
+    def load(cls, path: str) -> "StreamingClusterState":
+        """
+        Lädt einen mit save gespeicherten Zustand.
+        
+        Args:
+            path: Verzeichnis des gespeicherten Zustands
+            
+        Returns:
+            StreamingClusterState
+        """
+        with open(os.path.join(path, "cluster_state.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = np.load(os.path.join(path, "cluster_state.npz"))
+        
+        state = cls(meta["dimension"], meta["similarity_threshold"], meta["maintenance_interval"])
+        state._records = meta["records"]
+        state._embeddings = arrays["embeddings"].astype(np.float32)
+        state._assignments = arrays["assignments"].astype(np.int64)
+        state._added_since_maintenance = meta["added_since_maintenance"]
+        
+        # Die Clusterstatistiken werden aus den Zuordnungen neu aufgebaut
+        n_clusters = int(state._assignments.max()) + 1 if len(state._assignments) else 0
+        members = [[] for _ in range(n_clusters)]
+        for position, cluster in enumerate(state._assignments.tolist()):
+            members[cluster].append(position)
+        for cluster_members in members:
+            state._set_members(state._open_cluster(), cluster_members)
+        state._compact()
+        
+        return state
+    
+    @staticmethod
+    def _make_record(proposal: Dict[str, Any]) -> Dict[str, Any]:
+        """Extrahiert die für Trends benötigten Felder eines Vorschlags."""
+        categories = []
+        if "primary_category" in proposal:
+            categories.append(proposal["primary_category"])
+        elif "categories" in proposal and proposal["categories"]:
+            if isinstance(proposal["categories"], list):
+                categories.extend(proposal["categories"])
+            elif isinstance(proposal["categories"], dict):
+                categories.extend(proposal["categories"].keys())
+        
+        created_at = proposal.get("created_at", datetime.now().isoformat())
+        if isinstance(created_at, datetime):
+            timestamp = created_at.timestamp()
+            created_at = created_at.isoformat()
+        else:
+            timestamp = datetime.fromisoformat(created_at.replace("Z", "+00:00")).timestamp()
+        
+        return {
+            "id": str(proposal.get("id", "")),
+            "title": proposal.get("title", "Unbenannter Trend"),
+            "quality": float(proposal.get("quality", {}).get("overall_quality", 3.0)),
+            "categories": categories,
+            "created_at": created_at,
+            "timestamp": timestamp
+        }
+    
+    def _nearest_cluster(self, embedding: np.ndarray) -> Optional[int]:
+        """Sucht den Cluster mit der höchsten durchschnittlichen Ähnlichkeit über dem Schwellenwert."""
+        if self._n_clusters == 0:
+            return None
+        
+        sizes = self._sizes[:self._n_clusters]
+        scores = (self._sums[:self._n_clusters] @ embedding) / np.maximum(sizes, 1)
+        scores[sizes == 0] = -np.inf
+        
+        best = int(np.argmax(scores))
+        return best if scores[best] >= self.similarity_threshold else None
+    
+    def _open_cluster(self) -> int:
+        """Legt einen leeren Cluster an."""
+        cluster = self._n_clusters
+        self._sums = _ensure_rows(self._sums, cluster + 1)
+        self._sizes = _ensure_rows(self._sizes, cluster + 1)
+        self._quality_sums = _ensure_rows(self._quality_sums, cluster + 1)
+        self._sums[cluster] = 0.0
+        self._sizes[cluster] = 0
+        self._quality_sums[cluster] = 0.0
+        self._categories.append(Counter())
+        self._members.append([])
+        self._earliest.append(-1)
+        self._n_clusters += 1
+        return cluster
+    
+    def _add_member(self, cluster: int, position: int) -> None:
+        """Fügt einen Vorschlag einem Cluster hinzu und aktualisiert dessen Statistiken."""
+        record = self._records[position]
+        self._sums[cluster] += self._embeddings[position]
+        self._sizes[cluster] += 1
+        self._quality_sums[cluster] += record["quality"]
+        self._categories[cluster].update(record["categories"])
+        self._members[cluster].append(position)
+        self._assignments[position] = cluster
+        
+        earliest = self._earliest[cluster]
+        if earliest < 0 or record["timestamp"] < self._records[earliest]["timestamp"]:
+            self._earliest[cluster] = position
+    
+    def _set_members(self, cluster: int, members: List[int]) -> None:
+        """Baut die Statistiken eines Clusters aus einer (sortierten) Mitgliederliste neu auf."""
+        self._sums[cluster] = 0.0
+        self._sizes[cluster] = 0
+        self._quality_sums[cluster] = 0.0
+        self._categories[cluster] = Counter()
+        self._members[cluster] = []
+        self._earliest[cluster] = -1
+        
+        for position in members:
+            self._add_member(cluster, position)
+    
+    def _compact(self) -> None:
+        """Entfernt leere Cluster und nummeriert die übrigen fortlaufend."""
+        keep = np.flatnonzero(self._sizes[:self._n_clusters] > 0)
+        if len(keep) == self._n_clusters:
+            return
+        
+        mapping = np.full(self._n_clusters, -1, dtype=np.int64)
+        mapping[keep] = np.arange(len(keep))
+        n = len(self._records)
+        self._assignments[:n] = mapping[self._assignments[:n]]
+        
+        self._sums = self._sums[keep]
+        self._sizes = self._sizes[keep]
+        self._quality_sums = self._quality_sums[keep]
+        self._categories = [self._categories[i] for i in keep]
+        self._members = [self._members[i] for i in keep]
+        self._earliest = [self._earliest[i] for i in keep]
+        self._n_clusters = len(keep)
+
+
+def _ensure_rows(array: np.ndarray, rows: int) -> np.ndarray:
+    """Vergrößert ein Array bei Bedarf (mit Reserve), sodass es mindestens rows Zeilen hat."""
+    if rows <= len(array):
+        return array
+    grown = np.zeros((max(rows, 2 * len(array), 16),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
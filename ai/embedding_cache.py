@@ -0,0 +1,204 @@
+"""
+Embedding-Cache für die Ähnlichkeitsanalyse
+
+Dieses Modul implementiert einen inhaltsadressierten Cache für Texteinbettungen.
+Der Schlüssel ist ein Hash aus der Modellidentität und dem bereinigten Text, sodass
+Einbettungen nach einem Modellwechsel automatisch nicht mehr verwendet werden.
+
+Der Cache besteht aus zwei Stufen:
+- einer LRU-Stufe im Arbeitsspeicher mit Größenbegrenzung und Verdrängungszähler
+- einer optionalen persistenten Stufe (SQLite-Datei), die Neustarts überdauert
+"""
+
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Any
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """Zweistufiger Cache (LRU im Speicher, SQLite auf der Festplatte) für Einbettungen."""
+    
+    def __init__(self, max_entries: int = 10000, path: Optional[str] = None):
+        """
+        Initialisiert den EmbeddingCache.
+        
+        Args:
+            max_entries: Maximale Anzahl von Einbettungen in der Speicherstufe
+            path: Optionaler Pfad der SQLite-Datei für die persistente Stufe
+        """
+        self.max_entries = max_entries
+        self.path = path
+        
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Zähler für Treffer, Fehlschläge und Verdrängungen
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        # Persistente Stufe
+        self._connection = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._connection.commit()
+    
+    @staticmethod
+    def make_key(text: str, model_id: str) -> str:
+        """
+        Erzeugt den Cache-Schlüssel für einen Text.
+        
+        Der Text wird wie in TextPreprocessor.clean_text bereinigt, sodass sich
+        Texte, die sich nur in Leerzeichen unterscheiden, einen Eintrag teilen.
+        
+        Args:
+            text: Eingebetteter Text
+            model_id: Identität des Modells (Name und Gewichtsstand)
+            
+        Returns:
+            Hex-Digest des Schlüssels
+        """
+        cleaned_text = " ".join(text.split())
+        return hashlib.sha256(f"{model_id}\n{cleaned_text}".encode("utf-8")).hexdigest()
+    
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Sucht mehrere Einbettungen im Cache.
+        
+        Args:
+            keys: Cache-Schlüssel (siehe make_key)
+            
+        Returns:
+            Liste mit Einbettungen bzw. None für nicht gefundene Schlüssel
+        """
+        results = [None] * len(keys)
+        disk_lookups = []
+        
+        with self._lock:
+            for i, key in enumerate(keys):
+                embedding = self._memory.get(key)
+                if embedding is not None:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    results[i] = embedding
+                else:
+                    disk_lookups.append(i)
+            
+            # Nachschlagen in der persistenten Stufe
+            if disk_lookups and self._connection is not None:
+                found = self._read_disk([keys[i] for i in disk_lookups])
+                remaining = []
+                for i in disk_lookups:
+                    embedding = found.get(keys[i])
+                    if embedding is not None:
+                        self.disk_hits += 1
+                        results[i] = embedding
+                        self._store_memory(keys[i], embedding)
+                    else:
+                        remaining.append(i)
+                disk_lookups = remaining
+            
+            self.misses += len(disk_lookups)
+        
+        return results
+    
+    def put_many(self, keys: List[str], embeddings: np.ndarray) -> None:
+        """
+        Legt mehrere Einbettungen in beiden Cache-Stufen ab.
+        
+        Args:
+            keys: Cache-Schlüssel (siehe make_key)
+            embeddings: Einbettungsmatrix (eine Zeile pro Schlüssel)
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        
+        with self._lock:
+            for key, embedding in zip(keys, embeddings):
+                self._store_memory(key, embedding.copy())
+            
+            if self._connection is not None:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, embedding.tobytes()) for key, embedding in zip(keys, embeddings)]
+                )
+                self._connection.commit()
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Sucht eine einzelne Einbettung im Cache."""
+        return self.get_many([key])[0]
+    
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        """Legt eine einzelne Einbettung im Cache ab."""
+        self.put_many([key], np.asarray(embedding)[None, :])
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Gibt die Cache-Statistik zurück.
+        
+        Returns:
+            Dictionary mit Einträgen, Treffern, Fehlschlägen, Verdrängungen und Trefferquote
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+    
+    def clear(self) -> None:
+        """Leert beide Cache-Stufen und setzt die Zähler zurück."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM embeddings")
+                self._connection.commit()
+    
+    def close(self) -> None:
+        """Schließt die Verbindung zur persistenten Stufe."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+    
+    def _store_memory(self, key: str, embedding: np.ndarray) -> None:
+        """Legt eine Einbettung in der LRU-Stufe ab und verdrängt bei Bedarf alte Einträge."""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+    
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Liest Einbettungen aus der persistenten Stufe."""
+        found = {}
+        
+        # SQLite begrenzt die Anzahl der Parameter pro Abfrage
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            )
+            for key, vector in rows:
+                found[key] = np.frombuffer(vector, dtype=np.float32).copy()
+        
+        return found
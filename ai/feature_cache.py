@@ -0,0 +1,125 @@
+"""
+Zwischengespeicherte Encoder-Merkmale für das Training der Ausgabeköpfe
+
+Ändern sich categories.json oder die Qualitätsdimensionen, müssen nur die
+linearen Köpfe (classifier, regressor) neu trainiert werden. Die [CLS]-Vektoren
+des gelabelten Korpus werden dafür einmal berechnet und als .npy-Datei pro
+Korpus abgelegt:
+
+    <cache_dir>/<Korpus-Schlüssel>/<Encoder-Schlüssel>.npy
+    <cache_dir>/<Korpus-Schlüssel>/<Encoder-Schlüssel>.layer<n>.npy
+    
+Die zweite Form enthält die [CLS]-Vektoren einer Zwischenschicht für die
+Zwischenklassifikatoren (Early Exit). Der Encoder-Schlüssel enthält einen Hash der Encoder-Gewichte (ohne Köpfe);
+nach einem Nachtraining des Encoders werden die Merkmale daher neu berechnet
+und veraltete Dateien desselben Korpus entfernt.
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+
+# Parameter, die die Merkmale bestimmen (Encoder und ggf. Projektion des Schülermodells)
+ENCODER_PREFIXES = ("bert.", "embedding_projection.")
+
+
+def encoder_fingerprint(model) -> str:
+    """
+    Fingerabdruck der Encoder-Gewichte eines ProposalMultiHeadModel.
+    
+    Die Köpfe gehen nicht ein, sodass neu trainierte Köpfe den Fingerabdruck
+    nicht ändern.
+    """
+    import torch
+    
+    digest = hashlib.sha256()
+    for name, tensor in model.state_dict().items():
+        if not name.startswith(ENCODER_PREFIXES):
+            continue
+        
+        # Rohe Bytes des Tensors (unabhängig vom Datentyp)
+        data = tensor.detach().cpu().contiguous().reshape(-1)
+        digest.update(f"{name}:{data.dtype}:{tuple(tensor.shape)}\n".encode("utf-8"))
+        digest.update(data.view(torch.uint8).numpy())
+    return digest.hexdigest()[:16]
+
+
+class FeatureCache:
+    """[CLS]-Merkmale gelabelter Korpora je Encoder-Stand."""
+    
+    def __init__(self, directory: str):
+        """
+        Initialisiert den FeatureCache.
+        
+        Args:
+            directory: Verzeichnis für die Merkmalsdateien
+        """
+        self.directory = directory
+        
+        # Zähler für Treffer und neu berechnete Merkmale
+        self.hits = 0
+        self.misses = 0
+    
+    def path(self, corpus_key: str, encoder_key: str, layer: Optional[int] = None) -> str:
+        """Pfad der Merkmalsdatei eines Korpus für einen Encoder-Stand (und ggf. eine Zwischenschicht)."""
+        name = encoder_key if layer is None else f"{encoder_key}.layer{layer}"
+        return os.path.join(self.directory, corpus_key, f"{name}.npy")
+    
+    def load(self, corpus_key: str, encoder_key: str, layer: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Lädt die Merkmale eines Korpus.
+        
+        Args:
+            corpus_key: Schlüssel des Korpus (siehe tokenized_corpus.corpus_key)
+            encoder_key: Schlüssel des Encoder-Stands (siehe encoder_fingerprint)
+            layer: Optionale Zwischenschicht (Standard: Ausgabe des Encoders)
+            
+        Returns:
+            Merkmalsmatrix (Texte x Einbettungsdimension) oder None
+        """
+        path = self.path(corpus_key, encoder_key, layer)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return np.load(path)
+    
+    def save(self, corpus_key: str, encoder_key: str, features: np.ndarray,
+             layer: Optional[int] = None) -> str:
+        """
+        Speichert die Merkmale eines Korpus und entfernt Merkmale älterer Encoder-Stände.
+        
+        Args:
+            corpus_key: Schlüssel des Korpus
+            encoder_key: Schlüssel des Encoder-Stands
+            features: Merkmalsmatrix (Texte x Einbettungsdimension)
+            layer: Optionale Zwischenschicht (Standard: Ausgabe des Encoders)
+            
+        Returns:
+            Pfad der Merkmalsdatei
+        """
+        path = self.path(corpus_key, encoder_key, layer)
+        corpus_dir = os.path.dirname(path)
+        os.makedirs(corpus_dir, exist_ok=True)
+        
+        # Schreiben in eine temporäre Datei und atomares Umbenennen
+        handle, temp_path = tempfile.mkstemp(dir=corpus_dir, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                np.save(f, np.asarray(features, dtype=np.float32))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        
+        # Merkmale anderer Encoder-Stände werden nicht mehr verwendet
+        for name in os.listdir(corpus_dir):
+            if name.endswith(".npy") and name.split(".")[0] != encoder_key:
+                os.remove(os.path.join(corpus_dir, name))
+        
+        return path
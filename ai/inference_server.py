@@ -0,0 +1,493 @@
+"""
+Lokaler Inferenzserver mit dynamischem Micro-Batching
+
+Dieses Modul stellt einen ProposalProcessor als langlebigen asyncio-Server
+bereit (HTTP auf localhost oder über einen Unix-Socket). Gleichzeitig
+eintreffende Anfragen werden pro Operation von einem MicroBatcher zu
+Encoder-Batches zusammengefasst: Ein Batch wird ausgeführt, sobald er
+max_batch_size Anfragen enthält oder die erste Anfrage max_wait_ms gewartet hat.
+Die Warteschlange ist begrenzt; ist sie voll, antwortet der Server sofort mit
+503 (Backpressure), statt Anfragen unbegrenzt anzunehmen.
+
+Endpunkte (POST, JSON-Körper mit "text"):
+- /process: vollständige Analyse wie ProposalProcessor.process_proposal
+- /categorize: Kategorien (optional "threshold")
+- /quality: Qualitätsscores
+- /similarity: Ähnlichkeit zu "reference_texts" (optional "threshold")
+- GET /health: Zustand und Batch-Statistiken
+
+Aufruf: python inference_server.py [--port 8765 | --unix-socket /tmp/proposals.sock]
+        [--max-batch-size 32] [--max-wait-ms 5] [--max-queue-size 256]
+"""
+
+import json
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Optional, Any, Callable
+
+from proposal_processor import ProposalProcessor, PRECISION_MODES, BACKENDS
+from result_store import json_default
+
+# Maximale Größe eines Anfragekörpers in Bytes
+MAX_BODY_SIZE = 1024 * 1024
+
+HTTP_STATUS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+
+class QueueFullError(Exception):
+    """Die Warteschlange eines MicroBatchers ist voll (Backpressure)."""
+
+
+class MicroBatcher:
+    """
+    Fasst gleichzeitig eingehende Anfragen zu Batches zusammen.
+    
+    Die Batch-Funktion erhält eine Liste von Eingaben und liefert die Ergebnisse
+    in derselben Reihenfolge. Sie läuft im übergebenen Executor, damit die
+    Ereignisschleife während der Inferenz weitere Anfragen annehmen kann.
+    Schlägt ein Batch fehl, werden seine Eingaben einzeln wiederholt; nur die
+    fehlerhaften Anfragen erhalten den Fehler.
+    """
+    
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, max_queue_size: int = 256,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        """
+        Initialisiert den MicroBatcher.
+        
+        Args:
+            process_batch: Funktion, die eine Liste von Eingaben verarbeitet
+            max_batch_size: Maximale Anzahl von Anfragen pro Batch
+            max_wait_ms: Maximale Wartezeit der ersten Anfrage auf weitere Anfragen
+            max_queue_size: Maximale Anzahl wartender Anfragen
+            executor: Executor für die Batch-Funktion (Standard: ein eigener Thread)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size muss mindestens 1 sein")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size muss mindestens 1 sein")
+        
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        
+        self._queue = None
+        self._task = None
+        
+        # Statistiken
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+    
+    def start(self) -> None:
+        """Startet die Batch-Schleife in der laufenden Ereignisschleife."""
+        if self._task is None:
+            self._queue = asyncio.Queue(self.max_queue_size)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Beendet die Batch-Schleife; wartende Anfragen werden abgebrochen."""
+        if self._task is None:
+            return
+        
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+    
+    async def submit(self, item: Any) -> Any:
+        """
+        Reiht eine Eingabe ein und wartet auf ihr Ergebnis.
+        
+        Args:
+            item: Eingabe für die Batch-Funktion
+            
+        Returns:
+            Ergebnis der Batch-Funktion für diese Eingabe
+            
+        Raises:
+            QueueFullError: Wenn bereits max_queue_size Anfragen warten
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"Warteschlange voll ({self.max_queue_size} Anfragen)")
+        
+        return await future
+    
+    @property
+    def queue_size(self) -> int:
+        """Anzahl der aktuell wartenden Anfragen."""
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Liefert Statistiken über die bisher verarbeiteten Batches."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "rejected": self.rejected,
+            "queue_size": self.queue_size
+        }
+    
+    async def _next_batch(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Wartet auf die erste Anfrage und sammelt weitere bis zur Batch-Größe oder Frist."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            # Bereits wartende Anfragen ohne Verzögerung übernehmen
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    def _call_batch(self, items: List[Any]) -> Tuple[Optional[List[Any]], Optional[Exception]]:
+        """
+        Führt die Batch-Funktion aus und liefert Ergebnisse oder Fehler.
+        
+        Der Fehler wird als Wert zurückgegeben, damit sein Traceback nicht die
+        Batch-Schleife enthält (die Clients können ihn sonst beim Aufräumen leeren).
+        """
+        try:
+            return self.process_batch(items), None
+        except Exception as e:
+            return None, e
+    
+    async def _run(self) -> None:
+        """Batch-Schleife: sammelt Anfragen und führt die Batch-Funktion aus."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = await self._next_batch()
+            
+            # Vom Client abgebrochene Anfragen nicht mehr berechnen
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            
+            items = [item for item, _ in batch]
+            results, error = await loop.run_in_executor(self.executor, self._call_batch, items)
+            if error is None:
+                outcomes = [(result, None) for result in results]
+                self.batches += 1
+                self.items += len(batch)
+            elif len(batch) == 1:
+                outcomes = [(None, error)]
+            else:
+                # Fehler einer Anfrage sollen nicht die übrigen zusammengefassten Anfragen
+                # treffen: Einzelverarbeitung, damit jeder Fehler bei seiner Anfrage bleibt
+                outcomes = []
+                for item in items:
+                    results, error = await loop.run_in_executor(self.executor, self._call_batch, [item])
+                    outcomes.append((None, error) if error is not None else (results[0], None))
+                    if error is None:
+                        self.batches += 1
+                        self.items += 1
+            
+            for (_, future), (result, error) in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+class InferenceServer:
+    """asyncio-Server, der die Operationen eines ProposalProcessor gebündelt ausführt."""
+    
+    def __init__(self, processor: ProposalProcessor, max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, max_queue_size: int = 256):
+        """
+        Initialisiert den InferenceServer.
+        
+        Args:
+            processor: ProposalProcessor für die Inferenz
+            max_batch_size: Maximale Anzahl von Anfragen pro Batch
+            max_wait_ms: Maximale Wartezeit einer Anfrage auf weitere Anfragen
+            max_queue_size: Maximale Anzahl wartender Anfragen pro Operation
+        """
+        self.processor = processor
+        
+        # Ein gemeinsamer Thread für alle Operationen, damit das Modell nie
+        # parallel aus mehreren Threads aufgerufen wird
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        
+        operations = {
+            "process": self._process_batch,
+            "categorize": self._categorize_batch,
+            "quality": self._quality_batch,
+            "similarity": self._similarity_batch
+        }
+        self.batchers = {
+            name: MicroBatcher(function, max_batch_size, max_wait_ms, max_queue_size, self.executor)
+            for name, function in operations.items()
+        }
+        self._server = None
+        self._connections = set()
+    
+    def _process_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Vollständige Analyse mehrerer Vorschläge."""
+        return self.processor.process_batch([request["text"] for request in requests], len(requests))
+    
+    def _categorize_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """Kategorisierung mehrerer Vorschläge (gruppiert nach Schwellenwert)."""
+        results = [None] * len(requests)
+        groups = {}
+        for i, request in enumerate(requests):
+            groups.setdefault(float(request.get("threshold", 0.5)), []).append(i)
+        
+        for threshold, indices in groups.items():
+            scores = self.processor.categorize_batch(
+                [requests[i]["text"] for i in indices], threshold, len(indices)
+            )
+            for i, category_scores in zip(indices, scores):
+                results[i] = category_scores
+        return results
+    
+    def _quality_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """Qualitätsbewertung mehrerer Vorschläge."""
+        return self.processor.evaluate_quality_batch([request["text"] for request in requests], len(requests))
+    
+    def _similarity_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ähnlichkeitsprüfung mehrerer Vorschläge gegen ihre Referenztexte."""
+        # Alle Einbettungen in einem Durchlauf berechnen; die Einzelprüfungen
+        # lesen sie anschließend aus dem Embedding-Cache
+        texts = []
+        for request in requests:
+            texts.append(request["text"])
+            texts.extend(request.get("reference_texts", []))
+        self.processor.similarity_analyzer.get_embeddings(texts)
+        
+        return [
+            self.processor.check_similarity(
+                request["text"], request.get("reference_texts", []), threshold=float(request.get("threshold", 0.85))
+            )
+            for request in requests
+        ]
+    
+    @staticmethod
+    def _validate_request(request: Any) -> Dict[str, Any]:
+        """
+        Prüft die Felder einer Anfrage, bevor sie mit anderen zu einem Batch zusammengefasst wird.
+        
+        Args:
+            request: Dekodierter Anfragekörper
+            
+        Returns:
+            Anfrage mit 'threshold' als float
+            
+        Raises:
+            ValueError: Bei fehlendem 'text' oder ungültigem 'threshold' bzw. 'reference_texts'
+        """
+        if not isinstance(request, dict) or not isinstance(request.get("text"), str):
+            raise ValueError("Feld 'text' fehlt")
+        
+        if "threshold" in request:
+            threshold = request["threshold"]
+            if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not 0.0 <= threshold <= 1.0:
+                raise ValueError("Feld 'threshold' muss eine Zahl zwischen 0 und 1 sein")
+            request["threshold"] = float(threshold)
+        
+        reference_texts = request.get("reference_texts", [])
+        if not isinstance(reference_texts, list) or not all(isinstance(text, str) for text in reference_texts):
+            raise ValueError("Feld 'reference_texts' muss eine Liste von Texten sein")
+        return request
+    
+    async def handle_request(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        """
+        Beantwortet eine Anfrage.
+        
+        Args:
+            method: HTTP-Methode
+            path: Pfad (z.B. "/categorize")
+            body: Anfragekörper (JSON)
+            
+        Returns:
+            Tupel aus HTTP-Status und JSON-serialisierbarer Antwort
+        """
+        if path == "/health":
+            health = {
+                "status": "ok",
+                "models_loaded": self.processor.models_loaded,
+                "batchers": {name: batcher.stats() for name, batcher in self.batchers.items()}
+            }
+            if self.processor.result_store is not None:
+                health["result_store"] = self.processor.result_store.stats()
+            return 200, health
+        
+        operation = path.strip("/")
+        if operation not in self.batchers:
+            return 404, {"error": f"Unbekannter Endpunkt {path}"}
+        if method != "POST":
+            return 405, {"error": "Nur POST wird unterstützt"}
+        
+        try:
+            request = self._validate_request(json.loads(body or b"{}"))
+        except ValueError as e:
+            return 400, {"error": f"Ungültige Anfrage: {e}"}
+        
+        try:
+            return 200, await self.batchers[operation].submit(request)
+        except QueueFullError as e:
+            return 503, {"error": str(e)}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Bearbeitet eine Verbindung (HTTP/1.1 mit Keep-Alive)."""
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                
+                content_length = int(headers.get("content-length", 0))
+                if content_length > MAX_BODY_SIZE:
+                    status, response = 413, {"error": "Anfragekörper zu groß"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(content_length) if content_length else b""
+                    status, response = await self.handle_request(method, path.split("?")[0], body)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                
+                payload = json.dumps(response, ensure_ascii=False, default=json_default).encode("utf-8")
+                head = (
+                    f"HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    + ("Retry-After: 1\r\n" if status == 503 else "")
+                    + f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                )
+                writer.write(head.encode("latin-1") + payload)
+                await writer.drain()
+                
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None) -> None:
+        """
+        Startet den Server (TCP auf host:port oder, falls angegeben, auf einem Unix-Socket).
+        
+        Args:
+            host: Adresse für TCP
+            port: Port für TCP (0: freier Port, siehe address)
+            unix_socket: Optionaler Pfad eines Unix-Sockets
+        """
+        for batcher in self.batchers.values():
+            batcher.start()
+        
+        if unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=unix_socket)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+    
+    @property
+    def address(self) -> Any:
+        """Adresse, auf der der Server lauscht ((host, port) oder Socket-Pfad)."""
+        return self._server.sockets[0].getsockname()
+    
+    async def serve_forever(self) -> None:
+        """Bearbeitet Anfragen, bis der Server beendet wird."""
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def stop(self) -> None:
+        """Beendet Server und Batch-Schleifen."""
+        if self._server is not None:
+            self._server.close()
+            
+            # Offene Keep-Alive-Verbindungen beenden
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        for batcher in self.batchers.values():
+            await batcher.stop()
+        self.executor.shutdown(wait=True)
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Startet den Server mit den Kommandozeilenparametern."""
+    processor = ProposalProcessor(
+        precision=args.precision, backend=args.backend, early_exit_margin=args.early_exit_margin
+    )
+    
+    # Modelle vor der ersten Anfrage laden
+    timings = processor.warmup(args.max_batch_size)
+    print("Aufwärmen: " + ", ".join(f"{name} {seconds:.2f} s" for name, seconds in timings.items()))
+    
+    server = InferenceServer(processor, args.max_batch_size, args.max_wait_ms, args.max_queue_size)
+    await server.start(args.host, args.port, args.unix_socket)
+    print(f"Inferenzserver lauscht auf {server.address}")
+    
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokaler Inferenzserver mit dynamischem Micro-Batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", help="Pfad eines Unix-Sockets anstelle von TCP")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-queue-size", type=int, default=256)
+    parser.add_argument("--precision", default="fp32", choices=PRECISION_MODES)
+    parser.add_argument("--backend", default="torch", choices=BACKENDS)
+    parser.add_argument("--early-exit-margin", type=float)
+    
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,374 @@
+"""
+Laufend aktualisierte Rangliste der Vorschläge nach Priorität
+
+ProposalSorter.get_top_proposals bewertet bei jedem Aufruf alle Vorschläge neu.
+PriorityLeaderboard hält die Rangfolge je Gewichtungsprofil (WEIGHT_PROFILES)
+in einer Skip-Liste vor:
+
+- Ändern sich Stimmen oder Qualität eines Vorschlags, wird nur dieser neu bewertet
+  und umgehängt (O(log n) je Profil).
+- Der Zeitfaktor des Prioritätsscores hängt nur vom Alter in ganzen Tagen ab. Ein
+  Heap enthält je Vorschlag den nächsten Tageswechsel; fällige Vorschläge werden
+  vor jeder Abfrage neu bewertet, alle übrigen behalten ihren Score.
+- Abfragen lesen die ersten Plätze aus einem unveränderlichen Schnappschuss (O(k)).
+  Schreibzugriffe sind über eine Sperre serialisiert und verwerfen den Schnappschuss
+  nur, wenn sie die ersten Plätze betreffen.
+
+Die Scores entsprechen ProposalSorter.calculate_priority_score zum jeweiligen
+Zeitpunkt; bei gleichem Score steht der früher aufgenommene Vorschlag vorn.
+"""
+
+import heapq
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple, Optional, Any
+
+import numpy as np
+
+from categorization_algorithms import ProposalSorter, WEIGHT_PROFILES
+from proposal_table import parse_created_at
+
+# Höchste Ebene der Skip-Liste (ausreichend für weit mehr als 10^9 Einträge)
+MAX_LEVEL = 32
+
+# Alter in Tagen, ab dem sich der Zeitfaktor nicht mehr ändert
+RECENCY_DAYS = 30
+
+
+class _SkipList:
+    """Aufsteigend sortierte Skip-Liste von (Schlüssel, Wert)-Paaren mit eindeutigen Schlüsseln."""
+    
+    def __init__(self, seed: int = 0):
+        # Knoten: [Schlüssel, Wert, Nachfolger je Ebene]
+        self._head = [None, None, [None] * MAX_LEVEL]
+        self._level = 1
+        self._size = 0
+        self._random = random.Random(seed)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _predecessors(self, key: Any) -> List[list]:
+        """Letzter Knoten mit kleinerem Schlüssel auf jeder Ebene."""
+        update = [self._head] * MAX_LEVEL
+        node = self._head
+        for level in range(self._level - 1, -1, -1):
+            following = node[2][level]
+            while following is not None and following[0] < key:
+                node = following
+                following = node[2][level]
+            update[level] = node
+        return update
+    
+    def insert(self, key: Any, value: Any) -> None:
+        """Fügt ein Paar ein (O(log n) erwartet)."""
+        update = self._predecessors(key)
+        
+        level = 1
+        while level < MAX_LEVEL and self._random.random() < 0.25:
+            level += 1
+        self._level = max(self._level, level)
+        
+        # Der neue Knoten wird vollständig verkettet, bevor er erreichbar wird
+        node = [key, value, [update[i][2][i] for i in range(level)]]
+        for i in range(level):
+            update[i][2][i] = node
+        self._size += 1
+    
+    def remove(self, key: Any) -> None:
+        """Entfernt das Paar mit dem Schlüssel (O(log n) erwartet)."""
+        update = self._predecessors(key)
+        node = update[0][2][0]
+        if node is None or node[0] != key:
+            raise KeyError(key)
+        
+        for i in range(len(node[2])):
+            update[i][2][i] = node[2][i]
+        while self._level > 1 and self._head[2][self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+    
+    def first(self, k: int) -> List[Tuple[Any, Any]]:
+        """Die k kleinsten Paare in aufsteigender Reihenfolge (O(k))."""
+        pairs = []
+        node = self._head[2][0]
+        while node is not None and len(pairs) < k:
+            pairs.append((node[0], node[1]))
+            node = node[2][0]
+        return pairs
+
+
+class PriorityLeaderboard:
+    """Rangliste nach Prioritätsscore mit inkrementellen Aktualisierungen (siehe Moduldokumentation)."""
+    
+    def __init__(self, sorter: Optional[ProposalSorter] = None,
+                 profiles: Optional[Dict[str, Dict[str, float]]] = None,
+                 max_age_days: Optional[Dict[str, int]] = None,
+                 snapshot_size: int = 100):
+        """
+        Initialisiert eine leere Rangliste.
+        
+        Args:
+            sorter: Optional vorhandene ProposalSorter-Instanz (für die Scoreberechnung)
+            profiles: Gewichtungsprofile, für die eine Rangfolge gehalten wird
+                      (Standard: WEIGHT_PROFILES)
+            max_age_days: Höchstalter in Tagen je Profil; ältere Vorschläge und solche
+                          ohne Datum fehlen in dieser Rangfolge (Standard: 7 Tage für
+                          'trending', wie in ProposalSorter.get_trending_proposals)
+            snapshot_size: Anzahl der Plätze im Schnappschuss (wächst mit größeren Abfragen)
+        """
+        self.sorter = sorter or ProposalSorter()
+        self.profiles = dict(profiles or WEIGHT_PROFILES)
+        self.max_age_days = {"trending": 7} if max_age_days is None else dict(max_age_days)
+        self.max_age_days = {name: days for name, days in self.max_age_days.items() if name in self.profiles}
+        
+        # Bis zu diesem Alter (in Tagen) können sich Scores oder Zugehörigkeit noch ändern
+        self._horizon = max([RECENCY_DAYS] + [days + 1 for days in self.max_age_days.values()])
+        
+        self._lock = threading.Lock()
+        self._records = {}
+        self._next_seq = 0
+        self._lists = {name: _SkipList(seed=i) for i, name in enumerate(self.profiles)}
+        
+        # Tageswechsel (Zeitpunkt, Reihenfolge, ID); der früheste Zeitpunkt wird ohne Sperre gelesen
+        self._heap = []
+        self._next_refresh = None
+        
+        # Schnappschüsse je Profil: (Plätze als (ID, Score), Schlüssel des letzten Platzes oder None)
+        self._snapshots = {name: None for name in self.profiles}
+        self._snapshot_sizes = {name: snapshot_size for name in self.profiles}
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def __contains__(self, proposal_id: Any) -> bool:
+        return str(proposal_id) in self._records
+    
+    def upsert(self, proposal: Dict[str, Any], now: Optional[datetime] = None) -> None:
+        """
+        Nimmt einen Vorschlag auf oder ersetzt dessen Daten.
+        
+        Args:
+            proposal: Vorschlagsdaten (muss 'id' enthalten; verwendet 'quality', 'votes'
+                      und 'created_at')
+            now: Bezugszeitpunkt (Standard: datetime.now())
+        """
+        if "id" not in proposal:
+            raise ValueError("Vorschlag ohne 'id' kann nicht aufgenommen werden")
+        now = now or datetime.now()
+        proposal_id = str(proposal["id"])
+        
+        # Nur die für den Score benötigten Felder; das Datum wird einmalig geparst
+        created_at = parse_created_at(proposal.get("created_at"))
+        created_at = None if np.isnat(created_at) else created_at.astype(datetime)
+        data = {"quality": dict(proposal.get("quality") or {})}
+        if "votes" in proposal:
+            data["votes"] = proposal["votes"]
+        if created_at is not None:
+            data["created_at"] = created_at
+        
+        with self._lock:
+            self._refresh(now)
+            record = self._records.get(proposal_id)
+            if record is None:
+                record = {"seq": self._next_seq, "keys": {}, "refresh_at": None}
+                self._records[proposal_id] = record
+                self._next_seq += 1
+            record["data"] = data
+            record["created_at"] = created_at
+            self._rescore(proposal_id, record, now)
+    
+    def add_proposals(self, proposals: List[Dict[str, Any]], now: Optional[datetime] = None) -> None:
+        """
+        Nimmt mehrere Vorschläge auf (siehe upsert).
+        
+        Args:
+            proposals: Liste von Vorschlagsdaten
+            now: Bezugszeitpunkt (Standard: datetime.now())
+        """
+        now = now or datetime.now()
+        for proposal in proposals:
+            self.upsert(proposal, now)
+    
+    def update(self, proposal_id: Any, votes: Optional[float] = None,
+               quality: Optional[Dict[str, float]] = None, now: Optional[datetime] = None) -> None:
+        """
+        Ändert Stimmen und/oder Qualitätsbewertung eines Vorschlags.
+        
+        Args:
+            proposal_id: ID des Vorschlags
+            votes: Neue Anzahl der Stimmen
+            quality: Neue Qualitätsbewertung (ersetzt die bisherige)
+            now: Bezugszeitpunkt (Standard: datetime.now())
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self._refresh(now)
+            record = self._record(proposal_id)
+            if votes is not None:
+                record["data"]["votes"] = votes
+            if quality is not None:
+                record["data"]["quality"] = dict(quality)
+            self._rescore(str(proposal_id), record, now)
+    
+    def add_votes(self, proposal_id: Any, count: int = 1, now: Optional[datetime] = None) -> None:
+        """
+        Erhöht die Stimmen eines Vorschlags.
+        
+        Args:
+            proposal_id: ID des Vorschlags
+            count: Anzahl der neuen Stimmen (negativ für zurückgezogene Stimmen)
+            now: Bezugszeitpunkt (Standard: datetime.now())
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self._refresh(now)
+            record = self._record(proposal_id)
+            record["data"]["votes"] = record["data"].get("votes", 0) + count
+            self._rescore(str(proposal_id), record, now)
+    
+    def remove(self, proposal_id: Any) -> None:
+        """
+        Entfernt einen Vorschlag aus allen Ranglisten.
+        
+        Args:
+            proposal_id: ID des Vorschlags
+        """
+        with self._lock:
+            record = self._record(proposal_id)
+            for name in self.profiles:
+                self._set_key(name, str(proposal_id), record, None)
+            # Einträge im Heap werden beim Tageswechsel übersprungen
+            del self._records[str(proposal_id)]
+    
+    def score(self, proposal_id: Any, profile: str = "default") -> Optional[float]:
+        """
+        Gibt den aktuell gespeicherten Score eines Vorschlags zurück.
+        
+        Args:
+            proposal_id: ID des Vorschlags
+            profile: Name des Gewichtungsprofils
+            
+        Returns:
+            Prioritätsscore oder None, falls der Vorschlag im Profil nicht enthalten ist
+        """
+        self._check_profile(profile)
+        with self._lock:
+            key = self._record(proposal_id)["keys"].get(profile)
+        return None if key is None else -key[0]
+    
+    def top(self, k: int = 10, profile: str = "default",
+            now: Optional[datetime] = None) -> List[Tuple[str, float]]:
+        """
+        Gibt die ersten k Plätze eines Profils zurück.
+        
+        Ohne Schreibzugriffe seit der letzten Abfrage und ohne fällige Tageswechsel wird
+        keine Sperre benötigt; die Abfrage kopiert dann nur k Einträge.
+        
+        Args:
+            k: Anzahl der Plätze
+            profile: Name des Gewichtungsprofils
+            now: Bezugszeitpunkt (Standard: datetime.now())
+            
+        Returns:
+            Liste von (ID, Prioritätsscore), absteigend nach Score
+        """
+        self._check_profile(profile)
+        now = now or datetime.now()
+        
+        next_refresh = self._next_refresh
+        if next_refresh is not None and next_refresh <= now:
+            with self._lock:
+                self._refresh(now)
+        
+        snapshot = self._snapshots[profile]
+        if snapshot is None or (snapshot[1] is not None and len(snapshot[0]) < k):
+            snapshot = self._build_snapshot(profile, k)
+        return list(snapshot[0][:k])
+    
+    def _check_profile(self, profile: str) -> None:
+        """Prüft, ob für das Profil eine Rangfolge gehalten wird."""
+        if profile not in self.profiles:
+            raise ValueError(f"Unbekanntes Gewichtungsprofil: {profile}")
+    
+    def _record(self, proposal_id: Any) -> Dict[str, Any]:
+        """Gibt den Eintrag eines Vorschlags zurück (Aufruf nur mit Sperre)."""
+        record = self._records.get(str(proposal_id))
+        if record is None:
+            raise ValueError(f"Unbekannter Vorschlag: {proposal_id}")
+        return record
+    
+    def _rescore(self, proposal_id: str, record: Dict[str, Any], now: datetime) -> None:
+        """Bewertet einen Vorschlag in allen Profilen neu und plant den nächsten Tageswechsel."""
+        created_at = record["created_at"]
+        days_old = None if created_at is None else (now - created_at).days
+        
+        for name, weights in self.profiles.items():
+            max_age = self.max_age_days.get(name)
+            if max_age is not None and (days_old is None or days_old > max_age):
+                key = None
+            else:
+                score = self.sorter.calculate_priority_score(record["data"], now, weights)
+                key = (-score, record["seq"])
+            self._set_key(name, proposal_id, record, key)
+        
+        # Vorschläge ohne Datum gelten dauerhaft als aktuell; ab dem Horizont ändert sich nichts mehr
+        refresh_at = None
+        if days_old is not None and days_old < self._horizon:
+            refresh_at = created_at + timedelta(days=days_old + 1)
+        if refresh_at != record["refresh_at"]:
+            record["refresh_at"] = refresh_at
+            if refresh_at is not None:
+                heapq.heappush(self._heap, (refresh_at, record["seq"], proposal_id))
+                self._next_refresh = self._heap[0][0]
+    
+    def _set_key(self, profile: str, proposal_id: str, record: Dict[str, Any],
+                 key: Optional[Tuple[float, int]]) -> None:
+        """Hängt einen Vorschlag in der Skip-Liste eines Profils um (Aufruf nur mit Sperre)."""
+        old_key = record["keys"].get(profile)
+        if old_key == key:
+            return
+        
+        skip_list = self._lists[profile]
+        if old_key is not None:
+            skip_list.remove(old_key)
+        if key is not None:
+            skip_list.insert(key, proposal_id)
+        record["keys"][profile] = key
+        
+        # Der Schnappschuss bleibt gültig, solange die Änderung hinter dem letzten Platz liegt
+        snapshot = self._snapshots[profile]
+        if snapshot is not None:
+            bound = snapshot[1]
+            if bound is None or (old_key is not None and old_key <= bound) or (key is not None and key <= bound):
+                self._snapshots[profile] = None
+    
+    def _refresh(self, now: datetime) -> None:
+        """Bewertet alle Vorschläge mit fälligem Tageswechsel neu (Aufruf nur mit Sperre)."""
+        while self._heap and self._heap[0][0] <= now:
+            refresh_at, _, proposal_id = heapq.heappop(self._heap)
+            record = self._records.get(proposal_id)
+            
+            # Veraltete Einträge (entfernte Vorschläge oder geändertes Datum) werden übersprungen
+            if record is not None and record["refresh_at"] == refresh_at:
+                record["refresh_at"] = None
+                self._rescore(proposal_id, record, now)
+        
+        self._next_refresh = self._heap[0][0] if self._heap else None
+    
+    def _build_snapshot(self, profile: str, k: int) -> Tuple[Tuple[Tuple[str, float], ...], Any]:
+        """Erstellt den Schnappschuss eines Profils mit mindestens k Plätzen."""
+        with self._lock:
+            size = max(self._snapshot_sizes[profile], k)
+            self._snapshot_sizes[profile] = size
+            
+            snapshot = self._snapshots[profile]
+            if snapshot is None or (snapshot[1] is not None and len(snapshot[0]) < k):
+                pairs = self._lists[profile].first(size)
+                
+                # Enthält die Liste weniger Einträge, betrifft jede Änderung den Schnappschuss
+                bound = pairs[-1][0] if len(pairs) == size else None
+                snapshot = (tuple((proposal_id, -key[0]) for key, proposal_id in pairs), bound)
+                self._snapshots[profile] = snapshot
+            return snapshot
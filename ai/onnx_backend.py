@@ -0,0 +1,204 @@
+"""
+ONNX-Runtime-Backend für die Inferenz
+
+Dieses Modul exportiert die PyTorch-Modelle (Multi-Head-Modell, Einzelmodelle
+und BERT-Encoder) nach ONNX und führt die exportierten Graphen mit dem
+CPU-Provider von onnxruntime aus. Batch- und Sequenzachse sind dynamisch, sodass
+die Graphen mit dem dynamischen Padding aus proposal_processor funktionieren.
+
+Der Export benötigt das Paket onnx, die Ausführung onnxruntime; beide sind
+optional und werden erst bei der ersten Verwendung importiert.
+"""
+
+import os
+from typing import List, Dict, Optional, Any, Callable
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from proposal_models import ProposalMultiHeadModel, ProposalCategorizer, ProposalQualityEvaluator, ClsEncoder
+
+# Standardeinstellungen der onnxruntime-Sitzung (überschreibbar über onnx_options)
+DEFAULT_SESSION_OPTIONS = {
+    # Graph-Optimierungen: "disable", "basic", "extended" oder "all"
+    "graph_optimization_level": "all",
+    # Threads innerhalb eines Operators (0: onnxruntime wählt die Anzahl der Kerne)
+    "intra_op_num_threads": 0,
+    # Threads für unabhängige Operatoren (nur bei execution_mode "parallel")
+    "inter_op_num_threads": 0,
+    "execution_mode": "sequential"
+}
+OPSET_VERSION = 17
+INPUT_NAMES = ["input_ids", "attention_mask"]
+
+
+def onnx_output_names(model: nn.Module) -> List[str]:
+    """Liefert die Ausgabenamen des exportierten Graphen für ein Modell."""
+    if isinstance(model, ProposalMultiHeadModel):
+        # Reihenfolge wie im Dictionary von ProposalMultiHeadModel.forward
+        return ["embeddings", "category_logits", "quality_scores"]
+    if isinstance(model, ProposalCategorizer):
+        return ["category_logits"]
+    if isinstance(model, ProposalQualityEvaluator):
+        return ["quality_scores"]
+    return ["embeddings"]
+
+
+def export_onnx(model: nn.Module, path: str, opset_version: int = OPSET_VERSION) -> str:
+    """
+    Exportiert ein Modell nach ONNX mit dynamischer Batch- und Sequenzachse.
+    
+    Unterstützt werden ProposalMultiHeadModel, ProposalCategorizer,
+    ProposalQualityEvaluator sowie BERT-Encoder (z.B. der des SimilarityAnalyzer),
+    von denen nur der [CLS]-Vektor exportiert wird.
+    
+    Args:
+        model: Modell in fp32 (ein quantisiertes Modell lässt sich nicht exportieren)
+        path: Zieldatei
+        opset_version: ONNX-Opset
+        
+    Returns:
+        Pfad des geschriebenen Graphen
+    """
+    output_names = onnx_output_names(model)
+    if output_names == ["embeddings"] and not isinstance(model, ClsEncoder):
+        model = ClsEncoder(model)
+    model.eval()
+    
+    device = next(model.parameters()).device
+    dummy_input = (
+        torch.ones((2, 16), dtype=torch.long, device=device),
+        torch.ones((2, 16), dtype=torch.long, device=device)
+    )
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES}
+    dynamic_axes.update({name: {0: "batch"} for name in output_names})
+    
+    # Schreiben in eine temporäre Datei, damit parallele Prozesse keinen halben Graphen laden
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            model, dummy_input, temp_path,
+            input_names=INPUT_NAMES, output_names=output_names,
+            dynamic_axes=dynamic_axes, opset_version=opset_version, dynamo=False
+        )
+    os.replace(temp_path, path)
+    return path
+
+
+def quantize_onnx(path: str, output_path: str) -> str:
+    """
+    Quantisiert die Gewichte eines ONNX-Graphen dynamisch nach int8.
+    
+    Args:
+        path: Graph in fp32
+        output_path: Zieldatei
+        
+    Returns:
+        Pfad des quantisierten Graphen
+    """
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    quantize_dynamic(path, temp_path, weight_type=QuantType.QInt8)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+class OnnxModel:
+    """Ausführung eines exportierten Graphen mit dem CPU-Provider von onnxruntime."""
+    
+    def __init__(self, path: str, options: Optional[Dict[str, Any]] = None):
+        """
+        Initialisiert die onnxruntime-Sitzung.
+        
+        Args:
+            path: Pfad des ONNX-Graphen
+            options: Sitzungseinstellungen, die DEFAULT_SESSION_OPTIONS überschreiben
+        """
+        import onnxruntime as ort
+        
+        self.path = path
+        self.options = dict(DEFAULT_SESSION_OPTIONS, **(options or {}))
+        
+        optimization_levels = {
+            "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        }
+        execution_modes = {
+            "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+            "parallel": ort.ExecutionMode.ORT_PARALLEL
+        }
+        level = self.options["graph_optimization_level"]
+        mode = self.options["execution_mode"]
+        if level not in optimization_levels:
+            raise ValueError(f"Unbekannte Graph-Optimierung '{level}' (erlaubt: {', '.join(optimization_levels)})")
+        if mode not in execution_modes:
+            raise ValueError(f"Unbekannter Ausführungsmodus '{mode}' (erlaubt: {', '.join(execution_modes)})")
+        
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = optimization_levels[level]
+        session_options.execution_mode = execution_modes[mode]
+        session_options.intra_op_num_threads = self.options["intra_op_num_threads"]
+        session_options.inter_op_num_threads = self.options["inter_op_num_threads"]
+        
+        self.session = ort.InferenceSession(path, session_options, providers=["CPUExecutionProvider"])
+        self.output_names = [output.name for output in self.session.get_outputs()]
+    
+    @property
+    def embedding_dim(self) -> int:
+        """Dimension der Einbettungen (Ausgabe "embeddings")."""
+        return self.output_dim("embeddings")
+    
+    def output_dim(self, name: str) -> int:
+        """Liefert die (feste) letzte Dimension einer Ausgabe, z.B. die Einbettungsdimension."""
+        for output in self.session.get_outputs():
+            if output.name == name:
+                return output.shape[-1]
+        raise ValueError(f"Ausgabe '{name}' nicht im Graphen vorhanden")
+    
+    def __call__(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Führt den Graphen auf einem gepaddeten Batch aus.
+        
+        Args:
+            input_ids: Token-IDs (Batch x Länge)
+            attention_mask: Attention-Mask (Batch x Länge)
+            
+        Returns:
+            Dictionary mit den Ausgaben des Graphen (siehe onnx_output_names)
+        """
+        outputs = self.session.run(self.output_names, {
+            "input_ids": np.asarray(input_ids, dtype=np.int64),
+            "attention_mask": np.asarray(attention_mask, dtype=np.int64)
+        })
+        return dict(zip(self.output_names, outputs))
+
+
+def load_onnx_model(path: str, model_factory: Callable[[], nn.Module], precision: str = "fp32",
+                    options: Optional[Dict[str, Any]] = None) -> OnnxModel:
+    """
+    Lädt einen ONNX-Graphen und exportiert bzw. quantisiert ihn vorher, falls nötig.
+    
+    Args:
+        path: Pfad des Graphen in fp32
+        model_factory: Funktion, die das PyTorch-Modell in fp32 für den Export liefert
+        precision: "fp32" oder "int8" (quantisierter Graph neben dem fp32-Graphen)
+        options: Sitzungseinstellungen (siehe DEFAULT_SESSION_OPTIONS)
+        
+    Returns:
+        OnnxModel für die Inferenz
+    """
+    if not os.path.exists(path):
+        export_onnx(model_factory(), path)
+    
+    if precision == "int8":
+        quantized_path = f"{os.path.splitext(path)[0]}-int8.onnx"
+        if not os.path.exists(quantized_path):
+            quantize_onnx(path, quantized_path)
+        path = quantized_path
+    
+    return OnnxModel(path, options)
@@ -0,0 +1,782 @@
+"""
+PyTorch-Komponenten für die Verarbeitung von Bürgervorschlägen
+
+Dieses Modul enthält alle Bestandteile, die PyTorch und transformers benötigen
+(Collator, Dataset und Modelle). proposal_processor importiert es erst bei der
+ersten Verwendung, sodass der Import des Hauptmoduls ohne PyTorch auskommt.
+"""
+
+import os
+import copy
+import warnings
+import contextlib
+import functools
+from typing import List, Dict, Tuple, Optional, Any, Sequence
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import Dataset, Sampler
+from transformers import AutoConfig, AutoModel
+
+from proposal_processor import (
+    TextPreprocessor, MODEL_PATH, BERT_MODEL_NAME, MAX_LENGTH, QUALITY_DIMENSIONS, load_categories, bucket_length
+)
+from tokenized_corpus import TokenizedCorpus
+
+DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# Vermerk in multihead.pt, dass der Qualitätskopf nicht auf dem gespeicherten Encoder trainiert wurde
+STALE_QUALITY_KEY = "quality_head_stale"
+
+# Reduzierte Genauigkeit für die Inferenz (siehe PRECISION_MODES)
+@functools.lru_cache(maxsize=None)
+def bf16_supported() -> bool:
+    """Prüft, ob das Gerät bf16 nativ rechnet (CPU: AVX512-BF16 oder AMX)."""
+    if DEVICE.type == "cuda":
+        return torch.cuda.is_bf16_supported()
+    
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+def resolve_precision(precision: str) -> str:
+    """
+    Liefert die tatsächlich verwendete Genauigkeit.
+    
+    Ohne native bf16-Unterstützung wäre bf16 emuliert und langsamer als fp32;
+    in diesem Fall wird mit einer Warnung auf fp32 zurückgefallen.
+    """
+    if precision == "bf16" and not bf16_supported():
+        warnings.warn("bf16 wird von diesem Prozessor nicht unterstützt; es wird fp32 verwendet.")
+        return "fp32"
+    return precision
+
+def apply_precision(model: nn.Module, precision: str) -> nn.Module:
+    """
+    Bereitet ein Modell in fp32 für die Inferenz mit der gewählten Genauigkeit vor.
+    
+    Bei int8 werden alle nn.Linear-Schichten dynamisch quantisiert (Gewichte in
+    int8, Aktivierungen zur Laufzeit); das geschieht in place, sodass die
+    fp32-Gewichte freigegeben werden. fp32 und bf16 lassen das Modell
+    unverändert (bf16 über precision_context).
+    
+    Args:
+        model: Modell in fp32 (im eval-Modus)
+        precision: Genauigkeit ("fp32", "int8" oder "bf16")
+        
+    Returns:
+        Modell für die Inferenz
+    """
+    if precision == "int8":
+        if DEVICE.type != "cpu":
+            raise ValueError("int8-Quantisierung ist nur auf der CPU verfügbar")
+        return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+def precision_context(precision: str):
+    """Kontext für einen Forward-Pass mit der gewählten Genauigkeit (bf16: Autocast)."""
+    if precision == "bf16":
+        return torch.autocast(DEVICE.type, dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+# Collate-Funktion für dynamisches Padding
+class DynamicPaddingCollator:
+    """Collate-Funktion, die einen Batch auf die längste Sequenz (bzw. deren Bucket) paddet."""
+    
+    def __init__(self, pad_token_id: int = 0, bucket_sizes: Optional[Sequence[int]] = None):
+        """
+        Initialisiert den Collator.
+        
+        Args:
+            pad_token_id: Token-ID für das Padding
+            bucket_sizes: Optionale Bucket-Grenzen für die Padding-Länge
+        """
+        self.pad_token_id = pad_token_id
+        self.bucket_sizes = bucket_sizes
+    
+    def __call__(self, batch: List[Dict[str, Any]]) -> Dict[str, torch.Tensor]:
+        """
+        Fasst ungepaddete Einträge zu einem Batch zusammen.
+        
+        Args:
+            batch: Liste von Einträgen mit "input_ids" sowie weiteren Tensoren
+                   (z.B. Labels), die unverändert gestapelt werden
+                   
+        Returns:
+            Dictionary mit gepaddeten "input_ids", "attention_mask" und den übrigen Tensoren
+        """
+        lengths = [len(item["input_ids"]) for item in batch]
+        max_length = bucket_length(max(lengths), self.bucket_sizes)
+        
+        input_ids = torch.full((len(batch), max_length), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch), max_length), dtype=torch.long)
+        
+        for i, (item, length) in enumerate(zip(batch, lengths)):
+            input_ids[i, :length] = torch.as_tensor(item["input_ids"], dtype=torch.long)
+            attention_mask[i, :length] = 1
+        
+        collated = {"input_ids": input_ids, "attention_mask": attention_mask}
+        
+        # Übrige Felder (z.B. Labels) werden gestapelt
+        for key in batch[0]:
+            if key not in collated:
+                collated[key] = torch.stack([torch.as_tensor(item[key]) for item in batch])
+        
+        return collated
+
+# Batch-Sampler, der Texte ähnlicher Länge zusammenfasst
+class LengthGroupedBatchSampler(Sampler):
+    """
+    Batch-Sampler mit längenähnlichen Batches.
+    
+    Pro Epoche werden die Indizes gemischt, in Gruppen von batch_size *
+    group_factor nach Länge sortiert und in Batches geteilt; die Reihenfolge der
+    Batches wird erneut gemischt. So bleibt das Training zufällig, während jeder
+    Batch kaum Padding enthält.
+    """
+    
+    def __init__(self, lengths: Sequence[int], batch_size: int, group_factor: int = 50,
+                 seed: Optional[int] = None):
+        """
+        Initialisiert den Sampler.
+        
+        Args:
+            lengths: Anzahl der Tokens je Eintrag
+            batch_size: Anzahl der Einträge pro Batch
+            group_factor: Gruppengröße in Batches, innerhalb derer nach Länge sortiert wird
+            seed: Optionaler Startwert für die Zufallsreihenfolge
+        """
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.group_factor = group_factor
+        self.generator = np.random.default_rng(seed)
+    
+    def __len__(self) -> int:
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+    
+    def __iter__(self):
+        indices = self.generator.permutation(len(self.lengths))
+        group_size = self.batch_size * self.group_factor
+        
+        batches = []
+        for start in range(0, len(indices), group_size):
+            group = indices[start:start + group_size]
+            group = group[np.argsort(-self.lengths[group], kind="stable")]
+            batches.extend(group[i:i + self.batch_size].tolist() for i in range(0, len(group), self.batch_size))
+        
+        for i in self.generator.permutation(len(batches)):
+            yield batches[i]
+
+# Dataset-Klasse für BERT-Finetuning
+class ProposalDataset(Dataset):
+    """
+    Dataset-Klasse für Vorschläge mit Labels (Kategorien oder Qualitätsscores).
+    
+    Die Texte werden beim Anlegen einmal tokenisiert und als TokenizedCorpus im
+    Cache-Verzeichnis abgelegt; __getitem__ liest nur noch aus den Arrays.
+    """
+    
+    def __init__(self, texts: List[str], labels: List[List[float]], preprocessor: TextPreprocessor,
+                 label_key: str = "labels", cache_dir: Optional[str] = None):
+        """
+        Initialisiert das Dataset.
+        
+        Weitere Zielwerte (eine Zeile pro Text) können über extra_labels
+        ergänzt werden und erscheinen unter ihrem Namen in den Einträgen.
+        
+        Args:
+            texts: Liste von Vorschlagstexten
+            labels: Liste von One-Hot-Encoded Kategorielabels (bzw. Scores)
+            preprocessor: TextPreprocessor-Instanz
+            label_key: Name des Label-Felds in den Einträgen
+            cache_dir: Verzeichnis für tokenisierte Korpora (Standard: MODEL_PATH/tokenized)
+        """
+        self.texts = texts
+        self.labels = np.asarray(labels, dtype=np.float32)
+        self.label_key = label_key
+        self.extra_labels: Dict[str, np.ndarray] = {}
+        self.corpus = TokenizedCorpus.build(
+            texts, preprocessor.tokenizer, cache_dir or os.path.join(MODEL_PATH, "tokenized"), MAX_LENGTH
+        )
+    
+    @property
+    def lengths(self) -> np.ndarray:
+        """Anzahl der Tokens je Text (für LengthGroupedBatchSampler)."""
+        return self.corpus.lengths
+    
+    def __len__(self) -> int:
+        return len(self.corpus)
+    
+    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
+        # Ungepaddete Token-IDs (gepaddet wird erst im DynamicPaddingCollator)
+        item = {
+            "input_ids": torch.from_numpy(self.corpus[idx]),
+            self.label_key: torch.as_tensor(self.labels[idx])
+        }
+        for name, values in self.extra_labels.items():
+            item[name] = torch.as_tensor(values[idx], dtype=torch.float)
+        return item
+
+# Modellklasse für Multi-Label-Kategorisierung
+class ProposalCategorizer(nn.Module):
+    """Modell für die Multi-Label-Kategorisierung von Vorschlägen."""
+    
+    def __init__(self, num_categories: int, dropout_rate: float = 0.3,
+                 exit_layers: Optional[Sequence[int]] = None):
+        """
+        Initialisiert das Kategorisierungsmodell.
+        
+        Args:
+            num_categories: Anzahl der Kategorien
+            dropout_rate: Dropout-Rate für Regularisierung
+            exit_layers: Optionale Schichten mit Zwischenklassifikatoren für Early Exit
+        """
+        super(ProposalCategorizer, self).__init__()
+        
+        # Laden des vortrainierten BERT-Modells
+        self.bert = AutoModel.from_pretrained(BERT_MODEL_NAME)
+        
+        # Ausgabedimension des BERT-Modells
+        hidden_size = self.bert.config.hidden_size
+        
+        # Klassifikationsschichten
+        self.dropout = nn.Dropout(dropout_rate)
+        self.classifier = nn.Linear(hidden_size, num_categories)
+        
+        # Zwischenklassifikatoren (werden gemeinsam mit dem Modell trainiert)
+        self.exit_classifiers = nn.ModuleDict({
+            str(layer): nn.Linear(hidden_size, num_categories) for layer in sorted(exit_layers or [])
+        })
+    
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor,
+                return_exits: bool = False):
+        """
+        Forward-Pass durch das Modell.
+        
+        Args:
+            input_ids: Token-IDs
+            attention_mask: Attention-Mask
+            return_exits: Ob zusätzlich die Logits der Zwischenklassifikatoren geliefert werden
+            
+        Returns:
+            Logits für jede Kategorie (mit return_exits: Tupel aus Logits und der Liste
+            der Zwischen-Logits in Schichtreihenfolge)
+        """
+        # BERT-Ausgabe
+        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask,
+                            output_hidden_states=return_exits)
+        
+        # Verwenden des [CLS]-Token für die Klassifikation
+        pooled_output = outputs.last_hidden_state[:, 0, :]
+        
+        # Dropout und Klassifikation
+        pooled_output = self.dropout(pooled_output)
+        logits = self.classifier(pooled_output)
+        
+        if return_exits:
+            # hidden_states[i] ist die Ausgabe der i-ten Schicht (0: Token-Einbettungen)
+            exit_logits = [
+                head(self.dropout(outputs.hidden_states[int(layer)][:, 0, :]))
+                for layer, head in self.exit_classifiers.items()
+            ]
+            return logits, exit_logits
+        
+        return logits
+
+# Modellklasse für Qualitätsbewertung
+class ProposalQualityEvaluator(nn.Module):
+    """Modell für die Bewertung der Qualität von Vorschlägen."""
+    
+    def __init__(self, num_dimensions: int = 4, dropout_rate: float = 0.3):
+        """
+        Initialisiert das Qualitätsbewertungsmodell.
+        
+        Args:
+            num_dimensions: Anzahl der Qualitätsdimensionen (z.B. Relevanz, Umsetzbarkeit)
+            dropout_rate: Dropout-Rate für Regularisierung
+        """
+        super(ProposalQualityEvaluator, self).__init__()
+        
+        # Laden des vortrainierten BERT-Modells
+        self.bert = AutoModel.from_pretrained(BERT_MODEL_NAME)
+        
+        # Ausgabedimension des BERT-Modells
+        hidden_size = self.bert.config.hidden_size
+        
+        # Regressionsschichten für jede Qualitätsdimension
+        self.dropout = nn.Dropout(dropout_rate)
+        self.regressor = nn.Linear(hidden_size, num_dimensions)
+    
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """
+        Forward-Pass durch das Modell.
+        
+        Args:
+            input_ids: Token-IDs
+            attention_mask: Attention-Mask
+            
+        Returns:
+            Scores für jede Qualitätsdimension
+        """
+        # BERT-Ausgabe
+        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        
+        # Verwenden des [CLS]-Token für die Regression
+        pooled_output = outputs.last_hidden_state[:, 0, :]
+        
+        # Dropout und Regression
+        pooled_output = self.dropout(pooled_output)
+        scores = self.regressor(pooled_output)
+        
+        # Sigmoid-Aktivierung für Scores im Bereich [0, 1]
+        # (wird später auf den Bereich [1, 5] skaliert)
+        scores = torch.sigmoid(scores)
+        
+        return scores
+
+# Encoder für Satzeinbettungen
+class ClsEncoder(nn.Module):
+    """Hülle um einen BERT-Encoder, die den [CLS]-Vektor als Satzeinbettung liefert."""
+    
+    def __init__(self, encoder: nn.Module):
+        """
+        Initialisiert den Encoder.
+        
+        Args:
+            encoder: BERT-Encoder (z.B. von AutoModel.from_pretrained)
+        """
+        super(ClsEncoder, self).__init__()
+        self.bert = encoder
+    
+    @property
+    def embedding_dim(self) -> int:
+        """Dimension der Einbettungen."""
+        return self.bert.config.hidden_size
+    
+    def encode(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """Liefert den [CLS]-Vektor je Sequenz."""
+        return self.bert(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state[:, 0, :]
+    
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        return self.encode(input_ids, attention_mask)
+
+class _EncoderInputsCaptured(Exception):
+    """Bricht den Forward-Pass ab, nachdem die Eingaben des Encoders abgegriffen wurden."""
+
+# Modellklasse mit gemeinsamem Encoder für alle Aufgaben
+class ProposalMultiHeadModel(nn.Module):
+    """
+    Gemeinsamer BERT-Encoder mit Köpfen für Kategorien, Qualität und Einbettungen.
+    
+    Ein einziger Forward-Pass liefert alle drei Ausgaben, sodass gbert nur
+    einmal im Speicher liegt und jeder Vorschlag nur einmal kodiert wird.
+    
+    Mit einem kleineren Encoder dient die Klasse auch als destilliertes
+    Schülermodell; ein schmalerer Encoder wird dann über embedding_projection
+    auf die Einbettungsdimension des Lehrermodells abgebildet.
+    """
+    
+    def __init__(self, num_categories: int, num_dimensions: int = len(QUALITY_DIMENSIONS),
+                 dropout_rate: float = 0.3, encoder: Optional[nn.Module] = None,
+                 embedding_dim: Optional[int] = None):
+        """
+        Initialisiert das Multi-Head-Modell.
+        
+        Args:
+            num_categories: Anzahl der Kategorien
+            num_dimensions: Anzahl der Qualitätsdimensionen
+            dropout_rate: Dropout-Rate für Regularisierung
+            encoder: Optionaler Encoder (Standard: vortrainiertes gbert)
+            embedding_dim: Dimension der Einbettungen und Eingabe der Köpfe
+                           (Standard: Ausgabedimension des Encoders)
+        """
+        super(ProposalMultiHeadModel, self).__init__()
+        
+        # Laden des vortrainierten BERT-Modells
+        self.bert = encoder if encoder is not None else AutoModel.from_pretrained(BERT_MODEL_NAME)
+        
+        # Ausgabedimension des BERT-Modells
+        hidden_size = self.bert.config.hidden_size
+        embedding_dim = embedding_dim or hidden_size
+        
+        # Projektion auf die Einbettungsdimension (nur bei schmaleren Schülermodellen)
+        self.embedding_projection = nn.Linear(hidden_size, embedding_dim) if embedding_dim != hidden_size else None
+        
+        # Ausgabeköpfe (Parameternamen wie in den Einzelmodellen)
+        self.dropout = nn.Dropout(dropout_rate)
+        self.classifier = nn.Linear(embedding_dim, num_categories)
+        self.regressor = nn.Linear(embedding_dim, num_dimensions)
+        
+        # Optionale Zwischenklassifikatoren für Early Exit (Schlüssel: Schichtnummer)
+        self.exit_classifiers = nn.ModuleDict()
+        
+        # Ob der Qualitätskopf auf einem anderen als dem aktuellen Encoder trainiert wurde
+        # (nach dem Ersetzen des Encoders, siehe load_legacy_state_dicts)
+        self.quality_head_stale = False
+    
+    @property
+    def exit_layers(self) -> List[int]:
+        """Schichten mit Zwischenklassifikator (aufsteigend)."""
+        return sorted(int(layer) for layer in self.exit_classifiers)
+    
+    def add_exit_heads(self, layers: Sequence[int]) -> None:
+        """
+        Fügt Zwischenklassifikatoren nach den angegebenen Schichten hinzu.
+        
+        Neue Köpfe werden (bei gleicher Breite) mit dem Kategorisierungskopf
+        initialisiert; vorhandene Köpfe bleiben unverändert.
+        
+        Args:
+            layers: Schichtnummern zwischen 1 und der Anzahl der Schichten - 1
+        """
+        hidden_size = self.bert.config.hidden_size
+        num_layers = self.bert.config.num_hidden_layers
+        
+        for layer in layers:
+            if not 1 <= layer < num_layers:
+                raise ValueError(f"Zwischenklassifikatoren sind nur nach den Schichten 1 bis {num_layers - 1} möglich")
+            if str(layer) in self.exit_classifiers:
+                continue
+            
+            head = nn.Linear(hidden_size, self.classifier.out_features)
+            if self.embedding_projection is None:
+                head.load_state_dict(self.classifier.state_dict())
+            self.exit_classifiers[str(layer)] = head.to(self.classifier.weight.device)
+        
+        # Schichtreihenfolge beibehalten
+        self.exit_classifiers = nn.ModuleDict(sorted(self.exit_classifiers.items(), key=lambda item: int(item[0])))
+    
+    def resize_heads(self, num_categories: Optional[int] = None, num_dimensions: Optional[int] = None) -> None:
+        """
+        Ersetzt Kategorisierungs- bzw. Regressionskopf durch neu initialisierte Köpfe anderer Größe.
+        
+        Der Encoder bleibt unverändert. Zwischenklassifikatoren passen nach einer
+        Änderung der Kategorien nicht mehr und werden entfernt.
+        
+        Args:
+            num_categories: Neue Anzahl der Kategorien
+            num_dimensions: Neue Anzahl der Qualitätsdimensionen
+        """
+        device = self.classifier.weight.device
+        
+        if num_categories is not None and num_categories != self.classifier.out_features:
+            self.classifier = nn.Linear(self.classifier.in_features, num_categories).to(device)
+            self.exit_classifiers = nn.ModuleDict()
+        if num_dimensions is not None and num_dimensions != self.regressor.out_features:
+            self.regressor = nn.Linear(self.regressor.in_features, num_dimensions).to(device)
+    
+    def adapt_to_state_dict(self, state_dict: Dict[str, torch.Tensor]) -> None:
+        """
+        Passt Köpfe und Zwischenklassifikatoren an einen Checkpoint an.
+        
+        Args:
+            state_dict: State-Dict, das anschließend geladen werden soll
+        """
+        # Anpassung der Köpfe an die Dimensionen des Checkpoints (z.B. nach einer
+        # Änderung von categories.json, siehe ProposalProcessor.train_heads)
+        self.resize_heads(
+            state_dict["classifier.weight"].shape[0] if "classifier.weight" in state_dict else None,
+            state_dict["regressor.weight"].shape[0] if "regressor.weight" in state_dict else None
+        )
+        
+        exit_layers = {int(key.split(".")[1]) for key in state_dict if key.startswith("exit_classifiers.")}
+        if exit_layers:
+            self.add_exit_heads(sorted(exit_layers))
+    
+    @property
+    def embedding_dim(self) -> int:
+        """Dimension der Einbettungen (Eingabe der Köpfe)."""
+        return self.classifier.in_features
+    
+    def encode(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """Liefert die Einbettung ([CLS]-Vektor, ggf. projiziert) je Sequenz."""
+        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        pooled_output = outputs.last_hidden_state[:, 0, :]
+        if self.embedding_projection is not None:
+            pooled_output = self.embedding_projection(pooled_output)
+        return pooled_output
+    
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> Dict[str, torch.Tensor]:
+        """
+        Forward-Pass durch das Modell.
+        
+        Args:
+            input_ids: Token-IDs
+            attention_mask: Attention-Mask
+            
+        Returns:
+            Dictionary mit "embeddings" ([CLS]-Vektor), "category_logits"
+            und "quality_scores" (im Bereich [0, 1])
+        """
+        # Verwenden des [CLS]-Token für alle Köpfe
+        pooled_output = self.encode(input_ids, attention_mask)
+        dropped_output = self.dropout(pooled_output)
+        
+        return {
+            "embeddings": pooled_output,
+            "category_logits": self.classifier(dropped_output),
+            "quality_scores": torch.sigmoid(self.regressor(dropped_output))
+        }
+    
+    def _embeddings_and_mask(self, input_ids: torch.Tensor,
+                             attention_mask: torch.Tensor) -> Tuple[torch.Tensor, Optional[torch.Tensor]]:
+        """
+        Liefert die Token-Einbettungen und die vom Encoder erwartete Attention-Mask.
+        
+        Beides wird im Forward-Pass von transformers abgegriffen, bevor die erste
+        Schicht läuft; so bleibt das Maskenformat (je nach Attention-Implementierung
+        und transformers-Version) das des Modells.
+        """
+        captured = {}
+        
+        def capture(module, args, kwargs):
+            captured["hidden_states"] = args[0] if args else kwargs["hidden_states"]
+            captured["attention_mask"] = args[1] if len(args) > 1 else kwargs.get("attention_mask")
+            raise _EncoderInputsCaptured()
+        
+        handle = self.bert.encoder.register_forward_pre_hook(capture, with_kwargs=True)
+        try:
+            self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        except _EncoderInputsCaptured:
+            pass
+        finally:
+            handle.remove()
+        
+        return captured["hidden_states"], captured["attention_mask"]
+    
+    def categorize_early_exit(self, input_ids: torch.Tensor, attention_mask: torch.Tensor,
+                              threshold: float = 0.5, margin: float = 0.2) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Berechnet Kategorie-Logits und bricht pro Sequenz nach der ersten sicheren Schicht ab.
+        
+        Nach jeder Schicht mit Zwischenklassifikator gilt eine Sequenz als sicher,
+        wenn alle Kategoriewahrscheinlichkeiten mindestens margin über oder unter
+        threshold liegen. Sichere Sequenzen verlassen den Batch, die übrigen laufen
+        weiter; was bis zur letzten Schicht unsicher bleibt, erhält die Logits des
+        Kategorisierungskopfs.
+        
+        Args:
+            input_ids: Token-IDs
+            attention_mask: Attention-Mask
+            threshold: Schwellenwert für die Kategorienzuordnung
+            margin: Mindestabstand der Wahrscheinlichkeiten vom Schwellenwert
+            
+        Returns:
+            Tupel aus Logits (Batch x Kategorien) und der Anzahl ausgeführter Schichten je Sequenz
+        """
+        layers = self.bert.encoder.layer
+        hidden_states, mask = self._embeddings_and_mask(input_ids, attention_mask)
+        batch_size = input_ids.shape[0]
+        
+        logits = torch.zeros((batch_size, self.classifier.out_features), device=input_ids.device)
+        layers_used = torch.full((batch_size,), len(layers), dtype=torch.long)
+        active = torch.arange(batch_size, device=input_ids.device)
+        
+        for i, layer_module in enumerate(layers, start=1):
+            output = layer_module(hidden_states, mask)
+            hidden_states = output[0] if isinstance(output, tuple) else output
+            
+            head = self.exit_classifiers[str(i)] if str(i) in self.exit_classifiers else None
+            if head is None or i == len(layers):
+                continue
+            
+            exit_logits = head(hidden_states[:, 0, :]).float()
+            confident = ((torch.sigmoid(exit_logits) - threshold).abs() >= margin).all(dim=1)
+            if not confident.any():
+                continue
+            
+            logits[active[confident]] = exit_logits[confident]
+            layers_used[active[confident].cpu()] = i
+            
+            # Sichere Sequenzen verlassen den Batch
+            keep = ~confident
+            active = active[keep]
+            if len(active) == 0:
+                return logits, layers_used
+            hidden_states = hidden_states[keep]
+            if mask is not None and mask.shape[0] == len(keep):
+                mask = mask[keep]
+        
+        pooled_output = hidden_states[:, 0, :]
+        if self.embedding_projection is not None:
+            pooled_output = self.embedding_projection(pooled_output)
+        logits[active] = self.classifier(pooled_output).float()
+        
+        return logits, layers_used
+    
+    def load_legacy_state_dicts(self, categorizer_state: Optional[Dict[str, torch.Tensor]] = None,
+                                quality_state: Optional[Dict[str, torch.Tensor]] = None) -> None:
+        """
+        Übernimmt Gewichte aus Checkpoints der Einzelmodelle.
+        
+        Der Encoder wird aus dem Kategorisierungsmodell übernommen (nur wenn dieses
+        fehlt, aus dem Qualitätsmodell). Der Regressionskopf passt dann nicht mehr
+        zum Encoder und wird als veraltet markiert (quality_head_stale), bis er auf
+        dem gemeinsamen Encoder nachtrainiert wird.
+        
+        Args:
+            categorizer_state: State-Dict eines ProposalCategorizer
+            quality_state: State-Dict eines ProposalQualityEvaluator
+        """
+        converted = {}
+        backbone_state = categorizer_state if categorizer_state is not None else quality_state
+        
+        if backbone_state is not None:
+            converted.update({k: v for k, v in backbone_state.items() if k.startswith("bert.")})
+        if categorizer_state is not None:
+            converted.update({k: v for k, v in categorizer_state.items() if k.startswith("classifier.")})
+            
+            # Zwischenklassifikatoren gehören zum Encoder des Kategorisierungsmodells
+            self.exit_classifiers = nn.ModuleDict()
+            exit_state = {k: v for k, v in categorizer_state.items() if k.startswith("exit_classifiers.")}
+            self.adapt_to_state_dict({**exit_state, "classifier.weight": categorizer_state["classifier.weight"]})
+            converted.update(exit_state)
+        if quality_state is not None:
+            converted.update({k: v for k, v in quality_state.items() if k.startswith("regressor.")})
+            
+            # Anpassung des Regressionskopfs an die Dimensionen des Checkpoints
+            self.adapt_to_state_dict({"regressor.weight": quality_state["regressor.weight"]})
+        
+        # Mit dem Encoder des Kategorisierungsmodells passt der bisherige Regressionskopf nicht mehr
+        if categorizer_state is not None:
+            self.quality_head_stale = True
+        
+        self.load_state_dict(converted, strict=False)
+    
+    def teacher_state_dict(self) -> Dict[str, Any]:
+        """State-Dict für multihead.pt, bei veraltetem Qualitätskopf mit entsprechendem Vermerk."""
+        state_dict = self.state_dict()
+        if self.quality_head_stale:
+            state_dict[STALE_QUALITY_KEY] = True
+        return state_dict
+    
+    def load_teacher_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        """
+        Lädt einen multihead.pt-Checkpoint (siehe teacher_state_dict).
+        
+        Args:
+            state_dict: State-Dict des Checkpoints; Köpfe und Zwischenklassifikatoren
+                        werden daran angepasst
+        """
+        state_dict = dict(state_dict)
+        self.quality_head_stale = bool(state_dict.pop(STALE_QUALITY_KEY, False))
+        self.adapt_to_state_dict(state_dict)
+        self.load_state_dict(state_dict)
+    
+    def student_checkpoint(self) -> Dict[str, Any]:
+        """
+        Liefert einen Checkpoint, der neben den Gewichten die Encoder-Konfiguration enthält.
+        
+        So lässt sich ein Schülermodell ohne Kenntnis seiner Architektur laden
+        (siehe from_student_checkpoint).
+        """
+        return {
+            "encoder_config": self.bert.config.to_dict(),
+            "embedding_dim": self.embedding_dim,
+            "num_categories": self.classifier.out_features,
+            "num_dimensions": self.regressor.out_features,
+            "state_dict": self.state_dict()
+        }
+    
+    @classmethod
+    def from_student_checkpoint(cls, checkpoint: Dict[str, Any]) -> "ProposalMultiHeadModel":
+        """Erzeugt ein Modell aus einem Checkpoint von student_checkpoint."""
+        config_dict = dict(checkpoint["encoder_config"])
+        config = AutoConfig.for_model(config_dict.pop("model_type"), **config_dict)
+        
+        model = cls(
+            checkpoint["num_categories"], checkpoint["num_dimensions"],
+            encoder=AutoModel.from_config(config), embedding_dim=checkpoint["embedding_dim"]
+        )
+        model.adapt_to_state_dict(checkpoint["state_dict"])
+        model.load_state_dict(checkpoint["state_dict"])
+        return model
+
+def build_student(teacher: ProposalMultiHeadModel, num_layers: int = 6,
+                  hidden_size: Optional[int] = None) -> ProposalMultiHeadModel:
+    """
+    Erzeugt ein kleineres Schülermodell für die Destillation eines Lehrermodells.
+    
+    Bei unveränderter Breite werden Token-Einbettungen und gleichmäßig verteilte
+    Schichten des Lehrers übernommen (wie bei DistilBERT). Ein schmalerer Encoder
+    wird zufällig initialisiert. Die Köpfe arbeiten auf der Einbettungsdimension
+    des Lehrers und werden von ihm übernommen.
+    
+    Args:
+        teacher: Trainiertes Multi-Head-Modell
+        num_layers: Anzahl der Transformer-Schichten des Schülers
+        hidden_size: Breite des Schülers (Standard: wie beim Lehrer)
+        
+    Returns:
+        Schülermodell auf dem Gerät des Lehrers
+    """
+    teacher_config = teacher.bert.config
+    if not 1 <= num_layers <= teacher_config.num_hidden_layers:
+        raise ValueError(f"num_layers muss zwischen 1 und {teacher_config.num_hidden_layers} liegen")
+    
+    config = copy.deepcopy(teacher_config)
+    config.num_hidden_layers = num_layers
+    if hidden_size is not None and hidden_size != teacher_config.hidden_size:
+        # Gleiche Kopfgröße wie beim Lehrer, entsprechend weniger Attention-Köpfe
+        head_size = teacher_config.hidden_size // teacher_config.num_attention_heads
+        if hidden_size % head_size != 0:
+            raise ValueError(f"hidden_size muss ein Vielfaches von {head_size} sein")
+        config.hidden_size = hidden_size
+        config.num_attention_heads = hidden_size // head_size
+        config.intermediate_size = teacher_config.intermediate_size * hidden_size // teacher_config.hidden_size
+    
+    encoder = AutoModel.from_config(config)
+    if config.hidden_size == teacher_config.hidden_size:
+        encoder.embeddings.load_state_dict(teacher.bert.embeddings.state_dict())
+        teacher_layers = [
+            round(i * (teacher_config.num_hidden_layers - 1) / max(num_layers - 1, 1)) for i in range(num_layers)
+        ]
+        for student_layer, teacher_layer in zip(encoder.encoder.layer, teacher_layers):
+            student_layer.load_state_dict(teacher.bert.encoder.layer[teacher_layer].state_dict())
+    
+    student = ProposalMultiHeadModel(
+        teacher.classifier.out_features, teacher.regressor.out_features,
+        dropout_rate=teacher.dropout.p, encoder=encoder, embedding_dim=teacher.embedding_dim
+    )
+    student.classifier.load_state_dict(teacher.classifier.state_dict())
+    student.regressor.load_state_dict(teacher.regressor.state_dict())
+    return student.to(teacher.classifier.weight.device)
+
+def convert_legacy_checkpoints(model_path: str = MODEL_PATH) -> Optional[str]:
+    """
+    Konvertiert categorizer.pt und quality_evaluator.pt in einen multihead.pt-Checkpoint.
+    
+    Args:
+        model_path: Verzeichnis mit den Checkpoints
+        
+    Returns:
+        Pfad des geschriebenen Checkpoints oder None, falls keine Einzelmodelle vorliegen
+    """
+    categorizer_path = os.path.join(model_path, "categorizer.pt")
+    quality_path = os.path.join(model_path, "quality_evaluator.pt")
+    
+    categorizer_state = torch.load(categorizer_path, map_location="cpu") if os.path.exists(categorizer_path) else None
+    quality_state = torch.load(quality_path, map_location="cpu") if os.path.exists(quality_path) else None
+    
+    if categorizer_state is None and quality_state is None:
+        return None
+    
+    num_categories = (
+        categorizer_state["classifier.weight"].shape[0]
+        if categorizer_state is not None else len(load_categories())
+    )
+    model = ProposalMultiHeadModel(num_categories)
+    model.load_legacy_state_dicts(categorizer_state, quality_state)
+    if model.quality_head_stale:
+        warnings.warn(
+            "Der Qualitätskopf wurde nicht auf dem Encoder des Kategorisierungsmodells trainiert; "
+            "Nachtraining mit ProposalProcessor.train_quality_evaluator erforderlich"
+        )
+    
+    output_path = os.path.join(model_path, "multihead.pt")
+    torch.save(model.teacher_state_dict(), output_path)
+    return output_path
@@ -9,32 +9,82 @@ KI-Technologien, insbesondere BERT für die deutsche Sprache, spaCy für NLP-Auf
 und PyTorch für die Modellimplementierung.
 """
 
+from __future__ import annotations
+
 import os
 import json
+import time
+import hashlib
+import warnings
+import importlib
+from contextlib import contextmanager
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Tuple, Optional, Union, Any
+from typing import List, Dict, Tuple, Optional, Union, Any, Sequence, Callable, TYPE_CHECKING
 
-# NLP und Deep Learning Bibliotheken
-import torch
-import torch.nn as nn
-import torch.nn.functional as F
-from torch.utils.data import Dataset, DataLoader
-from transformers import AutoTokenizer, AutoModel, BertForSequenceClassification
-import spacy
+# Cache und Index für Texteinbettungen
+from embedding_cache import EmbeddingCache
+from vector_index import VectorIndex, normalize_rows
 
-# Scikit-learn für klassische ML-Algorithmen und Evaluation
-from sklearn.preprocessing import MultiLabelBinarizer
-from sklearn.metrics import precision_recall_fscore_support, accuracy_score
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-from sklearn.metrics.pairwise import cosine_similarity
+# PyTorch, transformers und spaCy werden erst bei der ersten Verwendung importiert
+# (PyTorch-Komponenten in proposal_models, siehe __getattr__)
+if TYPE_CHECKING:
+    import torch
+    import torch.nn as nn
+    from proposal_models import ProposalMultiHeadModel, ProposalDataset
+    from worker_pool import WorkerPool
+    from result_store import ResultStore
 
 # Konstanten
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "models")
 DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
 BERT_MODEL_NAME = "deepset/gbert-base"
 MAX_LENGTH = 512
-DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+LENGTH_BUCKETS = (64, 128, 256, 512)
+QUALITY_DIMENSIONS = [
+    "relevance", "feasibility", "clarity", "constructiveness", "sustainability", "innovation"
+]
+# Universelle POS-Tags für das feste Merkmalsschema
+POS_TAGS = [
+    "ADJ", "ADP", "ADV", "AUX", "CCONJ", "CONJ", "DET", "INTJ", "NOUN", "NUM",
+    "PART", "PRON", "PROPN", "PUNCT", "SCONJ", "SPACE", "SYM", "VERB", "X"
+]
+SPACY_MODELS = ("de_core_news_lg", "de_core_news_md")
+# Genauigkeit für die Inferenz: fp32, dynamisch quantisiertes int8, bf16-Autocast
+PRECISION_MODES = ("fp32", "int8", "bf16")
+# Inferenz-Backends: PyTorch oder exportierte Graphen mit onnxruntime (siehe onnx_backend)
+BACKENDS = ("torch", "onnx")
+
+# Aus proposal_models bereitgestellte Namen (Import erst beim ersten Zugriff)
+_MODEL_EXPORTS = (
+    "DEVICE", "DynamicPaddingCollator", "LengthGroupedBatchSampler", "ProposalDataset", "ProposalCategorizer",
+    "ProposalQualityEvaluator", "ProposalMultiHeadModel", "convert_legacy_checkpoints"
+)
+
+def __getattr__(name: str) -> Any:
+    """Stellt die PyTorch-Komponenten aus proposal_models verzögert bereit (PEP 562)."""
+    if name in _MODEL_EXPORTS:
+        return getattr(importlib.import_module("proposal_models"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def check_precision(precision: str) -> str:
+    """Prüft, ob die Genauigkeit einer der PRECISION_MODES ist, und gibt sie zurück."""
+    if precision not in PRECISION_MODES:
+        raise ValueError(
+            f"Unbekannte Genauigkeit '{precision}' (erlaubt: {', '.join(PRECISION_MODES)})"
+        )
+    return precision
+
+def check_backend(backend: str, precision: str) -> str:
+    """Prüft, ob das Backend einer der BACKENDS ist und die Genauigkeit unterstützt."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unbekanntes Backend '{backend}' (erlaubt: {', '.join(BACKENDS)})")
+    if backend == "onnx" and precision == "bf16":
+        raise ValueError("Das ONNX-Backend unterstützt nur fp32 und int8")
+    return backend
+
+def onnx_model_path(name: str) -> str:
+    """Pfad eines exportierten ONNX-Graphen im Modellverzeichnis."""
+    return os.path.join(MODEL_PATH, "onnx", f"{name}.onnx")
 
 # Laden der Kategorien aus Konfigurationsdatei
 def load_categories() -> List[str]:
@@ -67,26 +117,147 @@ def load_ministries() -> Dict[str, List[str]]:
             "Bundesministerium für Wirtschaft und Energie": ["Wirtschaft"]
         }
 
+# Inhalts-Digests der Gewichtsdateien, je Pfad zum Stand (Größe, Änderungszeit, Inode)
+_FILE_DIGESTS: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+
+def file_digest(path: str) -> str:
+    """
+    Liefert den SHA-256-Digest des Dateiinhalts.
+    
+    Der Digest wird je Pfad zwischengespeichert und nur neu berechnet, wenn sich
+    Größe, Änderungszeit oder Inode der Datei ändern; jede Datei wird so höchstens
+    einmal pro Stand gelesen.
+    
+    Args:
+        path: Pfad der Datei
+        
+    Returns:
+        Hex-Digest des Inhalts
+    """
+    stat = os.stat(path)
+    state = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    cached = _FILE_DIGESTS.get(path)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+    
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    _FILE_DIGESTS[path] = (state, digest.hexdigest())
+    return digest.hexdigest()
+
+# Fingerabdruck der Modellgewichte
+def weights_fingerprint(paths: List[str]) -> str:
+    """
+    Erzeugt einen Fingerabdruck für einen Stand von Gewichtsdateien.
+    
+    Verwendet werden Dateiname und Inhalt (siehe file_digest), sodass neu trainierte
+    oder ausgetauschte Gewichte auch bei gleicher Größe und beibehaltener
+    Änderungszeit (z.B. nach cp -p oder rsync -a) einen neuen Fingerabdruck ergeben.
+    
+    Args:
+        paths: Pfade der Gewichtsdateien (nicht vorhandene werden ignoriert)
+        
+    Returns:
+        Hex-Digest des Fingerabdrucks ("base", falls keine Datei vorhanden ist)
+    """
+    parts = []
+    for path in sorted(paths):
+        if os.path.exists(path):
+            parts.append(f"{os.path.basename(path)}:{file_digest(path)}")
+    
+    if not parts:
+        return "base"
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+# Hilfsfunktionen für dynamisches Padding
+def bucket_length(length: int, bucket_sizes: Optional[Sequence[int]] = None) -> int:
+    """
+    Bestimmt die Padding-Länge für eine Sequenzlänge.
+    
+    Args:
+        length: Länge der längsten Sequenz im Batch
+        bucket_sizes: Optionale Bucket-Grenzen (z.B. LENGTH_BUCKETS); ohne Buckets
+                      wird auf die längste Sequenz gepaddet
+                      
+    Returns:
+        Ziellänge für das Padding
+    """
+    if bucket_sizes:
+        for size in sorted(bucket_sizes):
+            if length <= size:
+                return size
+    return length
+
+def length_sorted_batches(lengths: Sequence[int], batch_size: int) -> List[List[int]]:
+    """
+    Gruppiert Indizes nach Sequenzlänge in Batches, um Padding zu minimieren.
+    
+    Args:
+        lengths: Sequenzlänge je Eintrag
+        batch_size: Maximale Batch-Größe
+        
+    Returns:
+        Liste von Index-Listen (die Reihenfolge der Einträge ändert sich)
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
 # Vorverarbeitungsklasse
 class TextPreprocessor:
     """Klasse für die Vorverarbeitung von Texten."""
     
     def __init__(self):
-        """Initialisiert den TextPreprocessor mit spaCy und BERT-Tokenizer."""
-        # Laden des spaCy-Modells für Deutsch
-        try:
-            self.nlp = spacy.load("de_core_news_lg")
-        except OSError:
-            # Fallback zu kleinerem Modell, falls das große nicht verfügbar ist
+        """
+        Initialisiert den TextPreprocessor.
+        
+        spaCy-Modell und BERT-Tokenizer werden erst bei der ersten Verwendung geladen.
+        """
+        self._nlp = None
+        self._tokenizer = None
+    
+    @property
+    def nlp(self):
+        """spaCy-Pipeline für Deutsch (wird beim ersten Zugriff geladen)."""
+        if self._nlp is None:
+            self._load_nlp()
+        return self._nlp
+    
+    def _load_nlp(self) -> None:
+        """Lädt das spaCy-Modell für Deutsch, mit Fallback zu kleineren Modellen."""
+        import spacy
+        
+        for model_name in SPACY_MODELS:
             try:
-                self.nlp = spacy.load("de_core_news_md")
+                nlp = spacy.load(model_name)
+                break
             except OSError:
-                # Installieren und Laden des Modells, falls nicht vorhanden
-                os.system("python -m spacy download de_core_news_md")
-                self.nlp = spacy.load("de_core_news_md")
-        
-        # Laden des BERT-Tokenizers
-        self.tokenizer = AutoTokenizer.from_pretrained(BERT_MODEL_NAME)
+                continue
+        else:
+            # Kein Download zur Laufzeit: das Modell muss bei der Installation bereitgestellt werden
+            raise OSError(
+                f"Kein deutsches spaCy-Modell installiert ({', '.join(SPACY_MODELS)}); "
+                f"Installation z.B. mit 'python -m spacy download {SPACY_MODELS[-1]}'"
+            )
+        
+        self._nlp = nlp
+        self._configure_feature_pipeline()
+    
+    @property
+    def tokenizer(self):
+        """BERT-Tokenizer (wird beim ersten Zugriff geladen)."""
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(BERT_MODEL_NAME)
+        return self._tokenizer
+    
+    @property
+    def feature_names(self) -> List[str]:
+        """Spaltennamen der Merkmalsmatrix (abhängig von den NER-Labels des spaCy-Modells)."""
+        if self._nlp is None:
+            self._load_nlp()
+        return self._feature_names
     
     def clean_text(self, text: str) -> str:
         """Bereinigt den Text von unerwünschten Zeichen und normalisiert ihn."""
@@ -96,219 +267,298 @@ class TextPreprocessor:
         text = " ".join(text.split())
         return text
     
-    def extract_features(self, text: str) -> Dict[str, Any]:
-        """Extrahiert linguistische Merkmale aus dem Text."""
-        doc = self.nlp(text)
-        
-        # Grundlegende Textstatistiken
-        features = {
-            "num_tokens": len(doc),
-            "num_sentences": len(list(doc.sents)),
-            "avg_token_length": np.mean([len(token.text) for token in doc]) if len(doc) > 0 else 0,
-            "avg_sentence_length": np.mean([len(sent) for sent in doc.sents]) if len(list(doc.sents)) > 0 else 0,
-        }
-        
-        # POS-Tag-Verteilung
-        pos_counts = {}
-        for token in doc:
-            pos = token.pos_
-            pos_counts[pos] = pos_counts.get(pos, 0) + 1
-        
-        for pos, count in pos_counts.items():
-            features[f"pos_{pos}"] = count / len(doc) if len(doc) > 0 else 0
-        
-        # Entitäten
-        entities = {}
-        for ent in doc.ents:
-            ent_type = ent.label_
-            entities[ent_type] = entities.get(ent_type, 0) + 1
-        
-        for ent_type, count in entities.items():
-            features[f"ent_{ent_type}"] = count
-        
-        # Sentiment-Analyse (einfache Heuristik basierend auf spaCy)
-        sentiment_score = 0
-        for token in doc:
-            if token.pos_ in ["ADJ", "ADV"]:
-                # Einfache Heuristik: Positiv/Negativ basierend auf Lexikon
-                # In einer vollständigen Implementierung würde hier ein Sentiment-Lexikon verwendet
-                pass
-        
-        features["sentiment_score"] = sentiment_score
+    def _configure_feature_pipeline(self) -> None:
+        """
+        Legt fest, welche spaCy-Komponenten für die Merkmalsextraktion laufen.
         
-        return features
-    
-    def tokenize_for_bert(self, text: str) -> Dict[str, torch.Tensor]:
-        """Tokenisiert den Text für die Verwendung mit BERT."""
-        return self.tokenizer(
-            text,
-            padding="max_length",
-            truncation=True,
-            max_length=MAX_LENGTH,
-            return_tensors="pt"
+        Lemmatizer und Parser werden nicht benötigt; der Parser liefert nur die
+        Satzgrenzen und wird durch den Senter des Modells bzw. einen regelbasierten
+        Sentencizer ersetzt.
+        """
+        from spacy.parts_of_speech import IDS as POS_IDS
+        
+        pipe_names = self.nlp.pipe_names
+        self._feature_disable = [name for name in ("lemmatizer", "parser") if name in pipe_names]
+        self._feature_enable = []
+        
+        if not any(name in pipe_names for name in ("senter", "sentencizer")):
+            if "senter" in self.nlp.component_names:
+                sentence_component = "senter"
+            else:
+                sentence_component = "feature_sentencizer"
+                self.nlp.add_pipe("sentencizer", name=sentence_component, first=True)
+                self.nlp.disable_pipe(sentence_component)
+            self._feature_enable.append(sentence_component)
+        
+        # Festes Merkmalsschema
+        self.entity_labels = sorted(self.nlp.get_pipe("ner").labels) if "ner" in pipe_names else []
+        self._feature_names = (
+            ["num_tokens", "num_sentences", "avg_token_length", "avg_sentence_length"]
+            + [f"pos_{pos}" for pos in POS_TAGS]
+            + [f"ent_{ent_type}" for ent_type in self.entity_labels]
+            + ["sentiment_score"]
         )
-    
-    def process_text(self, text: str) -> Dict[str, Any]:
-        """Führt die vollständige Textverarbeitung durch."""
-        cleaned_text = self.clean_text(text)
-        features = self.extract_features(cleaned_text)
-        tokenized = self.tokenize_for_bert(cleaned_text)
         
-        return {
-            "cleaned_text": cleaned_text,
-            "features": features,
-            "tokenized": tokenized
+        # Abbildung der spaCy-POS-IDs auf die Spalten der Merkmalsmatrix
+        # (unbekannte Tags landen in einer zusätzlichen, verworfenen Spalte)
+        self._pos_columns = np.full(max(POS_IDS.values()) + 1, len(POS_TAGS), dtype=np.int64)
+        for i, pos in enumerate(POS_TAGS):
+            self._pos_columns[POS_IDS[pos]] = i
+        self._entity_columns = {
+            ent_type: 4 + len(POS_TAGS) + i for i, ent_type in enumerate(self.entity_labels)
         }
-
-# Dataset-Klasse für BERT-Finetuning
-class ProposalDataset(Dataset):
-    """Dataset-Klasse für Vorschläge mit Kategorien."""
     
-    def __init__(self, texts: List[str], labels: List[List[int]], preprocessor: TextPreprocessor):
+    @contextmanager
+    def _feature_pipeline(self):
+        """Kontext, in dem nur die für die Merkmale benötigten Komponenten aktiv sind."""
+        nlp = self.nlp
+        for name in self._feature_enable:
+            nlp.enable_pipe(name)
+        try:
+            with nlp.select_pipes(disable=self._feature_disable):
+                yield nlp
+        finally:
+            for name in self._feature_enable:
+                nlp.disable_pipe(name)
+    
+    def extract_features(self, text: str) -> Dict[str, float]:
+        """Extrahiert linguistische Merkmale aus dem Text (Schema siehe feature_names)."""
+        return dict(zip(self.feature_names, self.extract_features_batch([text])[0].tolist()))
+    
+    def extract_features_batch(self, texts: List[str], batch_size: int = 64,
+                               n_process: int = 1) -> np.ndarray:
         """
-        Initialisiert das Dataset.
+        Extrahiert linguistische Merkmale für mehrere Texte mit nlp.pipe.
         
         Args:
-            texts: Liste von Vorschlagstexten
-            labels: Liste von One-Hot-Encoded Kategorielabels
-            preprocessor: TextPreprocessor-Instanz
+            texts: Liste von (bereinigten) Texten
+            batch_size: Anzahl der Texte pro spaCy-Batch
+            n_process: Anzahl der Prozesse für nlp.pipe
+            
+        Returns:
+            Merkmalsmatrix (Texte x len(feature_names)) in float32
         """
-        self.texts = texts
-        self.labels = labels
-        self.preprocessor = preprocessor
-    
-    def __len__(self) -> int:
-        return len(self.texts)
-    
-    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
-        text = self.texts[idx]
-        label = self.labels[idx]
+        from spacy.attrs import LENGTH, POS
         
-        # Tokenisierung für BERT
-        tokenized = self.preprocessor.tokenize_for_bert(text)
+        features = np.zeros((len(texts), len(self.feature_names)), dtype=np.float32)
         
-        # Konvertierung der Labels zu Tensor
-        label_tensor = torch.tensor(label, dtype=torch.float)
+        with self._feature_pipeline() as nlp:
+            for row, doc in enumerate(nlp.pipe(texts, batch_size=batch_size, n_process=n_process)):
+                num_tokens = len(doc)
+                if num_tokens == 0:
+                    continue
+                
+                # Grundlegende Textstatistiken; die Sätze zerlegen das Dokument vollständig
+                num_sentences = sum(1 for _ in doc.sents)
+                token_attrs = doc.to_array([LENGTH, POS])
+                features[row, 0] = num_tokens
+                features[row, 1] = num_sentences
+                features[row, 2] = token_attrs[:, 0].mean()
+                features[row, 3] = num_tokens / num_sentences
+                
+                # POS-Tag-Verteilung (Token ohne bekannten Tag werden nicht gezählt)
+                pos_counts = np.bincount(self._pos_columns[token_attrs[:, 1]], minlength=len(POS_TAGS) + 1)
+                features[row, 4:4 + len(POS_TAGS)] = pos_counts[:-1] / num_tokens
+                
+                # Entitäten
+                for ent in doc.ents:
+                    column = self._entity_columns.get(ent.label_)
+                    if column is not None:
+                        features[row, column] += 1
+                
+                # sentiment_score bleibt 0, bis ein Sentiment-Lexikon vorliegt
         
-        return {
-            "input_ids": tokenized["input_ids"].squeeze(),
-            "attention_mask": tokenized["attention_mask"].squeeze(),
-            "labels": label_tensor
-        }
-
-# Modellklasse für Multi-Label-Kategorisierung
-class ProposalCategorizer(nn.Module):
-    """Modell für die Multi-Label-Kategorisierung von Vorschlägen."""
+        return features
     
-    def __init__(self, num_categories: int, dropout_rate: float = 0.3):
+    def tokenize_for_bert(self, text: str, bucket_sizes: Optional[Sequence[int]] = None) -> Dict[str, torch.Tensor]:
         """
-        Initialisiert das Kategorisierungsmodell.
+        Tokenisiert den Text für die Verwendung mit BERT.
+        
+        Es wird nicht auf MAX_LENGTH gepaddet; dank Attention-Mask sind die
+        Modellausgaben bis auf Rundungsfehler identisch.
         
         Args:
-            num_categories: Anzahl der Kategorien
-            dropout_rate: Dropout-Rate für Regularisierung
+            text: Zu tokenisierender Text
+            bucket_sizes: Optionale Bucket-Grenzen für die Padding-Länge
         """
-        super(ProposalCategorizer, self).__init__()
-        
-        # Laden des vortrainierten BERT-Modells
-        self.bert = AutoModel.from_pretrained(BERT_MODEL_NAME)
-        
-        # Ausgabedimension des BERT-Modells
-        hidden_size = self.bert.config.hidden_size
-        
-        # Klassifikationsschichten
-        self.dropout = nn.Dropout(dropout_rate)
-        self.classifier = nn.Linear(hidden_size, num_categories)
+        return self.tokenize_batch([text], bucket_sizes)
     
-    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    def tokenize_batch(self, texts: List[str], bucket_sizes: Optional[Sequence[int]] = None) -> Dict[str, torch.Tensor]:
         """
-        Forward-Pass durch das Modell.
+        Tokenisiert mehrere Texte und paddet sie auf die längste Sequenz im Batch.
         
         Args:
-            input_ids: Token-IDs
-            attention_mask: Attention-Mask
+            texts: Zu tokenisierende Texte
+            bucket_sizes: Optionale Bucket-Grenzen für die Padding-Länge
             
         Returns:
-            Logits für jede Kategorie
+            Dictionary mit "input_ids" und "attention_mask" (Batch x Länge)
         """
-        # BERT-Ausgabe
-        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        from proposal_models import DynamicPaddingCollator
         
-        # Verwenden des [CLS]-Token für die Klassifikation
-        pooled_output = outputs.last_hidden_state[:, 0, :]
-        
-        # Dropout und Klassifikation
-        pooled_output = self.dropout(pooled_output)
-        logits = self.classifier(pooled_output)
-        
-        return logits
-
-# Modellklasse für Qualitätsbewertung
-class ProposalQualityEvaluator(nn.Module):
-    """Modell für die Bewertung der Qualität von Vorschlägen."""
+        encodings = self.tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+        collator = DynamicPaddingCollator(self.tokenizer.pad_token_id, bucket_sizes)
+        return collator([{"input_ids": ids} for ids in encodings["input_ids"]])
     
-    def __init__(self, num_dimensions: int = 4, dropout_rate: float = 0.3):
+    def process_text(self, text: str, extract_features: bool = True) -> Dict[str, Any]:
         """
-        Initialisiert das Qualitätsbewertungsmodell.
+        Führt die vollständige Textverarbeitung durch.
+        
+        Das Ergebnis wird einmal pro Vorschlag erzeugt und an alle weiteren
+        Verarbeitungsschritte durchgereicht (siehe ProposalProcessor.*_processed).
         
         Args:
-            num_dimensions: Anzahl der Qualitätsdimensionen (z.B. Relevanz, Umsetzbarkeit)
-            dropout_rate: Dropout-Rate für Regularisierung
+            text: Rohtext des Vorschlags
+            extract_features: Ob die linguistischen Merkmale (spaCy) berechnet werden sollen
+            
+        Returns:
+            Dictionary mit "cleaned_text", "features" (oder None) und "tokenized"
         """
-        super(ProposalQualityEvaluator, self).__init__()
-        
-        # Laden des vortrainierten BERT-Modells
-        self.bert = AutoModel.from_pretrained(BERT_MODEL_NAME)
-        
-        # Ausgabedimension des BERT-Modells
-        hidden_size = self.bert.config.hidden_size
+        cleaned_text = self.clean_text(text)
+        features = self.extract_features(cleaned_text) if extract_features else None
+        tokenized = self.tokenize_for_bert(cleaned_text)
         
-        # Regressionsschichten für jede Qualitätsdimension
-        self.dropout = nn.Dropout(dropout_rate)
-        self.regressor = nn.Linear(hidden_size, num_dimensions)
+        return {
+            "cleaned_text": cleaned_text,
+            "features": features,
+            "tokenized": tokenized
+        }
     
-    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    def process_texts(self, texts: List[str], extract_features: bool = True,
+                      batch_size: int = 64, n_process: int = 1) -> List[Dict[str, Any]]:
         """
-        Forward-Pass durch das Modell.
+        Führt die Textverarbeitung für mehrere Texte durch (wie process_text).
+        
+        Die Merkmale werden gebündelt mit extract_features_batch berechnet.
         
         Args:
-            input_ids: Token-IDs
-            attention_mask: Attention-Mask
+            texts: Rohtexte der Vorschläge
+            extract_features: Ob die linguistischen Merkmale (spaCy) berechnet werden sollen
+            batch_size: Anzahl der Texte pro spaCy-Batch
+            n_process: Anzahl der Prozesse für nlp.pipe
             
         Returns:
-            Scores für jede Qualitätsdimension
+            Liste von Dictionaries wie bei process_text
         """
-        # BERT-Ausgabe
-        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        from proposal_models import DynamicPaddingCollator
         
-        # Verwenden des [CLS]-Token für die Regression
-        pooled_output = outputs.last_hidden_state[:, 0, :]
+        cleaned_texts = [self.clean_text(text) for text in texts]
         
-        # Dropout und Regression
-        pooled_output = self.dropout(pooled_output)
-        scores = self.regressor(pooled_output)
+        feature_matrix = None
+        if extract_features:
+            feature_matrix = self.extract_features_batch(cleaned_texts, batch_size, n_process)
         
-        # Sigmoid-Aktivierung für Scores im Bereich [0, 1]
-        # (wird später auf den Bereich [1, 5] skaliert)
-        scores = torch.sigmoid(scores)
+        encodings = self.tokenizer(cleaned_texts, truncation=True, max_length=MAX_LENGTH)
+        collator = DynamicPaddingCollator(self.tokenizer.pad_token_id)
         
-        return scores
+        return [
+            {
+                "cleaned_text": cleaned_text,
+                "features": (
+                    dict(zip(self.feature_names, feature_matrix[i].tolist()))
+                    if feature_matrix is not None else None
+                ),
+                "tokenized": collator([{"input_ids": encodings["input_ids"][i]}])
+            }
+            for i, cleaned_text in enumerate(cleaned_texts)
+        ]
 
 # Klasse für Ähnlichkeitsberechnung und Duplikaterkennung
 class SimilarityAnalyzer:
     """Klasse für die Berechnung von Textähnlichkeiten und Duplikaterkennung."""
     
-    def __init__(self, model_name: str = BERT_MODEL_NAME):
+    def __init__(self, model_name: str = BERT_MODEL_NAME, encoder: Optional[nn.Module] = None,
+                 tokenizer: Optional[Any] = None, cache: Optional[EmbeddingCache] = None,
+                 model_id: Optional[str] = None,
+                 encoder_factory: Optional[Callable[[], nn.Module]] = None,
+                 tokenizer_factory: Optional[Callable[[], Any]] = None,
+                 precision: str = "fp32", backend: str = "torch",
+                 onnx_options: Optional[Dict[str, Any]] = None):
         """
         Initialisiert den SimilarityAnalyzer.
         
+        Encoder und Tokenizer werden erst bei der ersten Verwendung geladen.
+        
         Args:
             model_name: Name des zu verwendenden Sprachmodells
+            encoder: Optional bereits geladener BERT-Encoder oder ClsEncoder, der mitgenutzt wird
+            tokenizer: Optional bereits geladener Tokenizer, der mitgenutzt wird
+            cache: Optionaler EmbeddingCache für bereits berechnete Einbettungen
+            model_id: Identität des Encoders für die Cache-Schlüssel (Standard: model_name)
+            encoder_factory: Optionale Funktion, die den mitgenutzten Encoder (mit encode und
+                             embedding_dim, z.B. ProposalMultiHeadModel) bei jedem Zugriff liefert
+            tokenizer_factory: Optionale Funktion, die den mitgenutzten Tokenizer beim ersten Zugriff liefert
+            precision: Genauigkeit für die Inferenz (siehe PRECISION_MODES); ein mitgenutzter
+                       Encoder muss bereits entsprechend vorbereitet sein
+            backend: "torch" oder "onnx" (exportierter Encoder mit onnxruntime)
+            onnx_options: Sitzungseinstellungen für onnxruntime (siehe onnx_backend)
         """
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModel.from_pretrained(model_name)
-        self.model.to(DEVICE)
-        self.model.eval()
+        self.model_name = model_name
+        self.cache = cache
+        self.precision = check_precision(precision)
+        self.backend = check_backend(backend, precision)
+        self.onnx_options = onnx_options
+        self.model_id = model_id or "/".join(
+            [model_name] + [setting for setting in (precision, backend) if setting not in ("fp32", "torch")]
+        )
+        
+        if encoder is not None and not hasattr(encoder, "encode"):
+            from proposal_models import ClsEncoder
+            encoder = ClsEncoder(encoder)
+        
+        self._model = encoder
+        self._tokenizer = tokenizer
+        self._encoder_factory = encoder_factory
+        self._tokenizer_factory = tokenizer_factory
+    
+    @property
+    def model(self) -> Union[nn.Module, Any]:
+        """BERT-Encoder bzw. beim ONNX-Backend der exportierte Graph (wird beim ersten Zugriff geladen)."""
+        if self._model is None:
+            if self._encoder_factory is not None:
+                # Gemeinsamer Encoder wird vom Besitzer verwaltet (Gerät, eval-Modus, Genauigkeit)
+                # und kann nach einem Training ausgetauscht werden
+                return self._encoder_factory()
+            
+            if self.backend == "onnx":
+                from onnx_backend import load_onnx_model
+                
+                self._model = load_onnx_model(
+                    onnx_model_path(f"{self.model_name.replace('/', '--')}-encoder"),
+                    self._load_encoder, self.precision, self.onnx_options
+                )
+            else:
+                from proposal_models import apply_precision, resolve_precision
+                
+                self.precision = resolve_precision(self.precision)
+                self._model = apply_precision(self._load_encoder(), self.precision)
+        return self._model
+    
+    def _load_encoder(self) -> nn.Module:
+        """Lädt den BERT-Encoder in fp32."""
+        from transformers import AutoModel
+        from proposal_models import ClsEncoder, DEVICE
+        
+        model = ClsEncoder(AutoModel.from_pretrained(self.model_name))
+        model.to(DEVICE)
+        model.eval()
+        return model
+    
+    @property
+    def embedding_dim(self) -> int:
+        """Dimension der Einbettungen."""
+        return self.model.embedding_dim
+    
+    @property
+    def tokenizer(self):
+        """Tokenizer (wird beim ersten Zugriff geladen)."""
+        if self._tokenizer is None:
+            if self._tokenizer_factory is not None:
+                self._tokenizer = self._tokenizer_factory()
+            else:
+                from transformers import AutoTokenizer
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        return self._tokenizer
     
     def get_embedding(self, text: str) -> np.ndarray:
         """
@@ -320,25 +570,86 @@ class SimilarityAnalyzer:
         Returns:
             Einbettungsvektor
         """
-        # Tokenisierung
-        inputs = self.tokenizer(
-            text,
-            padding="max_length",
-            truncation=True,
-            max_length=MAX_LENGTH,
-            return_tensors="pt"
-        )
+        return self.get_embeddings([text])[0]
+    
+    def get_embeddings(self, texts: List[str], batch_size: int = 32,
+                       bucket_sizes: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Erzeugt Einbettungen für mehrere Texte in längensortierten Batches.
         
-        # Verschieben der Tensoren auf das Gerät
-        inputs = {k: v.to(DEVICE) for k, v in inputs.items()}
+        Jeder Batch wird nur auf seine längste Sequenz (bzw. deren Bucket) gepaddet.
+        
+        Args:
+            texts: Einzubettende Texte
+            batch_size: Anzahl der Texte pro Forward-Pass
+            bucket_sizes: Optionale Bucket-Grenzen für die Padding-Länge
+            
+        Returns:
+            Einbettungsmatrix (Anzahl Texte x Einbettungsdimension) in Eingabereihenfolge
+            
+        Ist ein Cache gesetzt, werden nur die dort nicht vorhandenen Texte kodiert.
+        """
+        embeddings = np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
+        if not texts:
+            return embeddings
+        
+        if self.cache is None:
+            embeddings[:] = self._encode(texts, batch_size, bucket_sizes)
+            return embeddings
+        
+        # Nachschlagen im Cache
+        keys = [EmbeddingCache.make_key(text, self.model_id) for text in texts]
+        cached = self.cache.get_many(keys)
+        
+        # Fehlende Texte werden (ohne Duplikate) einmal kodiert
+        missing = {}
+        for i, (key, embedding) in enumerate(zip(keys, cached)):
+            if embedding is not None:
+                embeddings[i] = embedding
+            else:
+                missing.setdefault(key, []).append(i)
+        
+        if missing:
+            missing_keys = list(missing)
+            computed = self._encode([texts[missing[key][0]] for key in missing_keys], batch_size, bucket_sizes)
+            self.cache.put_many(missing_keys, computed)
+            for key, embedding in zip(missing_keys, computed):
+                embeddings[missing[key]] = embedding
+        
+        return embeddings
+    
+    def _encode(self, texts: List[str], batch_size: int = 32,
+                bucket_sizes: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Kodiert Texte ohne Cache in längensortierten Batches."""
+        import torch
+        from proposal_models import DynamicPaddingCollator, DEVICE, precision_context
         
-        # Berechnung der Einbettung
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            # Verwenden des [CLS]-Token als Satzeinbettung
-            embedding = outputs.last_hidden_state[:, 0, :].cpu().numpy()
+        model = self.model
+        embeddings = np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
         
-        return embedding[0]
+        # Tokenisierung ohne Padding
+        encodings = self.tokenizer(list(texts), truncation=True, max_length=MAX_LENGTH)["input_ids"]
+        collator = DynamicPaddingCollator(self.tokenizer.pad_token_id, bucket_sizes)
+        
+        for batch_indices in length_sorted_batches([len(ids) for ids in encodings], batch_size):
+            inputs = collator([{"input_ids": encodings[i]} for i in batch_indices])
+            
+            if self.backend == "onnx":
+                outputs = model(inputs["input_ids"].numpy(), inputs["attention_mask"].numpy())
+                embeddings[batch_indices] = outputs["embeddings"]
+                continue
+            
+            # Verschieben der Tensoren auf das Gerät
+            inputs = {k: v.to(DEVICE) for k, v in inputs.items()}
+            
+            # Berechnung der Einbettung
+            with torch.no_grad(), precision_context(self.precision):
+                # [CLS]-Token als Satzeinbettung
+                embeddings[batch_indices] = model.encode(
+                    inputs["input_ids"], inputs["attention_mask"]
+                ).float().cpu().numpy()
+        
+        return embeddings
     
     def compute_similarity(self, text1: str, text2: str) -> float:
         """
@@ -352,11 +663,10 @@ class SimilarityAnalyzer:
             Ähnlichkeitswert zwischen 0 und 1
         """
         # Berechnung der Einbettungen
-        embedding1 = self.get_embedding(text1)
-        embedding2 = self.get_embedding(text2)
+        embedding1, embedding2 = normalize_rows(self.get_embeddings([text1, text2]))
         
         # Berechnung der Kosinus-Ähnlichkeit
-        similarity = cosine_similarity([embedding1], [embedding2])[0][0]
+        similarity = embedding1 @ embedding2
         
         return float(similarity)
     
@@ -380,10 +690,10 @@ class SimilarityAnalyzer:
         embedding = self.get_embedding(text)
         
         # Berechnung der Einbettungen für die Referenztexte
-        reference_embeddings = np.array([self.get_embedding(ref_text) for ref_text in reference_texts])
+        reference_embeddings = self.get_embeddings(reference_texts)
         
         # Berechnung der Ähnlichkeiten
-        similarities = cosine_similarity([embedding], reference_embeddings)[0]
+        similarities = normalize_rows(reference_embeddings) @ normalize_rows(embedding[None, :])[0]
         
         # Finden des ähnlichsten Texts
         max_similarity = np.max(similarities)
@@ -393,17 +703,92 @@ class SimilarityAnalyzer:
         is_duplicate = max_similarity >= threshold
         
         return is_duplicate, int(max_index) if is_duplicate else -1, float(max_similarity)
+    
+    def build_index(self, texts: List[str], ids: List[str], batch_size: int = 32) -> VectorIndex:
+        """
+        Erstellt einen VectorIndex für Referenztexte.
+        
+        Args:
+            texts: Referenztexte
+            ids: Vorschlags-IDs der Referenztexte
+            batch_size: Anzahl der Texte pro Forward-Pass
+            
+        Returns:
+            VectorIndex mit den normalisierten Einbettungen
+        """
+        index = VectorIndex(self.embedding_dim)
+        self.add_to_index(index, texts, ids, batch_size)
+        return index
+    
+    def add_to_index(self, index: VectorIndex, texts: List[str], ids: List[str], batch_size: int = 32) -> None:
+        """
+        Fügt Texte einem bestehenden VectorIndex hinzu (vorhandene IDs werden ersetzt).
+        
+        Args:
+            index: Zu erweiternder Index
+            texts: Hinzuzufügende Texte
+            ids: Vorschlags-IDs der Texte
+            batch_size: Anzahl der Texte pro Forward-Pass
+        """
+        if texts:
+            index.add(ids, self.get_embeddings(texts, batch_size))
+    
+    def is_duplicate_in_index(self, text: str, index: VectorIndex,
+                              threshold: float = 0.85) -> Tuple[bool, Optional[str], float]:
+        """
+        Prüft über einen VectorIndex, ob ein Text ein Duplikat eines indexierten Vorschlags ist.
+        
+        Args:
+            text: Zu prüfender Text
+            index: Index der Referenzvorschläge
+            threshold: Schwellenwert für die Duplikaterkennung
+            
+        Returns:
+            Tuple aus (ist_duplikat, id_des_duplikats, ähnlichkeitswert)
+            Wenn kein Duplikat gefunden wurde, ist id_des_duplikats None
+        """
+        matches = index.query(self.get_embedding(text), k=1)
+        if not matches:
+            return False, None, 0.0
+        
+        best_id, max_similarity = matches[0]
+        is_duplicate = max_similarity >= threshold
+        
+        return is_duplicate, best_id if is_duplicate else None, max_similarity
 
 # Hauptklasse für die Vorschlagsverarbeitung
 class ProposalProcessor:
     """Hauptklasse für die Verarbeitung von Bürgervorschlägen."""
     
-    def __init__(self, load_models: bool = True):
+    def __init__(self, load_models: bool = True, embedding_cache: Optional[EmbeddingCache] = None,
+                 precision: str = "fp32", backend: str = "torch",
+                 onnx_options: Optional[Dict[str, Any]] = None, model_file: str = "multihead.pt",
+                 early_exit_margin: Optional[float] = None, result_store: Optional[ResultStore] = None):
         """
         Initialisiert den ProposalProcessor.
         
+        Modell, Tokenizer und spaCy-Pipeline werden erst bei der ersten Verwendung
+        geladen (siehe warmup, um das vorab zu erledigen).
+        
         Args:
-            load_models: Ob die Modelle geladen werden sollen
+            load_models: Ob die trainierten Gewichte geladen werden sollen
+            embedding_cache: Optionaler EmbeddingCache (z.B. mit persistenter Stufe);
+                             standardmäßig wird ein reiner Speicher-Cache verwendet
+            precision: Genauigkeit für die Inferenz (siehe PRECISION_MODES); bf16 fällt
+                       ohne native CPU-Unterstützung auf fp32 zurück
+            backend: "torch" oder "onnx"; beim ONNX-Backend wird das gemeinsame Modell
+                     beim ersten Zugriff exportiert und mit onnxruntime ausgeführt
+            onnx_options: Sitzungseinstellungen für onnxruntime (Graph-Optimierung,
+                          Threads; siehe onnx_backend.DEFAULT_SESSION_OPTIONS)
+            model_file: Checkpoint des gemeinsamen Modells in MODEL_PATH, z.B. ein mit
+                        train_distilled erzeugtes Schülermodell ("student.pt")
+            early_exit_margin: Wenn gesetzt, brechen categorize und categorize_batch die
+                               Kategorisierung nach der ersten Schicht mit Zwischenklassifikator
+                               ab, deren Wahrscheinlichkeiten alle mindestens so weit vom
+                               Schwellenwert entfernt sind (siehe train_exit_heads)
+            result_store: Optionaler ResultStore; process_proposal und process_batch
+                          liefern dann gespeicherte Ergebnisse unveränderter Vorschläge,
+                          solange sich Gewichte und Konfiguration nicht geändert haben
         """
         # Laden der Kategorien und Ministerien
         self.categories = load_categories()
@@ -412,84 +797,551 @@ class ProposalProcessor:
         
         # Initialisierung der Komponenten
         self.preprocessor = TextPreprocessor()
-        self.similarity_analyzer = SimilarityAnalyzer()
         
-        # Initialisierung der Modelle
-        if load_models:
-            self.categorizer = self._load_categorizer()
-            self.quality_evaluator = self._load_quality_evaluator()
-        else:
-            self.categorizer = None
-            self.quality_evaluator = None
+        # Gemeinsames Modell für Kategorien, Qualität und Einbettungen (siehe model)
+        self._model = None
+        self._mlb = None
+        self.models_loaded = load_models
+        self.model_file = model_file
+        self.precision = check_precision(precision)
+        self.backend = check_backend(backend, precision)
+        self.onnx_options = onnx_options
+        self._onnx_model = None
+        self.early_exit_margin = early_exit_margin
+        self.worker_pool = None
+        self.result_store = result_store
+        
+        # Die Ähnlichkeitsanalyse nutzt Encoder und Tokenizer des gemeinsamen Modells
+        self.similarity_analyzer = SimilarityAnalyzer(
+            cache=embedding_cache if embedding_cache is not None else EmbeddingCache(),
+            model_id=self._model_id(),
+            encoder_factory=(lambda: self.onnx_model) if backend == "onnx" else (lambda: self.model),
+            tokenizer_factory=lambda: self.preprocessor.tokenizer,
+            precision=self.precision,
+            backend=self.backend
+        )
+    
+    @property
+    def model(self) -> ProposalMultiHeadModel:
+        """Gemeinsames Multi-Head-Modell in der gewählten Genauigkeit (wird beim ersten Zugriff geladen)."""
+        if self._model is None:
+            from proposal_models import apply_precision, resolve_precision
+            
+            self.precision = self.similarity_analyzer.precision = resolve_precision(self.precision)
+            self._model = apply_precision(self._load_model(self.models_loaded), self.precision)
+        return self._model
+    
+    @property
+    def onnx_model(self):
+        """
+        Exportiertes gemeinsames Modell für das ONNX-Backend (wird beim ersten Zugriff geladen).
+        
+        Der Graph wird pro Gewichtsstand einmal exportiert (bei int8 zusätzlich
+        quantisiert) und im Modellverzeichnis abgelegt.
+        """
+        if self._onnx_model is None:
+            from onnx_backend import load_onnx_model
+            
+            self._onnx_model = load_onnx_model(
+                onnx_model_path(f"{os.path.splitext(self.model_file)[0]}-{self._weights_fingerprint()}"),
+                lambda: self._load_model(self.models_loaded), self.precision, self.onnx_options
+            )
+        return self._onnx_model
+    
+    @property
+    def mlb(self):
+        """MultiLabelBinarizer für Kategorien (wird beim ersten Zugriff angelegt)."""
+        if self._mlb is None:
+            from sklearn.preprocessing import MultiLabelBinarizer
+            self._mlb = MultiLabelBinarizer(classes=self.categories)
+            self._mlb.fit([self.categories])
+        return self._mlb
+    
+    def warmup(self, batch_size: int = 8) -> Dict[str, float]:
+        """
+        Lädt alle Komponenten und führt einen Dummy-Batch aus, damit die erste
+        Anfrage nicht die Lade- und Initialisierungszeiten trägt.
+        
+        Args:
+            batch_size: Größe des Dummy-Batches
+            
+        Returns:
+            Dauer in Sekunden je Schritt ("tokenizer", "model", "nlp", "inference")
+        """
+        dummy_texts = ["Die Stadt sollte mehr Radwege bauen, um den Verkehr zu entlasten."] * batch_size
+        steps = [
+            ("tokenizer", lambda: self.preprocessor.tokenizer),
+            ("model", lambda: self.onnx_model if self.backend == "onnx" else self.model),
+            ("nlp", lambda: self.preprocessor.extract_features_batch(dummy_texts[:1])),
+            ("inference", lambda: self._predict_batch(self._tokenize_cleaned(dummy_texts), batch_size))
+        ]
+        
+        timings = {}
+        for name, step in steps:
+            start = time.perf_counter()
+            step()
+            timings[name] = time.perf_counter() - start
         
-        # MultiLabelBinarizer für Kategorien
-        self.mlb = MultiLabelBinarizer(classes=self.categories)
-        self.mlb.fit([self.categories])
+        return timings
     
-    def _load_categorizer(self) -> ProposalCategorizer:
-        """Lädt das Kategorisierungsmodell."""
-        model = ProposalCategorizer(self.num_categories)
-        model_path = os.path.join(MODEL_PATH, "categorizer.pt")
+    def _load_model(self, load_weights: bool = True) -> ProposalMultiHeadModel:
+        """
+        Lädt das gemeinsame Multi-Head-Modell.
+        
+        Bevorzugt wird model_file (Standard: multihead.pt); fehlt dieser Checkpoint,
+        werden vorhandene categorizer.pt- und quality_evaluator.pt-Checkpoints konvertiert.
+        
+        Args:
+            load_weights: Ob trainierte Gewichte geladen werden sollen
+        """
+        import torch
+        from proposal_models import ProposalMultiHeadModel, DEVICE
+        
+        checkpoint_path = os.path.join(MODEL_PATH, self.model_file)
         
-        if os.path.exists(model_path):
-            model.load_state_dict(torch.load(model_path, map_location=DEVICE))
+        if load_weights and os.path.exists(checkpoint_path):
+            state_dict = torch.load(checkpoint_path, map_location=DEVICE)
+            
+            if "encoder_config" in state_dict:
+                # Destilliertes Schülermodell (siehe train_distilled)
+                model = ProposalMultiHeadModel.from_student_checkpoint(state_dict)
+            else:
+                model = ProposalMultiHeadModel(self.num_categories)
+                
+                # Anpassung von Regressionskopf und Zwischenklassifikatoren an den Checkpoint
+                model.load_teacher_state_dict(state_dict)
+        elif load_weights and self.model_file != "multihead.pt":
+            raise ValueError(f"Modelldatei {checkpoint_path} nicht gefunden")
+        else:
+            model = ProposalMultiHeadModel(self.num_categories)
+            
+            if load_weights:
+                categorizer_path = os.path.join(MODEL_PATH, "categorizer.pt")
+                quality_path = os.path.join(MODEL_PATH, "quality_evaluator.pt")
+                model.load_legacy_state_dicts(
+                    torch.load(categorizer_path, map_location=DEVICE) if os.path.exists(categorizer_path) else None,
+                    torch.load(quality_path, map_location=DEVICE) if os.path.exists(quality_path) else None
+                )
+        
+        if model.quality_head_stale:
+            warnings.warn(
+                "Der Qualitätskopf wurde nicht auf dem geladenen Encoder trainiert; "
+                "Qualitätsbewertungen sind bis zum Nachtraining mit train_quality_evaluator unzuverlässig"
+            )
         
         model.to(DEVICE)
         model.eval()
         return model
     
-    def _load_quality_evaluator(self) -> ProposalQualityEvaluator:
-        """Lädt das Qualitätsbewertungsmodell."""
-        model = ProposalQualityEvaluator()
-        model_path = os.path.join(MODEL_PATH, "quality_evaluator.pt")
+    def _weights_fingerprint(self) -> str:
+        """Fingerabdruck der geladenen Gewichte ("base" ohne trainierte Gewichte)."""
+        if not self.models_loaded:
+            return "base"
+        return weights_fingerprint([
+            os.path.join(MODEL_PATH, name)
+            for name in (self.model_file, "categorizer.pt", "quality_evaluator.pt")
+        ])
+    
+    def _model_id(self) -> str:
+        """Liefert die Identität des geladenen Encoders (Modellname, Gewichtsstand, Genauigkeit, Backend)."""
+        model_id = BERT_MODEL_NAME
+        if self.models_loaded:
+            model_id = f"{model_id}@{self._weights_fingerprint()}"
+        
+        # Reduzierte Genauigkeit und onnxruntime ergeben leicht abweichende Einbettungen
+        if self.precision != "fp32":
+            model_id = f"{model_id}/{self.precision}"
+        if self.backend != "torch":
+            model_id = f"{model_id}/{self.backend}"
+        return model_id
+    
+    def result_fingerprint(self) -> str:
+        """
+        Fingerabdruck des Stands, von dem die Analyseergebnisse abhängen.
+        
+        Enthält die Gewichtsdateien in MODEL_PATH, Kategorien, Ministerien,
+        Qualitätsdimensionen sowie Genauigkeit und Backend (siehe ResultStore).
+        """
+        state = {
+            "model_id": self._model_id(),
+            "model_file": self.model_file,
+            "categories": self.categories,
+            "ministries": self.ministries,
+            "quality_dimensions": QUALITY_DIMENSIONS
+        }
+        return hashlib.sha256(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    
+    def _result_keys(self, texts: List[str]) -> List[str]:
+        """Schlüssel der bereinigten Texte für den ResultStore."""
+        return [self.result_store.make_key(self.preprocessor.clean_text(text)) for text in texts]
+    
+    def _check_teacher_model(self) -> None:
+        """Stellt sicher, dass der Processor das Lehrermodell (multihead.pt) verwendet."""
+        if self.model_file != "multihead.pt":
+            raise ValueError("Nur das Lehrermodell (multihead.pt) kann trainiert oder destilliert werden; "
+                             "Schülermodelle werden mit train_distilled neu erzeugt")
+    
+    def _fp32_model(self) -> ProposalMultiHeadModel:
+        """Gemeinsames Modell in fp32 (bei int8 neu geladen, da sich ein quantisiertes Modell nicht trainieren lässt)."""
+        return self._load_model(self.models_loaded) if self.precision == "int8" else self.model
+    
+    def _save_model(self, model: ProposalMultiHeadModel) -> str:
+        """Speichert das gemeinsame Modell (in fp32) als multihead.pt."""
+        import torch
         
-        if os.path.exists(model_path):
-            model.load_state_dict(torch.load(model_path, map_location=DEVICE))
+        os.makedirs(MODEL_PATH, exist_ok=True)
+        model_path = os.path.join(MODEL_PATH, "multihead.pt")
+        torch.save(model.teacher_state_dict(), model_path)
+        
+        # Neue Gewichte ergeben neue Einbettungen und damit neue Cache-Schlüssel
+        self.similarity_analyzer.model_id = self._model_id()
+        return model_path
+    
+    def _update_model(self, categorizer_state: Dict[str, torch.Tensor]) -> None:
+        """
+        Übernimmt Encoder und Kategorisierungskopf eines neu trainierten ProposalCategorizer
+        in das gemeinsame Modell und speichert es.
+        
+        Der Qualitätskopf bleibt erhalten, passt aber nicht zum neuen Encoder und wird
+        als veraltet markiert (siehe quality_head_stale). Ein quantisiertes Modell lässt
+        sich nicht aktualisieren; bei int8 wird daher das Modell in fp32 neu geladen,
+        aktualisiert, gespeichert und erneut quantisiert.
+        
+        Args:
+            categorizer_state: State-Dict eines ProposalCategorizer
+        """
+        model = self._fp32_model()
+        model.load_legacy_state_dicts(categorizer_state)
+        self._replace_model(model)
+    
+    @property
+    def quality_head_stale(self) -> bool:
+        """Ob der Qualitätskopf auf einem anderen als dem aktuellen Encoder trainiert wurde."""
+        return self.model.quality_head_stale
+    
+    def _replace_model(self, model: ProposalMultiHeadModel) -> None:
+        """Speichert ein aktualisiertes Modell (in fp32) und verwendet es in der gewählten Genauigkeit."""
+        from proposal_models import apply_precision
         
-        model.to(DEVICE)
         model.eval()
-        return model
+        self.models_loaded = True
+        self._save_model(model)
+        self._model = apply_precision(model, self.precision)
+        
+        # Der ONNX-Graph wird für den neuen Gewichtsstand beim nächsten Zugriff exportiert
+        self._onnx_model = None
+        
+        # Laufende Worker verwenden noch die alten Gewichte
+        if self.worker_pool is not None:
+            self.start_worker_pool(self.worker_pool.num_workers, self.worker_pool.threads_per_worker)
     
-    def categorize(self, text: str, threshold: float = 0.5) -> Dict[str, float]:
+    def start_worker_pool(self, num_workers: Optional[int] = None,
+                          threads_per_worker: Optional[int] = None) -> WorkerPool:
         """
-        Kategorisiert einen Vorschlag.
+        Verteilt die Inferenz gebündelter Methoden auf mehrere Prozesse.
+        
+        Das Modell wird einmal geladen und von allen Workern gemeinsam genutzt
+        (siehe worker_pool.WorkerPool). Danach rechnen categorize_batch,
+        evaluate_quality_batch und process_batch ohne weitere Änderungen in den
+        Workern; ein bereits laufender Pool wird ersetzt.
         
         Args:
-            text: Vorschlagstext
-            threshold: Schwellenwert für die Kategorienzuordnung
+            num_workers: Anzahl der Worker (Standard: ein Worker pro Kern)
+            threads_per_worker: Intra-Op-Threads pro Worker
             
         Returns:
-            Dictionary mit Kategorien und Konfidenzwerten
+            Der gestartete WorkerPool
         """
-        if self.categorizer is None:
-            raise ValueError("Kategorisierungsmodell nicht geladen")
+        from worker_pool import WorkerPool
         
-        # Vorverarbeitung des Texts
-        processed = self.preprocessor.process_text(text)
+        if self.backend != "torch":
+            raise ValueError("Der Worker-Pool unterstützt nur das PyTorch-Backend")
+        
+        self.stop_worker_pool()
+        self.worker_pool = WorkerPool(self, num_workers, threads_per_worker)
+        return self.worker_pool
+    
+    def stop_worker_pool(self) -> None:
+        """Beendet den Worker-Pool; die Inferenz läuft danach wieder im eigenen Prozess."""
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = None
+    
+    def _predict(self, tokenized: Dict[str, torch.Tensor],
+                 model: Optional[ProposalMultiHeadModel] = None) -> Dict[str, np.ndarray]:
+        """
+        Führt einen Forward-Pass des gemeinsamen Modells aus.
+        
+        Args:
+            tokenized: Tokenisierte Eingabe (input_ids, attention_mask)
+            model: Optional ein anderes PyTorch-Modell (z.B. ein Schülermodell)
+            
+        Returns:
+            Dictionary mit "embeddings", "category_probabilities" und "quality_scores"
+        """
+        if self.backend == "onnx" and model is None:
+            outputs = self.onnx_model(tokenized["input_ids"].numpy(), tokenized["attention_mask"].numpy())
+            return {
+                "embeddings": outputs["embeddings"],
+                "category_probabilities": 1.0 / (1.0 + np.exp(-outputs["category_logits"])),
+                "quality_scores": outputs["quality_scores"]
+            }
+        
+        import torch
+        from proposal_models import DEVICE, precision_context
+        
+        model = model if model is not None else self.model
         
         # Verschieben der Tensoren auf das Gerät
-        input_ids = processed["tokenized"]["input_ids"].to(DEVICE)
-        attention_mask = processed["tokenized"]["attention_mask"].to(DEVICE)
-        
-        # Vorhersage
-        with torch.no_grad():
-            logits = self.categorizer(input_ids, attention_mask)
-            probabilities = torch.sigmoid(logits).cpu().numpy()[0]
-        
-        # Zuordnung der Kategorien mit Konfidenzwerten
-        category_scores = {
-            self.categories[i]: float(probabilities[i])
-            for i in range(self.num_categories)
-            if probabilities[i] >= threshold
+        input_ids = tokenized["input_ids"].to(DEVICE)
+        attention_mask = tokenized["attention_mask"].to(DEVICE)
+        
+        # Vorhersage aller Köpfe in einem Durchlauf
+        with torch.no_grad(), precision_context(self.precision):
+            outputs = model(input_ids, attention_mask)
+        
+        # Ausgaben in fp32 (unter bf16-Autocast liegen sie in bf16 vor)
+        return {
+            "embeddings": outputs["embeddings"].float().cpu().numpy(),
+            "category_probabilities": torch.sigmoid(outputs["category_logits"].float()).cpu().numpy(),
+            "quality_scores": outputs["quality_scores"].float().cpu().numpy()
         }
+    
+    def _predict_batch(self, input_ids: List[Sequence[int]], batch_size: int = 32,
+                       bucket_sizes: Optional[Sequence[int]] = None,
+                       model: Optional[ProposalMultiHeadModel] = None) -> Dict[str, np.ndarray]:
+        """
+        Führt das gemeinsame Modell auf längensortierten, gepaddeten Mini-Batches aus.
+        
+        Args:
+            input_ids: Ungepaddete Token-IDs je Text
+            batch_size: Anzahl der Texte pro Forward-Pass
+            bucket_sizes: Optionale Bucket-Grenzen für die Padding-Länge
+            model: Optional ein anderes PyTorch-Modell (z.B. ein Schülermodell)
+            
+        Returns:
+            Dictionary mit "embeddings", "category_probabilities" und "quality_scores"
+            als Matrizen (eine Zeile pro Text, in Eingabereihenfolge)
+        """
+        from proposal_models import DynamicPaddingCollator
+        
+        if self.worker_pool is not None and model is None:
+            return self.worker_pool.predict_batch(input_ids, batch_size, bucket_sizes)
+        
+        collator = DynamicPaddingCollator(self.preprocessor.tokenizer.pad_token_id, bucket_sizes)
+        results = {}
+        
+        for batch_indices in length_sorted_batches([len(ids) for ids in input_ids], batch_size):
+            tokenized = collator([{"input_ids": input_ids[i]} for i in batch_indices])
+            predictions = self._predict(tokenized, model)
+            
+            for name, values in predictions.items():
+                if name not in results:
+                    results[name] = np.zeros((len(input_ids),) + values.shape[1:], dtype=values.dtype)
+                results[name][batch_indices] = values
+        
+        return results
+    
+    def _uses_early_exit(self) -> bool:
+        """Ob die Kategorisierung vorzeitig abbrechen kann (Marge gesetzt, PyTorch-Backend, Zwischenklassifikatoren)."""
+        return (
+            self.early_exit_margin is not None and self.backend == "torch"
+            and len(self.model.exit_layers) > 0
+        )
+    
+    def _predict_categories_early_exit(self, input_ids: List[Sequence[int]], threshold: float = 0.5,
+                                       batch_size: int = 32, margin: Optional[float] = None,
+                                       model: Optional[ProposalMultiHeadModel] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Berechnet Kategoriewahrscheinlichkeiten mit vorzeitigem Abbruch pro Text.
+        
+        Args:
+            input_ids: Ungepaddete Token-IDs je Text
+            threshold: Schwellenwert für die Kategorienzuordnung
+            batch_size: Anzahl der Texte pro Forward-Pass
+            margin: Konfidenzmarge (Standard: early_exit_margin)
+            model: Optional ein anderes PyTorch-Modell
+            
+        Returns:
+            Tupel aus Wahrscheinlichkeitsmatrix (Texte x Kategorien) und der Anzahl
+            ausgeführter Schichten je Text (beides in Eingabereihenfolge)
+        """
+        import torch
+        from proposal_models import DynamicPaddingCollator, DEVICE, precision_context
+        
+        model = model if model is not None else self.model
+        margin = margin if margin is not None else self.early_exit_margin
+        
+        collator = DynamicPaddingCollator(self.preprocessor.tokenizer.pad_token_id)
+        probabilities = np.zeros((len(input_ids), model.classifier.out_features), dtype=np.float32)
+        layers_used = np.zeros(len(input_ids), dtype=np.int64)
+        
+        for batch_indices in length_sorted_batches([len(ids) for ids in input_ids], batch_size):
+            tokenized = collator([{"input_ids": input_ids[i]} for i in batch_indices])
+            with torch.no_grad(), precision_context(self.precision):
+                logits, layers = model.categorize_early_exit(
+                    tokenized["input_ids"].to(DEVICE), tokenized["attention_mask"].to(DEVICE), threshold, margin
+                )
+            probabilities[batch_indices] = torch.sigmoid(logits.float()).cpu().numpy()
+            layers_used[batch_indices] = layers.numpy()
+        
+        return probabilities, layers_used
+    
+    def early_exit_report(self, texts: List[str], margins: Sequence[float] = (0.1, 0.2, 0.3, 0.4),
+                          labels: Optional[List[List[str]]] = None, threshold: float = 0.5,
+                          batch_size: int = 32) -> List[Dict[str, float]]:
+        """
+        Vergleicht die Kategorisierung mit vorzeitigem Abbruch mit dem vollständigen Modell.
+        
+        Args:
+            texts: Vergleichstexte
+            margins: Zu vergleichende Konfidenzmargen
+            labels: Optionale Kategorielisten je Text für die Genauigkeit gegenüber den Labels
+            threshold: Schwellenwert für die Kategorienzuordnung
+            batch_size: Anzahl der Texte pro Forward-Pass
+            
+        Returns:
+            Eine Zeile pro Marge (zuerst das vollständige Modell mit margin None) mit
+            "avg_layers", "throughput" (Texte/s), "label_agreement" (gleiche
+            Kategorienmenge wie das vollständige Modell), "probability_mae" und bei
+            Labels "accuracy" (exakte Übereinstimmung) und "accuracy_loss"
+        """
+        if not self.model.exit_layers:
+            raise ValueError("Das Modell hat keine Zwischenklassifikatoren (siehe train_exit_heads)")
+        
+        input_ids = self._tokenize_cleaned(texts)
+        num_layers = self.model.bert.config.num_hidden_layers
+        gold = self.mlb.transform(labels).astype(bool) if labels is not None else None
+        
+        start = time.perf_counter()
+        reference = self._predict_batch(input_ids, batch_size)["category_probabilities"]
+        runs = [(None, reference, np.full(len(input_ids), num_layers), time.perf_counter() - start)]
+        
+        for margin in margins:
+            start = time.perf_counter()
+            probabilities, layers_used = self._predict_categories_early_exit(input_ids, threshold, batch_size, margin)
+            runs.append((margin, probabilities, layers_used, time.perf_counter() - start))
+        
+        report = []
+        for margin, probabilities, layers_used, elapsed in runs:
+            row = {
+                "margin": margin,
+                "avg_layers": float(layers_used.mean()),
+                "throughput": len(input_ids) / elapsed,
+                "label_agreement": float(np.mean(np.all((probabilities >= threshold) == (reference >= threshold), axis=1))),
+                "probability_mae": float(np.abs(probabilities - reference).mean())
+            }
+            if gold is not None:
+                row["accuracy"] = float(np.mean(np.all((probabilities >= threshold) == gold, axis=1)))
+                row["accuracy_loss"] = report[0]["accuracy"] - row["accuracy"] if report else 0.0
+            report.append(row)
+        
+        return report
+    
+    def _category_scores(self, probabilities: np.ndarray, threshold: float) -> List[Dict[str, float]]:
+        """
+        Ordnet Kategoriewahrscheinlichkeiten den Kategorien zu.
+        
+        Args:
+            probabilities: Wahrscheinlichkeitsmatrix (Texte x Kategorien)
+            threshold: Schwellenwert für die Kategorienzuordnung
+            
+        Returns:
+            Liste von Dictionaries mit Kategorien und Konfidenzwerten (eine pro Zeile)
+        """
+        if probabilities.shape[1] != self.num_categories:
+            raise ValueError(
+                f"Das Modell hat {probabilities.shape[1]} Kategorien, konfiguriert sind {self.num_categories}; "
+                "der Kategorisierungskopf muss mit train_heads neu trainiert werden"
+            )
+        
+        # Zuordnung der Kategorien über dem Schwellenwert
+        selected = probabilities >= threshold
         
         # Wenn keine Kategorie über dem Schwellenwert liegt, nehmen wir die mit der höchsten Wahrscheinlichkeit
-        if not category_scores:
-            max_index = np.argmax(probabilities)
-            category_scores = {self.categories[max_index]: float(probabilities[max_index])}
+        without_category = np.flatnonzero(~selected.any(axis=1))
+        selected[without_category, np.argmax(probabilities[without_category], axis=1)] = True
+        
+        rows, columns = np.nonzero(selected)
+        category_scores = [{} for _ in range(len(probabilities))]
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            category_scores[row][self.categories[column]] = float(probabilities[row, column])
         
         return category_scores
     
+    def _quality_scores(self, scores: np.ndarray) -> List[Dict[str, float]]:
+        """
+        Skaliert Qualitätsscores und ordnet sie den Qualitätsdimensionen zu.
+        
+        Args:
+            scores: Scorematrix im Bereich [0, 1] (Texte x Dimensionen)
+            
+        Returns:
+            Liste von Dictionaries mit Qualitätsdimensionen und Scores (eine pro Zeile)
+        """
+        # Skalierung der Scores auf den Bereich [1, 5]
+        scores = 1 + 4 * scores
+        overall_quality = scores.mean(axis=1)
+        dimensions = QUALITY_DIMENSIONS[:scores.shape[1]]
+        
+        # Zuordnung der Qualitätsdimensionen
+        quality_scores = []
+        for row, overall in zip(scores.tolist(), overall_quality.tolist()):
+            row_scores = dict(zip(dimensions, row))
+            row_scores["overall_quality"] = overall
+            quality_scores.append(row_scores)
+        
+        return quality_scores
+    
+    def _predict_processed(self, processed: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Liefert die Modellvorhersagen für ein Vorverarbeitungsergebnis.
+        
+        Die Vorhersagen werden im Vorverarbeitungsergebnis abgelegt, sodass
+        mehrere Verarbeitungsschritte denselben Forward-Pass nutzen.
+        """
+        if "predictions" not in processed:
+            processed["predictions"] = self._predict(processed["tokenized"])
+        return processed["predictions"]
+    
+    def categorize(self, text: str, threshold: float = 0.5) -> Dict[str, float]:
+        """
+        Kategorisiert einen Vorschlag.
+        
+        Args:
+            text: Vorschlagstext
+            threshold: Schwellenwert für die Kategorienzuordnung
+            
+        Returns:
+            Dictionary mit Kategorien und Konfidenzwerten
+        """
+        if self._uses_early_exit():
+            if not self.models_loaded:
+                raise ValueError("Kategorisierungsmodell nicht geladen")
+            probabilities, _ = self._predict_categories_early_exit(self._tokenize_cleaned([text]), threshold)
+            return self._category_scores(probabilities, threshold)[0]
+        
+        # Für die Kategorisierung genügt die Tokenisierung (ohne spaCy-Analyse)
+        processed = self.preprocessor.process_text(text, extract_features=False)
+        return self.categorize_processed(processed, threshold)
+    
+    def categorize_processed(self, processed: Dict[str, Any], threshold: float = 0.5) -> Dict[str, float]:
+        """
+        Kategorisiert einen bereits vorverarbeiteten Vorschlag.
+        
+        Args:
+            processed: Ergebnis von TextPreprocessor.process_text
+            threshold: Schwellenwert für die Kategorienzuordnung
+            
+        Returns:
+            Dictionary mit Kategorien und Konfidenzwerten
+        """
+        if not self.models_loaded:
+            raise ValueError("Kategorisierungsmodell nicht geladen")
+        
+        probabilities = self._predict_processed(processed)["category_probabilities"]
+        return self._category_scores(probabilities, threshold)[0]
+    
     def evaluate_quality(self, text: str) -> Dict[str, float]:
         """
         Bewertet die Qualität eines Vorschlags.
@@ -500,35 +1352,128 @@ class ProposalProcessor:
         Returns:
             Dictionary mit Qualitätsdimensionen und Scores
         """
-        if self.quality_evaluator is None:
+        # Für die Qualitätsbewertung genügt die Tokenisierung (ohne spaCy-Analyse)
+        processed = self.preprocessor.process_text(text, extract_features=False)
+        return self.evaluate_quality_processed(processed)
+    
+    def evaluate_quality_processed(self, processed: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Bewertet die Qualität eines bereits vorverarbeiteten Vorschlags.
+        
+        Args:
+            processed: Ergebnis von TextPreprocessor.process_text
+            
+        Returns:
+            Dictionary mit Qualitätsdimensionen und Scores
+        """
+        if not self.models_loaded:
             raise ValueError("Qualitätsbewertungsmodell nicht geladen")
         
-        # Vorverarbeitung des Texts
-        processed = self.preprocessor.process_text(text)
+        scores = self._predict_processed(processed)["quality_scores"]
+        return self._quality_scores(scores)[0]
+    
+    def _tokenize_cleaned(self, texts: List[str]) -> List[List[int]]:
+        """Bereinigt und tokenisiert Texte ohne Padding."""
+        cleaned_texts = [self.preprocessor.clean_text(text) for text in texts]
+        return self.preprocessor.tokenizer(cleaned_texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+    
+    def categorize_batch(self, texts: List[str], threshold: float = 0.5,
+                         batch_size: int = 32) -> List[Dict[str, float]]:
+        """
+        Kategorisiert mehrere Vorschläge in gepaddeten Mini-Batches.
         
-        # Verschieben der Tensoren auf das Gerät
-        input_ids = processed["tokenized"]["input_ids"].to(DEVICE)
-        attention_mask = processed["tokenized"]["attention_mask"].to(DEVICE)
+        Args:
+            texts: Liste von Vorschlagstexten
+            threshold: Schwellenwert für die Kategorienzuordnung
+            batch_size: Anzahl der Texte pro Forward-Pass
+            
+        Returns:
+            Liste von Dictionaries mit Kategorien und Konfidenzwerten
+        """
+        if not self.models_loaded:
+            raise ValueError("Kategorisierungsmodell nicht geladen")
+        if not texts:
+            return []
         
-        # Vorhersage
-        with torch.no_grad():
-            scores = self.quality_evaluator(input_ids, attention_mask).cpu().numpy()[0]
+        input_ids = self._tokenize_cleaned(texts)
+        if self._uses_early_exit():
+            probabilities, _ = self._predict_categories_early_exit(input_ids, threshold, batch_size)
+            return self._category_scores(probabilities, threshold)
         
-        # Skalierung der Scores auf den Bereich [1, 5]
-        scores = 1 + 4 * scores
+        predictions = self._predict_batch(input_ids, batch_size)
+        return self._category_scores(predictions["category_probabilities"], threshold)
+    
+    def evaluate_quality_batch(self, texts: List[str], batch_size: int = 32) -> List[Dict[str, float]]:
+        """
+        Bewertet die Qualität mehrerer Vorschläge in gepaddeten Mini-Batches.
         
-        # Zuordnung der Qualitätsdimensionen
-        quality_scores = {
-            "relevance": float(scores[0]),
-            "feasibility": float(scores[1]),
-            "clarity": float(scores[2]),
-            "constructiveness": float(scores[3]),
-            "sustainability": float(scores[4]),
-            "innovation": float(scores[5]),
-            "overall_quality": float(np.mean(scores))
-        }
+        Args:
+            texts: Liste von Vorschlagstexten
+            batch_size: Anzahl der Texte pro Forward-Pass
+            
+        Returns:
+            Liste von Dictionaries mit Qualitätsdimensionen und Scores
+        """
+        if not self.models_loaded:
+            raise ValueError("Qualitätsbewertungsmodell nicht geladen")
+        if not texts:
+            return []
         
-        return quality_scores
+        predictions = self._predict_batch(self._tokenize_cleaned(texts), batch_size)
+        return self._quality_scores(predictions["quality_scores"])
+    
+    def process_batch(self, texts: List[str], batch_size: int = 32) -> List[Dict[str, Any]]:
+        """
+        Verarbeitet mehrere Vorschläge vollständig mit gebündelten Forward-Passes.
+        
+        Args:
+            texts: Liste von Vorschlagstexten
+            batch_size: Anzahl der Texte pro Forward-Pass
+            
+        Returns:
+            Liste von Analyseergebnissen wie bei process_proposal
+        """
+        if not self.models_loaded:
+            raise ValueError("Modelle nicht geladen")
+        
+        # Gespeicherte Ergebnisse unveränderter Vorschläge wiederverwenden
+        results = [None] * len(texts)
+        if self.result_store is not None:
+            keys = self._result_keys(texts)
+            fingerprint = self.result_fingerprint()
+            results = self.result_store.get_many(keys, fingerprint)
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            processed_texts = self.preprocessor.process_texts([texts[i] for i in missing])
+            self._predict_processed_batch(processed_texts, batch_size)
+            for i, processed in zip(missing, processed_texts):
+                results[i] = self.process_processed(processed)
+            
+            if self.result_store is not None:
+                self.result_store.put_many([keys[i] for i in missing], fingerprint, [results[i] for i in missing])
+        
+        return results
+    
+    def _predict_processed_batch(self, processed_texts: List[Dict[str, Any]], batch_size: int = 32) -> None:
+        """
+        Berechnet die Vorhersagen für mehrere Vorverarbeitungsergebnisse gebündelt.
+        
+        Die Vorhersagen werden wie bei _predict_processed in den Ergebnissen abgelegt.
+        """
+        pending = [processed for processed in processed_texts if "predictions" not in processed]
+        if not pending:
+            return
+        
+        # Ungepaddete Token-IDs aus den Vorverarbeitungsergebnissen
+        input_ids = [
+            processed["tokenized"]["input_ids"][0][processed["tokenized"]["attention_mask"][0].bool()].tolist()
+            for processed in pending
+        ]
+        predictions = self._predict_batch(input_ids, batch_size)
+        
+        for i, processed in enumerate(pending):
+            processed["predictions"] = {name: values[i:i + 1] for name, values in predictions.items()}
     
     def assign_ministries(self, categories: Dict[str, float]) -> Dict[str, float]:
         """
@@ -601,11 +1546,35 @@ class ProposalProcessor:
         Returns:
             Dictionary mit allen Analyseergebnissen
         """
-        # Kategorisierung
-        category_scores = self.categorize(text)
+        # Gespeichertes Ergebnis eines unveränderten Vorschlags
+        if self.result_store is not None:
+            keys = self._result_keys([text])
+            fingerprint = self.result_fingerprint()
+            stored = self.result_store.get_many(keys, fingerprint)[0]
+            if stored is not None:
+                return stored
+        
+        # Einmalige Vorverarbeitung für alle Verarbeitungsschritte
+        processed = self.preprocessor.process_text(text)
+        results = self.process_processed(processed)
+        
+        if self.result_store is not None:
+            self.result_store.put_many(keys, fingerprint, [results])
+        return results
+    
+    def process_processed(self, processed: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Verarbeitet einen bereits vorverarbeiteten Vorschlag vollständig.
         
-        # Qualitätsbewertung
-        quality_scores = self.evaluate_quality(text)
+        Args:
+            processed: Ergebnis von TextPreprocessor.process_text
+            
+        Returns:
+            Dictionary mit allen Analyseergebnissen
+        """
+        # Kategorisierung und Qualitätsbewertung (ein gemeinsamer Forward-Pass)
+        category_scores = self.categorize_processed(processed)
+        quality_scores = self.evaluate_quality_processed(processed)
         
         # Ministeriumszuordnung
         ministry_scores = self.assign_ministries(category_scores)
@@ -613,35 +1582,45 @@ class ProposalProcessor:
         # Prioritätsberechnung
         priority = self.calculate_priority(quality_scores, category_scores)
         
-        # Extraktion linguistischer Merkmale
-        processed = self.preprocessor.process_text(text)
-        features = processed["features"]
-        
         # Zusammenstellung der Ergebnisse
         results = {
             "categories": category_scores,
             "ministries": ministry_scores,
             "quality": quality_scores,
             "priority": priority,
-            "features": features,
+            "features": processed["features"],
             "processed_text": processed["cleaned_text"]
         }
         
         return results
     
-    def check_similarity(self, text: str, reference_texts: List[str]) -> Dict[str, Any]:
+    def check_similarity(self, text: str, reference_texts: Optional[List[str]] = None,
+                         index: Optional[VectorIndex] = None, threshold: float = 0.85) -> Dict[str, Any]:
         """
         Prüft die Ähnlichkeit eines Vorschlags zu Referenzvorschlägen.
         
         Args:
             text: Vorschlagstext
             reference_texts: Liste von Referenzvorschlägen
+            index: Alternativ ein VectorIndex der Referenzvorschläge (z.B. aller
+                   bestehenden Vorschläge); das Ergebnis enthält dann "duplicate_id"
+            threshold: Schwellenwert für die Duplikaterkennung
             
         Returns:
             Dictionary mit Ähnlichkeitsinformationen
         """
+        if index is not None:
+            is_duplicate, duplicate_id, similarity = self.similarity_analyzer.is_duplicate_in_index(
+                text, index, threshold
+            )
+            return {
+                "is_duplicate": is_duplicate,
+                "duplicate_id": duplicate_id,
+                "similarity": similarity
+            }
+        
         is_duplicate, duplicate_index, similarity = self.similarity_analyzer.is_duplicate(
-            text, reference_texts
+            text, reference_texts or [], threshold
         )
         
         result = {
@@ -655,89 +1634,390 @@ class ProposalProcessor:
         
         return result
     
+    def _training_dataloader(self, dataset: ProposalDataset, batch_size: int,
+                             bucket_sizes: Optional[Sequence[int]] = None, num_workers: int = 0,
+                             group_by_length: bool = True) -> "torch.utils.data.DataLoader":
+        """
+        Erstellt den DataLoader für die Trainingsmethoden.
+        
+        Args:
+            dataset: Vortokenisiertes ProposalDataset
+            batch_size: Batch-Größe
+            bucket_sizes: Optionale Bucket-Grenzen für das dynamische Padding
+            num_workers: Anzahl der DataLoader-Worker
+            group_by_length: Ob Batches aus Texten ähnlicher Länge gebildet werden
+                             (weniger Padding); sonst rein zufällige Batches
+        """
+        from torch.utils.data import DataLoader
+        from proposal_models import DynamicPaddingCollator, LengthGroupedBatchSampler, DEVICE
+        
+        collator = DynamicPaddingCollator(self.preprocessor.tokenizer.pad_token_id, bucket_sizes)
+        options = {
+            "collate_fn": collator,
+            "num_workers": num_workers,
+            "persistent_workers": num_workers > 0,
+            "pin_memory": DEVICE.type == "cuda"
+        }
+        
+        if group_by_length:
+            return DataLoader(dataset, batch_sampler=LengthGroupedBatchSampler(dataset.lengths, batch_size), **options)
+        return DataLoader(dataset, batch_size=batch_size, shuffle=True, **options)
+    
     def train_categorizer(self, texts: List[str], labels: List[List[str]], 
                           batch_size: int = 16, num_epochs: int = 3, 
-                          learning_rate: float = 2e-5) -> Dict[str, Any]:
+                          learning_rate: float = 2e-5,
+                          bucket_sizes: Optional[Sequence[int]] = None,
+                          exit_layers: Optional[Sequence[int]] = None,
+                          num_workers: int = 0, group_by_length: bool = True,
+                          bf16: bool = False, gradient_accumulation_steps: int = 1,
+                          gradient_checkpointing: bool = False, compile_model: bool = False,
+                          quality_scores: Optional[List[List[float]]] = None) -> Dict[str, Any]:
         """
         Trainiert das Kategorisierungsmodell.
         
+        Encoder und Kategorisierungskopf ersetzen die des gemeinsamen Modells. Der
+        Qualitätskopf passt danach nicht mehr zum Encoder: mit quality_scores wird er
+        direkt auf dem neuen Encoder nachtrainiert (siehe train_quality_evaluator),
+        sonst wird er als veraltet markiert und es wird gewarnt.
+        
         Args:
             texts: Liste von Vorschlagstexten
             labels: Liste von Kategorielisten für jeden Vorschlag
             batch_size: Batch-Größe für das Training
             num_epochs: Anzahl der Trainingsepochen
             learning_rate: Lernrate
-            
+            bucket_sizes: Optionale Bucket-Grenzen für das dynamische Padding
+            exit_layers: Optionale Schichten, nach denen Zwischenklassifikatoren für
+                         Early Exit gemeinsam mit dem Modell trainiert werden
+            num_workers: Anzahl der DataLoader-Worker
+            group_by_length: Ob Batches aus Texten ähnlicher Länge gebildet werden
+            bf16: Ob unter bf16-Autocast trainiert wird (ohne native Unterstützung fp32)
+            gradient_accumulation_steps: Anzahl der Batches pro Optimierungsschritt
+                                         (effektive Batch-Größe: batch_size * Schritte)
+            gradient_checkpointing: Ob Encoder-Aktivierungen im Backward-Pass neu
+                                    berechnet werden (weniger Speicher bei langen Sequenzen)
+            compile_model: Ob das Modell mit torch.compile übersetzt wird
+            quality_scores: Optionale Qualitätsscores (1-5) je Dimension für jeden
+                            Vorschlag zum Nachtraining des Qualitätskopfs
+                            
         Returns:
-            Dictionary mit Trainingsergebnissen
+            Dictionary mit Trainingsergebnissen ("training_stats" mit Verlust,
+            Beispielen/s und Spitzenspeicher pro Epoche, "quality_head_stale" und
+            ggf. "quality_results" des Nachtrainings)
         """
+        import torch
+        import torch.nn as nn
+        from proposal_models import ProposalDataset, ProposalCategorizer, DEVICE
+        from trainer import Trainer
+        
+        self._check_teacher_model()
+        
         # Konvertierung der Labels zu One-Hot-Encoding
         y = self.mlb.transform(labels)
         
-        # Erstellung des Datasets und DataLoaders
+        # Erstellung des Datasets (einmalig tokenisiert) und DataLoaders
         dataset = ProposalDataset(texts, y, self.preprocessor)
-        dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
+        dataloader = self._training_dataloader(dataset, batch_size, bucket_sizes, num_workers, group_by_length)
         
         # Initialisierung des Modells
-        model = ProposalCategorizer(self.num_categories)
+        model = ProposalCategorizer(self.num_categories, exit_layers=exit_layers)
         model.to(DEVICE)
         
-        # Optimierer und Verlustfunktion
-        optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate)
+        # Verlustfunktion (gemittelt über End- und Zwischenklassifikatoren)
         criterion = nn.BCEWithLogitsLoss()
         
-        # Training
-        model.train()
-        training_stats = []
+        def loss_fn(model, batch):
+            logits, exit_logits = model(batch["input_ids"], batch["attention_mask"], return_exits=True)
+            loss = sum(criterion(head_logits.float(), batch["labels"]) for head_logits in [logits] + exit_logits)
+            return loss / (1 + len(exit_logits))
         
-        for epoch in range(num_epochs):
-            epoch_loss = 0.0
-            
-            for batch in dataloader:
-                # Verschieben der Tensoren auf das Gerät
-                input_ids = batch["input_ids"].to(DEVICE)
-                attention_mask = batch["attention_mask"].to(DEVICE)
-                labels = batch["labels"].to(DEVICE)
-                
-                # Forward-Pass
-                optimizer.zero_grad()
-                logits = model(input_ids, attention_mask)
-                
-                # Berechnung des Verlusts
-                loss = criterion(logits, labels)
-                
-                # Backward-Pass und Optimierung
-                loss.backward()
-                optimizer.step()
-                
-                epoch_loss += loss.item()
-            
-            # Speichern der Trainingsstatistik
-            avg_epoch_loss = epoch_loss / len(dataloader)
-            training_stats.append({
-                "epoch": epoch + 1,
-                "avg_loss": avg_epoch_loss
-            })
-            
-            print(f"Epoch {epoch + 1}/{num_epochs}, Loss: {avg_epoch_loss:.4f}")
+        # Training
+        trainer = Trainer(
+            model, loss_fn, learning_rate, bf16=bf16, gradient_accumulation_steps=gradient_accumulation_steps,
+            gradient_checkpointing=gradient_checkpointing, compile_model=compile_model
+        )
+        training_stats = trainer.train(dataloader, num_epochs)
         
         # Speichern des Modells
         os.makedirs(MODEL_PATH, exist_ok=True)
         torch.save(model.state_dict(), os.path.join(MODEL_PATH, "categorizer.pt"))
         
-        # Aktualisierung des Modells im Processor
-        self.categorizer = model
+        # Aktualisierung des gemeinsamen Modells im Processor
+        self._update_model(model.state_dict())
+        results = {
+            "training_stats": training_stats,
+            "model_path": os.path.join(MODEL_PATH, "categorizer.pt")
+        }
+        
+        # Der Qualitätskopf wurde auf dem bisherigen Encoder trainiert
+        if quality_scores is not None:
+            results["quality_results"] = self.train_quality_evaluator(
+                texts, quality_scores, batch_size, num_epochs, learning_rate, bucket_sizes, num_workers,
+                group_by_length, bf16, gradient_accumulation_steps, gradient_checkpointing, compile_model
+            )
+        else:
+            warnings.warn(
+                "Der Encoder des gemeinsamen Modells wurde ersetzt; der Qualitätskopf ist veraltet "
+                "und muss mit train_quality_evaluator nachtrainiert werden"
+            )
+        results["quality_head_stale"] = self.quality_head_stale
+        return results
+    
+    def train_exit_heads(self, texts: List[str], labels: Optional[List[List[str]]] = None,
+                         exit_layers: Optional[Sequence[int]] = None, batch_size: int = 32,
+                         num_epochs: int = 10, learning_rate: float = 1e-3,
+                         cache_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Trainiert Zwischenklassifikatoren für Early Exit nachträglich.
+        
+        Das gemeinsame Modell bleibt unverändert; die [CLS]-Vektoren der
+        Zwischenschichten werden einmal berechnet, im FeatureCache abgelegt und
+        nur die Köpfe trainiert. Ohne Labels lernen die Köpfe die
+        Wahrscheinlichkeiten des vollständigen Modells nachzubilden.
+        
+        Args:
+            texts: Liste von Vorschlagstexten
+            labels: Optionale Kategorielisten für jeden Vorschlag
+            exit_layers: Schichten mit Zwischenklassifikator (Standard: nach einem
+                         Viertel, der Hälfte und drei Vierteln der Schichten)
+            batch_size: Batch-Größe für das Training
+            num_epochs: Anzahl der Trainingsepochen
+            learning_rate: Lernrate
+            cache_dir: Verzeichnis für die Merkmale (Standard: MODEL_PATH/features)
+            
+        Returns:
+            Dictionary mit Trainingsergebnissen
+        """
+        import torch
+        import torch.nn as nn
+        from torch.utils.data import DataLoader
+        from feature_cache import FeatureCache, encoder_fingerprint
+        from tokenized_corpus import corpus_key
+        from trainer import Trainer
+        
+        self._check_teacher_model()
+        if labels is None and not self.models_loaded:
+            raise ValueError("Ohne Labels wird ein trainiertes Kategorisierungsmodell benötigt")
+        
+        model = self._fp32_model()
+        num_layers = model.bert.config.num_hidden_layers
+        if exit_layers is None:
+            exit_layers = sorted({max(1, num_layers * i // 4) for i in (1, 2, 3)} - {num_layers})
+        model.add_exit_heads(exit_layers)
+        model.eval()
+        
+        # [CLS]-Merkmale der Zwischenschichten aus dem Cache oder einmalig ohne Gradienten
+        cache = FeatureCache(cache_dir or os.path.join(MODEL_PATH, "features"))
+        key = corpus_key(texts, self.preprocessor.tokenizer, MAX_LENGTH)
+        encoder_key = f"{encoder_fingerprint(model)}-{self.precision}"
+        features = {layer: cache.load(key, encoder_key, layer) for layer in exit_layers}
+        missing = [layer for layer, values in features.items() if values is None]
+        input_ids = self._tokenize_cleaned(texts) if missing or labels is None else None
+        if missing:
+            computed = self._hidden_state_features(input_ids, missing, batch_size, model)
+            for layer in missing:
+                features[layer] = computed[layer]
+                cache.save(key, encoder_key, computed[layer], layer)
+        features = {layer: torch.from_numpy(values) for layer, values in features.items()}
+        
+        # Ziele: Labels oder die Wahrscheinlichkeiten des vollständigen Modells
+        if labels is None:
+            final_features = cache.load(key, encoder_key)
+            if final_features is None:
+                final_features = self._predict_batch(input_ids, batch_size, model=model)["embeddings"]
+                cache.save(key, encoder_key, final_features)
+            with torch.no_grad():
+                y = torch.sigmoid(model.classifier(torch.from_numpy(final_features).to(model.classifier.weight.device))).cpu()
+        else:
+            y = torch.tensor(self.mlb.transform(labels), dtype=torch.float)
+        
+        def collate(indices):
+            batch = {f"features_{layer}": values[indices] for layer, values in features.items()}
+            batch["labels"] = y[indices]
+            return batch
+        
+        dataloader = DataLoader(range(len(texts)), batch_size=batch_size, shuffle=True, collate_fn=collate)
+        
+        # Verlustfunktion: Mittel über alle Zwischenklassifikatoren
+        heads = {layer: model.exit_classifiers[str(layer)] for layer in exit_layers}
+        criterion = nn.BCEWithLogitsLoss()
+        
+        def loss_fn(model, batch):
+            return sum(
+                criterion(head(model.dropout(batch[f"features_{layer}"])), batch["labels"])
+                for layer, head in heads.items()
+            ) / len(heads)
+        
+        # Training (nur die Parameter der Zwischenklassifikatoren)
+        trainer = Trainer(
+            model, loss_fn, learning_rate,
+            parameters=[p for head in heads.values() for p in head.parameters()]
+        )
+        training_stats = trainer.train(dataloader, num_epochs)
+        
+        self._replace_model(model)
         
         return {
             "training_stats": training_stats,
-            "model_path": os.path.join(MODEL_PATH, "categorizer.pt")
+            "model_path": os.path.join(MODEL_PATH, "multihead.pt"),
+            "exit_layers": model.exit_layers,
+            "features_cached": not missing,
+            "features_paths": [cache.path(key, encoder_key, layer) for layer in exit_layers]
+        }
+    
+    def _hidden_state_features(self, input_ids: List[Sequence[int]], layers: Sequence[int],
+                               batch_size: int, model: ProposalMultiHeadModel) -> Dict[int, np.ndarray]:
+        """
+        Berechnet die [CLS]-Vektoren ausgewählter Encoder-Schichten in einem Durchlauf.
+        
+        Args:
+            input_ids: Ungepaddete Token-IDs je Text
+            layers: Schichten, deren [CLS]-Vektoren benötigt werden
+            batch_size: Anzahl der Texte pro Forward-Pass
+            model: PyTorch-Modell mit dem Encoder
+            
+        Returns:
+            Dictionary mit einer Merkmalsmatrix (Texte x Dimension) je Schicht
+            (in Eingabereihenfolge)
+        """
+        import torch
+        from proposal_models import DynamicPaddingCollator, DEVICE, precision_context
+        
+        collator = DynamicPaddingCollator(self.preprocessor.tokenizer.pad_token_id)
+        features = {
+            layer: np.zeros((len(input_ids), model.bert.config.hidden_size), dtype=np.float32)
+            for layer in layers
+        }
+        
+        for batch_indices in length_sorted_batches([len(ids) for ids in input_ids], batch_size):
+            tokenized = collator([{"input_ids": input_ids[i]} for i in batch_indices])
+            with torch.no_grad(), precision_context(self.precision):
+                outputs = model.bert(
+                    input_ids=tokenized["input_ids"].to(DEVICE),
+                    attention_mask=tokenized["attention_mask"].to(DEVICE),
+                    output_hidden_states=True
+                )
+            for layer in layers:
+                features[layer][batch_indices] = outputs.hidden_states[layer][:, 0, :].float().cpu().numpy()
+        
+        return features
+    
+    def train_heads(self, texts: List[str], labels: Optional[List[List[str]]] = None,
+                    quality_scores: Optional[List[List[float]]] = None, batch_size: int = 64,
+                    num_epochs: int = 20, learning_rate: float = 1e-3,
+                    cache_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Trainiert nur die Köpfe des gemeinsamen Modells auf zwischengespeicherten Encoder-Merkmalen.
+        
+        Der Encoder bleibt eingefroren. Seine [CLS]-Vektoren werden für das Korpus
+        einmal berechnet und im FeatureCache abgelegt; weitere Aufrufe mit demselben
+        Korpus und unverändertem Encoder trainieren nur noch die linearen Köpfe.
+        Weicht die Anzahl der Kategorien (categories.json) oder der
+        Qualitätsdimensionen vom Modell ab, wird der Kopf in neuer Größe angelegt.
+        
+        Args:
+            texts: Liste von Vorschlagstexten
+            labels: Optionale Kategorielisten für jeden Vorschlag (trainiert classifier)
+            quality_scores: Optionale Qualitätsscores (1-5) je Dimension für jeden
+                            Vorschlag (trainiert regressor)
+            batch_size: Batch-Größe für das Training
+            num_epochs: Anzahl der Trainingsepochen
+            learning_rate: Lernrate
+            cache_dir: Verzeichnis für die Merkmale (Standard: MODEL_PATH/features)
+            
+        Returns:
+            Dictionary mit Trainingsergebnissen
+        """
+        import torch
+        import torch.nn as nn
+        from torch.utils.data import DataLoader
+        from feature_cache import FeatureCache, encoder_fingerprint
+        from tokenized_corpus import corpus_key
+        from trainer import Trainer
+        
+        self._check_teacher_model()
+        if labels is None and quality_scores is None:
+            raise ValueError("Es müssen Kategorielabels oder Qualitätsscores angegeben werden")
+        
+        model = self._fp32_model()
+        model.eval()
+        
+        # Zielwerte; die Köpfe werden bei Bedarf an die neue Größe angepasst
+        targets = {}
+        if labels is not None:
+            targets["labels"] = torch.tensor(self.mlb.transform(labels), dtype=torch.float)
+            model.resize_heads(num_categories=self.num_categories)
+        if quality_scores is not None:
+            targets["scores"] = torch.tensor(np.array(quality_scores) / 5.0, dtype=torch.float)
+            model.resize_heads(num_dimensions=targets["scores"].shape[1])
+        
+        # [CLS]-Merkmale aus dem Cache oder einmalig mit dem eingefrorenen Encoder
+        cache = FeatureCache(cache_dir or os.path.join(MODEL_PATH, "features"))
+        key = corpus_key(texts, self.preprocessor.tokenizer, MAX_LENGTH)
+        encoder_key = f"{encoder_fingerprint(model)}-{self.precision}"
+        features = cache.load(key, encoder_key)
+        if features is None:
+            features = self._predict_batch(self._tokenize_cleaned(texts), batch_size, model=model)["embeddings"]
+            cache.save(key, encoder_key, features)
+        features = torch.from_numpy(features)
+        
+        def collate(indices):
+            return {"features": features[indices], **{name: values[indices] for name, values in targets.items()}}
+        
+        dataloader = DataLoader(range(len(texts)), batch_size=batch_size, shuffle=True, collate_fn=collate)
+        
+        # Verlustfunktion über die trainierten Köpfe
+        category_criterion = nn.BCEWithLogitsLoss()
+        quality_criterion = nn.MSELoss()
+        
+        def loss_fn(model, batch):
+            dropped_features = model.dropout(batch["features"])
+            loss = 0.0
+            if "labels" in batch:
+                loss = loss + category_criterion(model.classifier(dropped_features), batch["labels"])
+            if "scores" in batch:
+                loss = loss + quality_criterion(torch.sigmoid(model.regressor(dropped_features)), batch["scores"])
+            return loss
+        
+        # Training (nur die Parameter der Köpfe)
+        heads = []
+        if labels is not None:
+            heads.append(model.classifier)
+        if quality_scores is not None:
+            heads.append(model.regressor)
+        trainer = Trainer(model, loss_fn, learning_rate, parameters=[p for head in heads for p in head.parameters()])
+        training_stats = trainer.train(dataloader, num_epochs)
+        
+        # Der Qualitätskopf passt jetzt zum Encoder
+        if quality_scores is not None:
+            model.quality_head_stale = False
+        self._replace_model(model)
+        
+        return {
+            "training_stats": training_stats,
+            "model_path": os.path.join(MODEL_PATH, "multihead.pt"),
+            "features_cached": cache.hits > 0,
+            "features_path": cache.path(key, encoder_key)
         }
     
     def train_quality_evaluator(self, texts: List[str], quality_scores: List[List[float]],
                                batch_size: int = 16, num_epochs: int = 3,
-                               learning_rate: float = 2e-5) -> Dict[str, Any]:
+                               learning_rate: float = 2e-5,
+                               bucket_sizes: Optional[Sequence[int]] = None,
+                               num_workers: int = 0, group_by_length: bool = True,
+                               bf16: bool = False, gradient_accumulation_steps: int = 1,
+                               gradient_checkpointing: bool = False, compile_model: bool = False,
+                               freeze_encoder: bool = False, cache_dir: Optional[str] = None) -> Dict[str, Any]:
         """
-        Trainiert das Qualitätsbewertungsmodell.
+        Trainiert die Qualitätsbewertung des gemeinsamen Modells.
+        
+        Encoder und Regressionskopf des gemeinsamen Modells werden gemeinsam
+        feinjustiert. Der Kategorisierungskopf bleibt eingefroren; damit die
+        Kategorisierung zum veränderten Encoder passt, lernt das Modell zusätzlich
+        die Kategoriewahrscheinlichkeiten vor dem Training nachzubilden. Mit
+        freeze_encoder=True wird nur der Regressionskopf auf zwischengespeicherten
+        Encoder-Merkmalen trainiert (siehe train_heads). Ein als veraltet
+        markierter Qualitätskopf ist danach wieder aktuell.
         
         Args:
             texts: Liste von Vorschlagstexten
@@ -746,92 +2026,235 @@ class ProposalProcessor:
             batch_size: Batch-Größe für das Training
             num_epochs: Anzahl der Trainingsepochen
             learning_rate: Lernrate
-            
+            bucket_sizes: Optionale Bucket-Grenzen für das dynamische Padding
+            num_workers: Anzahl der DataLoader-Worker
+            group_by_length: Ob Batches aus Texten ähnlicher Länge gebildet werden
+            bf16: Ob unter bf16-Autocast trainiert wird (ohne native Unterstützung fp32)
+            gradient_accumulation_steps: Anzahl der Batches pro Optimierungsschritt
+                                         (effektive Batch-Größe: batch_size * Schritte)
+            gradient_checkpointing: Ob Encoder-Aktivierungen im Backward-Pass neu
+                                    berechnet werden (weniger Speicher bei langen Sequenzen)
+            compile_model: Ob das Modell mit torch.compile übersetzt wird
+            freeze_encoder: Ob nur der Regressionskopf trainiert wird (Encoder eingefroren)
+            cache_dir: Verzeichnis für die Encoder-Merkmale bei freeze_encoder
+                       (Standard: MODEL_PATH/features)
+                       
         Returns:
-            Dictionary mit Trainingsergebnissen
+            Dictionary mit Trainingsergebnissen ("training_stats" mit Verlust,
+            Beispielen/s und Spitzenspeicher pro Epoche)
         """
+        import torch
+        import torch.nn as nn
+        import torch.nn.functional as F
+        from proposal_models import ProposalDataset
+        from trainer import Trainer
+        
+        if freeze_encoder:
+            return self.train_heads(
+                texts, quality_scores=quality_scores, batch_size=batch_size, num_epochs=num_epochs,
+                learning_rate=learning_rate, cache_dir=cache_dir
+            )
+        
+        self._check_teacher_model()
+        
         # Konvertierung der Scores zu Numpy-Array und Skalierung auf [0, 1]
         y = np.array(quality_scores) / 5.0
         
-        # Erstellung eines eigenen Datasets und DataLoaders
-        class QualityDataset(Dataset):
-            def __init__(self, texts, scores, preprocessor):
-                self.texts = texts
-                self.scores = scores
-                self.preprocessor = preprocessor
-            
-            def __len__(self):
-                return len(self.texts)
-            
-            def __getitem__(self, idx):
-                text = self.texts[idx]
-                score = self.scores[idx]
-                
-                tokenized = self.preprocessor.tokenize_for_bert(text)
-                score_tensor = torch.tensor(score, dtype=torch.float)
-                
-                return {
-                    "input_ids": tokenized["input_ids"].squeeze(),
-                    "attention_mask": tokenized["attention_mask"].squeeze(),
-                    "scores": score_tensor
-                }
-        
-        dataset = QualityDataset(texts, y, self.preprocessor)
-        dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
+        model = self._fp32_model()
+        model.resize_heads(num_dimensions=y.shape[1])
         
-        # Initialisierung des Modells
-        model = ProposalQualityEvaluator()
-        model.to(DEVICE)
+        # Erstellung des Datasets (einmalig tokenisiert); ein trainierter Kategorisierungskopf
+        # liefert seine bisherigen Wahrscheinlichkeiten als zusätzliches Ziel
+        dataset = ProposalDataset(texts, y, self.preprocessor, label_key="scores")
+        if self.models_loaded:
+            input_ids = [dataset.corpus[i] for i in range(len(dataset))]
+            dataset.extra_labels["category_targets"] = self._predict_batch(
+                input_ids, batch_size, bucket_sizes, model=model
+            )["category_probabilities"]
+        dataloader = self._training_dataloader(dataset, batch_size, bucket_sizes, num_workers, group_by_length)
         
-        # Optimierer und Verlustfunktion
-        optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate)
+        # Verlustfunktion
         criterion = nn.MSELoss()
         
-        # Training
-        model.train()
-        training_stats = []
+        def loss_fn(model, batch):
+            outputs = model(batch["input_ids"], batch["attention_mask"])
+            loss = criterion(outputs["quality_scores"].float(), batch["scores"])
+            if "category_targets" in batch:
+                loss = loss + F.binary_cross_entropy_with_logits(
+                    outputs["category_logits"].float(), batch["category_targets"]
+                )
+            return loss
+        
+        # Training von Encoder und Regressionskopf (Kategorisierungsköpfe eingefroren)
+        trainer = Trainer(
+            model, loss_fn, learning_rate,
+            parameters=[
+                p for name, p in model.named_parameters()
+                if not name.startswith(("classifier.", "exit_classifiers."))
+            ],
+            bf16=bf16, gradient_accumulation_steps=gradient_accumulation_steps,
+            gradient_checkpointing=gradient_checkpointing, compile_model=compile_model
+        )
+        training_stats = trainer.train(dataloader, num_epochs)
+        
+        # Speichern des Modells (quality_evaluator.pt im Format von ProposalQualityEvaluator)
+        os.makedirs(MODEL_PATH, exist_ok=True)
+        model_path = os.path.join(MODEL_PATH, "quality_evaluator.pt")
+        torch.save(
+            {k: v for k, v in model.state_dict().items() if k.startswith(("bert.", "regressor."))},
+            model_path
+        )
         
-        for epoch in range(num_epochs):
-            epoch_loss = 0.0
+        # Der Qualitätskopf passt jetzt zum Encoder
+        model.quality_head_stale = False
+        self._replace_model(model)
+        
+        return {
+            "training_stats": training_stats,
+            "model_path": model_path
+        }
+    
+    def train_distilled(self, texts: List[str], num_layers: int = 6, hidden_size: Optional[int] = None,
+                        batch_size: int = 16, num_epochs: int = 3, learning_rate: float = 5e-5,
+                        temperature: float = 2.0, loss_weights: Optional[Dict[str, float]] = None,
+                        validation_texts: Optional[List[str]] = None,
+                        model_file: str = "student.pt") -> Dict[str, Any]:
+        """
+        Destilliert das gemeinsame Modell (Lehrer) in ein kleineres Schülermodell.
+        
+        Der Schüler lernt die Kategorie-Logits (weiche Ziele mit Temperatur), die
+        Qualitätsscores und die [CLS]-Einbettungen des Lehrers nachzubilden. Labels
+        werden nicht benötigt. Der Checkpoint lässt sich mit
+        ProposalProcessor(model_file=...) anstelle des Lehrers laden.
+        
+        Args:
+            texts: Unbeschriftete Vorschlagstexte für die Destillation
+            num_layers: Anzahl der Transformer-Schichten des Schülers
+            hidden_size: Breite des Schülers (Standard: wie beim Lehrer)
+            batch_size: Batch-Größe für das Training
+            num_epochs: Anzahl der Trainingsepochen
+            learning_rate: Lernrate
+            temperature: Temperatur für die weichen Kategorieziele
+            loss_weights: Gewichte der Verluste "categories", "quality" und "embeddings"
+            validation_texts: Zurückgehaltene Texte für den Vergleich mit dem Lehrer
+                              (Standard: die Trainingstexte)
+            model_file: Dateiname des Schüler-Checkpoints in MODEL_PATH
             
-            for batch in dataloader:
-                # Verschieben der Tensoren auf das Gerät
-                input_ids = batch["input_ids"].to(DEVICE)
-                attention_mask = batch["attention_mask"].to(DEVICE)
-                scores = batch["scores"].to(DEVICE)
-                
-                # Forward-Pass
-                optimizer.zero_grad()
-                predicted_scores = model(input_ids, attention_mask)
-                
-                # Berechnung des Verlusts
-                loss = criterion(predicted_scores, scores)
-                
-                # Backward-Pass und Optimierung
-                loss.backward()
-                optimizer.step()
-                
-                epoch_loss += loss.item()
+        Returns:
+            Dictionary mit Trainingsergebnissen und "report" (Geschwindigkeit und
+            Übereinstimmung von Lehrer und Schüler, siehe _distillation_metrics)
+        """
+        import torch
+        import torch.nn.functional as F
+        from torch.utils.data import DataLoader
+        from proposal_models import build_student, DynamicPaddingCollator
+        from trainer import Trainer
+        
+        self._check_teacher_model()
+        if not self.models_loaded:
+            raise ValueError("Lehrermodell nicht geladen")
+        
+        weights = {"categories": 1.0, "quality": 1.0, "embeddings": 1.0}
+        weights.update(loss_weights or {})
+        
+        teacher = self._fp32_model()
+        teacher.eval()
+        student = build_student(teacher, num_layers, hidden_size)
+        
+        # Ungepaddete Token-IDs; gepaddet wird pro Batch im Collator
+        dataset = [{"input_ids": ids} for ids in self._tokenize_cleaned(texts)]
+        collator = DynamicPaddingCollator(self.preprocessor.tokenizer.pad_token_id)
+        dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=True, collate_fn=collator)
+        
+        def loss_fn(student, batch):
+            # Ziele des Lehrers
+            with torch.no_grad():
+                targets = teacher(batch["input_ids"], batch["attention_mask"])
             
-            # Speichern der Trainingsstatistik
-            avg_epoch_loss = epoch_loss / len(dataloader)
-            training_stats.append({
-                "epoch": epoch + 1,
-                "avg_loss": avg_epoch_loss
-            })
+            outputs = student(batch["input_ids"], batch["attention_mask"])
             
-            print(f"Epoch {epoch + 1}/{num_epochs}, Loss: {avg_epoch_loss:.4f}")
+            # Weiche Kategorieziele (Multi-Label), skaliert mit T², Qualität als Regression,
+            # Einbettungen über die Kosinus-Distanz
+            category_loss = F.binary_cross_entropy_with_logits(
+                outputs["category_logits"].float() / temperature,
+                torch.sigmoid(targets["category_logits"].float() / temperature)
+            ) * temperature ** 2
+            quality_loss = F.mse_loss(outputs["quality_scores"].float(), targets["quality_scores"].float())
+            embedding_loss = 1 - F.cosine_similarity(
+                outputs["embeddings"].float(), targets["embeddings"].float()
+            ).mean()
+            
+            return (
+                weights["categories"] * category_loss +
+                weights["quality"] * quality_loss +
+                weights["embeddings"] * embedding_loss
+            )
         
-        # Speichern des Modells
-        os.makedirs(MODEL_PATH, exist_ok=True)
-        torch.save(model.state_dict(), os.path.join(MODEL_PATH, "quality_evaluator.pt"))
+        # Training
+        training_stats = Trainer(student, loss_fn, learning_rate).train(dataloader, num_epochs)
         
-        # Aktualisierung des Modells im Processor
-        self.quality_evaluator = model
+        # Speichern des Schülers mit seiner Architektur
+        os.makedirs(MODEL_PATH, exist_ok=True)
+        model_path = os.path.join(MODEL_PATH, model_file)
+        torch.save(student.student_checkpoint(), model_path)
+        
+        # Vergleich von Lehrer und Schüler auf den zurückgehaltenen Texten
+        input_ids = self._tokenize_cleaned(validation_texts or texts)
+        reference = self._predict_batch(input_ids, batch_size, model=teacher)
+        report = [
+            dict(self._distillation_metrics(teacher, input_ids, reference), model="teacher"),
+            dict(self._distillation_metrics(student, input_ids, reference), model=model_file)
+        ]
         
         return {
             "training_stats": training_stats,
-            "model_path": os.path.join(MODEL_PATH, "quality_evaluator.pt")
+            "model_path": model_path,
+            "report": report
+        }
+    
+    def _distillation_metrics(self, model: ProposalMultiHeadModel, input_ids: List[List[int]],
+                              reference: Dict[str, np.ndarray], batch_size: int = 32,
+                              num_latency_samples: int = 32) -> Dict[str, float]:
+        """
+        Misst Geschwindigkeit und Übereinstimmung eines Modells mit Referenzvorhersagen.
+        
+        Args:
+            model: Zu messendes Modell
+            input_ids: Ungepaddete Token-IDs der Vergleichstexte
+            reference: Vorhersagen des Lehrers (siehe _predict_batch)
+            batch_size: Batch-Größe für die Durchsatzmessung
+            num_latency_samples: Anzahl der Einzeltexte für die Latenzmessung
+            
+        Returns:
+            Dictionary mit "parameters_m", "latency_ms" (Median, ein Text), "throughput"
+            (Texte/s), "top1_agreement", "label_agreement" (Schwellenwert 0.5),
+            "probability_mae", "quality_mae" (Skala 1–5) und "embedding_cosine"
+        """
+        latencies = []
+        for ids in input_ids[:num_latency_samples]:
+            start = time.perf_counter()
+            self._predict_batch([ids], 1, model=model)
+            latencies.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        predictions = self._predict_batch(input_ids, batch_size, model=model)
+        throughput = len(input_ids) / (time.perf_counter() - start)
+        
+        probabilities = predictions["category_probabilities"]
+        reference_probabilities = reference["category_probabilities"]
+        embedding_cosine = np.sum(
+            normalize_rows(predictions["embeddings"]) * normalize_rows(reference["embeddings"]), axis=1
+        )
+        
+        return {
+            "parameters_m": sum(p.numel() for p in model.parameters()) / 1e6,
+            "latency_ms": 1000 * float(np.median(latencies)),
+            "throughput": throughput,
+            "top1_agreement": float(np.mean(probabilities.argmax(axis=1) == reference_probabilities.argmax(axis=1))),
+            "label_agreement": float(np.mean(np.all((probabilities >= 0.5) == (reference_probabilities >= 0.5), axis=1))),
+            "probability_mae": float(np.abs(probabilities - reference_probabilities).mean()),
+            "quality_mae": float(4 * np.abs(predictions["quality_scores"] - reference["quality_scores"]).mean()),
+            "embedding_cosine": float(embedding_cosine.mean())
         }
 
 # Beispiel für die Verwendung
@@ -860,14 +2283,11 @@ if __name__ == "__main__":
         [3.8, 3.2, 4.3, 3.9]
     ]
     
-    # Training des Kategorisierungsmodells
+    # Training des Kategorisierungsmodells; der Qualitätskopf wird anschließend
+    # auf dem neuen Encoder trainiert
     categorizer_results = processor.train_categorizer(
-        example_proposals, example_categories, batch_size=2, num_epochs=2
-    )
-    
-    # Training des Qualitätsbewertungsmodells
-    quality_results = processor.train_quality_evaluator(
-        example_proposals, example_quality_scores, batch_size=2, num_epochs=2
+        example_proposals, example_categories, batch_size=2, num_epochs=2,
+        quality_scores=example_quality_scores
     )
     
     # Verarbeitung eines neuen Vorschlags
@@ -0,0 +1,393 @@
+"""
+Spaltenorientierte Vorschlagsdaten für Sortierung, Clustering und Empfehlungen
+
+ProposalSorter, ProposalClusterer und ProposalRecommender arbeiteten auf Listen
+von Dictionaries: Jeder Aufruf wiederholte verschachtelte Zugriffe wie
+proposal.get("quality", {}).get(...), parste 'created_at' erneut und kopierte
+Dictionaries. ProposalTable legt die benötigten Felder einmalig in NumPy-Spalten ab:
+
+- Zeitstempel als datetime64[us] (naive Ortszeit wie datetime.now(), NaT für
+  fehlende oder nicht lesbare Werte)
+- Kategorien und Ministerien als Codes in ein gemeinsames Vokabular (-1 für fehlend),
+  mehrwertige Kategorienfelder als Offsets und Codes (CodeLists)
+- Qualitätsdimensionen und Stimmen als float64 (NaN für fehlend)
+- optional eine Einbettungsmatrix (eine Zeile pro Vorschlag)
+
+Alle drei Klassen akzeptieren statt der Liste eine ProposalTable. Die Tabelle
+enthält nur diese Felder; weitere Felder eines Vorschlags lassen sich über 'ids'
+zuordnen.
+"""
+
+import warnings
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Any, Iterable, Union
+
+import numpy as np
+
+# Wert für fehlende Zeitstempel
+NOT_A_TIME = np.datetime64("NaT", "us")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def parse_created_at(value: Any) -> np.datetime64:
+    """
+    Wandelt ein Erstellungsdatum in einen Zeitstempel um.
+    
+    Zeitstempel mit Zeitzone werden in die naive Ortszeit umgerechnet, damit sie mit
+    datetime.now() vergleichbar sind.
+    
+    Args:
+        value: ISO-Zeichenkette (auch mit 'Z'), datetime oder None
+        
+    Returns:
+        Zeitstempel als datetime64[us] (NaT, falls fehlend oder nicht lesbar)
+    """
+    return np.datetime64(_microseconds(value), "us")
+
+
+def parse_created_at_column(values: List[Any]) -> np.ndarray:
+    """
+    Wandelt eine Liste von Erstellungsdaten in eine Spalte um (wie parse_created_at).
+    
+    Naive ISO-Zeichenketten (der Regelfall) parst NumPy in einem Schritt. Enthält die
+    Liste andere Werte (Zeitzonenangaben, datetime-Objekte, ungültige Angaben), wird
+    jeder Wert einzeln umgewandelt.
+    
+    Args:
+        values: Erstellungsdaten (None für fehlend)
+        
+    Returns:
+        Zeitstempel als datetime64[us]
+    """
+    if all(value is None or isinstance(value, str) for value in values):
+        with warnings.catch_warnings():
+            # NumPy warnt bei Zeitzonenangaben und würde sie als UTC lesen
+            warnings.simplefilter("error")
+            try:
+                return np.array(values, dtype="datetime64[us]")
+            except (ValueError, Warning):
+                pass
+    
+    return np.array([_microseconds(value) for value in values], dtype=np.int64).view("datetime64[us]")
+
+
+def _microseconds(value: Any) -> int:
+    """Mikrosekunden seit 1970 in naiver Ortszeit (NaT als kleinster int64-Wert)."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return np.iinfo(np.int64).min
+    if not isinstance(value, datetime):
+        return np.iinfo(np.int64).min
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class CodeLists:
+    """Mehrwertige kategoriale Spalte: Codes aller Zeilen hintereinander, getrennt durch Offsets."""
+    
+    def __init__(self, offsets: np.ndarray, codes: np.ndarray):
+        """
+        Initialisiert die Spalte.
+        
+        Args:
+            offsets: Startpositionen der Zeilen in codes (Länge Zeilen + 1)
+            codes: Codes aller Zeilen
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.codes = np.asarray(codes, dtype=np.int32)
+    
+    @classmethod
+    def from_lists(cls, lists: List[Iterable[int]]) -> "CodeLists":
+        """Erzeugt die Spalte aus einer Liste von Code-Listen."""
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum(np.array([len(codes) for codes in lists], dtype=np.int64), out=offsets[1:])
+        codes = np.fromiter((code for codes in lists for code in codes), dtype=np.int32, count=int(offsets[-1]))
+        return cls(offsets, codes)
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def row(self, i: int) -> np.ndarray:
+        """Codes der Zeile i."""
+        return self.codes[self.offsets[i]:self.offsets[i + 1]]
+    
+    def row_indices(self) -> np.ndarray:
+        """Zeilennummer zu jedem Eintrag von codes."""
+        return np.repeat(np.arange(len(self)), np.diff(self.offsets))
+    
+    def take(self, indices: np.ndarray) -> "CodeLists":
+        """Wählt Zeilen aus (auch umsortiert oder mehrfach)."""
+        starts = self.offsets[:-1][indices]
+        lengths = self.offsets[1:][indices] - starts
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return CodeLists(offsets, self.codes[positions])
+
+
+class ProposalTable:
+    """Spaltenorientierte Vorschlagsdaten (siehe Moduldokumentation)."""
+    
+    def __init__(self, ids: np.ndarray, titles: np.ndarray, texts: np.ndarray, created_at: np.ndarray,
+                 votes: np.ndarray, quality: Dict[str, np.ndarray], primary_categories: np.ndarray,
+                 secondary_categories: CodeLists, has_secondary: np.ndarray, categories: CodeLists,
+                 primary_ministries: np.ndarray, category_names: List[str], ministry_names: List[str],
+                 embeddings: Optional[np.ndarray] = None):
+        """
+        Initialisiert die Tabelle aus fertigen Spalten (siehe from_dicts).
+        
+        Args:
+            ids: IDs der Vorschläge (object)
+            titles: Titel (object, None für fehlend)
+            texts: Texte aus 'text', sonst 'content' (object)
+            created_at: Erstellungszeitpunkte (datetime64[us], NaT für fehlend)
+            votes: Stimmen (float64, NaN für fehlend)
+            quality: Qualitätsdimension -> Werte (float64, NaN für fehlend)
+            primary_categories: Codes der primären Kategorie (-1 für fehlend)
+            secondary_categories: Codes aus 'secondary_categories'
+            has_secondary: Ob 'secondary_categories' vorhanden war
+            categories: Codes aus 'categories' (Liste oder Schlüssel eines Dictionaries)
+            primary_ministries: Codes des primären Ministeriums (-1 für fehlend)
+            category_names: Vokabular der Kategorien-Codes
+            ministry_names: Vokabular der Ministeriums-Codes
+            embeddings: Optional Einbettungsmatrix (eine Zeile pro Vorschlag)
+        """
+        if embeddings is not None and len(embeddings) != len(ids):
+            raise ValueError(
+                f"Anzahl der Einbettungen ({len(embeddings)}) passt nicht zur Anzahl der Vorschläge ({len(ids)})"
+            )
+        
+        self.ids = ids
+        self.titles = titles
+        self.texts = texts
+        self.created_at = created_at
+        self.votes = votes
+        self.quality = quality
+        self.primary_categories = primary_categories
+        self.secondary_categories = secondary_categories
+        self.has_secondary = has_secondary
+        self.categories = categories
+        self.primary_ministries = primary_ministries
+        self.category_names = category_names
+        self.ministry_names = ministry_names
+        self.embeddings = embeddings
+        
+        # Zuordnung ID -> Zeile (wird bei Bedarf angelegt)
+        self._positions = None
+    
+    @classmethod
+    def from_dicts(cls, proposals: List[Dict[str, Any]],
+                   embeddings: Optional[np.ndarray] = None) -> "ProposalTable":
+        """
+        Erzeugt die Tabelle aus einer Liste von Vorschlagsdaten.
+        
+        Args:
+            proposals: Liste von Vorschlagsdaten im bisherigen Format
+            embeddings: Optional Einbettungsmatrix (eine Zeile pro Vorschlag)
+            
+        Returns:
+            ProposalTable
+        """
+        n = len(proposals)
+        category_codes = {}
+        ministry_codes = {}
+        
+        def code(vocabulary: Dict[Any, int], label: Any) -> int:
+            return vocabulary.setdefault(label, len(vocabulary))
+        
+        # Jede Spalte wird in einem eigenen Durchlauf gesammelt und in einem Schritt umgewandelt
+        ids = [proposal.get("id", "") for proposal in proposals]
+        titles = [proposal.get("title") for proposal in proposals]
+        texts = [proposal["text"] if "text" in proposal else proposal.get("content", "") for proposal in proposals]
+        created_at = parse_created_at_column([proposal.get("created_at") for proposal in proposals])
+        votes = np.array([proposal.get("votes", np.nan) for proposal in proposals], dtype=np.float64)
+        
+        qualities = [proposal.get("quality") or {} for proposal in proposals]
+        dimensions = set()
+        for values in qualities:
+            dimensions.update(values)
+        quality = {}
+        for dimension in sorted(dimensions):
+            values = [values.get(dimension, np.nan) for values in qualities]
+            try:
+                quality[dimension] = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                # Nicht numerische Angaben werden wie fehlende behandelt
+                quality[dimension] = np.array([
+                    value if isinstance(value, (int, float, np.number)) else np.nan for value in values
+                ], dtype=np.float64)
+        
+        primary_categories = np.array([
+            code(category_codes, proposal["primary_category"]) if "primary_category" in proposal else -1
+            for proposal in proposals
+        ], dtype=np.int32)
+        primary_ministries = np.array([
+            code(ministry_codes, proposal["primary_ministry"]) if "primary_ministry" in proposal else -1
+            for proposal in proposals
+        ], dtype=np.int32)
+        
+        has_secondary = np.array(["secondary_categories" in proposal for proposal in proposals], dtype=bool)
+        secondary_categories = CodeLists.from_lists([
+            [code(category_codes, category) for category in proposal["secondary_categories"]]
+            if "secondary_categories" in proposal else ()
+            for proposal in proposals
+        ])
+        
+        # 'categories' als Liste oder als Dictionary (Kategorie -> Score)
+        categories = CodeLists.from_lists([
+            [code(category_codes, category) for category in proposal["categories"]]
+            if isinstance(proposal.get("categories"), (list, dict)) else ()
+            for proposal in proposals
+        ])
+        
+        return cls(
+            np.fromiter(ids, dtype=object, count=n), np.fromiter(titles, dtype=object, count=n),
+            np.fromiter(texts, dtype=object, count=n), created_at, votes, quality, primary_categories,
+            secondary_categories, has_secondary, categories, primary_ministries,
+            list(category_codes), list(ministry_codes), None if embeddings is None else np.asarray(embeddings)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __getitem__(self, key: Union[int, slice, np.ndarray]) -> Union[Dict[str, Any], "ProposalTable"]:
+        """Einzelne Zeile als Dictionary (Ganzzahl) oder Teiltabelle (Slice oder Indexarray)."""
+        if isinstance(key, (int, np.integer)):
+            return self.row(int(key))
+        if isinstance(key, slice):
+            key = np.arange(len(self))[key]
+        return self.take(np.asarray(key))
+    
+    def take(self, indices: np.ndarray) -> "ProposalTable":
+        """
+        Wählt Zeilen aus, ohne die übrigen Spalten zu kopieren.
+        
+        Args:
+            indices: Zeilennummern (auch umsortiert)
+            
+        Returns:
+            ProposalTable mit den ausgewählten Zeilen
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        return ProposalTable(
+            self.ids[indices], self.titles[indices], self.texts[indices], self.created_at[indices],
+            self.votes[indices], {dimension: values[indices] for dimension, values in self.quality.items()},
+            self.primary_categories[indices], self.secondary_categories.take(indices),
+            self.has_secondary[indices], self.categories.take(indices), self.primary_ministries[indices],
+            self.category_names, self.ministry_names,
+            None if self.embeddings is None else self.embeddings[indices]
+        )
+    
+    def row(self, i: int) -> Dict[str, Any]:
+        """
+        Gibt eine Zeile im bisherigen Dictionary-Format zurück.
+        
+        Fehlende Felder werden ausgelassen; 'created_at' ist eine ISO-Zeichenkette in Ortszeit.
+        
+        Args:
+            i: Zeilennummer
+            
+        Returns:
+            Dictionary mit den Vorschlagsdaten
+        """
+        proposal = {"id": self.ids[i], "text": self.texts[i]}
+        if self.titles[i] is not None:
+            proposal["title"] = self.titles[i]
+        if not np.isnat(self.created_at[i]):
+            proposal["created_at"] = self.created_at[i].astype(datetime).isoformat()
+        if not np.isnan(self.votes[i]):
+            proposal["votes"] = float(self.votes[i])
+        
+        quality = {
+            dimension: float(values[i]) for dimension, values in self.quality.items() if not np.isnan(values[i])
+        }
+        if quality:
+            proposal["quality"] = quality
+        
+        if self.primary_categories[i] >= 0:
+            proposal["primary_category"] = self.category_names[self.primary_categories[i]]
+        if self.has_secondary[i]:
+            proposal["secondary_categories"] = [self.category_names[c] for c in self.secondary_categories.row(i)]
+        categories = self.categories.row(i)
+        if len(categories):
+            proposal["categories"] = [self.category_names[c] for c in categories]
+        if self.primary_ministries[i] >= 0:
+            proposal["primary_ministry"] = self.ministry_names[self.primary_ministries[i]]
+        
+        return proposal
+    
+    def quality_column(self, dimension: str, default: float) -> np.ndarray:
+        """
+        Gibt eine Qualitätsdimension mit Standardwert für fehlende Angaben zurück.
+        
+        Args:
+            dimension: Name der Dimension (z.B. 'overall_quality')
+            default: Wert für Vorschläge ohne diese Dimension
+            
+        Returns:
+            Werte als float64
+        """
+        values = self.quality.get(dimension)
+        if values is None:
+            return np.full(len(self), float(default))
+        return np.where(np.isnan(values), default, values)
+    
+    def trend_categories(self, indices: Iterable[int]) -> List[str]:
+        """
+        Sammelt die Kategorien ausgewählter Zeilen wie beim Clustering: die primäre
+        Kategorie, sonst die Einträge von 'categories'.
+        
+        Args:
+            indices: Zeilennummern
+            
+        Returns:
+            Liste der Kategorien (mit Wiederholungen)
+        """
+        labels = []
+        for i in indices:
+            codes = [self.primary_categories[i]] if self.primary_categories[i] >= 0 else self.categories.row(i)
+            labels.extend(self.category_names[c] for c in codes)
+        return labels
+    
+    def count_categories_in(self, labels: Iterable[str]) -> np.ndarray:
+        """
+        Zählt pro Zeile die Kategorien, die in labels enthalten sind. Gezählt werden die
+        primäre Kategorie und die sekundären Kategorien (ohne 'secondary_categories'
+        die Einträge von 'categories'), Wiederholungen mehrfach.
+        
+        Args:
+            labels: Gesuchte Kategorien
+            
+        Returns:
+            Anzahl pro Zeile (int64)
+        """
+        labels = set(labels)
+        wanted = np.array([name in labels for name in self.category_names] + [False], dtype=bool)
+        
+        # Code -1 (fehlend) verweist auf den angehängten Eintrag False
+        counts = wanted[self.primary_categories].astype(np.int64)
+        for column, rows in ((self.secondary_categories, self.has_secondary),
+                             (self.categories, ~self.has_secondary)):
+            row_indices = column.row_indices()
+            hits = wanted[column.codes] & rows[row_indices]
+            counts += np.bincount(row_indices[hits], minlength=len(self))
+        return counts
+    
+    def positions(self, ids: Iterable[Any]) -> List[Optional[int]]:
+        """
+        Sucht die Zeilen zu IDs (verglichen als Zeichenketten).
+        
+        Args:
+            ids: Gesuchte IDs
+            
+        Returns:
+            Zeilennummer je ID bzw. None, falls nicht enthalten
+        """
+        if self._positions is None:
+            self._positions = {str(proposal_id): i for i, proposal_id in enumerate(self.ids)}
+        return [self._positions.get(str(proposal_id)) for proposal_id in ids]
@@ -0,0 +1,159 @@
+"""
+Versionierter Ergebnisspeicher für die Analyse von Vorschlägen
+
+Nach jedem Deployment oder Backfill wurden unveränderte Vorschläge erneut
+vollständig analysiert. ResultStore legt die Ergebnisse von
+ProposalProcessor.process_proposal in einer SQLite-Datei ab. Schlüssel ist
+das Paar (Hash des bereinigten Texts, Fingerabdruck von Modell und
+Konfiguration); der Fingerabdruck ändert sich mit den Gewichtsdateien in
+MODEL_PATH, den Kategorien und den Ministerien (siehe
+ProposalProcessor.result_fingerprint). Ergebnisse eines älteren Stands werden
+damit nicht mehr gefunden und lassen sich mit prune entfernen.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Optional, Any
+
+import numpy as np
+
+
+def json_default(value: Any) -> Any:
+    """Wandelt NumPy-Werte in den Ergebnissen für json.dumps um."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Typ {type(value).__name__} ist nicht JSON-serialisierbar")
+
+
+class ResultStore:
+    """SQLite-Speicher für Analyseergebnisse, versioniert nach Modell- und Konfigurationsstand."""
+    
+    def __init__(self, path: str = ":memory:"):
+        """
+        Öffnet den Ergebnisspeicher.
+        
+        Args:
+            path: Pfad der SQLite-Datei (":memory:" für einen flüchtigen Speicher)
+        """
+        self.path = path
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "text_hash TEXT NOT NULL, fingerprint TEXT NOT NULL, result TEXT NOT NULL, "
+            "PRIMARY KEY (text_hash, fingerprint))"
+        )
+        self._connection.commit()
+        
+        # Zähler für Treffer und Fehlschläge
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(cleaned_text: str) -> str:
+        """
+        Erzeugt den Schlüssel für einen bereinigten Text.
+        
+        Args:
+            cleaned_text: Mit TextPreprocessor.clean_text bereinigter Text
+            
+        Returns:
+            Hex-Digest des Texts
+        """
+        return hashlib.sha256(cleaned_text.encode("utf-8")).hexdigest()
+    
+    def get_many(self, keys: List[str], fingerprint: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Sucht gespeicherte Ergebnisse.
+        
+        Args:
+            keys: Schlüssel der Texte (siehe make_key)
+            fingerprint: Aktueller Modell- und Konfigurationsstand
+            
+        Returns:
+            Liste mit Ergebnissen bzw. None für nicht gefundene Texte
+        """
+        found = {}
+        with self._lock:
+            # SQLite begrenzt die Anzahl der Parameter pro Abfrage
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT text_hash, result FROM results WHERE fingerprint = ? AND text_hash IN ({placeholders})",
+                    [fingerprint] + chunk
+                )
+                found.update(rows)
+            
+            results = [json.loads(found[key]) if key in found else None for key in keys]
+            self.hits += sum(result is not None for result in results)
+            self.misses += sum(result is None for result in results)
+        
+        return results
+    
+    def put_many(self, keys: List[str], fingerprint: str, results: List[Dict[str, Any]]) -> None:
+        """
+        Speichert Ergebnisse für den aktuellen Stand.
+        
+        Args:
+            keys: Schlüssel der Texte (siehe make_key)
+            fingerprint: Aktueller Modell- und Konfigurationsstand
+            results: Analyseergebnisse (eines pro Schlüssel)
+        """
+        rows = [
+            (key, fingerprint, json.dumps(result, ensure_ascii=False, default=json_default))
+            for key, result in zip(keys, results)
+        ]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO results (text_hash, fingerprint, result) VALUES (?, ?, ?)", rows
+            )
+            self._connection.commit()
+    
+    def prune(self, fingerprint: str) -> int:
+        """
+        Entfernt Ergebnisse anderer Modell- und Konfigurationsstände.
+        
+        Args:
+            fingerprint: Aktueller Stand, dessen Ergebnisse erhalten bleiben
+            
+        Returns:
+            Anzahl der entfernten Ergebnisse
+        """
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM results WHERE fingerprint != ?", (fingerprint,))
+            self._connection.commit()
+            return cursor.rowcount
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Gibt die Statistik des Speichers zurück.
+        
+        Returns:
+            Dictionary mit Einträgen, Treffern, Fehlschlägen und Trefferquote
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+    
+    def close(self) -> None:
+        """Schließt die Verbindung zur SQLite-Datei."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,93 @@
+"""Gemeinsame Testdaten für Sortierung, Tabellen und Rangliste sowie kleine Modelle und Pipelines ohne Netzwerkzugriff"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+import numpy as np
+
+CATEGORIES = ["Umwelt", "Verkehr", "Bildung", "Gesundheit"]
+
+# Vokabular des Offline-Tokenizers (kleingeschrieben wie bei einem uncased-Modell)
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + (
+    "die der das und im zur mehr neue stadt bus bahn schule klinik park radweg bäume "
+    "lehrer ärzte strom wind sonne steuer geld polizei daten netz"
+).split()
+
+def make_proposals(n, seed=0):
+    """Erzeugt Vorschlagsdaten mit allen Feldvarianten (fehlende Felder, 'content', Kategorien als Dictionary)"""
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    proposals = []
+    for i in range(n):
+        group = int(rng.integers(0, len(CATEGORIES)))
+        proposal = {"id": str(i), "title": f"Vorschlag {i}"}
+        proposal["text" if i % 3 else "content"] = f"Gruppe {group} Vorschlag {i}"
+        if i % 5:
+            created_at = now - timedelta(days=int(rng.integers(0, 40)), minutes=int(rng.integers(0, 1440)))
+            proposal["created_at"] = created_at.isoformat()
+        if i % 4:
+            proposal["quality"] = {
+                "overall_quality": float(rng.integers(1, 6)),
+                "relevance": float(rng.uniform(1, 5)),
+                "feasibility": float(rng.uniform(1, 5))
+            }
+        if i % 2:
+            proposal["votes"] = int(rng.integers(0, 300))
+        if i % 7:
+            proposal["primary_category"] = CATEGORIES[group]
+            proposal["primary_ministry"] = f"Ministerium {group % 2}"
+        if i % 3 == 1:
+            proposal["secondary_categories"] = [CATEGORIES[(group + 1) % len(CATEGORIES)]]
+        else:
+            proposal["categories"] = {CATEGORIES[group]: 0.9, CATEGORIES[(group + 2) % len(CATEGORIES)]: 0.4}
+        proposals.append(proposal)
+    return proposals
+
+def blank_pipeline(sentencizer=True):
+    """Leere deutsche spaCy-Pipeline mit regelbasierten POS-Tags, Entitäten und optionalem Sentencizer"""
+    import spacy
+    
+    nlp = spacy.blank("de")
+    if sentencizer:
+        nlp.add_pipe("sentencizer")
+    attribute_ruler = nlp.add_pipe("attribute_ruler")
+    attribute_ruler.add(patterns=[[{"LOWER": {"IN": ["bäume", "bahn"]}}]], attrs={"POS": "NOUN"})
+    attribute_ruler.add(patterns=[[{"IS_PUNCT": True}]], attrs={"POS": "PUNCT"})
+    entity_ruler = nlp.add_pipe("entity_ruler", name="ner")
+    entity_ruler.add_patterns([{"label": "LOC", "pattern": "Berlin"}, {"label": "ORG", "pattern": "Bahn"}])
+    return nlp
+
+def tiny_processor(test_case, num_hidden_layers=2, **kwargs):
+    """
+    Erzeugt einen ProposalProcessor mit kleinem zufälligem BERT-Encoder und Offline-Tokenizer.
+    
+    Tokenizer und Encoder werden erst beim ersten Zugriff über die gepatchten
+    from_pretrained-Aufrufe erzeugt; MODEL_PATH zeigt auf ein temporäres
+    Verzeichnis. Alle Patches werden mit dem Testfall aufgeräumt.
+    """
+    from transformers import BertConfig, BertModel, BertTokenizer
+    import proposal_processor
+    
+    temp_dir = tempfile.TemporaryDirectory()
+    test_case.addCleanup(temp_dir.cleanup)
+    vocab_file = os.path.join(temp_dir.name, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(VOCAB))
+    
+    config = BertConfig(
+        vocab_size=len(VOCAB), hidden_size=32, num_hidden_layers=num_hidden_layers,
+        num_attention_heads=4, intermediate_size=64
+    )
+    patchers = [
+        mock.patch.object(proposal_processor, "MODEL_PATH", temp_dir.name),
+        mock.patch("transformers.AutoTokenizer.from_pretrained",
+                   side_effect=lambda *args, **kw: BertTokenizer(vocab_file)),
+        mock.patch("proposal_models.AutoModel.from_pretrained",
+                   side_effect=lambda *args, **kw: BertModel(config))
+    ]
+    for patcher in patchers:
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+    
+    return proposal_processor.ProposalProcessor(load_models=False, **kwargs)
@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import numpy as np
+import torch
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from proposal_processor import QUALITY_DIMENSIONS
+from proposal_fixtures import tiny_processor
+
+class TestBatchInference(unittest.TestCase):
+    """Tests für die Batch-Inferenz im Vergleich zur Verarbeitung einzelner Texte"""
+    
+    def setUp(self):
+        """Test-Setup: Processor mit kleinem Modell und zufälligen, gespeicherten Köpfen"""
+        torch.manual_seed(0)
+        self.processor = tiny_processor(self)
+        model = self.processor.model
+        with torch.no_grad():
+            torch.nn.init.normal_(model.classifier.weight, std=1.0)
+            torch.nn.init.normal_(model.regressor.weight, std=1.0)
+        self.processor._replace_model(model)
+        
+        self.texts = [
+            "Mehr Bäume im Park",
+            "Neue Bahn und Bus zur Schule",
+            "Strom aus Wind und Sonne für die Stadt " * 5,
+            "Polizei",
+            "Lehrer und Ärzte für die Klinik"
+        ]
+    
+    def reference_category_scores(self, probabilities, threshold):
+        """Zuordnung pro Text wie vor der Vektorisierung (Kategorienreihenfolge, argmax als Rückfall)"""
+        category_scores = {
+            category: float(probability)
+            for category, probability in zip(self.processor.categories, probabilities)
+            if probability >= threshold
+        }
+        if not category_scores:
+            max_index = int(np.argmax(probabilities))
+            category_scores = {self.processor.categories[max_index]: float(probabilities[max_index])}
+        return category_scores
+    
+    def assertScoresEqual(self, actual, expected):
+        """Vergleicht Dictionaries einschließlich der Schlüsselreihenfolge"""
+        self.assertEqual(list(actual), list(expected))
+        for key in expected:
+            self.assertAlmostEqual(actual[key], expected[key], places=5)
+    
+    def test_category_scores(self):
+        """Testet Schwellenwert, argmax-Rückfall und Schlüsselreihenfolge von _category_scores"""
+        num_categories = self.processor.num_categories
+        probabilities = np.random.default_rng(0).uniform(0, 1, (20, num_categories)).astype(np.float32)
+        probabilities[0] = np.linspace(0.1, 0.4, num_categories)
+        probabilities[1] = 0.5
+        
+        for threshold in (0.3, 0.5, 0.9, 1.0):
+            scores = self.processor._category_scores(probabilities, threshold)
+            self.assertEqual(len(scores), len(probabilities))
+            for row, row_scores in zip(probabilities, scores):
+                self.assertScoresEqual(row_scores, self.reference_category_scores(row, threshold))
+        
+        # Keine Kategorie über dem Schwellenwert: nur die wahrscheinlichste
+        scores = self.processor._category_scores(probabilities, 0.5)
+        self.assertEqual(list(scores[0]), [self.processor.categories[-1]])
+        self.assertEqual(list(scores[1]), self.processor.categories)
+        
+        with self.assertRaises(ValueError):
+            self.processor._category_scores(probabilities[:, 1:], 0.5)
+    
+    def test_quality_scores(self):
+        """Testet die Skalierung auf [1, 5] und die Gesamtbewertung"""
+        scores = self.processor._quality_scores(np.array([[0.0, 0.5, 1.0, 0.25], [1.0, 1.0, 1.0, 1.0]]))
+        
+        expected = dict(zip(QUALITY_DIMENSIONS, [1.0, 3.0, 5.0, 2.0]))
+        expected["overall_quality"] = 2.75
+        self.assertScoresEqual(scores[0], expected)
+        self.assertEqual(scores[1]["overall_quality"], 5.0)
+    
+    def test_categorize_batch_matches_single(self):
+        """Testet, dass categorize_batch dieselben Ergebnisse liefert wie categorize pro Text"""
+        probabilities = self.processor._predict_batch(self.processor._tokenize_cleaned(self.texts))[
+            "category_probabilities"
+        ]
+        
+        for threshold in (0.5, float(np.median(probabilities)), 1.0):
+            batch = self.processor.categorize_batch(self.texts, threshold, batch_size=2)
+            for text, row, batch_scores in zip(self.texts, probabilities, batch):
+                self.assertScoresEqual(batch_scores, self.processor.categorize(text, threshold))
+                self.assertScoresEqual(batch_scores, self.reference_category_scores(row, threshold))
+        
+        # Mit unerreichbarem Schwellenwert erhält jeder Text genau eine Kategorie
+        self.assertTrue(all(len(scores) == 1 for scores in self.processor.categorize_batch(self.texts, 1.0)))
+    
+    def test_evaluate_quality_batch_matches_single(self):
+        """Testet, dass evaluate_quality_batch dieselben Ergebnisse liefert wie evaluate_quality pro Text"""
+        batch = self.processor.evaluate_quality_batch(self.texts, batch_size=2)
+        
+        self.assertEqual(len(batch), len(self.texts))
+        for text, batch_scores in zip(self.texts, batch):
+            self.assertScoresEqual(batch_scores, self.processor.evaluate_quality(text))
+            for dimension, score in batch_scores.items():
+                self.assertTrue(1.0 <= score <= 5.0, dimension)
+        
+        self.assertEqual(self.processor.categorize_batch([]), [])
+        self.assertEqual(self.processor.evaluate_quality_batch([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
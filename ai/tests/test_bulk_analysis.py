@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import csv
+import json
+import tempfile
+from unittest import mock
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from bulk_analysis import run_bulk_analysis, read_proposals, checkpoint_path
+
+class FakeProcessor:
+    """Ersatz für ProposalProcessor, der die verarbeiteten Texte protokolliert"""
+    
+    def __init__(self, fail_after=None):
+        self.texts = []
+        self.fail_after = fail_after
+    
+    def process_batch(self, texts, batch_size=32):
+        if self.fail_after is not None and len(self.texts) + len(texts) > self.fail_after:
+            raise RuntimeError("Abbruch")
+        self.texts.extend(texts)
+        return [
+            {"categories": {"Verkehr": 0.9}, "ministries": {}, "quality": {"overall_quality": 3.0},
+             "priority": len(text), "features": {"text_length": float(len(text))}, "processed_text": text}
+            for text in texts
+        ]
+
+class TestBulkAnalysis(unittest.TestCase):
+    """Tests für die Massenanalyse mit Checkpoints"""
+    
+    def setUp(self):
+        """Test-Setup: JSONL-Eingabe mit 25 Vorschlägen, davon einer ohne Text"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        
+        self.input_path = os.path.join(self.temp_dir.name, "vorschlaege.jsonl")
+        self.output_path = os.path.join(self.temp_dir.name, "ergebnisse.jsonl")
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            for i in range(25):
+                f.write(json.dumps({"id": f"v{i}", "text": "" if i == 7 else f"Vorschlag Nummer {i}"}) + "\n")
+    
+    def read_output(self):
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+    
+    def run_analysis(self, processor, **kwargs):
+        with mock.patch("builtins.print"):
+            return run_bulk_analysis(
+                processor, self.input_path, self.output_path, chunk_size=4, checkpoint_every=8, **kwargs
+            )
+    
+    def test_all_proposals_written(self):
+        """Testet, dass jeder Vorschlag mit Text genau einmal in der Ausgabe steht"""
+        stats = self.run_analysis(FakeProcessor())
+        results = self.read_output()
+        
+        self.assertEqual([r["id"] for r in results], [f"v{i}" for i in range(25) if i != 7])
+        self.assertEqual(results[0]["categories"], {"Verkehr": 0.9})
+        self.assertEqual((stats["processed"], stats["skipped"]), (25, 1))
+        
+        with open(checkpoint_path(self.output_path), "r", encoding="utf-8") as f:
+            self.assertTrue(json.load(f)["complete"])
+    
+    def test_resume_after_abort(self):
+        """Testet, dass ein abgebrochener Lauf ab dem letzten Checkpoint ohne Duplikate fortgesetzt wird"""
+        with self.assertRaises(RuntimeError):
+            self.run_analysis(FakeProcessor(fail_after=18))
+        
+        processor = FakeProcessor()
+        stats = self.run_analysis(processor)
+        
+        # Checkpoint nach 16 Datensätzen; die danach geschriebenen Ergebnisse werden neu erzeugt
+        self.assertEqual(stats["resumed_from"], 16)
+        self.assertEqual(processor.texts[0], "Vorschlag Nummer 16")
+        self.assertEqual([r["id"] for r in self.read_output()], [f"v{i}" for i in range(25) if i != 7])
+        self.assertEqual(stats["skipped"], 1)
+        
+        # Ohne Fortsetzen wird neu begonnen
+        processor = FakeProcessor()
+        self.run_analysis(processor, resume=False)
+        self.assertEqual(len(processor.texts), 24)
+        self.assertEqual(len(self.read_output()), 24)
+    
+    def test_checkpoint_of_other_input(self):
+        """Testet, dass ein Checkpoint einer geänderten Eingabedatei abgelehnt wird"""
+        self.run_analysis(FakeProcessor())
+        with open(self.input_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "neu", "text": "Neuer Vorschlag"}) + "\n")
+        
+        with self.assertRaises(ValueError):
+            self.run_analysis(FakeProcessor())
+    
+    def test_csv_input(self):
+        """Testet das Lesen von CSV-Dateien mit eigenem Textfeld und fehlenden Bezeichnern"""
+        csv_path = os.path.join(self.temp_dir.name, "vorschlaege.csv")
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["inhalt"])
+            writer.writerows([["Mehr Radwege"], ["Schulen sanieren, schnell"]])
+        
+        proposals = list(read_proposals(csv_path, text_field="inhalt", start=1))
+        self.assertEqual(proposals, [{"id": "1", "text": "Schulen sanieren, schnell"}])
+        
+        with self.assertRaises(ValueError):
+            list(read_proposals(os.path.join(self.temp_dir.name, "vorschlaege.txt")))
+
+if __name__ == '__main__':
+    unittest.main()
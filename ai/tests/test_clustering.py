@@ -0,0 +1,177 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from clustering import average_linkage_clusters, average_linkage_clusters_naive, StreamingClusterState
+from vector_index import normalize_rows
+from categorization_algorithms import ProposalClusterer
+from proposal_fixtures import tiny_processor
+
+class TestAverageLinkage(unittest.TestCase):
+    """Tests für das Average-Linkage-Clustering"""
+    
+    def setUp(self):
+        """Test-Setup: Ähnlichkeitsmatrix aus Einbettungen mit Gruppenstruktur"""
+        rng = np.random.default_rng(7)
+        centers = rng.normal(size=(6, 16))
+        labels = rng.integers(0, 6, size=80)
+        embeddings = normalize_rows(centers[labels] + 0.6 * rng.normal(size=(80, 16)))
+        self.similarity_matrix = embeddings @ embeddings.T
+        np.fill_diagonal(self.similarity_matrix, 1.0)
+    
+    def test_matches_naive(self):
+        """Testet, dass das Ergebnis dem bisherigen Verfahren entspricht"""
+        for threshold in (0.2, 0.5, 0.75, 0.9):
+            for min_cluster_size in (1, 2, 4):
+                expected = average_linkage_clusters_naive(self.similarity_matrix, threshold, min_cluster_size)
+                clusters = average_linkage_clusters(self.similarity_matrix, threshold, min_cluster_size)
+                self.assertEqual(clusters, expected)
+    
+    def test_copy(self):
+        """Testet, dass die Eingabematrix nur mit copy=False überschrieben wird"""
+        original = self.similarity_matrix.copy()
+        average_linkage_clusters(self.similarity_matrix, 0.5)
+        np.testing.assert_array_equal(self.similarity_matrix, original)
+        
+        working_copy = original.copy()
+        clusters = average_linkage_clusters(working_copy, 0.5, copy=False)
+        self.assertEqual(clusters, average_linkage_clusters(original, 0.5))
+    
+    def test_edge_cases(self):
+        """Testet leere und einelementige Eingaben"""
+        self.assertEqual(average_linkage_clusters(np.zeros((0, 0)), 0.5), [])
+        self.assertEqual(average_linkage_clusters(np.ones((1, 1)), 0.5), [[0]])
+        self.assertEqual(average_linkage_clusters(np.ones((1, 1)), 0.5, min_cluster_size=2), [])
+
+class TestStreamingClusterState(unittest.TestCase):
+    """Tests für den inkrementellen Clusterzustand"""
+    
+    def setUp(self):
+        """Test-Setup: Deutlich getrennte Gruppen von Einbettungen mit Vorschlagsdaten"""
+        rng = np.random.default_rng(3)
+        centers = rng.normal(size=(5, 32))
+        self.labels = rng.integers(0, 5, size=120)
+        self.embeddings = normalize_rows(centers[self.labels] + 0.2 * rng.normal(size=(120, 32)))
+        categories = ["Umwelt", "Verkehr", "Bildung", "Gesundheit", "Wirtschaft"]
+        self.proposals = [
+            {
+                "id": str(i),
+                "title": f"Vorschlag {i}",
+                "primary_category": categories[label],
+                "quality": {"overall_quality": 1.0 + label},
+                "created_at": f"2025-03-{1 + i % 28:02d}T10:00:00"
+            }
+            for i, label in enumerate(self.labels)
+        ]
+    
+    def test_matches_batch_clustering(self):
+        """Testet, dass das inkrementelle Clustering dem vollständigen Clustering entspricht"""
+        state = StreamingClusterState(32, similarity_threshold=0.6, maintenance_interval=0)
+        for start in range(0, 120, 25):
+            state.add(self.embeddings[start:start + 25], self.proposals[start:start + 25])
+        state.maintain()
+        
+        expected = average_linkage_clusters(self.embeddings @ self.embeddings.T, 0.6)
+        trends = state.trends(min_trend_size=1)
+        self.assertEqual(sorted(trend["proposal_indices"] for trend in trends), expected)
+        
+        for trend in trends:
+            label = self.labels[trend["proposal_indices"][0]]
+            self.assertEqual(trend["avg_quality"], 1.0 + label)
+            self.assertEqual(trend["representative_title"], f"Vorschlag {trend['proposal_indices'][0]}")
+            self.assertEqual(trend["created_at"], min(
+                self.proposals[i]["created_at"] for i in trend["proposal_indices"]
+            ))
+    
+    def test_split_and_merge(self):
+        """Testet die Wartung nach einer Änderung des Schwellenwerts"""
+        state = StreamingClusterState(32, similarity_threshold=-1.0, maintenance_interval=0)
+        state.add(self.embeddings, self.proposals)
+        self.assertEqual(state.n_clusters, 1)
+        
+        state.similarity_threshold = 0.6
+        state.maintain()
+        self.assertEqual(state.n_clusters, len(set(self.labels.tolist())))
+        
+        state.similarity_threshold = -1.0
+        state.maintain()
+        self.assertEqual(state.n_clusters, 1)
+    
+    def test_save_and_load(self):
+        """Testet Speichern und Laden des Zustands"""
+        state = StreamingClusterState(32, similarity_threshold=0.6, maintenance_interval=50)
+        state.add(self.embeddings[:100], self.proposals[:100])
+        
+        with tempfile.TemporaryDirectory() as path:
+            state.save(path)
+            restored = StreamingClusterState.load(path)
+        
+        self.assertEqual(restored.trends(1), state.trends(1))
+        
+        state.add(self.embeddings[100:], self.proposals[100:])
+        restored.add(self.embeddings[100:], self.proposals[100:])
+        self.assertEqual(restored.trends(1), state.trends(1))
+
+class TestSimilarityMatrix(unittest.TestCase):
+    """Tests für die Ähnlichkeitsmatrix des ProposalClusterer"""
+    
+    def setUp(self):
+        """Test-Setup: Clusterer mit kleinem Modell und Zähler für eingebettete Texte"""
+        processor = tiny_processor(self)
+        self.clusterer = ProposalClusterer(processor)
+        
+        # Ohne Embedding-Cache bettet jeder Aufruf alle Texte ein
+        self.clusterer.similarity_analyzer.cache = None
+        self.texts = [
+            "Mehr Bäume im Park", "Neue Bahn und Bus", "Lehrer für die Schule", "Radweg zur Klinik",
+            "Strom aus Wind und Sonne", "Polizei im Netz", "Mehr Bäume im Park", "Geld für die Stadt",
+            "Daten im Netz", "Neue Ärzte"
+        ]
+        
+        # Jeder Forward-Pass des Encoders zählt die Texte im Batch
+        self.embedded = 0
+        
+        def count(module, inputs, outputs):
+            self.embedded += outputs.last_hidden_state.shape[0]
+        
+        handle = processor.model.bert.register_forward_hook(count)
+        self.addCleanup(handle.remove)
+    
+    def test_blocked_and_out(self):
+        """Testet, dass blockweise Berechnung und vorab angelegte Matrix dasselbe Ergebnis liefern"""
+        n = len(self.texts)
+        expected = self.clusterer.compute_similarity_matrix(self.texts, batch_size=4)
+        self.assertEqual(self.embedded, n)
+        self.assertEqual(expected.dtype, np.float32)
+        np.testing.assert_array_equal(np.diag(expected), np.ones(n))
+        
+        embeddings = normalize_rows(self.clusterer.similarity_analyzer.get_embeddings(self.texts))
+        reference = embeddings @ embeddings.T
+        np.fill_diagonal(reference, 1.0)
+        np.testing.assert_allclose(expected, reference, atol=1e-6)
+        
+        for block_size in (1, 3, n, 2 * n):
+            self.embedded = 0
+            blocked = self.clusterer.compute_similarity_matrix(self.texts, batch_size=4, block_size=block_size)
+            self.assertEqual(self.embedded, n)
+            np.testing.assert_allclose(blocked, expected, atol=1e-6)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out = np.memmap(os.path.join(temp_dir, "similarity.npy"), dtype=np.float32, mode="w+", shape=(n, n))
+            self.embedded = 0
+            result = self.clusterer.compute_similarity_matrix(self.texts, block_size=3, out=out)
+            self.assertIs(result, out)
+            self.assertEqual(self.embedded, n)
+            np.testing.assert_allclose(np.asarray(out), expected, atol=1e-6)
+            del result, out
+        
+        self.assertEqual(self.clusterer.compute_similarity_matrix([]).shape, (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
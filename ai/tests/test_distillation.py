@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+from unittest import mock
+import torch
+from transformers import BertConfig, BertModel
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from proposal_models import ProposalMultiHeadModel, build_student
+
+class TestStudentModel(unittest.TestCase):
+    """Tests für den Aufbau und das Laden destillierter Schülermodelle"""
+    
+    def setUp(self):
+        """Test-Setup: Lehrermodell mit kleinem zufälligem BERT-Encoder statt gbert"""
+        torch.manual_seed(0)
+        config = BertConfig(
+            vocab_size=100, hidden_size=32, num_hidden_layers=4,
+            num_attention_heads=4, intermediate_size=64
+        )
+        with mock.patch("proposal_models.AutoModel.from_pretrained", return_value=BertModel(config)):
+            self.teacher = ProposalMultiHeadModel(num_categories=5).eval()
+        
+        self.input_ids = torch.randint(1, 100, (3, 12))
+        self.attention_mask = torch.ones_like(self.input_ids)
+    
+    def test_layers_copied_from_teacher(self):
+        """Testet, dass ein gleich breiter Schüler Einbettungen, Schichten und Köpfe des Lehrers übernimmt"""
+        student = build_student(self.teacher, num_layers=2)
+        
+        self.assertEqual(student.bert.config.num_hidden_layers, 2)
+        self.assertIsNone(student.embedding_projection)
+        
+        # Erste und letzte Schicht des Lehrers
+        for student_layer, teacher_layer in zip(student.bert.encoder.layer, (0, 3)):
+            for name, value in student_layer.state_dict().items():
+                torch.testing.assert_close(value, self.teacher.bert.encoder.layer[teacher_layer].state_dict()[name])
+        torch.testing.assert_close(student.classifier.weight, self.teacher.classifier.weight)
+    
+    def test_narrow_student_projects_embeddings(self):
+        """Testet, dass ein schmaler Schüler Einbettungen in der Dimension des Lehrers liefert"""
+        student = build_student(self.teacher, num_layers=1, hidden_size=16).eval()
+        
+        self.assertEqual(student.bert.config.hidden_size, 16)
+        self.assertEqual(student.bert.config.num_attention_heads, 2)
+        self.assertEqual(student.embedding_dim, self.teacher.embedding_dim)
+        
+        with torch.no_grad():
+            outputs = student(self.input_ids, self.attention_mask)
+        self.assertEqual(tuple(outputs["embeddings"].shape), (3, 32))
+        self.assertEqual(tuple(outputs["category_logits"].shape), (3, 5))
+        
+        with self.assertRaises(ValueError):
+            build_student(self.teacher, num_layers=1, hidden_size=20)
+        with self.assertRaises(ValueError):
+            build_student(self.teacher, num_layers=5)
+    
+    def test_checkpoint_roundtrip(self):
+        """Testet, dass ein Schüler ohne Kenntnis seiner Architektur geladen werden kann"""
+        student = build_student(self.teacher, num_layers=1, hidden_size=16).eval()
+        loaded = ProposalMultiHeadModel.from_student_checkpoint(student.student_checkpoint()).eval()
+        
+        with torch.no_grad():
+            expected = student(self.input_ids, self.attention_mask)
+            outputs = loaded(self.input_ids, self.attention_mask)
+        for name, value in expected.items():
+            torch.testing.assert_close(outputs[name], value)
+
+if __name__ == '__main__':
+    unittest.main()
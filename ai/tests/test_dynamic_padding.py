@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import torch
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from proposal_models import DynamicPaddingCollator
+from proposal_processor import MAX_LENGTH, LENGTH_BUCKETS
+from proposal_fixtures import tiny_processor
+
+class TestDynamicPadding(unittest.TestCase):
+    """Tests für dynamisches Padding und Längen-Buckets"""
+    
+    def setUp(self):
+        """Test-Setup: Kleines Modell, Offline-Tokenizer und unterschiedlich lange Texte"""
+        torch.manual_seed(0)
+        processor = tiny_processor(self)
+        self.tokenizer = processor.preprocessor.tokenizer
+        self.model = processor.model
+        
+        self.texts = [
+            "Mehr Bäume im Park",
+            "Neue Bahn und Bus zur Schule",
+            "Strom aus Wind und Sonne für die Stadt und mehr Radweg im Netz " * 4,
+            "Polizei"
+        ]
+        self.input_ids = self.tokenizer(self.texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+        
+        # Referenz: Padding aller Texte auf MAX_LENGTH
+        reference = self.tokenizer(
+            self.texts, padding="max_length", truncation=True, max_length=MAX_LENGTH, return_tensors="pt"
+        )
+        self.reference = self.predict(reference)
+    
+    def predict(self, tokenized):
+        """Führt das Modell auf einem gepaddeten Batch aus"""
+        with torch.no_grad():
+            return self.model(tokenized["input_ids"], tokenized["attention_mask"])
+    
+    def assertMatchesReference(self, tokenized):
+        """Vergleicht alle Modellausgaben mit der auf MAX_LENGTH gepaddeten Referenz"""
+        outputs = self.predict(tokenized)
+        for name in ("embeddings", "category_logits", "quality_scores"):
+            self.assertTrue(torch.allclose(outputs[name], self.reference[name], atol=1e-5), name)
+    
+    def test_longest_sequence(self):
+        """Testet Padding auf die längste Sequenz des Batches"""
+        tokenized = DynamicPaddingCollator(self.tokenizer.pad_token_id)(
+            [{"input_ids": ids} for ids in self.input_ids]
+        )
+        
+        lengths = [len(ids) for ids in self.input_ids]
+        self.assertEqual(tokenized["input_ids"].shape, (len(self.texts), max(lengths)))
+        self.assertEqual(tokenized["attention_mask"].sum(dim=1).tolist(), lengths)
+        self.assertMatchesReference(tokenized)
+    
+    def test_bucket_sizes(self):
+        """Testet Padding auf die nächste Bucket-Grenze"""
+        for bucket_sizes, expected_length in ((LENGTH_BUCKETS, 64), ((16, 32, 128), 128)):
+            tokenized = DynamicPaddingCollator(self.tokenizer.pad_token_id, bucket_sizes)(
+                [{"input_ids": ids} for ids in self.input_ids]
+            )
+            
+            self.assertEqual(tokenized["input_ids"].shape[1], expected_length)
+            self.assertMatchesReference(tokenized)
+        
+        # Weitere Felder werden unverändert gestapelt
+        tokenized = DynamicPaddingCollator(self.tokenizer.pad_token_id, LENGTH_BUCKETS)(
+            [{"input_ids": ids, "labels": torch.tensor([float(i)])} for i, ids in enumerate(self.input_ids)]
+        )
+        self.assertEqual(tokenized["labels"].squeeze(1).tolist(), [0.0, 1.0, 2.0, 3.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import sys
+import os
+from unittest import mock
+import numpy as np
+import torch
+from transformers import BertConfig, BertModel
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from proposal_models import ProposalMultiHeadModel
+from proposal_processor import ProposalProcessor
+from proposal_fixtures import tiny_processor
+
+class TestEarlyExit(unittest.TestCase):
+    """Tests für die Kategorisierung mit vorzeitigem Abbruch"""
+    
+    def setUp(self):
+        """Test-Setup: Modell mit kleinem zufälligem BERT-Encoder und Zwischenklassifikatoren"""
+        torch.manual_seed(0)
+        config = BertConfig(
+            vocab_size=100, hidden_size=32, num_hidden_layers=4,
+            num_attention_heads=4, intermediate_size=64
+        )
+        with mock.patch("proposal_models.AutoModel.from_pretrained", return_value=BertModel(config)):
+            self.model = ProposalMultiHeadModel(num_categories=5)
+        self.model.add_exit_heads([2, 1])
+        for head in self.model.exit_classifiers.values():
+            torch.nn.init.normal_(head.weight, std=0.5)
+        self.model.eval()
+        
+        # Unterschiedlich lange, gepaddete Sequenzen
+        self.input_ids = torch.randint(1, 100, (6, 12))
+        self.attention_mask = torch.ones_like(self.input_ids)
+        for i in range(1, 6):
+            self.attention_mask[i, 12 - 2 * i:] = 0
+        self.input_ids[self.attention_mask == 0] = 0
+        
+        with torch.no_grad():
+            outputs = self.model.bert(self.input_ids, self.attention_mask, output_hidden_states=True)
+            self.exit_logits = {
+                layer: self.model.exit_classifiers[str(layer)](outputs.hidden_states[layer][:, 0, :])
+                for layer in (1, 2)
+            }
+            self.full_logits = self.model(self.input_ids, self.attention_mask)["category_logits"]
+    
+    def categorize(self, margin):
+        """Führt die Kategorisierung mit vorzeitigem Abbruch aus"""
+        with torch.no_grad():
+            return self.model.categorize_early_exit(self.input_ids, self.attention_mask, margin=margin)
+    
+    def test_margin_bounds(self):
+        """Testet, dass Marge 0 nach der ersten Schicht und eine unerreichbare Marge nie abbricht"""
+        self.assertEqual(self.model.exit_layers, [1, 2])
+        
+        logits, layers = self.categorize(0.0)
+        self.assertEqual(layers.tolist(), [1] * 6)
+        torch.testing.assert_close(logits, self.exit_logits[1])
+        
+        logits, layers = self.categorize(1.0)
+        self.assertEqual(layers.tolist(), [4] * 6)
+        torch.testing.assert_close(logits, self.full_logits)
+    
+    def test_mixed_exits(self):
+        """Testet, dass jede Sequenz die Logits der Schicht erhält, nach der sie abbricht"""
+        # Marge zwischen den Konfidenzen der Sequenzen, sodass nur ein Teil früh abbricht
+        confidence = (torch.sigmoid(self.exit_logits[1]) - 0.5).abs().min(dim=1).values
+        margin = float(confidence.median())
+        
+        logits, layers = self.categorize(margin)
+        self.assertTrue(0 < (layers == 1).sum() < 6)
+        
+        for i, layer in enumerate(layers.tolist()):
+            expected = self.exit_logits[layer] if layer < 4 else self.full_logits
+            torch.testing.assert_close(logits[i], expected[i])
+    
+    def test_exit_heads_roundtrip(self):
+        """Testet, dass Zwischenklassifikatoren aus einem Checkpoint übernommen werden"""
+        with mock.patch("proposal_models.AutoModel.from_pretrained", return_value=BertModel(self.model.bert.config)):
+            loaded = ProposalMultiHeadModel(num_categories=5)
+        state_dict = self.model.state_dict()
+        loaded.adapt_to_state_dict(state_dict)
+        loaded.load_state_dict(state_dict)
+        
+        self.assertEqual(loaded.exit_layers, [1, 2])
+        with self.assertRaises(ValueError):
+            loaded.add_exit_heads([4])
+
+class TestExitHeadTraining(unittest.TestCase):
+    """Tests für das nachträgliche Training der Zwischenklassifikatoren"""
+    
+    def setUp(self):
+        """Test-Setup: Processor mit kleinem Modell (Merkmals-Cache unter dem temporären MODEL_PATH)"""
+        torch.manual_seed(0)
+        self.processor = tiny_processor(self, num_hidden_layers=4)
+        self.texts = ["Mehr Bäume im Park", "Neue Bahn und Bus", "Lehrer für die Schule",
+                      "Radweg zur Klinik", "Strom aus Wind und Sonne", "Polizei im Netz"] * 3
+        self.labels = [[self.processor.categories[i % 3]] for i in range(len(self.texts))]
+    
+    def test_cached_features(self):
+        """Testet, dass die Köpfe mit dem Trainer auf zwischengespeicherten Merkmalen trainiert werden"""
+        result = self.processor.train_exit_heads(self.texts, self.labels, [1, 2], batch_size=4, num_epochs=2)
+        
+        self.assertEqual(result["exit_layers"], [1, 2])
+        self.assertFalse(result["features_cached"])
+        self.assertEqual(len(result["training_stats"]), 2)
+        self.assertIn("samples_per_sec", result["training_stats"][0])
+        for path in result["features_paths"]:
+            self.assertEqual(np.load(path).shape, (len(self.texts), 32))
+        heads = {layer: head.weight.clone() for layer, head in self.processor.model.exit_classifiers.items()}
+        
+        # Ohne Labels: Merkmale aus dem Cache, Ziele aus dem vollständigen Modell
+        with mock.patch.object(ProposalProcessor, "_hidden_state_features") as hidden_state_features:
+            result = self.processor.train_exit_heads(self.texts, None, [1, 2], batch_size=4, num_epochs=1)
+        hidden_state_features.assert_not_called()
+        self.assertTrue(result["features_cached"])
+        for layer, head in self.processor.model.exit_classifiers.items():
+            self.assertFalse(torch.equal(head.weight, heads[layer]))
+        
+        # Der gespeicherte Checkpoint enthält die Zwischenklassifikatoren
+        loaded = ProposalProcessor(load_models=True)
+        self.assertEqual(loaded.model.exit_layers, [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from embedding_cache import EmbeddingCache
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Tests für den EmbeddingCache"""
+    
+    def setUp(self):
+        """Test-Setup: Beispieleinbettungen"""
+        self.embeddings = np.arange(12, dtype=np.float32).reshape(3, 4)
+        self.keys = [EmbeddingCache.make_key(f"Vorschlag {i}", "modell") for i in range(3)]
+    
+    def test_make_key(self):
+        """Testet, dass der Schlüssel vom bereinigten Text und vom Modell abhängt"""
+        self.assertEqual(
+            EmbeddingCache.make_key("  Mehr   Fahrradwege ", "modell"),
+            EmbeddingCache.make_key("Mehr Fahrradwege", "modell")
+        )
+        self.assertNotEqual(
+            EmbeddingCache.make_key("Mehr Fahrradwege", "modell@a"),
+            EmbeddingCache.make_key("Mehr Fahrradwege", "modell@b")
+        )
+    
+    def test_lru_eviction(self):
+        """Testet die Größenbegrenzung und die Verdrängungszähler"""
+        cache = EmbeddingCache(max_entries=2)
+        cache.put_many(self.keys[:2], self.embeddings[:2])
+        
+        # Zugriff auf den ersten Eintrag macht den zweiten zum ältesten
+        self.assertIsNotNone(cache.get(self.keys[0]))
+        cache.put(self.keys[2], self.embeddings[2])
+        
+        results = cache.get_many(self.keys)
+        self.assertIsNotNone(results[0])
+        self.assertIsNone(results[1])
+        np.testing.assert_array_equal(results[2], self.embeddings[2])
+        
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["hits"], 3)
+        self.assertEqual(stats["misses"], 1)
+    
+    def test_persistence(self):
+        """Testet, dass die persistente Stufe einen Neustart überdauert"""
+        path = os.path.join(tempfile.mkdtemp(), "embeddings.sqlite")
+        cache = EmbeddingCache(path=path)
+        cache.put_many(self.keys, self.embeddings)
+        cache.close()
+        
+        restarted = EmbeddingCache(path=path)
+        results = restarted.get_many(self.keys)
+        for result, expected in zip(results, self.embeddings):
+            np.testing.assert_array_equal(result, expected)
+        
+        stats = restarted.stats()
+        self.assertEqual(stats["disk_hits"], 3)
+        self.assertEqual(stats["hit_rate"], 1.0)
+        
+        # Nach dem Laden liegen die Einträge in der Speicherstufe
+        restarted.get_many(self.keys)
+        self.assertEqual(restarted.stats()["hits"], 3)
+        restarted.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
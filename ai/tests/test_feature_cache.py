@@ -0,0 +1,183 @@
+import unittest
+import sys
+import os
+import tempfile
+import warnings
+from unittest import mock
+import numpy as np
+import torch
+from transformers import BertConfig, BertModel
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from feature_cache import FeatureCache, encoder_fingerprint
+from proposal_models import ProposalMultiHeadModel, ProposalCategorizer, STALE_QUALITY_KEY
+from proposal_fixtures import tiny_processor
+
+class TestFeatureCache(unittest.TestCase):
+    """Tests für zwischengespeicherte Encoder-Merkmale und anpassbare Köpfe"""
+    
+    def setUp(self):
+        """Test-Setup: Multi-Head-Modell mit kleinem zufälligem BERT-Encoder und temporärem Cache"""
+        torch.manual_seed(0)
+        self.config = BertConfig(
+            vocab_size=100, hidden_size=32, num_hidden_layers=2,
+            num_attention_heads=4, intermediate_size=64
+        )
+        with mock.patch("proposal_models.AutoModel.from_pretrained", return_value=BertModel(self.config)):
+            self.model = ProposalMultiHeadModel(num_categories=5, num_dimensions=4).eval()
+        
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.cache = FeatureCache(self.temp_dir.name)
+    
+    def test_fingerprint_ignores_heads(self):
+        """Testet, dass nur Änderungen am Encoder den Fingerabdruck ändern"""
+        fingerprint = encoder_fingerprint(self.model)
+        
+        with torch.no_grad():
+            self.model.classifier.weight.add_(1.0)
+        self.model.resize_heads(num_dimensions=6)
+        self.assertEqual(encoder_fingerprint(self.model), fingerprint)
+        
+        with torch.no_grad():
+            self.model.bert.encoder.layer[1].output.dense.bias[0] += 1e-3
+        self.assertNotEqual(encoder_fingerprint(self.model), fingerprint)
+    
+    def test_save_load_and_invalidation(self):
+        """Testet, dass Merkmale je Encoder-Stand gespeichert und veraltete entfernt werden"""
+        features = np.random.default_rng(0).standard_normal((3, 32)).astype(np.float32)
+        
+        self.assertIsNone(self.cache.load("korpus", "alt"))
+        self.cache.save("korpus", "alt", features)
+        np.testing.assert_array_equal(self.cache.load("korpus", "alt"), features)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        
+        # Neuer Encoder-Stand ersetzt die alten Merkmale desselben Korpus
+        self.cache.save("korpus", "neu", features * 2)
+        self.cache.save("anderes-korpus", "alt", features)
+        self.assertIsNone(self.cache.load("korpus", "alt"))
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir.name, "korpus")), ["neu.npy"])
+        self.assertIsNotNone(self.cache.load("anderes-korpus", "alt"))
+        
+        # Zwischenschichten desselben Encoder-Stands bleiben nebeneinander erhalten
+        self.cache.save("korpus", "neu", features * 3, layer=1)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.temp_dir.name, "korpus"))), ["neu.layer1.npy", "neu.npy"])
+        np.testing.assert_array_equal(self.cache.load("korpus", "neu", layer=1), features * 3)
+        self.cache.save("korpus", "neuer", features)
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir.name, "korpus")), ["neuer.npy"])
+    
+    def test_resize_heads(self):
+        """Testet neue Köpfe anderer Größe bei unverändertem Encoder"""
+        self.model.add_exit_heads([1])
+        encoder_state = {k: v.clone() for k, v in self.model.bert.state_dict().items()}
+        
+        self.model.resize_heads(num_categories=7)
+        
+        self.assertEqual(self.model.classifier.out_features, 7)
+        self.assertEqual(self.model.exit_layers, [])
+        for name, value in self.model.bert.state_dict().items():
+            torch.testing.assert_close(value, encoder_state[name])
+        
+        # Ein Checkpoint mit anderer Kategorienanzahl lässt sich laden
+        state_dict = self.model.state_dict()
+        self.model.resize_heads(num_categories=5)
+        self.model.adapt_to_state_dict(state_dict)
+        self.model.load_state_dict(state_dict)
+        self.assertEqual(self.model.classifier.out_features, 7)
+    
+    def test_quality_head_stale_after_encoder_swap(self):
+        """Testet, dass der Qualitätskopf nach Übernahme eines neuen Encoders als veraltet gilt und dies gespeichert wird"""
+        with mock.patch("proposal_models.AutoModel.from_pretrained", return_value=BertModel(self.config)):
+            categorizer = ProposalCategorizer(num_categories=5)
+        plain_state = self.model.state_dict()
+        
+        self.assertFalse(self.model.quality_head_stale)
+        self.model.load_legacy_state_dicts(categorizer.state_dict())
+        self.assertTrue(self.model.quality_head_stale)
+        self.assertEqual(encoder_fingerprint(self.model), encoder_fingerprint(categorizer))
+        
+        # Der Vermerk übersteht Speichern und Laden von multihead.pt
+        state_dict = self.model.teacher_state_dict()
+        self.assertIs(state_dict[STALE_QUALITY_KEY], True)
+        with mock.patch("proposal_models.AutoModel.from_pretrained", return_value=BertModel(self.config)):
+            loaded = ProposalMultiHeadModel(num_categories=5)
+        loaded.load_teacher_state_dict(state_dict)
+        self.assertTrue(loaded.quality_head_stale)
+        torch.testing.assert_close(loaded.regressor.weight, self.model.regressor.weight)
+        
+        # Checkpoints ohne Vermerk gelten als aktuell
+        loaded.load_teacher_state_dict(plain_state)
+        self.assertFalse(loaded.quality_head_stale)
+        self.assertNotIn(STALE_QUALITY_KEY, loaded.teacher_state_dict())
+
+class TestQualityTraining(unittest.TestCase):
+    """Tests für das Training der Qualitätsbewertung auf dem gemeinsamen Encoder"""
+    
+    def setUp(self):
+        """Test-Setup: Processor mit kleinem Modell und Trainingsdaten"""
+        torch.manual_seed(0)
+        self.processor = tiny_processor(self)
+        self.texts = ["Mehr Bäume im Park", "Neue Bahn und Bus", "Lehrer für die Schule",
+                      "Radweg zur Klinik", "Strom aus Wind und Sonne", "Polizei im Netz"] * 2
+        self.labels = [[self.processor.categories[i % 3]] for i in range(len(self.texts))]
+        self.scores = np.random.default_rng(0).uniform(1, 5, (len(self.texts), 4)).tolist()
+    
+    def test_joint_finetuning(self):
+        """Testet, dass Encoder und Qualitätskopf gemeinsam trainiert werden und der Kategorisierungskopf eingefroren bleibt"""
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            results = self.processor.train_categorizer(self.texts, self.labels, batch_size=4, num_epochs=1)
+        self.assertTrue(results["quality_head_stale"])
+        self.assertTrue(any("Qualitätskopf" in str(warning.message) for warning in caught))
+        
+        model = self.processor.model
+        fingerprint = encoder_fingerprint(model)
+        classifier = model.classifier.weight.clone()
+        regressor = model.regressor.weight.clone()
+        
+        results = self.processor.train_quality_evaluator(
+            self.texts, self.scores, batch_size=4, num_epochs=2, learning_rate=1e-3,
+            group_by_length=False, gradient_accumulation_steps=2
+        )
+        
+        model = self.processor.model
+        self.assertEqual(len(results["training_stats"]), 2)
+        self.assertFalse(self.processor.quality_head_stale)
+        self.assertNotEqual(encoder_fingerprint(model), fingerprint)
+        self.assertFalse(torch.equal(model.regressor.weight, regressor))
+        torch.testing.assert_close(model.classifier.weight, classifier)
+        
+        # quality_evaluator.pt enthält Encoder und Regressionskopf des gemeinsamen Modells
+        state_dict = torch.load(results["model_path"])
+        self.assertEqual(os.path.basename(results["model_path"]), "quality_evaluator.pt")
+        self.assertEqual({k.split(".")[0] for k in state_dict}, {"bert", "regressor"})
+        torch.testing.assert_close(state_dict["regressor.weight"], model.regressor.weight)
+    
+    def test_freeze_encoder(self):
+        """Testet, dass mit freeze_encoder nur der Qualitätskopf trainiert wird"""
+        model = self.processor.model
+        fingerprint = encoder_fingerprint(model)
+        regressor = model.regressor.weight.clone()
+        
+        results = self.processor.train_quality_evaluator(
+            self.texts, self.scores, batch_size=4, num_epochs=2, learning_rate=1e-2, freeze_encoder=True
+        )
+        
+        self.assertFalse(results["features_cached"])
+        self.assertEqual(encoder_fingerprint(self.processor.model), fingerprint)
+        self.assertFalse(torch.equal(self.processor.model.regressor.weight, regressor))
+    
+    def test_categorizer_retrains_quality_head(self):
+        """Testet, dass train_categorizer mit Qualitätsscores den Qualitätskopf nachtrainiert"""
+        results = self.processor.train_categorizer(
+            self.texts, self.labels, batch_size=4, num_epochs=1, quality_scores=self.scores
+        )
+        
+        self.assertFalse(results["quality_head_stale"])
+        self.assertEqual(len(results["quality_results"]["training_stats"]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+from unittest import mock
+import transformers
+import torch
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+import proposal_models
+from proposal_processor import TextPreprocessor, SPACY_MODELS
+from proposal_fixtures import tiny_processor, blank_pipeline
+
+class TestLazyLoading(unittest.TestCase):
+    """Tests für das verzögerte Laden von Tokenizer, Modell und spaCy-Pipeline"""
+    
+    def setUp(self):
+        """Test-Setup: Processor mit gepatchten Ladefunktionen"""
+        torch.manual_seed(0)
+        self.processor = tiny_processor(self)
+        self.load_tokenizer = transformers.AutoTokenizer.from_pretrained
+        self.load_encoder = proposal_models.AutoModel.from_pretrained
+        
+        patcher = mock.patch("spacy.load", return_value=blank_pipeline())
+        self.load_nlp = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_construction_loads_nothing(self):
+        """Testet, dass beim Anlegen des Processors nichts geladen wird"""
+        self.assertEqual(self.load_tokenizer.call_count, 0)
+        self.assertEqual(self.load_encoder.call_count, 0)
+        self.assertEqual(self.load_nlp.call_count, 0)
+        self.assertIsNone(self.processor.preprocessor._tokenizer)
+        self.assertIsNone(self.processor.preprocessor._nlp)
+        self.assertIsNone(self.processor._model)
+        
+        # Nur die angefragte Komponente wird geladen
+        self.processor.preprocessor.tokenizer
+        self.assertEqual(self.load_tokenizer.call_count, 1)
+        self.assertEqual((self.load_encoder.call_count, self.load_nlp.call_count), (0, 0))
+    
+    def test_warmup_loads_everything(self):
+        """Testet, dass warmup alle Komponenten einmal lädt"""
+        timings = self.processor.warmup(batch_size=2)
+        
+        self.assertEqual(list(timings), ["tokenizer", "model", "nlp", "inference"])
+        self.assertIsNotNone(self.processor.preprocessor._tokenizer)
+        self.assertIsNotNone(self.processor.preprocessor._nlp)
+        self.assertIsNotNone(self.processor._model)
+        calls = (self.load_tokenizer.call_count, self.load_encoder.call_count, self.load_nlp.call_count)
+        self.assertEqual(calls, (1, 1, 1))
+        
+        # Ein weiterer Aufruf lädt nichts erneut
+        self.processor.warmup(batch_size=2)
+        self.assertEqual(
+            (self.load_tokenizer.call_count, self.load_encoder.call_count, self.load_nlp.call_count), calls
+        )
+    
+    def test_missing_spacy_model(self):
+        """Testet, dass ein fehlendes spaCy-Modell einen OSError auslöst statt heruntergeladen zu werden"""
+        preprocessor = TextPreprocessor()
+        
+        with mock.patch("spacy.load", side_effect=OSError("nicht installiert")) as load, \
+                mock.patch("spacy.cli.download") as download, \
+                mock.patch("subprocess.run") as run:
+            with self.assertRaises(OSError) as context:
+                preprocessor.extract_features("Mehr Bäume im Park")
+        
+        self.assertEqual([call.args[0] for call in load.call_args_list], list(SPACY_MODELS))
+        self.assertIn(SPACY_MODELS[-1], str(context.exception))
+        download.assert_not_called()
+        run.assert_not_called()
+        self.assertIsNone(preprocessor._nlp)
+
+if __name__ == '__main__':
+    unittest.main()
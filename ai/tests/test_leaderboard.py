@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from leaderboard import PriorityLeaderboard
+from proposal_processor import ProposalProcessor
+from categorization_algorithms import ProposalSorter, WEIGHT_PROFILES
+from proposal_fixtures import make_proposals
+
+class TestPriorityLeaderboard(unittest.TestCase):
+    """Tests für die laufend aktualisierte Prioritäts-Rangliste"""
+    
+    def setUp(self):
+        """Test-Setup: Rangliste und Vorschläge zu einem festen Zeitpunkt"""
+        self.sorter = ProposalSorter(ProposalProcessor(load_models=False))
+        self.leaderboard = PriorityLeaderboard(self.sorter)
+        self.proposals = make_proposals(300, seed=2)
+        self.now = datetime.now()
+        self.leaderboard.add_proposals(self.proposals, self.now)
+    
+    def assertMatchesSorter(self, now, k=25):
+        """Vergleicht die Top-k beider Profile mit einer vollständigen Neuberechnung"""
+        expected = self.sorter.get_top_proposals(self.proposals, k, "default", now)
+        self.assertEqual(
+            self.leaderboard.top(k, "default", now),
+            [(p["id"], self.sorter.calculate_priority_score(p, now, "default")) for p in expected]
+        )
+        
+        expected = self.sorter.get_trending_proposals(self.proposals, 7, k, "trending", now)
+        self.assertEqual(
+            self.leaderboard.top(k, "trending", now),
+            [(p["id"], self.sorter.calculate_priority_score(p, now, "trending")) for p in expected]
+        )
+    
+    def test_matches_full_sort(self):
+        """Testet die Übereinstimmung mit get_top_proposals nach Änderungen von Stimmen, Qualität und Alter"""
+        self.assertMatchesSorter(self.now)
+        self.assertEqual(self.leaderboard.top(5), self.leaderboard.top(25)[:5])
+        
+        rng = np.random.default_rng(3)
+        now = self.now
+        for step in range(40):
+            proposal = self.proposals[int(rng.integers(0, len(self.proposals)))]
+            if step % 3 == 0:
+                proposal["quality"] = {"overall_quality": float(rng.uniform(1, 5))}
+                self.leaderboard.update(proposal["id"], quality=proposal["quality"], now=now)
+            else:
+                count = int(rng.integers(1, 500))
+                proposal["votes"] = proposal.get("votes", 0) + count
+                self.leaderboard.add_votes(proposal["id"], count, now)
+            
+            # Zeit schreitet über Tageswechsel hinweg voran
+            now = now + timedelta(hours=7)
+            self.assertMatchesSorter(now)
+        
+        top_id = self.leaderboard.top(1, now=now)[0][0]
+        self.proposals = [p for p in self.proposals if p["id"] != top_id]
+        self.leaderboard.remove(top_id)
+        self.assertNotIn(top_id, self.leaderboard)
+        self.assertMatchesSorter(now + timedelta(days=40), k=len(self.proposals))
+    
+    def test_concurrent_readers(self):
+        """Testet gleichzeitige Abfragen während laufender Stimmabgaben"""
+        errors = []
+        stop = threading.Event()
+        
+        def read():
+            try:
+                while not stop.is_set():
+                    for profile in WEIGHT_PROFILES:
+                        ranking = self.leaderboard.top(20, profile, self.now)
+                        scores = [score for _, score in ranking]
+                        assert scores == sorted(scores, reverse=True)
+                        assert len({proposal_id for proposal_id, _ in ranking}) == len(ranking)
+            except Exception as error:
+                errors.append(error)
+        
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(2000):
+            self.leaderboard.add_votes(self.proposals[i % 50]["id"], 7, self.now)
+        stop.set()
+        for reader in readers:
+            reader.join()
+        
+        self.assertEqual(errors, [])
+        for proposal in self.proposals[:50]:
+            proposal["votes"] = proposal.get("votes", 0) + 280
+        self.assertMatchesSorter(self.now)
+    
+    def test_profiles_per_query(self):
+        """Testet, dass Profile pro Abfrage gewählt werden und self.weights unverändert bleibt"""
+        weights = dict(self.sorter.weights)
+        self.sorter.get_trending_proposals(self.proposals, now=self.now)
+        self.assertEqual(self.sorter.weights, weights)
+        
+        with self.assertRaises(ValueError):
+            self.leaderboard.top(5, "beliebt")
+        with self.assertRaises(ValueError):
+            self.sorter.get_top_proposals(self.proposals, 5, "beliebt")
+        with self.assertRaises(ValueError):
+            self.leaderboard.add_votes("unbekannt")
+
+if __name__ == '__main__':
+    unittest.main()
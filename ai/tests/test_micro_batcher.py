@@ -0,0 +1,154 @@
+import unittest
+import sys
+import os
+import json
+import asyncio
+import threading
+from unittest import mock
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from inference_server import MicroBatcher, QueueFullError, InferenceServer
+from proposal_processor import ProposalProcessor
+
+class TestMicroBatcher(unittest.TestCase):
+    """Tests für das Zusammenfassen gleichzeitiger Anfragen zu Batches"""
+    
+    def setUp(self):
+        """Test-Setup: Batch-Funktion, die ihre Batch-Größen protokolliert"""
+        self.batch_sizes = []
+        self.release = threading.Event()
+        self.release.set()
+    
+    def process_batch(self, items):
+        """Verdoppelt alle Eingaben und merkt sich die Batch-Größe"""
+        self.release.wait()
+        if "fehler" in items:
+            raise ValueError("Ungültige Eingabe")
+        self.batch_sizes.append(len(items))
+        return [item * 2 for item in items]
+    
+    def run_batcher(self, scenario, **kwargs):
+        """Führt ein Szenario mit einem frisch gestarteten MicroBatcher aus"""
+        async def run():
+            batcher = MicroBatcher(self.process_batch, **kwargs)
+            try:
+                return await scenario(batcher)
+            finally:
+                await batcher.stop()
+        return asyncio.run(run())
+    
+    def test_concurrent_requests_are_batched(self):
+        """Testet, dass gleichzeitige Anfragen gebündelt und in Reihenfolge beantwortet werden"""
+        async def scenario(batcher):
+            return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        
+        results = self.run_batcher(scenario, max_batch_size=4, max_wait_ms=50)
+        
+        self.assertEqual(results, [2 * i for i in range(10)])
+        self.assertEqual(self.batch_sizes, [4, 4, 2])
+    
+    def test_single_request_waits_at_most_max_wait(self):
+        """Testet, dass eine einzelne Anfrage nach der Wartezeit allein verarbeitet wird"""
+        async def scenario(batcher):
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            result = await batcher.submit(3)
+            return result, loop.time() - start
+        
+        result, elapsed = self.run_batcher(scenario, max_batch_size=8, max_wait_ms=20)
+        
+        self.assertEqual(result, 6)
+        self.assertEqual(self.batch_sizes, [1])
+        self.assertLess(elapsed, 1.0)
+    
+    def test_backpressure_and_errors(self):
+        """Testet die Abweisung bei voller Warteschlange und die Weitergabe von Fehlern"""
+        async def scenario(batcher):
+            # Erster Batch blockiert die Batch-Funktion, zwei weitere Anfragen füllen die Warteschlange
+            self.release.clear()
+            first = asyncio.ensure_future(batcher.submit(1))
+            await asyncio.sleep(0.05)
+            queued = [asyncio.ensure_future(batcher.submit(i)) for i in (2, 3)]
+            await asyncio.sleep(0)
+            
+            with self.assertRaises(QueueFullError):
+                await batcher.submit(4)
+            
+            self.release.set()
+            results = await asyncio.gather(first, *queued)
+            
+            with self.assertRaises(ValueError):
+                await batcher.submit("fehler")
+            return results, batcher.stats()
+        
+        results, stats = self.run_batcher(scenario, max_batch_size=1, max_wait_ms=1, max_queue_size=2)
+        
+        self.assertEqual(results, [2, 4, 6])
+        self.assertEqual(stats["rejected"], 1)
+        self.assertEqual(stats["items"], 3)
+    
+    def test_error_stays_with_request(self):
+        """Testet, dass ein Fehler im Batch nur die verursachende Anfrage trifft"""
+        async def scenario(batcher):
+            return await asyncio.gather(*(batcher.submit(item) for item in (1, "fehler", 3)), return_exceptions=True)
+        
+        results = self.run_batcher(scenario, max_batch_size=4, max_wait_ms=50)
+        
+        self.assertEqual(results[0], 2)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2], 6)
+        self.assertEqual(self.batch_sizes, [1, 1])
+
+class TestInferenceServerRequests(unittest.TestCase):
+    """Tests für die Prüfung von Anfragen, die zu Batches zusammengefasst werden"""
+    
+    def setUp(self):
+        """Test-Setup: Server ohne Modelle; die Kategorisierung wird ersetzt"""
+        self.processor = ProposalProcessor(load_models=False)
+        self.calls = []
+        
+        def categorize_batch(texts, threshold=0.5, batch_size=32):
+            self.calls.append(list(texts))
+            if "fehler" in texts:
+                raise ValueError("Ungültige Eingabe")
+            return [{"Verkehr": threshold} for _ in texts]
+        
+        patcher = mock.patch.object(self.processor, "categorize_batch", side_effect=categorize_batch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_invalid_requests_do_not_fail_batch(self):
+        """Testet, dass ungültige oder fehlschlagende Anfragen die übrigen Anfragen im Batch nicht betreffen"""
+        bodies = [
+            {"text": "a", "threshold": 0.3},
+            {"text": "b", "threshold": "abc"},
+            {"text": "fehler"},
+            {"text": "c"},
+            {"text": "d", "reference_texts": ["x", 1]}
+        ]
+        
+        async def run():
+            server = InferenceServer(self.processor, max_batch_size=8, max_wait_ms=50)
+            try:
+                return await asyncio.gather(*(
+                    server.handle_request("POST", "/similarity" if "reference_texts" in body else "/categorize",
+                                          json.dumps(body).encode("utf-8"))
+                    for body in bodies
+                ))
+            finally:
+                await server.stop()
+        
+        responses = asyncio.run(run())
+        
+        self.assertEqual([status for status, _ in responses], [200, 400, 400, 200, 400])
+        self.assertEqual(responses[0][1], {"Verkehr": 0.3})
+        self.assertEqual(responses[3][1], {"Verkehr": 0.5})
+        
+        # Die gültigen Anfragen wurden zunächst gemeinsam mit der fehlschlagenden verarbeitet
+        self.assertIn(["fehler", "c"], self.calls)
+
+if __name__ == '__main__':
+    unittest.main()
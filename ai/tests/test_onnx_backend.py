@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+import tempfile
+import importlib.util
+from unittest import mock
+import numpy as np
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ONNX_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("onnx", "onnxruntime"))
+
+if ONNX_AVAILABLE:
+    import torch
+    from transformers import BertConfig, BertModel
+    
+    # Import der zu testenden Module
+    from proposal_models import ProposalMultiHeadModel, ProposalCategorizer, ProposalQualityEvaluator
+    from onnx_backend import OnnxModel, export_onnx, load_onnx_model
+
+@unittest.skipUnless(ONNX_AVAILABLE, "onnx und onnxruntime sind nicht installiert")
+class TestOnnxBackend(unittest.TestCase):
+    """Tests für den ONNX-Export und die Ausführung mit onnxruntime"""
+    
+    def setUp(self):
+        """Test-Setup: Kleiner zufälliger BERT-Encoder statt gbert"""
+        torch.manual_seed(0)
+        self.config = BertConfig(
+            vocab_size=100, hidden_size=32, num_hidden_layers=2,
+            num_attention_heads=2, intermediate_size=64
+        )
+        patcher = mock.patch(
+            "proposal_models.AutoModel.from_pretrained",
+            side_effect=lambda name: BertModel(self.config)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+    
+    def make_batch(self, batch_size, length):
+        """Erzeugt einen Batch mit unterschiedlich langen, gepaddeten Sequenzen"""
+        input_ids = torch.randint(1, self.config.vocab_size, (batch_size, length))
+        attention_mask = torch.ones((batch_size, length), dtype=torch.long)
+        for i in range(1, batch_size):
+            attention_mask[i, length - i:] = 0
+        input_ids[attention_mask == 0] = 0
+        return input_ids, attention_mask
+    
+    def test_multihead_matches_torch(self):
+        """Testet, dass der exportierte Graph bei beliebigen Batch- und Sequenzlängen dem PyTorch-Modell entspricht"""
+        model = ProposalMultiHeadModel(num_categories=5).eval()
+        path = export_onnx(model, os.path.join(self.temp_dir.name, "multihead.onnx"))
+        onnx_model = OnnxModel(path)
+        
+        self.assertEqual(onnx_model.output_names, ["embeddings", "category_logits", "quality_scores"])
+        self.assertEqual(onnx_model.output_dim("embeddings"), self.config.hidden_size)
+        
+        for batch_size, length in ((1, 7), (4, 23), (32, 5)):
+            input_ids, attention_mask = self.make_batch(batch_size, length)
+            with torch.no_grad():
+                expected = model(input_ids, attention_mask)
+            outputs = onnx_model(input_ids.numpy(), attention_mask.numpy())
+            
+            for name, values in expected.items():
+                np.testing.assert_allclose(outputs[name], values.numpy(), atol=1e-4)
+    
+    def test_single_models_and_encoder(self):
+        """Testet den Export der Einzelmodelle und des BERT-Encoders"""
+        models = {
+            "category_logits": ProposalCategorizer(num_categories=5).eval(),
+            "quality_scores": ProposalQualityEvaluator(num_dimensions=4).eval(),
+            "embeddings": BertModel(self.config).eval()
+        }
+        input_ids, attention_mask = self.make_batch(3, 11)
+        
+        for name, model in models.items():
+            onnx_model = OnnxModel(export_onnx(model, os.path.join(self.temp_dir.name, f"{name}.onnx")))
+            self.assertEqual(onnx_model.output_names, [name])
+            
+            with torch.no_grad():
+                expected = model(input_ids, attention_mask)
+            if name == "embeddings":
+                expected = expected.last_hidden_state[:, 0, :]
+            
+            np.testing.assert_allclose(
+                onnx_model(input_ids.numpy(), attention_mask.numpy())[name], expected.numpy(), atol=1e-4
+            )
+    
+    def test_load_int8_and_options(self):
+        """Testet Export bei Bedarf, int8-Quantisierung und Sitzungseinstellungen"""
+        model = ProposalMultiHeadModel(num_categories=5).eval()
+        path = os.path.join(self.temp_dir.name, "multihead.onnx")
+        factory = mock.Mock(return_value=model)
+        
+        fp32_model = load_onnx_model(path, factory, options={"graph_optimization_level": "disable"})
+        int8_model = load_onnx_model(path, factory, precision="int8", options={"intra_op_num_threads": 1})
+        
+        # Der fp32-Graph wird nur einmal exportiert, der quantisierte daneben abgelegt
+        self.assertEqual(factory.call_count, 1)
+        self.assertTrue(int8_model.path.endswith("multihead-int8.onnx"))
+        self.assertEqual(int8_model.options["intra_op_num_threads"], 1)
+        
+        input_ids, attention_mask = self.make_batch(4, 9)
+        expected = fp32_model(input_ids.numpy(), attention_mask.numpy())["embeddings"]
+        quantized = int8_model(input_ids.numpy(), attention_mask.numpy())["embeddings"]
+        cosine = np.sum(expected * quantized, axis=1) / (
+            np.linalg.norm(expected, axis=1) * np.linalg.norm(quantized, axis=1)
+        )
+        self.assertTrue(np.all(cosine > 0.95))
+        
+        with self.assertRaises(ValueError):
+            OnnxModel(path, {"graph_optimization_level": "maximal"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import unittest
+import sys
+import os
+import zlib
+from datetime import datetime, timedelta
+import numpy as np
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from proposal_table import ProposalTable
+from proposal_processor import ProposalProcessor
+from categorization_algorithms import ProposalSorter, ProposalClusterer, ProposalRecommender
+from proposal_fixtures import CATEGORIES, make_proposals
+
+class FakeSimilarityAnalyzer:
+    """Ersatz für SimilarityAnalyzer: Einbettungen aus der Gruppe im Text plus Rauschen"""
+    
+    def __init__(self):
+        self.centers = np.random.default_rng(0).normal(size=(len(CATEGORIES), 16))
+    
+    def get_embedding(self, text):
+        group = int(text.split()[1])
+        noise = np.random.default_rng(zlib.crc32(text.encode("utf-8"))).normal(size=16)
+        return (self.centers[group] + 0.3 * noise).astype(np.float32)
+    
+    def get_embeddings(self, texts, batch_size=32):
+        return np.stack([self.get_embedding(text) for text in texts])
+
+class TestProposalTable(unittest.TestCase):
+    """Tests für die spaltenorientierten Vorschlagsdaten"""
+    
+    def test_columns_and_rows(self):
+        """Testet Spalten, Zeilen-Dictionaries und die Auswahl von Zeilen"""
+        proposals = [
+            {"id": "a", "content": "Text", "created_at": "2025-03-01T10:00:00", "votes": 3,
+             "quality": {"overall_quality": 4.0}, "primary_category": "Verkehr", "secondary_categories": ["Umwelt"]},
+            {"id": "b", "created_at": "kein Datum", "categories": {"Umwelt": 0.8}},
+            {"id": "c", "created_at": datetime(2025, 3, 2, 8, 30)}
+        ]
+        table = ProposalTable.from_dicts(proposals, embeddings=np.eye(3))
+        
+        self.assertEqual(table[0], {
+            "id": "a", "text": "Text", "created_at": "2025-03-01T10:00:00", "votes": 3.0,
+            "quality": {"overall_quality": 4.0}, "primary_category": "Verkehr", "secondary_categories": ["Umwelt"]
+        })
+        self.assertTrue(np.isnat(table.created_at[1]))
+        self.assertEqual(table[2]["created_at"], "2025-03-02T08:30:00")
+        np.testing.assert_array_equal(table.quality_column("overall_quality", 3.0), [4.0, 3.0, 3.0])
+        np.testing.assert_array_equal(table.count_categories_in(["Umwelt"]), [1, 1, 0])
+        
+        subset = table[::-1][:2]
+        self.assertEqual(list(subset.ids), ["c", "b"])
+        self.assertEqual(subset[1]["categories"], ["Umwelt"])
+        np.testing.assert_array_equal(subset.embeddings, np.eye(3)[[2, 1]])
+        self.assertEqual(table.positions(["b", "x"]), [1, None])
+        
+        with self.assertRaises(ValueError):
+            ProposalTable.from_dicts(proposals, embeddings=np.eye(2))
+
+class TestPriorityScores(unittest.TestCase):
+    """Tests für die vektorisierte Berechnung der Prioritätsscores"""
+    
+    def setUp(self):
+        """Test-Setup: Sortierer und Vorschläge mit zukünftigen Daten, datetime-Objekten und vielen Stimmen"""
+        self.sorter = ProposalSorter(ProposalProcessor(load_models=False))
+        self.proposals = make_proposals(500, seed=1)
+        now = datetime.now()
+        self.proposals[1]["created_at"] = (now + timedelta(days=45)).isoformat()
+        self.proposals[2]["created_at"] = now - timedelta(days=3)
+        self.proposals[3]["votes"] = 10 ** 9
+    
+    def test_matches_scalar(self):
+        """Testet, dass die Scores exakt mit calculate_priority_score übereinstimmen"""
+        now = datetime.now()
+        expected = [self.sorter.calculate_priority_score(p, now) for p in self.proposals]
+        scores = self.sorter.priority_scores(ProposalTable.from_dicts(self.proposals), now)
+        np.testing.assert_array_equal(scores, expected)
+        
+        self.sorter.weights = {"quality": 0.2, "relevance": 0.2, "feasibility": 0.1, "recency": 0.5}
+        expected = [self.sorter.calculate_priority_score(p, now) for p in self.proposals]
+        np.testing.assert_array_equal(self.sorter.priority_scores(ProposalTable.from_dicts(self.proposals), now), expected)
+    
+    def test_sort_does_not_mutate(self):
+        """Testet, dass die Sortierung die Eingabe nicht verändert und vorhandene Scores übernimmt"""
+        proposals = [dict(p) for p in self.proposals]
+        proposals[10]["priority_score"] = 2.0
+        before = [dict(p) for p in proposals]
+        
+        ranked = self.sorter.sort_proposals(proposals, "priority")
+        self.assertEqual(proposals, before)
+        self.assertIs(ranked[0], proposals[10])
+        
+        scores = self.sorter.priority_scores(ProposalTable.from_dicts(ranked[1:]))
+        self.assertTrue(np.all(np.diff(scores) <= 1e-9))
+    
+    def test_explicit_weights_ignore_stored_scores(self):
+        """Testet, dass gespeicherte Scores bei expliziten Gewichtungen nicht übernommen werden"""
+        now = datetime.now()
+        weights = {"quality": 0.0, "relevance": 0.0, "feasibility": 0.0, "recency": 1.0}
+        proposals = [
+            {"id": "a", "created_at": (now - timedelta(days=6)).isoformat(), "priority_score": 0.99},
+            {"id": "b", "created_at": (now - timedelta(days=3)).isoformat()}
+        ]
+        
+        for ranked in (
+            self.sorter.sort_proposals(proposals, "priority", weights, now),
+            self.sorter.get_top_proposals(proposals, 2, weights, now)
+        ):
+            self.assertEqual([p["id"] for p in ranked], ["b", "a"])
+        
+        # Ohne explizite Gewichtungen bleibt der gespeicherte Score maßgeblich
+        self.assertEqual([p["id"] for p in self.sorter.sort_proposals(proposals, "priority", now=now)], ["a", "b"])
+
+class TestTableConsumers(unittest.TestCase):
+    """Tests, dass Sortierung, Clustering und Empfehlungen mit ProposalTable wie mit Listen arbeiten"""
+    
+    def setUp(self):
+        """Test-Setup: Algorithmen mit ersetztem SimilarityAnalyzer"""
+        processor = ProposalProcessor(load_models=False)
+        processor.similarity_analyzer = FakeSimilarityAnalyzer()
+        self.sorter = ProposalSorter(processor)
+        self.clusterer = ProposalClusterer(processor)
+        self.recommender = ProposalRecommender(processor)
+        self.proposals = make_proposals(60)
+        self.table = ProposalTable.from_dicts(self.proposals)
+    
+    def ids(self, proposals):
+        return [p["id"] for p in proposals] if isinstance(proposals, list) else list(proposals.ids)
+    
+    def test_sorter(self):
+        """Testet Sortierung, Gruppierung und Trendauswahl"""
+        for criteria in ("priority", "quality", "relevance", "recency", "votes"):
+            expected = self.sorter.sort_proposals([dict(p) for p in self.proposals], criteria)
+            self.assertEqual(self.ids(self.sorter.sort_proposals(self.table, criteria)), self.ids(expected), criteria)
+        
+        for group in (self.sorter.group_by_category, self.sorter.group_by_ministry):
+            expected = group([dict(p) for p in self.proposals])
+            grouped = group(self.table)
+            self.assertEqual(list(grouped), list(expected))
+            self.assertEqual({k: self.ids(v) for k, v in grouped.items()}, {k: self.ids(v) for k, v in expected.items()})
+        
+        expected = self.sorter.get_trending_proposals([dict(p) for p in self.proposals], days=10, n=50)
+        self.assertEqual(self.ids(self.sorter.get_trending_proposals(self.table, days=10, n=50)), self.ids(expected))
+        
+        with self.assertRaises(ValueError):
+            self.sorter.sort_proposals(self.table, "titel")
+    
+    def test_clusterer(self):
+        """Testet Clustering und Trends, auch mit vorberechneten Einbettungen"""
+        expected = self.clusterer.identify_trends(self.proposals)
+        self.assertTrue(expected)
+        self.assertEqual(self.clusterer.identify_trends(self.table), expected)
+        
+        embeddings = self.clusterer.similarity_analyzer.get_embeddings(self.clusterer._proposal_texts(self.proposals))
+        table = ProposalTable.from_dicts(self.proposals, embeddings=embeddings)
+        self.assertEqual(self.clusterer.cluster_proposals(table), self.clusterer.cluster_proposals(self.proposals))
+    
+    def test_recommender(self):
+        """Testet ähnliche Vorschläge und Empfehlungen"""
+        text = "Gruppe 1 neuer Vorschlag"
+        expected = self.recommender.find_similar_proposals(text, self.proposals, n=5, threshold=0.5)
+        similar = self.recommender.find_similar_proposals(text, self.table, n=5, threshold=0.5)
+        self.assertEqual(self.ids(similar), self.ids(expected))
+        np.testing.assert_allclose([p["similarity"] for p in similar], [p["similarity"] for p in expected])
+        
+        history = self.proposals[:3]
+        expected = self.recommender.recommend_for_user(["Umwelt", "Verkehr"], history, self.proposals, n=8)
+        embeddings = self.recommender.similarity_analyzer.get_embeddings(self.clusterer._proposal_texts(self.proposals))
+        for table in (self.table, ProposalTable.from_dicts(self.proposals, embeddings=embeddings)):
+            recommendations = self.recommender.recommend_for_user(["Umwelt", "Verkehr"], history, table, n=8)
+            self.assertEqual(self.ids(recommendations), self.ids(expected))
+            np.testing.assert_allclose(
+                [p["relevance_score"] for p in recommendations], [p["relevance_score"] for p in expected], rtol=1e-6
+            )
+
+if __name__ == '__main__':
+    unittest.main()
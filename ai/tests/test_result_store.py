@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from result_store import ResultStore
+from proposal_processor import ProposalProcessor, weights_fingerprint
+
+class TestResultStore(unittest.TestCase):
+    """Tests für den versionierten Ergebnisspeicher"""
+    
+    def setUp(self):
+        """Test-Setup: Ergebnisspeicher in einer temporären SQLite-Datei"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "ergebnisse.sqlite")
+        self.store = ResultStore(self.path)
+        self.result = {"categories": {"Verkehr": np.float32(0.75)}, "priority": 3}
+    
+    def test_lookup_by_text_and_fingerprint(self):
+        """Testet, dass Ergebnisse nur bei gleichem Text und Stand gefunden werden"""
+        key = ResultStore.make_key("Mehr Radwege")
+        self.store.put_many([key], "stand-1", [self.result])
+        
+        self.assertEqual(self.store.get_many([key, key], "stand-1"), [{"categories": {"Verkehr": 0.75}, "priority": 3}] * 2)
+        self.assertEqual(self.store.get_many([key], "stand-2"), [None])
+        self.assertEqual(self.store.get_many([ResultStore.make_key("Mehr Schulen")], "stand-1"), [None])
+        
+        stats = self.store.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (2, 2, 1))
+    
+    def test_persistence_and_prune(self):
+        """Testet, dass Ergebnisse Neustarts überdauern und veraltete Stände entfernt werden"""
+        keys = [ResultStore.make_key(text) for text in ("a", "b")]
+        self.store.put_many(keys, "alt", [self.result] * 2)
+        self.store.put_many(keys[:1], "neu", [self.result])
+        self.store.close()
+        
+        store = ResultStore(self.path)
+        self.assertEqual(store.prune("neu"), 2)
+        self.assertEqual(store.stats()["entries"], 1)
+        self.assertIsNotNone(store.get_many(keys[:1], "neu")[0])
+        store.close()
+    
+    def test_weights_fingerprint_uses_content(self):
+        """Testet, dass neue Gewichte gleicher Größe und Änderungszeit einen neuen Fingerabdruck ergeben"""
+        path = os.path.join(self.temp_dir.name, "multihead.pt")
+        with open(path, "wb") as f:
+            f.write(b"alte Gewichte")
+        stat = os.stat(path)
+        fingerprint = weights_fingerprint([path])
+        self.assertEqual(weights_fingerprint([path]), fingerprint)
+        
+        # Austausch wie mit cp -p: gleicher Name, gleiche Größe, gleiche Änderungszeit
+        replacement = path + ".neu"
+        with open(replacement, "wb") as f:
+            f.write(b"neue Gewichte")
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, path)
+        
+        self.assertEqual(os.stat(path).st_size, stat.st_size)
+        self.assertNotEqual(weights_fingerprint([path]), fingerprint)
+        self.assertEqual(weights_fingerprint([os.path.join(self.temp_dir.name, "fehlt.pt")]), "base")
+
+class TestProcessorResultStore(unittest.TestCase):
+    """Tests für die Wiederverwendung gespeicherter Ergebnisse im ProposalProcessor"""
+    
+    def setUp(self):
+        """Test-Setup: Processor mit Ergebnisspeicher; die Analyse selbst wird ersetzt"""
+        self.processor = ProposalProcessor(result_store=ResultStore())
+        
+        def process_processed(processed):
+            return {"processed_text": processed["cleaned_text"], "priority": len(processed["cleaned_text"])}
+        
+        for name, replacement in (
+            ("process_processed", process_processed),
+            ("_predict_processed_batch", lambda processed_texts, batch_size: None)
+        ):
+            patcher = mock.patch.object(self.processor, name, side_effect=replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        patcher = mock.patch.object(
+            self.processor.preprocessor, "process_texts",
+            side_effect=lambda texts: [{"cleaned_text": " ".join(text.split())} for text in texts]
+        )
+        self.process_texts = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_unchanged_texts_reused(self):
+        """Testet, dass nur neue oder geänderte Texte analysiert werden"""
+        first = self.processor.process_batch(["Mehr Radwege", "Mehr Schulen"])
+        second = self.processor.process_batch(["Mehr Schulen", "  Mehr   Radwege ", "Mehr Parks"])
+        
+        self.assertEqual(second[:2], [first[1], first[0]])
+        self.assertEqual(self.process_texts.call_args_list[-1], mock.call(["Mehr Parks"]))
+        self.assertEqual(self.processor.result_store.stats()["hits"], 2)
+    
+    def test_configuration_change_invalidates(self):
+        """Testet, dass geänderte Kategorien zu einer neuen Analyse führen"""
+        fingerprint = self.processor.result_fingerprint()
+        self.processor.process_batch(["Mehr Radwege"])
+        
+        self.processor.categories = self.processor.categories + ["Wohnen"]
+        self.assertNotEqual(self.processor.result_fingerprint(), fingerprint)
+        
+        self.processor.process_batch(["Mehr Radwege"])
+        self.assertEqual(self.process_texts.call_count, 2)
+        self.assertEqual(self.processor.result_store.stats()["hits"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
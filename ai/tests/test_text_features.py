@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+from unittest import mock
+import numpy as np
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from proposal_processor import TextPreprocessor, POS_TAGS
+from proposal_fixtures import blank_pipeline
+
+class TestExtractFeaturesBatch(unittest.TestCase):
+    """Tests für die Merkmalsextraktion mit nlp.pipe"""
+    
+    def setUp(self):
+        """Test-Setup: TextPreprocessor mit leerer spaCy-Pipeline statt eines installierten Modells"""
+        self.nlp = blank_pipeline()
+        with mock.patch("spacy.load", return_value=self.nlp):
+            self.preprocessor = TextPreprocessor()
+            self.feature_names = self.preprocessor.feature_names
+        
+        self.texts = ["Mehr Bäume in Berlin. Die Bahn fährt.", "", "Radweg", ""]
+    
+    def test_columns(self):
+        """Testet, dass die Spalten der Reihenfolge von feature_names entsprechen"""
+        self.assertEqual(
+            self.feature_names,
+            ["num_tokens", "num_sentences", "avg_token_length", "avg_sentence_length"]
+            + [f"pos_{pos}" for pos in POS_TAGS] + ["ent_LOC", "ent_ORG", "sentiment_score"]
+        )
+        
+        features = self.preprocessor.extract_features_batch(self.texts, batch_size=2)
+        self.assertEqual(features.shape, (len(self.texts), len(self.feature_names)))
+        self.assertEqual(features.dtype, np.float32)
+        
+        expected = dict.fromkeys(self.feature_names, 0.0)
+        expected.update({
+            "num_tokens": 9, "num_sentences": 2, "avg_token_length": 31 / 9, "avg_sentence_length": 4.5,
+            "pos_NOUN": 2 / 9, "pos_PUNCT": 2 / 9, "ent_LOC": 1, "ent_ORG": 1
+        })
+        np.testing.assert_allclose(features[0], [expected[name] for name in self.feature_names], rtol=1e-6)
+    
+    def test_empty_texts(self):
+        """Testet, dass leere Texte Nullzeilen ergeben"""
+        features = self.preprocessor.extract_features_batch(self.texts)
+        np.testing.assert_array_equal(features[1], 0)
+        np.testing.assert_array_equal(features[3], 0)
+        self.assertEqual(features[2, 0], 1)
+        self.assertEqual(self.preprocessor.extract_features_batch([]).shape, (0, len(self.feature_names)))
+    
+    def test_matches_single_text(self):
+        """Testet, dass extract_features der ersten Zeile des Batches entspricht"""
+        features = self.preprocessor.extract_features_batch(self.texts)
+        for i, text in enumerate(self.texts):
+            single = self.preprocessor.extract_features(text)
+            self.assertEqual(list(single), self.feature_names)
+            np.testing.assert_array_equal(list(single.values()), features[i])
+            np.testing.assert_array_equal(self.preprocessor.extract_features_batch([text])[0], features[i])
+    
+    def test_pipeline_state_restored(self):
+        """Testet, dass aktivierte und deaktivierte Komponenten nach der Extraktion unverändert sind"""
+        for nlp in (self.nlp, blank_pipeline(sentencizer=False)):
+            with mock.patch("spacy.load", return_value=nlp):
+                preprocessor = TextPreprocessor()
+                preprocessor.feature_names
+            pipe_names, disabled = list(nlp.pipe_names), list(nlp.disabled)
+            
+            features = preprocessor.extract_features_batch(self.texts)
+            
+            self.assertEqual(features[0, 1], 2)
+            self.assertEqual(nlp.pipe_names, pipe_names)
+            self.assertEqual(nlp.disabled, disabled)
+        
+        # Ohne Sentencizer wird ein eigener, außerhalb der Extraktion deaktivierter ergänzt
+        self.assertEqual(disabled, ["feature_sentencizer"])
+
+if __name__ == '__main__':
+    unittest.main()
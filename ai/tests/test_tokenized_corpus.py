@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import pickle
+import tempfile
+import numpy as np
+import torch
+from unittest import mock
+from transformers import BertTokenizerFast
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from tokenized_corpus import TokenizedCorpus, corpus_key
+from proposal_models import LengthGroupedBatchSampler, ProposalDataset
+
+class TestTokenizedCorpus(unittest.TestCase):
+    """Tests für vortokenisierte, speicherabgebildete Korpora"""
+    
+    def setUp(self):
+        """Test-Setup: Kleiner WordPiece-Tokenizer und temporäres Cache-Verzeichnis"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        
+        vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "mehr", "radwege", "in", "der", "stadt", "bauen", "schulen"]
+        vocab_file = os.path.join(self.temp_dir.name, "vocab.txt")
+        with open(vocab_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(vocab))
+        self.tokenizer = BertTokenizerFast(vocab_file=vocab_file, do_lower_case=True)
+        self.cache_dir = os.path.join(self.temp_dir.name, "tokenized")
+        
+        self.texts = ["Mehr Radwege", "Schulen in der Stadt bauen", "", "Mehr Radwege in der Stadt bauen"]
+    
+    def test_ids_match_tokenizer(self):
+        """Testet, dass die gespeicherten IDs der direkten Tokenisierung entsprechen"""
+        corpus = TokenizedCorpus.build(self.texts, self.tokenizer, self.cache_dir, chunk_size=3)
+        expected = self.tokenizer(self.texts, truncation=True, max_length=512)["input_ids"]
+        
+        self.assertEqual(len(corpus), len(self.texts))
+        self.assertEqual(corpus.lengths.tolist(), [len(ids) for ids in expected])
+        for i, ids in enumerate(expected):
+            self.assertEqual(corpus[i].tolist(), ids)
+        
+        # Trunkierung auf die maximale Länge
+        truncated = TokenizedCorpus.build(self.texts, self.tokenizer, self.cache_dir, max_length=4)
+        self.assertEqual(truncated.lengths.max(), 4)
+    
+    def test_cache_reuse_and_invalidation(self):
+        """Testet, dass ein Korpus wiederverwendet und bei geänderten Texten neu erzeugt wird"""
+        corpus = TokenizedCorpus.build(self.texts, self.tokenizer, self.cache_dir)
+        reopened = TokenizedCorpus.build(self.texts, self.tokenizer, self.cache_dir)
+        changed = TokenizedCorpus.build(self.texts[:-1], self.tokenizer, self.cache_dir)
+        
+        self.assertEqual(reopened.directory, corpus.directory)
+        self.assertNotEqual(changed.directory, corpus.directory)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+        
+        # Aufrufe mit anderer Trunkierung ändern den Schlüssel nicht
+        key = corpus_key(self.texts, self.tokenizer, 512)
+        self.tokenizer(self.texts, truncation=True, max_length=3)
+        self.assertEqual(corpus_key(self.texts, self.tokenizer, 512), key)
+        
+        # Beim Übertragen an DataLoader-Worker werden keine Daten kopiert
+        corpus[0]
+        restored = pickle.loads(pickle.dumps(corpus))
+        self.assertIsNone(restored._ids)
+        self.assertEqual(restored[3].tolist(), corpus[3].tolist())
+    
+    def test_length_grouped_batches(self):
+        """Testet, dass der Sampler jeden Index einmal liefert und innerhalb der Gruppen nach Länge sortiert"""
+        lengths = np.random.default_rng(0).integers(1, 100, 103)
+        sampler = LengthGroupedBatchSampler(lengths, batch_size=8, group_factor=4, seed=0)
+        batches = list(sampler)
+        
+        self.assertEqual(len(batches), len(sampler))
+        self.assertEqual(sorted(i for batch in batches for i in batch), list(range(103)))
+        
+        # Gruppierte Batches enthalten deutlich weniger Padding als zufällige
+        padding = sum(len(batch) * lengths[batch].max() - lengths[batch].sum() for batch in batches)
+        random_batches = np.array_split(np.random.default_rng(1).permutation(103), len(batches))
+        random_padding = sum(len(batch) * lengths[batch].max() - lengths[batch].sum() for batch in random_batches)
+        self.assertLess(padding, random_padding / 2)
+    
+    def test_dataset_labels_and_scores(self):
+        """Testet Einträge des Datasets mit Kategorielabels und mit skalaren Qualitätsscores"""
+        preprocessor = mock.Mock(tokenizer=self.tokenizer)
+        categories = ProposalDataset(self.texts, [[1, 0]] * 4, preprocessor, cache_dir=self.cache_dir)
+        scores = ProposalDataset(
+            self.texts, [0.2, 0.4, 0.6, 0.8], preprocessor, label_key="scores", cache_dir=self.cache_dir
+        )
+        
+        self.assertEqual(categories[1]["labels"].tolist(), [1.0, 0.0])
+        self.assertEqual(scores[1]["scores"].shape, torch.Size([]))
+        self.assertEqual(scores[1]["input_ids"].tolist(), categories[1]["input_ids"].tolist())
+
+if __name__ == '__main__':
+    unittest.main()
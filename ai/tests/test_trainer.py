@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import copy
+import warnings
+from unittest import mock
+import torch
+import torch.nn as nn
+from transformers import BertConfig, BertModel
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from trainer import Trainer
+from proposal_models import ProposalCategorizer
+
+def mse_loss(model, batch):
+    return nn.functional.mse_loss(model(batch["input_ids"]), batch["scores"])
+
+class TestTrainer(unittest.TestCase):
+    """Tests für die gemeinsame Trainingsschleife"""
+    
+    def setUp(self):
+        """Test-Setup: Lineares Modell und acht Beispiele"""
+        torch.manual_seed(0)
+        self.model = nn.Linear(4, 1)
+        self.inputs = torch.randn(8, 4)
+        self.scores = torch.randn(8, 1)
+    
+    def batches(self, batch_size):
+        return [
+            {"input_ids": self.inputs[i:i + batch_size], "scores": self.scores[i:i + batch_size]}
+            for i in range(0, len(self.inputs), batch_size)
+        ]
+    
+    def test_accumulation_matches_large_batch(self):
+        """Testet, dass vier akkumulierte Batches dem Schritt mit einem großen Batch entsprechen"""
+        accumulated = copy.deepcopy(self.model)
+        
+        Trainer(self.model, mse_loss, learning_rate=0.1).train(self.batches(8), num_epochs=1)
+        Trainer(accumulated, mse_loss, learning_rate=0.1, gradient_accumulation_steps=4).train(
+            self.batches(2), num_epochs=1
+        )
+        
+        for expected, actual in zip(self.model.parameters(), accumulated.parameters()):
+            torch.testing.assert_close(actual, expected)
+    
+    def test_remaining_gradients_applied(self):
+        """Testet, dass restliche Gradienten am Epochenende wie bei einem großen Batch angewendet werden"""
+        before = copy.deepcopy(self.model.state_dict())
+        mse_loss(self.model, self.batches(8)[0]).backward()
+        expected = [parameter.grad.clone() for parameter in self.model.parameters()]
+        self.model.zero_grad()
+        
+        # Vier Batches, aber erst nach 16 Batches ein regulärer Optimierungsschritt
+        trainer = Trainer(self.model, mse_loss, gradient_accumulation_steps=16)
+        gradients = []
+        step = trainer.optimizer.step
+        
+        def record_step():
+            gradients.append([parameter.grad.clone() for parameter in self.model.parameters()])
+            step()
+        
+        with mock.patch.object(trainer.optimizer, "step", side_effect=record_step):
+            trainer.train(self.batches(2), num_epochs=1)
+        
+        self.assertEqual(len(gradients), 1)
+        for actual, expected_gradient in zip(gradients[0], expected):
+            torch.testing.assert_close(actual, expected_gradient)
+        self.assertFalse(torch.equal(self.model.weight, before["weight"]))
+        self.assertIsNone(self.model.weight.grad)
+    
+    def test_training_stats(self):
+        """Testet die Statistik pro Epoche und den Evaluierungsmodus nach dem Training"""
+        stats = Trainer(self.model, mse_loss).train(self.batches(2), num_epochs=2)
+        
+        self.assertEqual([entry["epoch"] for entry in stats], [1, 2])
+        for entry in stats:
+            self.assertEqual(set(entry), {"epoch", "avg_loss", "samples_per_sec", "peak_memory_mb"})
+            self.assertGreater(entry["samples_per_sec"], 0)
+        self.assertFalse(self.model.training)
+    
+    def test_invalid_options(self):
+        """Testet die Validierung der Optionen"""
+        with self.assertRaises(ValueError):
+            Trainer(self.model, mse_loss, gradient_accumulation_steps=0)
+        
+        # Gradient Checkpointing ohne transformers-Encoder
+        with self.assertRaises(ValueError):
+            Trainer(self.model, mse_loss, gradient_checkpointing=True)
+    
+    def test_bf16_fallback(self):
+        """Testet, dass bf16 ohne native Unterstützung mit Warnung auf fp32 zurückfällt"""
+        with mock.patch("trainer.bf16_supported", return_value=False):
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                trainer = Trainer(self.model, mse_loss, bf16=True)
+        self.assertFalse(trainer.bf16)
+        self.assertEqual(len(caught), 1)
+    
+    def test_gradient_checkpointing_same_gradients(self):
+        """Testet, dass Gradient Checkpointing des Encoders die Gradienten nicht ändert"""
+        config = BertConfig(
+            vocab_size=100, hidden_size=32, num_hidden_layers=2,
+            num_attention_heads=4, intermediate_size=64, hidden_dropout_prob=0.0,
+            attention_probs_dropout_prob=0.0
+        )
+        with mock.patch("proposal_models.AutoModel.from_pretrained", return_value=BertModel(config)):
+            model = ProposalCategorizer(num_categories=3, dropout_rate=0.0)
+        checkpointed = copy.deepcopy(model)
+        Trainer(checkpointed, mse_loss, gradient_checkpointing=True)
+        self.assertTrue(checkpointed.bert.is_gradient_checkpointing)
+        
+        input_ids = torch.randint(1, 100, (2, 10))
+        labels = torch.rand(2, 3)
+        for m in (model, checkpointed):
+            m.train()
+            nn.functional.binary_cross_entropy_with_logits(m(input_ids, torch.ones_like(input_ids)), labels).backward()
+        
+        for expected, actual in zip(model.parameters(), checkpointed.parameters()):
+            torch.testing.assert_close(actual.grad, expected.grad)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from vector_index import VectorIndex, normalize_rows
+
+class TestVectorIndex(unittest.TestCase):
+    """Tests für den VectorIndex"""
+    
+    def setUp(self):
+        """Test-Setup: Zufällige Einbettungen mit IDs"""
+        rng = np.random.default_rng(42)
+        self.embeddings = rng.normal(size=(500, 16)).astype(np.float32)
+        self.ids = [f"p{i}" for i in range(500)]
+        self.index = VectorIndex(16)
+        self.index.add(self.ids, self.embeddings)
+    
+    def brute_force(self, query, k):
+        """Referenz: Kosinus-Ähnlichkeit zu allen Einbettungen"""
+        scores = normalize_rows(self.embeddings) @ normalize_rows(query[None, :])[0]
+        top = np.argsort(-scores)[:k]
+        return [self.ids[i] for i in top], scores[top]
+    
+    def test_exact_query(self):
+        """Testet, dass die exakte Suche der Brute-Force-Suche entspricht"""
+        query = self.embeddings[7] + 0.1
+        expected_ids, expected_scores = self.brute_force(query, 5)
+        
+        matches = self.index.query(query, k=5)
+        self.assertEqual([proposal_id for proposal_id, _ in matches], expected_ids)
+        np.testing.assert_allclose([score for _, score in matches], expected_scores, rtol=1e-5)
+    
+    def test_threshold(self):
+        """Testet den Ähnlichkeitsschwellenwert"""
+        matches = self.index.query(self.embeddings[3], k=10, threshold=0.99)
+        self.assertEqual(matches[0][0], "p3")
+        self.assertTrue(all(score >= 0.99 for _, score in matches))
+    
+    def test_add_and_remove(self):
+        """Testet das inkrementelle Entfernen und Ersetzen von Einträgen"""
+        self.assertEqual(self.index.remove(["p3", "unbekannt"]), 1)
+        self.assertNotIn("p3", self.index)
+        self.assertNotEqual(self.index.query(self.embeddings[3], k=1)[0][0], "p3")
+        
+        # Ersetzen eines vorhandenen Eintrags
+        self.index.add(["p4"], self.embeddings[3:4])
+        self.assertEqual(len(self.index), 499)
+        self.assertEqual(self.index.query(self.embeddings[3], k=1)[0][0], "p4")
+        
+        # Verdichtung nach vielen Löschungen
+        self.index.remove(self.ids[100:])
+        self.assertEqual(len(self.index), 99)
+        self.assertEqual(self.index.query(self.embeddings[10], k=1)[0][0], "p10")
+    
+    def test_save_and_load(self):
+        """Testet das Speichern und Laden per Memory-Mapping"""
+        path = tempfile.mkdtemp()
+        self.index.remove(["p0"])
+        self.index.save(path)
+        
+        loaded = VectorIndex.load(path, mmap=True)
+        self.assertEqual(len(loaded), 499)
+        self.assertEqual(loaded.query(self.embeddings[5], k=1)[0][0], "p5")
+        
+        # Hinzufügen nach dem Laden erzeugt eine beschreibbare Kopie
+        loaded.add(["neu"], self.embeddings[0:1])
+        self.assertEqual(loaded.query(self.embeddings[0], k=1)[0][0], "neu")
+    
+    def test_approximate_query(self):
+        """Testet den IVF-Modus: mit allen Partitionen exakt, mit wenigen weiterhin plausibel"""
+        self.index.train(n_lists=10)
+        self.index.n_probe = 10
+        query = self.embeddings[11]
+        expected_ids, _ = self.brute_force(query, 5)
+        self.assertEqual([proposal_id for proposal_id, _ in self.index.query(query, k=5)], expected_ids)
+        
+        # Ein Eintrag wird immer in seiner eigenen Partition gefunden
+        self.index.n_probe = 1
+        self.assertEqual(self.index.query(query, k=1)[0][0], "p11")
+        
+        # Neue Einträge werden ihrer Partition zugeordnet
+        self.index.add(["neu"], self.embeddings[11:12] * 2)
+        self.assertIn("neu", [proposal_id for proposal_id, _ in self.index.query(query, k=2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import multiprocessing
+from types import SimpleNamespace
+import numpy as np
+import torch
+import torch.nn as nn
+
+# Pfad zum Hauptverzeichnis hinzufügen
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import der zu testenden Module
+from worker_pool import WorkerPool
+
+class RecordingProcessor:
+    """Ersatz für ProposalProcessor, der Länge, Prozess und Thread-Anzahl jedes Texts liefert"""
+    
+    def __init__(self):
+        """Kleines Modell, dessen Gewichte der Pool in gemeinsamen Speicher legt"""
+        self.model = nn.Linear(4, 2)
+        self.preprocessor = SimpleNamespace(tokenizer=None)
+        self.worker_pool = None
+    
+    def _predict_batch(self, input_ids, batch_size=32, bucket_sizes=None):
+        """Liefert je Text Länge, Prozess-ID und Thread-Anzahl"""
+        if any(-1 in ids for ids in input_ids):
+            raise ValueError("Ungültige Token-ID")
+        return {
+            "lengths": np.array([[len(ids)] for ids in input_ids]),
+            "pids": np.full((len(input_ids), 1), os.getpid()),
+            "threads": np.full((len(input_ids), 1), torch.get_num_threads())
+        }
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork ist nicht verfügbar")
+class TestWorkerPool(unittest.TestCase):
+    """Tests für die Verteilung von Batches auf Worker-Prozesse"""
+    
+    def setUp(self):
+        """Test-Setup: Pool mit zwei Workern und je zwei Threads"""
+        self.processor = RecordingProcessor()
+        self.pool = WorkerPool(self.processor, num_workers=2, threads_per_worker=2)
+        self.addCleanup(self.pool.close)
+    
+    def test_results_in_input_order(self):
+        """Testet, dass die Ergebnisse aller Batches in Eingabereihenfolge zusammengesetzt werden"""
+        input_ids = [[1] * length for length in (5, 1, 9, 3, 7, 2, 8, 4, 6)]
+        results = self.pool.predict_batch(input_ids, batch_size=2)
+        
+        self.assertEqual(results["lengths"][:, 0].tolist(), [5, 1, 9, 3, 7, 2, 8, 4, 6])
+        self.assertNotIn(os.getpid(), results["pids"][:, 0].tolist())
+        self.assertTrue(np.all(results["threads"] == 2))
+    
+    def test_weights_shared_and_errors_propagated(self):
+        """Testet gemeinsame Gewichte und die Weitergabe von Fehlern aus den Workern"""
+        self.assertTrue(self.processor.model.weight.is_shared())
+        
+        with self.assertRaises(ValueError):
+            self.pool.predict_batch([[1, 2], [-1]], batch_size=1)
+        
+        # Der Pool bleibt nach einem Fehler nutzbar
+        results = self.pool.predict_batch([[1, 2, 3]])
+        self.assertEqual(results["lengths"].tolist(), [[3]])
+        
+        self.pool.close()
+        with self.assertRaises(ValueError):
+            self.pool.predict_batch([[1]])
+
+if __name__ == '__main__':
+    unittest.main()
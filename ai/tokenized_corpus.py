@@ -0,0 +1,151 @@
+"""
+Vortokenisierte Korpora als speicherabgebildete NumPy-Arrays
+
+Beim Training wurde bisher jeder Text in jeder Epoche neu tokenisiert.
+TokenizedCorpus tokenisiert ein Korpus einmal und legt die Token-IDs
+hintereinander (ids.npy) mit Startpositionen (offsets.npy) ab. Der
+Verzeichnisname ist ein Hash aus Korpus, Tokenizer und maximaler Länge, sodass
+geänderte Texte oder ein anderer Tokenizer automatisch neu tokenisiert werden.
+
+Die Arrays werden per np.load(mmap_mode="r") gelesen; DataLoader-Worker öffnen
+sie jeweils selbst, statt die Daten zu kopieren.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from typing import List, Any
+
+import numpy as np
+
+
+def tokenizer_fingerprint(tokenizer: Any) -> str:
+    """
+    Fingerabdruck eines Tokenizers (Vokabular, Regeln und Sonderzeichen).
+    
+    Für schnelle Tokenizer wird die vollständige Serialisierung verwendet,
+    sonst Name, Klasse und Vokabular.
+    """
+    digest = hashlib.sha256(type(tokenizer).__name__.encode("utf-8"))
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        # Trunkierung und Padding setzt der Tokenizer pro Aufruf; sie gehören nicht zum Fingerabdruck
+        serialized = json.loads(backend.to_str())
+        serialized.pop("truncation", None)
+        serialized.pop("padding", None)
+        digest.update(json.dumps(serialized, sort_keys=True).encode("utf-8"))
+    else:
+        digest.update(str(getattr(tokenizer, "name_or_path", "")).encode("utf-8"))
+        for token, token_id in sorted(tokenizer.get_vocab().items()):
+            digest.update(f"{token}\t{token_id}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def corpus_key(texts: List[str], tokenizer: Any, max_length: int) -> str:
+    """Schlüssel eines tokenisierten Korpus aus Texten, Tokenizer und maximaler Länge."""
+    digest = hashlib.sha256(f"{tokenizer_fingerprint(tokenizer)}:{max_length}:{len(texts)}".encode("utf-8"))
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:24]
+
+
+class TokenizedCorpus:
+    """Speicherabgebildete Token-IDs eines Korpus (ein Eintrag pro Text, ungepaddet)."""
+    
+    def __init__(self, directory: str):
+        """
+        Öffnet ein mit build erzeugtes Korpus.
+        
+        Args:
+            directory: Verzeichnis mit ids.npy und offsets.npy
+        """
+        if not os.path.exists(os.path.join(directory, "offsets.npy")):
+            raise ValueError(f"Kein tokenisiertes Korpus in {directory}")
+        
+        self.directory = directory
+        self._ids = None
+        self._offsets = None
+    
+    @classmethod
+    def build(cls, texts: List[str], tokenizer: Any, cache_dir: str, max_length: int = 512,
+              chunk_size: int = 1024) -> "TokenizedCorpus":
+        """
+        Tokenisiert ein Korpus einmal und legt es im Cache-Verzeichnis ab.
+        
+        Ist das Korpus mit demselben Tokenizer bereits vorhanden, wird es nur geöffnet.
+        
+        Args:
+            texts: Zu tokenisierende Texte
+            tokenizer: transformers-Tokenizer
+            cache_dir: Verzeichnis für die tokenisierten Korpora
+            max_length: Maximale Anzahl von Tokens pro Text
+            chunk_size: Anzahl der Texte pro Tokenizer-Aufruf
+            
+        Returns:
+            TokenizedCorpus
+        """
+        directory = os.path.join(cache_dir, corpus_key(texts, tokenizer, max_length))
+        if os.path.exists(os.path.join(directory, "offsets.npy")):
+            return cls(directory)
+        
+        # Tokenisierung in Chunks; die IDs aller Texte werden hintereinander abgelegt
+        chunks = []
+        lengths = np.zeros(len(texts), dtype=np.int64)
+        for start in range(0, len(texts), chunk_size):
+            encodings = tokenizer(texts[start:start + chunk_size], truncation=True, max_length=max_length)
+            for i, ids in enumerate(encodings["input_ids"]):
+                lengths[start + i] = len(ids)
+                chunks.append(np.asarray(ids, dtype=np.int32))
+        
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        ids = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+        
+        # Schreiben in ein temporäres Verzeichnis und atomares Umbenennen, damit
+        # parallel startende Trainingsläufe kein halbes Korpus lesen
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=cache_dir)
+        try:
+            np.save(os.path.join(temp_dir, "ids.npy"), ids)
+            np.save(os.path.join(temp_dir, "offsets.npy"), offsets)
+            os.replace(temp_dir, directory)
+        except OSError:
+            # Ein anderer Prozess hat dasselbe Korpus gleichzeitig geschrieben
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if not os.path.exists(os.path.join(directory, "offsets.npy")):
+                raise
+        
+        return cls(directory)
+    
+    def _open(self) -> None:
+        """Öffnet die Arrays (pro Prozess, siehe __getstate__)."""
+        self._ids = np.load(os.path.join(self.directory, "ids.npy"), mmap_mode="r")
+        self._offsets = np.load(os.path.join(self.directory, "offsets.npy"))
+    
+    @property
+    def offsets(self) -> np.ndarray:
+        """Startpositionen der Texte in ids.npy (Länge: Anzahl Texte + 1)."""
+        if self._offsets is None:
+            self._open()
+        return self._offsets
+    
+    @property
+    def lengths(self) -> np.ndarray:
+        """Anzahl der Tokens je Text."""
+        return np.diff(self.offsets)
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, idx: int) -> np.ndarray:
+        """Token-IDs eines Texts (als int64-Kopie)."""
+        if self._ids is None:
+            self._open()
+        return np.array(self._ids[self._offsets[idx]:self._offsets[idx + 1]], dtype=np.int64)
+    
+    def __getstate__(self) -> dict:
+        # Ohne geöffnete Arrays übertragen; DataLoader-Worker öffnen sie selbst
+        return {"directory": self.directory, "_ids": None, "_offsets": None}
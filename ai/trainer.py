@@ -0,0 +1,167 @@
+"""
+Gemeinsame Trainingsschleife für die Modelle der Vorschlagsverarbeitung
+
+Trainer kapselt die Schleife, die train_categorizer, train_quality_evaluator,
+train_exit_heads und train_distilled zuvor jeweils selbst implementiert
+haben, und ergänzt
+optionale Beschleunigungen:
+- bf16-Autocast (ohne native Unterstützung Rückfall auf fp32, siehe bf16_supported)
+- Gradientenakkumulation für große effektive Batch-Größen
+- Gradient Checkpointing der transformers-Encoder für lange Sequenzen
+- torch.compile des Modells
+
+Jede Epoche liefert neben dem Verlust den Durchsatz (Beispiele/s) und den
+Spitzenspeicher (GPU-Speicher bzw. maximaler RSS des Prozesses).
+"""
+
+import sys
+import time
+import warnings
+import contextlib
+from typing import List, Dict, Optional, Any, Callable, Iterable
+
+import torch
+import torch.nn as nn
+from transformers import PreTrainedModel
+
+from proposal_models import DEVICE, bf16_supported
+
+
+def peak_memory_mb() -> float:
+    """Spitzenspeicher in MB (GPU: seit dem letzten Zurücksetzen, CPU: maximaler RSS des Prozesses)."""
+    if DEVICE.type == "cuda":
+        return torch.cuda.max_memory_allocated() / 2 ** 20
+    
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    
+    # ru_maxrss: Kilobyte unter Linux, Byte unter macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 2 ** 20 if sys.platform == "darwin" else max_rss / 2 ** 10
+
+
+class Trainer:
+    """Trainingsschleife mit optionalem bf16, Gradientenakkumulation, Checkpointing und torch.compile."""
+    
+    def __init__(self, model: nn.Module, loss_fn: Callable[[nn.Module, Dict[str, torch.Tensor]], torch.Tensor],
+                 learning_rate: float = 2e-5, parameters: Optional[Iterable[nn.Parameter]] = None,
+                 bf16: bool = False, gradient_accumulation_steps: int = 1,
+                 gradient_checkpointing: bool = False, compile_model: bool = False):
+        """
+        Initialisiert den Trainer.
+        
+        Args:
+            model: Zu trainierendes Modell (bereits auf DEVICE)
+            loss_fn: Berechnet den Verlust aus Modell und Batch (Tensoren auf DEVICE)
+            learning_rate: Lernrate für AdamW
+            parameters: Zu optimierende Parameter (Standard: alle Parameter des Modells)
+            bf16: Ob Forward- und Backward-Pass unter bf16-Autocast laufen
+            gradient_accumulation_steps: Anzahl der Batches pro Optimierungsschritt
+            gradient_checkpointing: Ob die Aktivierungen der Encoder-Schichten im
+                                    Backward-Pass neu berechnet statt gespeichert werden
+            compile_model: Ob das Modell mit torch.compile übersetzt wird
+        """
+        if gradient_accumulation_steps < 1:
+            raise ValueError("gradient_accumulation_steps muss mindestens 1 sein")
+        
+        if bf16 and not bf16_supported():
+            warnings.warn("bf16 wird auf diesem Gerät nicht nativ unterstützt; Training in fp32")
+            bf16 = False
+        
+        self.model = model
+        self.loss_fn = loss_fn
+        self.bf16 = bf16
+        self.gradient_accumulation_steps = gradient_accumulation_steps
+        self.optimizer = torch.optim.AdamW(
+            list(parameters) if parameters is not None else model.parameters(), lr=learning_rate
+        )
+        
+        if gradient_checkpointing:
+            encoders = [module for module in model.modules() if isinstance(module, PreTrainedModel)]
+            if not encoders:
+                raise ValueError("Gradient Checkpointing benötigt einen transformers-Encoder im Modell")
+            for encoder in encoders:
+                encoder.gradient_checkpointing_enable(gradient_checkpointing_kwargs={"use_reentrant": False})
+        
+        # Das übersetzte Modell teilt die Parameter mit model; gespeichert wird model
+        self.forward_model = torch.compile(model, dynamic=True) if compile_model else model
+    
+    def _autocast(self):
+        """Autocast-Kontext für bf16 (sonst ohne Wirkung)."""
+        if self.bf16:
+            return torch.autocast(DEVICE.type, dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+    
+    def train(self, dataloader: Iterable[Dict[str, torch.Tensor]], num_epochs: int) -> List[Dict[str, Any]]:
+        """
+        Trainiert das Modell.
+        
+        Args:
+            dataloader: Liefert Batches als Dictionaries von Tensoren
+            num_epochs: Anzahl der Trainingsepochen
+            
+        Returns:
+            Trainingsstatistik pro Epoche ("epoch", "avg_loss", "samples_per_sec",
+            "peak_memory_mb")
+        """
+        if DEVICE.type == "cuda":
+            torch.cuda.reset_peak_memory_stats()
+        
+        self.model.train()
+        training_stats = []
+        
+        for epoch in range(num_epochs):
+            epoch_loss = 0.0
+            num_batches = 0
+            num_samples = 0
+            start = time.perf_counter()
+            self.optimizer.zero_grad()
+            
+            for step, batch in enumerate(dataloader, start=1):
+                # Verschieben der Tensoren auf das Gerät (asynchron bei gepinntem Speicher)
+                batch = {key: value.to(DEVICE, non_blocking=True) for key, value in batch.items()}
+                
+                # Forward-Pass und Verlust (bei Akkumulation anteilig pro Batch)
+                with self._autocast():
+                    loss = self.loss_fn(self.forward_model, batch)
+                (loss / self.gradient_accumulation_steps).backward()
+                
+                # Optimierungsschritt nach gradient_accumulation_steps Batches
+                if step % self.gradient_accumulation_steps == 0:
+                    self.optimizer.step()
+                    self.optimizer.zero_grad()
+                
+                epoch_loss += loss.item()
+                num_batches += 1
+                num_samples += len(next(iter(batch.values())))
+            
+            # Restliche akkumulierte Gradienten am Epochenende anwenden; sie wurden durch
+            # gradient_accumulation_steps geteilt und werden auf den Mittelwert über die
+            # tatsächlich akkumulierten Batches umskaliert
+            remaining_batches = num_batches % self.gradient_accumulation_steps
+            if remaining_batches:
+                scale = self.gradient_accumulation_steps / remaining_batches
+                for group in self.optimizer.param_groups:
+                    for parameter in group["params"]:
+                        if parameter.grad is not None:
+                            parameter.grad.mul_(scale)
+                self.optimizer.step()
+                self.optimizer.zero_grad()
+            
+            # Speichern der Trainingsstatistik
+            elapsed = time.perf_counter() - start
+            avg_epoch_loss = epoch_loss / max(num_batches, 1)
+            training_stats.append({
+                "epoch": epoch + 1,
+                "avg_loss": avg_epoch_loss,
+                "samples_per_sec": num_samples / elapsed,
+                "peak_memory_mb": peak_memory_mb()
+            })
+            
+            print(f"Epoch {epoch + 1}/{num_epochs}, Loss: {avg_epoch_loss:.4f}, "
+                  f"{num_samples / elapsed:.1f} Beispiele/s")
+        
+        self.model.eval()
+        return training_stats
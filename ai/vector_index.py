@@ -0,0 +1,327 @@
+"""
+Vektorindex für Duplikaterkennung und die Suche ähnlicher Vorschläge
+
+Dieses Modul implementiert einen persistenten Index L2-normalisierter Einbettungen.
+Die Kosinus-Ähnlichkeit zu allen indexierten Vorschlägen wird mit einem einzigen
+Matrixprodukt berechnet, statt jeden Referenztext pro Anfrage neu einzubetten.
+
+Optional kann der Index in einen approximativen Modus (IVF) versetzt werden: Die
+Vektoren werden per k-Means in Partitionen aufgeteilt, und eine Anfrage durchsucht
+nur die n_probe ähnlichsten Partitionen. n_probe steuert den Kompromiss zwischen
+Trefferquote (Recall) und Anfragezeit.
+"""
+
+import os
+import json
+from typing import List, Tuple, Optional, Sequence
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Normalisiert die Zeilen einer Matrix auf L2-Länge 1.
+    
+    Args:
+        vectors: Matrix (Anzahl x Dimension)
+        
+    Returns:
+        Normalisierte Matrix als float32 (Nullvektoren bleiben unverändert)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex:
+    """Index normalisierter Einbettungen mit exakter und approximativer Top-k-Suche."""
+    
+    def __init__(self, dimension: int, n_probe: int = 8):
+        """
+        Initialisiert einen leeren VectorIndex.
+        
+        Args:
+            dimension: Dimension der Einbettungen
+            n_probe: Anzahl der durchsuchten Partitionen im approximativen Modus
+        """
+        self.dimension = dimension
+        self.n_probe = n_probe
+        
+        # Zeilenspeicher (wächst amortisiert); gelöschte Zeilen werden nur markiert
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._active = np.zeros(0, dtype=bool)
+        self._row_ids = []
+        self._size = 0
+        self._id_to_row = {}
+        
+        # Approximativer Modus (IVF): Zentroiden und Zeilen je Partition
+        self.centroids = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists = []
+    
+    def __len__(self) -> int:
+        return len(self._id_to_row)
+    
+    def __contains__(self, proposal_id: str) -> bool:
+        return str(proposal_id) in self._id_to_row
+    
+    @property
+    def ids(self) -> List[str]:
+        """IDs aller aktiven Einträge."""
+        return list(self._id_to_row)
+    
+    @property
+    def is_approximate(self) -> bool:
+        """Ob der approximative Modus (IVF) aktiv ist."""
+        return self.centroids is not None
+    
+    def add(self, ids: Sequence[str], embeddings: np.ndarray) -> None:
+        """
+        Fügt Einbettungen hinzu bzw. ersetzt vorhandene Einträge mit derselben ID.
+        
+        Args:
+            ids: Vorschlags-IDs
+            embeddings: Einbettungsmatrix (eine Zeile pro ID)
+        """
+        embeddings = normalize_rows(np.atleast_2d(embeddings))
+        if len(ids) != len(embeddings):
+            raise ValueError("Anzahl der IDs und Einbettungen stimmt nicht überein")
+        if embeddings.shape[1] != self.dimension:
+            raise ValueError(f"Einbettungsdimension {embeddings.shape[1]} passt nicht zum Index ({self.dimension})")
+        
+        # Vorhandene Einträge werden ersetzt
+        self.remove([proposal_id for proposal_id in ids if str(proposal_id) in self._id_to_row])
+        
+        self._reserve(self._size + len(ids))
+        rows = np.arange(self._size, self._size + len(ids))
+        self._vectors[rows] = embeddings
+        self._active[rows] = True
+        self._size += len(ids)
+        
+        for proposal_id, row in zip(ids, rows.tolist()):
+            self._row_ids.append(str(proposal_id))
+            self._id_to_row[str(proposal_id)] = row
+        
+        # Zuordnung zu den Partitionen im approximativen Modus
+        if self.is_approximate:
+            assignments = np.argmax(embeddings @ self.centroids.T, axis=1).astype(np.int32)
+            self._assignments[rows] = assignments
+            for row, assignment in zip(rows.tolist(), assignments.tolist()):
+                self._lists[assignment].append(row)
+    
+    def remove(self, ids: Sequence[str]) -> int:
+        """
+        Entfernt Einträge anhand ihrer ID.
+        
+        Args:
+            ids: Zu entfernende Vorschlags-IDs (unbekannte IDs werden ignoriert)
+            
+        Returns:
+            Anzahl der entfernten Einträge
+        """
+        removed = 0
+        for proposal_id in ids:
+            row = self._id_to_row.pop(str(proposal_id), None)
+            if row is not None:
+                self._active[row] = False
+                removed += 1
+        
+        # Verdichtung, wenn mehr als die Hälfte der Zeilen gelöscht ist
+        if self._size > 0 and len(self._id_to_row) < self._size // 2:
+            self.compact()
+        
+        return removed
+    
+    def query(self, embedding: np.ndarray, k: int = 10,
+              threshold: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Sucht die k ähnlichsten Einträge zu einer Einbettung.
+        
+        Args:
+            embedding: Anfragevektor
+            k: Anzahl der Treffer
+            threshold: Optionale minimale Kosinus-Ähnlichkeit
+            
+        Returns:
+            Liste von (ID, Ähnlichkeit), absteigend nach Ähnlichkeit sortiert
+        """
+        return self.query_batch(np.atleast_2d(embedding), k, threshold)[0]
+    
+    def query_batch(self, embeddings: np.ndarray, k: int = 10,
+                    threshold: Optional[float] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Sucht die k ähnlichsten Einträge für mehrere Anfragevektoren.
+        
+        Args:
+            embeddings: Anfragematrix (eine Zeile pro Anfrage)
+            k: Anzahl der Treffer pro Anfrage
+            threshold: Optionale minimale Kosinus-Ähnlichkeit
+            
+        Returns:
+            Liste von Trefferlisten (ID, Ähnlichkeit) je Anfrage
+        """
+        queries = normalize_rows(np.atleast_2d(embeddings))
+        if not self._id_to_row:
+            return [[] for _ in range(len(queries))]
+        
+        if self.is_approximate:
+            return [self._query_approximate(query, k, threshold) for query in queries]
+        
+        # Exakte Suche: ein Matrixprodukt über alle Zeilen
+        scores = queries @ self._vectors[:self._size].T
+        scores[:, ~self._active[:self._size]] = -np.inf
+        return [self._top_k(np.arange(self._size), row_scores, k, threshold) for row_scores in scores]
+    
+    def train(self, n_lists: int, iterations: int = 10, seed: int = 0) -> None:
+        """
+        Aktiviert den approximativen Modus durch k-Means-Partitionierung (IVF).
+        
+        Args:
+            n_lists: Anzahl der Partitionen (Faustregel: etwa Wurzel aus der Anzahl der Einträge)
+            iterations: Anzahl der k-Means-Iterationen
+            seed: Startwert für die Initialisierung
+        """
+        rows = np.flatnonzero(self._active[:self._size])
+        if len(rows) < n_lists:
+            raise ValueError("Zu wenige Einträge für die gewünschte Anzahl von Partitionen")
+        
+        vectors = np.asarray(self._vectors[rows])
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(len(rows), n_lists, replace=False)].copy()
+        
+        # Sphärisches k-Means (Kosinus-Ähnlichkeit auf normalisierten Vektoren)
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            for list_index in range(n_lists):
+                members = vectors[assignments == list_index]
+                if len(members) > 0:
+                    centroids[list_index] = members.sum(axis=0)
+            centroids = normalize_rows(centroids)
+        
+        self.centroids = centroids
+        self._assign_all()
+    
+    def compact(self) -> None:
+        """Entfernt gelöschte Zeilen physisch aus dem Zeilenspeicher."""
+        rows = np.flatnonzero(self._active[:self._size])
+        self._vectors = np.array(self._vectors[rows], dtype=np.float32)
+        self._active = np.ones(len(rows), dtype=bool)
+        self._row_ids = [self._row_ids[row] for row in rows.tolist()]
+        self._size = len(rows)
+        self._id_to_row = {proposal_id: row for row, proposal_id in enumerate(self._row_ids)}
+        
+        if self.is_approximate:
+            self._assign_all()
+    
+    def save(self, path: str) -> None:
+        """
+        Speichert den Index in einem Verzeichnis.
+        
+        Args:
+            path: Zielverzeichnis (wird bei Bedarf angelegt)
+        """
+        self.compact()
+        os.makedirs(path, exist_ok=True)
+        
+        np.save(os.path.join(path, "vectors.npy"), self._vectors[:self._size])
+        if self.is_approximate:
+            np.save(os.path.join(path, "centroids.npy"), self.centroids)
+        
+        with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "dimension": self.dimension,
+                "n_probe": self.n_probe,
+                "ids": self._row_ids
+            }, f)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorIndex":
+        """
+        Lädt einen gespeicherten Index.
+        
+        Args:
+            path: Verzeichnis des Index
+            mmap: Ob die Vektoren per Memory-Mapping (nur lesend) eingebunden werden;
+                  erst beim nächsten Hinzufügen wird eine beschreibbare Kopie angelegt
+                  
+        Returns:
+            Geladener VectorIndex
+        """
+        with open(os.path.join(path, "index.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        
+        index = cls(meta["dimension"], meta["n_probe"])
+        index._vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None)
+        index._size = len(index._vectors)
+        index._active = np.ones(index._size, dtype=bool)
+        index._row_ids = list(meta["ids"])
+        index._id_to_row = {proposal_id: row for row, proposal_id in enumerate(index._row_ids)}
+        
+        centroids_path = os.path.join(path, "centroids.npy")
+        if os.path.exists(centroids_path):
+            index.centroids = np.load(centroids_path)
+            index._assign_all()
+        
+        return index
+    
+    def _query_approximate(self, query: np.ndarray, k: int,
+                           threshold: Optional[float]) -> List[Tuple[str, float]]:
+        """Durchsucht nur die n_probe ähnlichsten Partitionen."""
+        n_probe = min(self.n_probe, len(self.centroids))
+        probe_lists = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        
+        candidate_lists = [self._lists[i] for i in probe_lists.tolist() if self._lists[i]]
+        if not candidate_lists:
+            return []
+        rows = np.concatenate(candidate_lists)
+        rows = rows[self._active[rows]]
+        
+        return self._top_k(rows, self._vectors[rows] @ query, k, threshold)
+    
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, k: int,
+               threshold: Optional[float]) -> List[Tuple[str, float]]:
+        """Wählt die k besten Zeilen aus und übersetzt sie in (ID, Ähnlichkeit)."""
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        
+        results = []
+        for position in top.tolist():
+            score = float(scores[position])
+            if score == -np.inf or (threshold is not None and score < threshold):
+                break
+            results.append((self._row_ids[int(rows[position])], score))
+        return results
+    
+    def _assign_all(self) -> None:
+        """Ordnet alle aktiven Zeilen ihrer Partition zu."""
+        self._assignments = np.full(len(self._active), -1, dtype=np.int32)
+        self._lists = [[] for _ in range(len(self.centroids))]
+        
+        rows = np.flatnonzero(self._active[:self._size])
+        for start in range(0, len(rows), 65536):
+            chunk = rows[start:start + 65536]
+            self._assignments[chunk] = np.argmax(self._vectors[chunk] @ self.centroids.T, axis=1)
+        
+        for row, assignment in zip(rows.tolist(), self._assignments[rows].tolist()):
+            self._lists[assignment].append(row)
+    
+    def _reserve(self, capacity: int) -> None:
+        """Vergrößert den Zeilenspeicher bei Bedarf (amortisiert verdoppelnd)."""
+        # Per Memory-Mapping geladene Vektoren sind schreibgeschützt und werden kopiert
+        if capacity <= len(self._vectors) and self._vectors.flags.writeable:
+            return
+        
+        new_capacity = max(capacity, 2 * len(self._vectors), 64)
+        vectors = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        active = np.zeros(new_capacity, dtype=bool)
+        active[:self._size] = self._active[:self._size]
+        assignments = np.full(new_capacity, -1, dtype=np.int32)
+        assignments[:len(self._assignments)] = self._assignments[:new_capacity]
+        
+        self._vectors, self._active, self._assignments = vectors, active, assignments
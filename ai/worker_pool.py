@@ -0,0 +1,174 @@
+"""
+Prozess-Pool für die CPU-Inferenz mit gemeinsam genutzten Modellgewichten
+
+Ein einzelner Python-Prozess lastet viele CPU-Kerne nicht aus, und jede
+weitere ProposalProcessor-Instanz lädt das Modell erneut. WorkerPool lädt das
+Modell einmal im Elternprozess, legt die Gewichte in gemeinsamen Speicher
+(Tensor.share_memory_) und startet die Worker per fork; alle Worker lesen
+dieselben Speicherseiten.
+
+Jeder Worker verwendet eine feste Anzahl von Intra-Op-Threads
+(torch.set_num_threads), damit Worker x Threads die Anzahl der Kerne nicht
+übersteigt. Die längensortierten Mini-Batches werden über eine gemeinsame
+Warteschlange verteilt, sodass freie Worker den nächsten Batch übernehmen.
+"""
+
+import os
+import queue
+import threading
+import multiprocessing
+from typing import List, Dict, Optional, Any, Sequence
+
+import numpy as np
+
+
+def available_cores() -> int:
+    """Anzahl der für diesen Prozess verfügbaren CPU-Kerne."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _worker_loop(processor: Any, threads_per_worker: int, tasks: Any, results: Any) -> None:
+    """Hauptschleife eines Workers: berechnet Batches, bis None empfangen wird."""
+    import torch
+    
+    torch.set_num_threads(threads_per_worker)
+    
+    # Im Worker wird direkt gerechnet und nicht erneut verteilt
+    processor.worker_pool = None
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        
+        task_id, input_ids, bucket_sizes = task
+        try:
+            predictions = processor._predict_batch(input_ids, len(input_ids), bucket_sizes)
+            results.put((task_id, predictions, None))
+        except Exception as e:
+            results.put((task_id, None, e))
+
+
+class WorkerPool:
+    """Pool von per fork gestarteten Workern, die das Modell eines ProposalProcessor teilen."""
+    
+    def __init__(self, processor: Any, num_workers: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None):
+        """
+        Lädt das Modell, legt die Gewichte in gemeinsamen Speicher und startet die Worker.
+        
+        Args:
+            processor: ProposalProcessor, dessen Modell verwendet wird
+            num_workers: Anzahl der Worker (Standard: verfügbare Kerne / threads_per_worker)
+            threads_per_worker: Intra-Op-Threads pro Worker (Standard: verfügbare
+                                Kerne / num_workers, mindestens 1)
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("Der Worker-Pool benötigt Prozesse mit fork (Linux/macOS)")
+        
+        cores = available_cores()
+        if num_workers is None:
+            num_workers = max(1, cores // (threads_per_worker or 1))
+        if threads_per_worker is None:
+            threads_per_worker = max(1, cores // num_workers)
+        if num_workers < 1 or threads_per_worker < 1:
+            raise ValueError("num_workers und threads_per_worker müssen mindestens 1 sein")
+        
+        self.processor = processor
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        
+        # Gewichte einmal laden und für alle Worker in gemeinsamen Speicher legen;
+        # der Tokenizer wird für das Padding benötigt und ebenfalls vorab geladen
+        processor.model.share_memory()
+        processor.preprocessor.tokenizer
+        
+        context = multiprocessing.get_context("fork")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._lock = threading.Lock()
+        self._next_task_id = 0
+        
+        self.workers = [
+            context.Process(
+                target=_worker_loop, args=(processor, threads_per_worker, self._tasks, self._results),
+                daemon=True, name=f"proposal-worker-{i}"
+            )
+            for i in range(num_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+    
+    def predict_batch(self, input_ids: List[Sequence[int]], batch_size: int = 32,
+                      bucket_sizes: Optional[Sequence[int]] = None) -> Dict[str, np.ndarray]:
+        """
+        Verteilt längensortierte Mini-Batches auf die Worker.
+        
+        Args:
+            input_ids: Ungepaddete Token-IDs je Text
+            batch_size: Anzahl der Texte pro Forward-Pass
+            bucket_sizes: Optionale Bucket-Grenzen für die Padding-Länge
+            
+        Returns:
+            Dictionary mit "embeddings", "category_probabilities" und "quality_scores"
+            wie bei ProposalProcessor._predict_batch (in Eingabereihenfolge)
+        """
+        from proposal_processor import length_sorted_batches
+        
+        if not self.workers:
+            raise ValueError("Der Worker-Pool wurde bereits beendet")
+        
+        with self._lock:
+            batches = {}
+            for batch_indices in length_sorted_batches([len(ids) for ids in input_ids], batch_size):
+                task_id = self._next_task_id
+                self._next_task_id += 1
+                batches[task_id] = batch_indices
+                self._tasks.put((task_id, [list(input_ids[i]) for i in batch_indices], bucket_sizes))
+            
+            results = {}
+            error = None
+            for _ in range(len(batches)):
+                task_id, predictions, task_error = self._get_result()
+                error = error or task_error
+                if predictions is None:
+                    continue
+                
+                for name, values in predictions.items():
+                    if name not in results:
+                        results[name] = np.zeros((len(input_ids),) + values.shape[1:], dtype=values.dtype)
+                    results[name][batches[task_id]] = values
+            
+            if error is not None:
+                raise error
+            return results
+    
+    def _get_result(self) -> tuple:
+        """Wartet auf das nächste Ergebnis und prüft dabei, ob alle Worker noch laufen."""
+        while True:
+            try:
+                return self._results.get(timeout=1.0)
+            except queue.Empty:
+                dead = [worker.name for worker in self.workers if not worker.is_alive()]
+                if dead:
+                    self.close()
+                    raise RuntimeError(f"Worker beendet: {', '.join(dead)}")
+    
+    def close(self) -> None:
+        """Beendet alle Worker."""
+        for worker in self.workers:
+            if worker.is_alive():
+                self._tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+    
+    def __enter__(self) -> "WorkerPool":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()